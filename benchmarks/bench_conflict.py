@@ -0,0 +1,191 @@
+"""
+ベンチマーク: 色の競合判定 / 競合しない色の選択
+
+競合が多発するgrid(少数の色をランダムに配置したgrid)で、以下の実装の処理時間を比較する。
+
+- scan: 色ごとに隣接する4セルを読み出して判定し、競合した色を除外して再選択する従来の実装
+- mask: セルごとに1度だけ取得した隣接色マスク(CodelGrid.neighbor_mask)のbit判定 /
+        マスク演算で選択する実装
+
+計測する処理は以下のとおり。
+
+- retry: すべてのセルについて、色相 / 明度を持つ18色を順に競合判定する
+         (競合解決で色をリトライする処理に相当)
+- fill: 市松模様の半数のセルに配置済みのgridの、空セルへの競合しない色の配置
+
+Usage:
+    python -m benchmarks.bench_conflict [--size SIZE] [--colors COLORS] [--repeat REPEAT]
+"""
+import random
+import time
+from argparse import ArgumentParser
+from typing import Callable
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.command_layouter.command_layouter import ICommandLayouter
+from pietgenerator.piet_common import Color
+
+
+def is_conflict_by_scan(color: Color, grid: CodelGrid, x: int, y: int) -> bool:
+    """
+    競合判定 (従来の実装)
+
+    Arguments:
+        color (Color): 競合判定を行う色
+        grid (CodelGrid): grid
+        x (int): 競合判定を行うx座標
+        y (int): 競合判定を行うy座標
+
+    Returns:
+        bool: 競合が発生した場合はTrue
+    """
+    if (color is Color.WHITE) or (color is Color.BLACK):
+        return False
+
+    index: int = color.index
+    cells: bytearray = grid._cells  # pylint: disable=protected-access
+    w: int = grid.width
+    pos: int = (y * w) + x
+
+    return (((x > 0) and (cells[pos - 1] == index)) or
+            ((x < w - 1) and (cells[pos + 1] == index)) or
+            ((y > 0) and (cells[pos - w] == index)) or
+            ((y < grid.height - 1) and (cells[pos + w] == index)))
+
+
+def fill_by_scan(grid: CodelGrid) -> None:
+    """
+    空セルへの色の配置 (従来の実装)
+
+    Arguments:
+        grid (CodelGrid): 配置を行うgrid
+    """
+    for y in range(grid.height):
+        for x in range(grid.width):
+            if not grid.is_empty(x, y):
+                continue
+
+            exclude_colors: list[Color] = []
+            while True:
+                color: Color = ICommandLayouter._get_random_color(exclude_colors)
+                if is_conflict_by_scan(color, grid, x, y):
+                    exclude_colors.append(color)
+                    continue
+
+                grid.set_color(x, y, color)
+                break
+
+
+def fill_by_mask(grid: CodelGrid) -> None:
+    """
+    空セルへの色の配置 (隣接色マスクを使用する実装)
+
+    Arguments:
+        grid (CodelGrid): 配置を行うgrid
+    """
+    for y in range(grid.height):
+        for x in range(grid.width):
+            if not grid.is_empty(x, y):
+                continue
+
+            grid.set_color(x, y, ICommandLayouter._get_random_color(None,
+                                                                    grid.neighbor_mask(x, y)))
+
+
+def create_grid(size: int, colors: list[Color], seed: int, checkered: bool) -> CodelGrid:
+    """
+    ベンチマーク用grid生成
+
+    Arguments:
+        size (int): gridの幅 / 高さ
+        colors (list[Color]): 配置する色
+        seed (int): 乱数のseed
+        checkered (bool): True: 市松模様の半数のセルのみ配置する; False: すべてのセルに配置する
+
+    Returns:
+        CodelGrid: 生成したgrid
+    """
+    rand = random.Random(seed)
+    grid = CodelGrid(size, size)
+
+    for y in range(size):
+        for x in range(size):
+            if (not checkered) or ((x + y) % 2 == 0):
+                grid.set_color(x, y, rand.choice(colors))
+
+    return grid
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of color conflict checks.")
+    arg_parser.add_argument("--size", type=int, default=200, help="Grid width and height.")
+    arg_parser.add_argument("--colors", type=int, default=4,
+                            help="Number of colors placed on the grid (1 - 18).")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of measurements.")
+    args = arg_parser.parse_args()
+
+    hued_colors = [color for color in Color
+                   if (color.index is not None) and (color.hue is not None)]
+    colors = hued_colors[:args.colors]
+
+    # retry
+    grid = create_grid(args.size, colors, 0, False)
+
+    def _retry_by_scan() -> list[bool]:
+        return [is_conflict_by_scan(color, grid, x, y)
+                for y in range(args.size) for x in range(args.size) for color in hued_colors]
+
+    def _retry_by_mask() -> list[bool]:
+        results: list[bool] = []
+        for y in range(args.size):
+            for x in range(args.size):
+                mask: int = grid.neighbor_mask(x, y)
+                results += [bool((mask >> color.index) & 1) for color in hued_colors]
+        return results
+
+    def _measure_retry(func: Callable[[], list[bool]]) -> float:
+        elapsed: list[float] = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            func()
+            elapsed.append(time.perf_counter() - start)
+        return min(elapsed)
+
+    identical = _retry_by_scan() == _retry_by_mask()
+
+    scan_time = _measure_retry(_retry_by_scan)
+    mask_time = _measure_retry(_retry_by_mask)
+
+    print(f"retry: scan {scan_time * 1000:8.1f} ms  mask {mask_time * 1000:8.1f} ms "
+          f"(x{scan_time / mask_time:.1f}) identical={identical}")
+
+    # fill
+    def _measure_fill(func: Callable[[CodelGrid], None]) -> tuple[float, bool]:
+        elapsed: list[float] = []
+        valid: bool = True
+        for seed in range(args.repeat):
+            fill_grid = create_grid(args.size, colors, seed, True)
+            random.seed(seed)
+
+            start = time.perf_counter()
+            func(fill_grid)
+            elapsed.append(time.perf_counter() - start)
+
+            valid &= fill_grid.is_fill_all() and not any(
+                ICommandLayouter._is_conflict(color, fill_grid, x, y)
+                for y in range(args.size) for x in range(args.size)
+                if (color := fill_grid.get_color(x, y)) is not None)
+        return min(elapsed), valid
+
+    scan_time, scan_valid = _measure_fill(fill_by_scan)
+    mask_time, mask_valid = _measure_fill(fill_by_mask)
+
+    print(f"fill : scan {scan_time * 1000:8.1f} ms  mask {mask_time * 1000:8.1f} ms "
+          f"(x{scan_time / mask_time:.1f}) valid={scan_valid and mask_valid}")
+
+
+if __name__ == '__main__':
+    main()
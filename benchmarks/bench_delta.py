@@ -0,0 +1,55 @@
+"""
+ベンチマーク: 連続する文字の差分による構築 (delta=True) のコマンド数
+
+英語 / 日本語の文章について、以下のコマンド生成器ごとに、文字ごとに新たに構築する場合(delta=False)と
+直前に構築した文字との差分で構築する場合(delta=True)のコマンド数を比較する。
+
+- factorize: FactorizeCommandGenerator
+- optimal  : OptimalCommandGenerator
+
+Usage:
+    python -m benchmarks.bench_delta
+"""
+from typing import Callable
+
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+
+_TEXTS: dict[str, str] = {
+    "english": ("Call me Ishmael. Some years ago - never mind how long precisely - having little "
+                "or no money in my purse, and nothing particular to interest me on shore, "
+                "I thought I would sail about a little and see the watery part of the world. "
+                "Tel: 0120-123-456"),
+    "japanese": ("メロスは激怒した。必ず、かの邪智暴虐の王を除かなければならぬと決意した。"
+                 "メロスには政治がわからぬ。メロスは、村の牧人である。笛を吹き、羊と遊んで暮して来た。"
+                 "けれども邪悪に対しては、人一倍に敏感であった。"),
+}
+""" 文章名 -> 文章 """
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    generators: dict[str, Callable[[bool], ICommandGenerator]] = {
+        "factorize": lambda delta: FactorizeCommandGenerator(False, delta=delta),
+        "optimal": lambda delta: OptimalCommandGenerator(False, delta=delta),
+    }
+
+    for gen_name, create in generators.items():
+        totals: list[int] = [0, 0]
+
+        for text_name, text in _TEXTS.items():
+            nums: list[int] = [len(create(delta).generate(text)) for delta in (False, True)]
+            totals = [total + num for total, num in zip(totals, nums)]
+
+            print(f"{gen_name:9s} {text_name:8s}: commands={nums[0]:6d} -> {nums[1]:6d} "
+                  f"({(nums[1] - nums[0]) / nums[0] * 100:+6.1f} %)")
+
+        print(f"{gen_name:9s} {'total':8s}: commands={totals[0]:6d} -> {totals[1]:6d} "
+              f"({(totals[1] - totals[0]) / totals[0] * 100:+6.1f} %)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+ベンチマーク: FactorizeCommandGenerator の変換方式 (ValueEncoding) ごとのコマンド数 / grid面積
+
+ASCII / 日本語 / 絵文字のメッセージについて、変換方式ごとに以下を計測する。
+
+- コマンド数 (seedごとの平均)
+- SquareLayouterで配置したgridの面積 (seedごとの平均)
+- コマンド生成 / 配置の処理時間 (seedごとの合計)
+
+Usage:
+    python -m benchmarks.bench_encoding [--length LENGTH] [--seeds SEEDS]
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color
+
+_CORPORA: dict[str, list[int]] = {
+    "ascii": list(range(0x20, 0x7F)),
+    # ひらがな / カタカナ / CJK統合漢字 (出現頻度を考慮し、かなを多めにする)
+    "japanese": [*range(0x3041, 0x3097), *range(0x3041, 0x3097),
+                 *range(0x30A1, 0x30FB), *range(0x4E00, 0x4E00 + 0x200)],
+    "emoji": [*range(0x1F300, 0x1F650), *range(0x1F900, 0x1FA00)],
+}
+""" コーパス名 -> メッセージに使用する文字のコードポイント """
+
+
+def create_message(corpus: list[int], length: int, seed: int) -> str:
+    """
+    ベンチマーク用メッセージ生成
+
+    Arguments:
+        corpus (list[int]): メッセージに使用する文字のコードポイント
+        length (int): メッセージ長
+        seed (int): 乱数のseed
+
+    Returns:
+        str: ランダムなメッセージ
+    """
+    rand = random.Random(seed)
+    return "".join(chr(rand.choice(corpus)) for _ in range(length))
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of FactorizeCommandGenerator encodings.")
+    arg_parser.add_argument("--length", type=int, default=100, help="Message length.")
+    arg_parser.add_argument("--seeds", type=int, default=3, help="Number of seeds per corpus.")
+    args = arg_parser.parse_args()
+
+    for name, corpus in _CORPORA.items():
+        for encoding in ValueEncoding:
+            gen = FactorizeCommandGenerator(False, encoding)
+            elapsed: float = 0.0
+            command_nums: list[int] = []
+            areas: list[int] = []
+
+            for seed in range(args.seeds):
+                message = create_message(corpus, args.length, seed)
+                # 配置中の乱数を固定し、変換方式間で同一の条件とする
+                layouter = SquareLayouter(False, False, seed=seed)
+
+                start = time.perf_counter()
+                commands = gen.generate(message)
+                grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+                elapsed += time.perf_counter() - start
+
+                command_nums.append(len(commands))
+                areas.append(len(grid) * len(grid[0]))
+
+            print(f"{name:8s} {str(encoding):9s}: "
+                  f"commands={sum(command_nums) / len(command_nums):8.1f} "
+                  f"area={sum(areas) / len(areas):9.1f} {elapsed * 1000:10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+ベンチマーク: SquareLayouter._put_to_empty_cells (未使用のセルへの色の配置)
+
+以下のgridについて、未使用のセルへの色の配置の処理時間を実装ごとに比較する。
+
+- length=N: 長さNのランダムなメッセージのコマンドを配置した、未使用のセルへの色の配置前のgrid
+- checkered: 市松模様の半数のセルにランダムな色を配置したgrid (未使用のセルが多いgrid)
+
+比較する実装は以下のとおり。
+
+- random : 競合しない色から、セルごとに乱数で選択する実装 (FillMode.RANDOM)
+- pattern: 固定の模様を敷き詰め、競合するセルのみ色を補正する実装 (FillMode.PATTERN)
+
+Usage:
+    python -m benchmarks.bench_fill [--lengths LENGTHS ...] [--size SIZE] [--repeat REPEAT]
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from benchmarks.bench_layout import create_random_commands
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.command_layouter.command_layouter import ICommandLayouter
+from pietgenerator.command_layouter.square_layouter import FillMode, SquareLayouter
+from pietgenerator.piet_common import Color
+
+
+class _CaptureLayouter(SquareLayouter):
+    """
+    未使用のセルへの色の配置前のgridを保存するSquareLayouter
+    """
+
+    def __init__(self, seed: int) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            seed (int): 乱数のseed
+        """
+        super().__init__(False, False, seed=seed)
+        self.captured: CodelGrid | None = None
+
+    def _put_to_empty_cells(self, grid: CodelGrid) -> None:
+        """
+        空セルコマンド配置 (配置前のgridを保存)
+
+        Arguments:
+            grid (CodelGrid): 塗りつぶしを行うgrid
+        """
+        self.captured = CodelGrid.from_codels(grid.to_codels())
+        super()._put_to_empty_cells(grid)
+
+
+def measure(source: CodelGrid, repeat: int) -> str:
+    """
+    未使用のセルへの色の配置の計測
+
+    Arguments:
+        source (CodelGrid): 未使用のセルへの色の配置前のgrid
+        repeat (int): 計測回数
+
+    Returns:
+        str: 実装ごとの計測結果
+    """
+    rows = source.to_index_rows()
+    results: list[str] = [f"empty={sum(row.count(CodelGrid.EMPTY) for row in rows):7d}"]
+
+    for fill_mode in (FillMode.RANDOM, FillMode.PATTERN):
+        filler = SquareLayouter(False, False, seed=0, fill_mode=fill_mode)
+        elapsed: list[float] = []
+        valid: bool = True
+
+        for _ in range(repeat):
+            grid = CodelGrid.from_codels(source.to_codels())
+
+            start = time.perf_counter()
+            filler._put_to_empty_cells(grid)
+            elapsed.append(time.perf_counter() - start)
+
+            valid &= grid.is_fill_all() and not any(
+                ICommandLayouter._is_conflict(color, grid, x, y)
+                for y in range(grid.height) for x in range(grid.width)
+                if (rows[y][x] == CodelGrid.EMPTY) and
+                ((color := grid.get_color(x, y)) is not None))
+
+        results.append(f"{str(fill_mode).lower()} {min(elapsed) * 1000:8.2f} ms valid={valid}")
+
+    return "  ".join(results)
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of SquareLayouter._put_to_empty_cells.")
+    arg_parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 3000],
+                            help="Message lengths.")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of measurements.")
+    arg_parser.add_argument("--size", type=int, default=300, help="Checkered grid size.")
+    args = arg_parser.parse_args()
+
+    for length in args.lengths:
+        layouter = _CaptureLayouter(length)
+        layouter.do_layout(create_random_commands(length, 0), Color.LIGHT_RED, Color.LIGHT_GREEN)
+
+        assert layouter.captured is not None
+        print(f"length={length:6d} w={layouter.captured.width:4d}: "
+              f"{measure(layouter.captured, args.repeat)}")
+
+    rand = random.Random(0)
+    checkered = CodelGrid(args.size, args.size)
+    for y in range(args.size):
+        for x in range(y % 2, args.size, 2):
+            checkered.set(x, y, rand.randrange(18))
+
+    print(f"checkered     w={args.size:4d}: {measure(checkered, args.repeat)}")
+
+
+if __name__ == '__main__':
+    main()
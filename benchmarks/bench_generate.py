@@ -0,0 +1,77 @@
+"""
+ベンチマーク: FactorizeCommandGenerator.generate (メッセージ -> コマンド生成)
+
+ランダムなASCII文字のメッセージについて、以下の実装の処理時間を比較する。
+
+- uncached: 文字ごとに素因数分解 / コマンド変換を行う従来の実装
+- cached  : 文字ごとのコマンドをキャッシュから取得する実装 (FactorizeCommandGenerator)
+
+Usage:
+    python -m benchmarks.bench_generate [--lengths LENGTHS ...] [--repeat REPEAT]
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.piet_common import Command
+
+
+def generate_uncached(gen: FactorizeCommandGenerator, message: str) -> list[Command]:
+    """
+    メッセージ -> コマンド生成 (従来の実装)
+
+    Arguments:
+        gen (FactorizeCommandGenerator): コマンド生成器
+        message (str): コマンドを生成するメッセージ
+
+    Returns:
+        list[Command]: メッセージから生成されたコマンドのリスト
+    """
+    commands: list[Command] = [Command.NONE]
+
+    for ch in message[::-1]:
+        commands.extend(gen._character_to_commands(ch))
+
+    commands.extend([Command.OUT_CHAR] * len(message))
+
+    return commands
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of FactorizeCommandGenerator.generate.")
+    arg_parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 100000],
+                            help="Message lengths.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of measurements.")
+    args = arg_parser.parse_args()
+
+    gen = FactorizeCommandGenerator(False)
+    rand = random.Random(0)
+
+    for length in args.lengths:
+        message = "".join(chr(rand.randrange(0x20, 0x7F)) for _ in range(length))
+
+        def _measure(func) -> float:
+            elapsed: list[float] = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                func(gen, message)
+                elapsed.append(time.perf_counter() - start)
+            return min(elapsed)
+
+        identical = generate_uncached(gen, message) == gen.generate(message)
+
+        FactorizeCommandGenerator.cache_clear()
+        uncached_time = _measure(generate_uncached)
+        cached_time = _measure(FactorizeCommandGenerator.generate)
+
+        print(f"length={length:8d}: uncached {uncached_time * 1000:9.1f} ms  "
+              f"cached {cached_time * 1000:9.1f} ms (x{uncached_time / cached_time:.1f}) "
+              f"identical={identical} {FactorizeCommandGenerator.cache_info()}")
+
+
+if __name__ == '__main__':
+    main()
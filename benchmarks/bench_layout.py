@@ -0,0 +1,75 @@
+"""
+ベンチマーク: SquareLayouter.do_layout (コマンド配置)
+
+ランダムなメッセージから生成したコマンドを配置し、メッセージ長ごとに以下を計測する。
+
+- 配置時間 (seedごとの合計)
+- 配置の試行回数 (SquareLayouter.layout_attempts の合計)
+- gridの幅 (seedごとの平均)
+
+--workers に2以上を指定した場合は、SquareLayouterの並列配置を使用する。
+
+Usage:
+    python -m benchmarks.bench_layout [--lengths LENGTHS ...] [--seeds SEEDS] [--workers WORKERS]
+"""
+import random
+import time
+from argparse import ArgumentParser
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color, Command
+
+
+def create_random_commands(length: int, seed: int) -> list[Command]:
+    """
+    ベンチマーク用コマンド生成
+
+    Arguments:
+        length (int): メッセージ長
+        seed (int): 乱数のseed
+
+    Returns:
+        list[Command]: ランダムなメッセージを出力するコマンド
+    """
+    rand = random.Random(seed)
+    message = "".join(rand.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(length))
+
+    return FactorizeCommandGenerator(False).generate(message)
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of SquareLayouter.do_layout.")
+    arg_parser.add_argument("--lengths", type=int, nargs="+", default=[100, 300, 1000],
+                            help="Message lengths.")
+    arg_parser.add_argument("--seeds", type=int, default=5, help="Number of seeds per length.")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                            help="Number of layout processes of SquareLayouter.")
+    args = arg_parser.parse_args()
+
+    for length in args.lengths:
+        elapsed: float = 0.0
+        attempts: int = 0
+        widths: list[int] = []
+
+        for seed in range(args.seeds):
+            commands = create_random_commands(length, seed)
+            # 配置中の乱数を固定し、実装間で同一の条件とする
+            layouter = SquareLayouter(False, False, args.workers, seed)
+
+            start = time.perf_counter()
+            grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+            elapsed += time.perf_counter() - start
+
+            attempts += layouter.layout_attempts
+            widths.append(len(grid))
+
+        print(f"length={length:6d}: {elapsed * 1000:10.1f} ms attempts={attempts:4d} "
+              f"w={sum(widths) / len(widths):.1f}")
+
+
+if __name__ == '__main__':
+    main()
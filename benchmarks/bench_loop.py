@@ -0,0 +1,64 @@
+"""
+ベンチマーク: ループによる繰り返し出力 (LoopCommandGenerator / LoopLayouter) のgridの面積
+
+繰り返しを含む文章 / 含まない文章について、以下のコマンド生成器 / 配置器の組み合わせごとに、
+コマンド数 / gridの面積 / 配置時間を比較する。
+
+- square: FactorizeCommandGenerator / SquareLayouter
+- loop  : LoopCommandGenerator / LoopLayouter
+
+Usage:
+    python -m benchmarks.bench_loop
+"""
+import time
+
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.loop_generator import LoopCommandGenerator
+from pietgenerator.command_layouter.command_layouter import ICommandLayouter
+from pietgenerator.command_layouter.loop_layouter import LoopLayouter
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color, Command
+
+_TEXTS: dict[str, str] = {
+    "banner": "=" * 60 + "\n  Piet Generator  \n" + "=" * 60 + "\n",
+    "repeat": "Hello World! " * 10,
+    "song": ("99 bottles of beer on the wall, 99 bottles of beer.\n" +
+             "Take one down, pass it around, " * 8 + "no more bottles of beer on the wall.\n"),
+    "log": "".join(f"[{level}] " + "." * 200 + "\n" for level in ["INFO", "WARN", "INFO"] * 10),
+    "plain": ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+              "it was the age of foolishness, it was the epoch of belief, "
+              "it was the epoch of incredulity."),
+}
+""" 文章名 -> 文章 """
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    modes: dict[str, tuple[ICommandGenerator, ICommandLayouter]] = {
+        "square": (FactorizeCommandGenerator(False), SquareLayouter(False, False, seed=0)),
+        "loop": (LoopCommandGenerator(False), LoopLayouter(False, False, seed=0)),
+    }
+
+    for text_name, text in _TEXTS.items():
+        base_area: int = 0
+        for mode_name, (gen, layouter) in modes.items():
+            commands = gen.generate(text)
+
+            start = time.perf_counter()
+            grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+            elapsed = time.perf_counter() - start
+
+            area: int = grid.width * grid.height
+            base_area = base_area or area
+            print(f"{text_name:6s} {mode_name:6s}: commands={len(commands):6d} "
+                  f"loops={commands.count(Command.LOOP_BEGIN):2d} "
+                  f"grid={grid.width:4d}x{grid.height:<4d} area={area:7d} "
+                  f"({(area - base_area) / base_area * 100:+6.1f} %) "
+                  f"layout={elapsed * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
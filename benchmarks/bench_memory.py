@@ -0,0 +1,111 @@
+"""
+ベンチマーク: Pietプログラムファイル出力時のピークメモリ使用量 (ピークRSS)
+
+以下の出力方法のピークRSSを比較する。
+ピークRSSはプロセス単位でしか計測できないため、出力方法ごとに子プロセスで計測する。
+
+- pillow: 画像全体の画素データからPIL.Imageでバイトオブジェクトを生成し、ファイルに書き込む
+- bytes : ProgramGenerator.generate と同様にバイトオブジェクトを生成し、ファイルに書き込む
+- stream: ProgramGenerator.generate_to と同様にファイルに直接出力する
+
+いずれも同一のgridを使用して計測するため、コマンド生成 / 配置は計測前に行う。
+
+Usage:
+    python -m benchmarks.bench_memory [--length LENGTH] [--codel_size CODEL_SIZE]
+"""
+import resource
+import subprocess
+import sys
+import tempfile
+from argparse import SUPPRESS, ArgumentParser
+
+from benchmarks.bench_translate import translate_by_pillow
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color
+from pietgenerator.program_generator import ProgramGenerator
+from pietgenerator.rasterizer import ImageMode
+
+_METHODS: list[str] = ["pillow", "bytes", "stream"]
+""" 出力方法 """
+
+
+def _get_max_rss() -> int:
+    """
+    ピークRSS取得
+
+    Returns:
+        int: 自プロセスのピークRSS [KiB]
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_child(method: str, message: str, codel_size: int, image_mode: ImageMode) -> None:
+    """
+    計測 (子プロセス)
+
+    引数: method の出力方法でPietプログラムファイルを出力し、出力前後のピークRSSを
+    標準出力に出力する。
+
+    Arguments:
+        method (str): 出力方法
+        message (str): Pietプログラムが出力するメッセージ
+        codel_size (int): 1つのCodelのサイズ [px]
+        image_mode (ImageMode): 画素形式
+    """
+    commands = FactorizeCommandGenerator(False).generate(message)
+    grid = SquareLayouter(False, False).do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+    gen = ProgramGenerator(None, None)  # type: ignore
+
+    before = _get_max_rss()
+
+    with tempfile.TemporaryFile() as fp:
+        if method == "pillow":
+            fp.write(translate_by_pillow(grid, codel_size, image_mode))
+        elif method == "bytes":
+            fp.write(gen._translate(grid, codel_size, image_mode))
+        else:
+            gen._translate_to(fp, grid, codel_size, image_mode)
+
+        size = fp.tell()
+
+    print(before, _get_max_rss(), size)
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of peak RSS while writing Piet program.")
+    arg_parser.add_argument("--length", type=int, default=1000, help="Message length.")
+    arg_parser.add_argument("--codel_size", type=int, default=50, help="Pixel size of Codel.")
+    arg_parser.add_argument("--image_mode", type=str, default="RGBA",
+                            choices=[str(image_mode) for image_mode in ImageMode])
+    arg_parser.add_argument("--child", type=str, choices=_METHODS, help=SUPPRESS)
+    args = arg_parser.parse_args()
+
+    message = ("Hello Piet World! " * (args.length // 18 + 1))[:args.length]
+    image_mode = ImageMode.name_of(args.image_mode)
+
+    if args.child:
+        run_child(args.child, message, args.codel_size, image_mode)
+        return
+
+    print(f"length={args.length} codel_size={args.codel_size} image_mode={image_mode}")
+
+    for method in _METHODS:
+        result = subprocess.run([sys.executable, "-m", "benchmarks.bench_memory",
+                                 "--length", str(args.length),
+                                 "--codel_size", str(args.codel_size),
+                                 "--image_mode", str(image_mode),
+                                 "--child", method],
+                                check=True, capture_output=True, text=True)
+        before, after, size = (int(value) for value in result.stdout.split())
+
+        print(f"{method:6s}: peak RSS {after / 1024:10.1f} MiB "
+              f"(+{(after - before) / 1024:.1f} MiB while writing) file {size:10d} bytes")
+
+
+if __name__ == '__main__':
+    main()
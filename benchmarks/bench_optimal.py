@@ -0,0 +1,80 @@
+"""
+ベンチマーク: OptimalCommandGenerator (最短コマンド探索) のコマンド数削減
+
+代表的な文章について、以下のコマンド生成器のコマンド数 / SquareLayouterで配置したgridの面積を比較する。
+
+- factorize: FactorizeCommandGenerator (ValueEncoding.FACTORIZE)
+- shortest : FactorizeCommandGenerator (ValueEncoding.SHORTEST)
+- optimal  : OptimalCommandGenerator
+
+併せて、OptimalCommandGeneratorが使用する表(ShortestCommandTable)の計算時間を計測する。
+
+Usage:
+    python -m benchmarks.bench_optimal [--max_value MAX_VALUE] [--search_depth SEARCH_DEPTH]
+"""
+import time
+from argparse import ArgumentParser
+
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color
+
+_TEXTS: dict[str, str] = {
+    "english": ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+                "it was the age of foolishness, it was the epoch of belief, "
+                "it was the epoch of incredulity."),
+    "japanese": ("吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+                 "何でも薄暗いじめじめした所でニャーニャー泣いていた事だけは記憶している。"),
+    "emoji": "🎉🎂🍰🎁🎈✨🌸🌏🚀🐱🐶🍣🍜☕🍺👍👏🙏😀😂🥺😭❤️🔥",
+}
+""" 文章名 -> 文章 """
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of OptimalCommandGenerator.")
+    arg_parser.add_argument("--max_value", type=int, default=0x1FFFF,
+                            help="Max code point of the shortest command table.")
+    arg_parser.add_argument("--search_depth", type=int, default=17,
+                            help="Max number of commands of the breadth-first search.")
+    args = arg_parser.parse_args()
+
+    start = time.perf_counter()
+    optimal_gen = OptimalCommandGenerator(False, args.max_value, args.search_depth)
+    print(f"table: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    generators: dict[str, ICommandGenerator] = {
+        "factorize": FactorizeCommandGenerator(False, ValueEncoding.FACTORIZE),
+        "shortest": FactorizeCommandGenerator(False, ValueEncoding.SHORTEST),
+        "optimal": optimal_gen,
+    }
+
+    totals: dict[str, int] = dict.fromkeys(generators, 0)
+
+    for text_name, text in _TEXTS.items():
+        base_num: int = 0
+        for gen_name, gen in generators.items():
+            commands = gen.generate(text)
+            # 配置中の乱数を固定し、コマンド生成器間で同一の条件とする
+            grid = SquareLayouter(False, False, seed=0).do_layout(commands, Color.LIGHT_RED,
+                                                                  Color.LIGHT_GREEN)
+
+            totals[gen_name] += len(commands)
+            base_num = base_num or len(commands)
+            print(f"{text_name:8s} {gen_name:9s}: commands={len(commands):6d} "
+                  f"({(len(commands) - base_num) / base_num * 100:+6.1f} %) "
+                  f"area={len(grid) * len(grid[0]):7d}")
+
+    base_total: int = totals["factorize"]
+    for gen_name, total in totals.items():
+        print(f"total    {gen_name:9s}: commands={total:6d} "
+              f"({(total - base_total) / base_total * 100:+6.1f} %)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+ベンチマーク: 整数へのパックによる出力 (PackedCommandGenerator / LoopLayouter) のgridの面積
+
+英文 / 数字 / 日本語の文章について、以下のコマンド生成器 / 配置器の組み合わせごとに、
+コマンド数 / gridの面積 / 配置時間を比較する。
+
+- optimal: OptimalCommandGenerator / SquareLayouter
+- packed : PackedCommandGenerator / LoopLayouter
+
+Usage:
+    python -m benchmarks.bench_packed
+"""
+import time
+
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+from pietgenerator.command_generator.packed_generator import PackedCommandGenerator
+from pietgenerator.command_layouter.command_layouter import ICommandLayouter
+from pietgenerator.command_layouter.loop_layouter import LoopLayouter
+from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.piet_common import Color
+
+_TEXTS: dict[str, str] = {
+    "short": "Hello, World!",
+    "english": ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+                "it was the age of foolishness, it was the epoch of belief, "
+                "it was the epoch of incredulity, it was the season of Light, "
+                "it was the season of Darkness, it was the spring of hope, "
+                "it was the winter of despair."),
+    "digits": "3.14159265358979323846264338327950288419716939937510582097494459230781640628",
+    "japanese": ("吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+                 "何でも薄暗いじめじめした所でニャーニャー泣いていた事だけは記憶している。"),
+}
+""" 文章名 -> 文章 """
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    modes: dict[str, tuple[ICommandGenerator, ICommandLayouter]] = {
+        "optimal": (OptimalCommandGenerator(False), SquareLayouter(False, False, seed=0)),
+        "packed": (PackedCommandGenerator(False), LoopLayouter(False, False, seed=0)),
+    }
+
+    for text_name, text in _TEXTS.items():
+        base_area: int = 0
+        for mode_name, (gen, layouter) in modes.items():
+            commands = gen.generate(text)
+
+            start = time.perf_counter()
+            grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+            elapsed = time.perf_counter() - start
+
+            area: int = grid.width * grid.height
+            base_area = base_area or area
+            print(f"{text_name:8s} {mode_name:7s}: chars={len(text):4d} "
+                  f"commands={len(commands):6d} ({len(commands) / len(text):5.2f} /char) "
+                  f"grid={grid.width:4d}x{grid.height:<4d} area={area:7d} "
+                  f"({(area - base_area) / base_area * 100:+6.1f} %) "
+                  f"layout={elapsed * 1000:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+ベンチマーク: piet_common.get_color_from_command / get_command_from_color のスループット
+
+以下の実装のスループットを比較する。
+
+- scan : Enumのメンバーを線形探索する従来の実装
+- table: import時に生成した変換テーブルを参照する実装(pietgenerator.piet_common)
+
+Usage:
+    python -m benchmarks.bench_piet_common [--number NUMBER] [--repeat REPEAT]
+"""
+import itertools
+import timeit
+from argparse import ArgumentParser
+from typing import Any, Callable, Sequence
+
+from pietgenerator.piet_common import Color, Command, PIET_COMMAND_NUM
+from pietgenerator.piet_common import get_color_from_command, get_command_from_color
+
+
+def get_color_from_command_by_scan(command: Command, color: Color) -> Color:
+    """
+    実行コマンド色取得 (従来の実装)
+
+    Arguments:
+        command (Command): 実行するコマンド
+        color (Color): コマンドを実行する直前の色
+
+    Returns:
+        Color: 実行するコマンドの色
+    """
+    hue = (color.hue + command.hue_step) % Color.COLOR_MAX.hue
+    lightness = (color.lightness + command.lightness_step) % Color.COLOR_MAX.lightness
+
+    for color_ in Color:
+        if (color_.hue == hue) and (color_.lightness == lightness):
+            return color_
+
+    raise ValueError(f"color=({hue}, {lightness}) is not found.")
+
+
+def get_command_from_color_by_scan(color: Color, next_color: Color) -> Command:
+    """
+    色により実行されるコマンド取得 (従来の実装)
+
+    Arguments:
+        color (Color): コマンドを実行する直前の色
+        next_color (Color): 実行するコマンドの色
+
+    Returns:
+        Command: 実行するコマンド
+    """
+    hue_step = (Color.COLOR_MAX.hue + next_color.hue - color.hue) % Color.COLOR_MAX.hue
+    lightness_step = ((Color.COLOR_MAX.lightness + next_color.lightness - color.lightness)
+                      % Color.COLOR_MAX.lightness)
+
+    for command in Command:
+        if (command.hue_step == hue_step) and (command.lightness_step == lightness_step):
+            return command
+
+    raise ValueError(f"command=({hue_step}, {lightness_step}) is not found.")
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of piet_common color / command lookup.")
+    arg_parser.add_argument("--number", type=int, default=20, help="Loops per measurement.")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of measurements.")
+    args = arg_parser.parse_args()
+
+    colors = [color for color in Color if (color.index is not None) and (color.hue is not None)]
+    commands = [command for command in Command
+                if command.command_id < PIET_COMMAND_NUM]
+    color_command_pairs = list(itertools.product(commands, colors))
+    color_pairs = list(itertools.product(colors, colors))
+
+    def _measure(func, pairs) -> float:
+        elapsed = min(timeit.repeat(lambda: [func(a, b) for a, b in pairs],
+                                    number=args.number, repeat=args.repeat))
+        return (len(pairs) * args.number) / elapsed
+
+    # (名前, 従来の実装, 変換テーブルの実装, 引数の組み合わせ)
+    targets: list[tuple[str, Callable[..., object], Callable[..., object],
+                        Sequence[tuple[Any, Any]]]] = [
+        ("get_color_from_command", get_color_from_command_by_scan, get_color_from_command,
+         color_command_pairs),
+        ("get_command_from_color", get_command_from_color_by_scan, get_command_from_color,
+         color_pairs),
+    ]
+
+    for name, scan, table, pairs in targets:
+        # 従来の実装と結果が同一であることを確認
+        identical = all(scan(a, b) is table(a, b) for a, b in pairs)
+
+        scan_ops = _measure(scan, pairs)
+        table_ops = _measure(table, pairs)
+
+        print(f"{name}: scan {scan_ops / 1e6:6.2f} Mops/s  "
+              f"table {table_ops / 1e6:6.2f} Mops/s (x{table_ops / scan_ops:.1f}) "
+              f"identical={identical}")
+
+
+if __name__ == '__main__':
+    main()
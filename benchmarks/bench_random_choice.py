@@ -0,0 +1,153 @@
+"""
+ベンチマーク: ICommandLayouter._get_random_color / _get_random_command (任意の色 / コマンドの選択)
+
+以下の実装の1回あたりの処理時間を比較する。
+
+- list: 呼び出しごとに候補のリストを生成し、除外する色 / コマンドをlist.removeで削除してから
+        random.choiceで選択する従来の実装
+- mask: 事前に生成した候補のtupleと除外する色 / コマンドのbitマスクから選択する実装
+        (pietgenerator.command_layouter.command_layouter)
+
+同一のseedの乱数生成器を使用した場合に、両実装の選択結果が同一となることも確認する。
+
+Usage:
+    python -m benchmarks.bench_random_choice [--number NUMBER] [--repeat REPEAT]
+"""
+import random
+import timeit
+from argparse import ArgumentParser
+from typing import Any, Callable, Sequence
+
+from pietgenerator.command_layouter.command_layouter import ICommandLayouter
+from pietgenerator.piet_common import Color, Command
+
+
+def get_random_color_by_list(exclude_colors: list[Color], rand: random.Random) -> Color:
+    """
+    任意の色取得 (従来の実装)
+
+    Arguments:
+        exclude_colors (list[Color]): 除外する色
+        rand (random.Random): 使用する乱数生成器
+
+    Returns:
+        Color: 任意の色
+    """
+    colors: list[Color] = [
+        Color.LIGHT_RED,
+        Color.LIGHT_YELLOW,
+        Color.LIGHT_GREEN,
+        Color.LIGHT_CYAN,
+        Color.LIGHT_BLUE,
+        Color.LIGHT_MAGENTA,
+        Color.RED,
+        Color.YELLOW,
+        Color.GREEN,
+        Color.CYAN,
+        Color.BLUE,
+        Color.MAGENTA,
+        Color.DARK_RED,
+        Color.DARK_YELLOW,
+        Color.DARK_GREEN,
+        Color.DARK_CYAN,
+        Color.DARK_BLUE,
+        Color.DARK_MAGENTA
+    ]
+
+    for exclude_color in exclude_colors:
+        colors.remove(exclude_color)
+
+    if not colors:
+        raise RuntimeError("No color left.")
+
+    return rand.choice(colors)
+
+
+def get_random_command_by_list(exclude_commands: list[Command], rand: random.Random) -> Command:
+    """
+    任意のコマンド取得 (従来の実装)
+
+    Arguments:
+        exclude_commands (list[Command]): 除外するコマンド
+        rand (random.Random): 使用する乱数生成器
+
+    Returns:
+        Command: 任意のコマンド
+    """
+    commands: list[Command] = [
+        Command.PUSH,
+        Command.POP,
+        Command.ADD,
+        Command.SUBTRACT,
+        Command.MULTIPLY,
+        Command.DIVIDE,
+        Command.MOD,
+        Command.NOT,
+        Command.GREATER,
+        Command.DUPLICATE,
+    ]
+
+    for exclude_command in exclude_commands:
+        commands.remove(exclude_command)
+
+    if not commands:
+        raise RuntimeError("No command left.")
+
+    return rand.choice(commands)
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of random color / command selection.")
+    arg_parser.add_argument("--number", type=int, default=100000, help="Calls per measurement.")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Number of measurements.")
+    args = arg_parser.parse_args()
+
+    colors = ICommandLayouter._RANDOM_COLORS
+    commands = ICommandLayouter._RANDOM_COMMANDS
+
+    # 除外数ごとの、除外する色 / コマンド (list) と除外マスク (mask)
+    color_cases = [(list(colors[:n]), sum(1 << color.index for color in colors[:n]))
+                   for n in (0, 4, 12)]
+    command_cases = [(list(commands[:n]), sum(1 << command.command_id for command in commands[:n]))
+                     for n in (0, 3, 7)]
+
+    def _measure(func: Callable[[random.Random], object]) -> float:
+        rand = random.Random(0)
+        elapsed = min(timeit.repeat(lambda: func(rand), number=args.number, repeat=args.repeat))
+        return elapsed / args.number
+
+    def _identical(list_func: Callable[[random.Random], object],
+                   mask_func: Callable[[random.Random], object]) -> bool:
+        list_rand = random.Random(0)
+        mask_rand = random.Random(0)
+        return all(list_func(list_rand) is mask_func(mask_rand) for _ in range(10000))
+
+    # (名前, 除外する値と除外マスク, listによる実装, 除外マスクによる実装)
+    targets: list[tuple[str, Sequence[tuple[list[Any], int]], Callable[..., object],
+                        Callable[..., object]]] = [
+        ("color  ", color_cases, get_random_color_by_list, ICommandLayouter._get_random_color),
+        ("command", command_cases, get_random_command_by_list,
+         ICommandLayouter._get_random_command),
+    ]
+
+    for name, cases, by_list, by_mask in targets:
+        for excludes, mask in cases:
+            def _by_list(rand: random.Random, excludes=excludes, by_list=by_list) -> object:
+                return by_list(excludes, rand)
+
+            def _by_mask(rand: random.Random, mask=mask, by_mask=by_mask) -> object:
+                return by_mask(None, mask, rand)
+
+            list_time = _measure(_by_list)
+            mask_time = _measure(_by_mask)
+
+            print(f"{name} exclude={len(excludes):2d}: list {list_time * 1e9:7.1f} ns  "
+                  f"mask {mask_time * 1e9:7.1f} ns (x{list_time / mask_time:.1f}) "
+                  f"identical={_identical(_by_list, _by_mask)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+ベンチマーク: ProgramGenerator._translate (grid -> PNG画像ファイル変換)
+
+以下の実装の処理時間 / ファイルサイズを比較する。
+
+- putpixel: 1pixelずつ描画する従来の実装(Image.putpixel)
+- pillow  : index配列を一括して拡大し、PIL.Imageで出力する実装
+- writer  : Codelの繰り返し構造を利用したPNG出力(pietgenerator.png_writer)
+
+Usage:
+    python -m benchmarks.bench_translate [--size SIZE] [--codel_size CODEL_SIZE]
+"""
+import random
+import timeit
+from argparse import ArgumentParser
+from io import BytesIO
+
+from PIL import Image
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Codel, Color
+from pietgenerator.program_generator import ProgramGenerator
+from pietgenerator.rasterizer import ImageMode, PALETTE_RGB, rasterize, to_index_rows
+
+
+def translate_by_putpixel(grid: list[list[Codel]], codel_size: int) -> bytes:
+    """
+    grid -> PNG画像ファイル変換 (従来の実装)
+
+    Arguments:
+        grid (list[list[Codel]]): 変換するgrid
+        codel_size (int): 1つのCodelのサイズ [px]
+
+    Returns:
+        bytes: PNG形式の画像ファイル
+    """
+    h = len(grid)
+    w = len(grid[0])
+
+    image = Image.new("RGBA", (w * codel_size, h * codel_size))
+
+    for y in range(h):
+        for x in range(w):
+            color = grid[y][x].color
+
+            for i in range(codel_size):
+                for j in range(codel_size):
+                    image.putpixel(((x * codel_size) + j, (y * codel_size) + i),
+                                   (color.r, color.g, color.b, color.a))
+
+    fp: BytesIO = BytesIO()
+    image.save(fp, format="PNG")
+
+    return fp.getvalue()
+
+
+def translate_by_pillow(grid: CodelGrid | list[list[Codel]], codel_size: int,
+                        image_mode: ImageMode) -> bytes:
+    """
+    grid -> PNG画像ファイル変換 (PIL.Imageで出力する実装)
+
+    Arguments:
+        grid (CodelGrid | list[list[Codel]]): 変換するgrid
+        codel_size (int): 1つのCodelのサイズ [px]
+        image_mode (ImageMode): 画素形式
+
+    Returns:
+        bytes: PNG形式の画像ファイル
+    """
+    h = len(grid)
+    w = len(grid[0])
+
+    pixels: bytes = rasterize(to_index_rows(grid), codel_size, image_mode)
+    image = Image.frombuffer(image_mode.pil_mode, (w * codel_size, h * codel_size),
+                             pixels, "raw", image_mode.pil_mode, 0, 1)
+
+    if image_mode is ImageMode.PALETTE:
+        image.putpalette(PALETTE_RGB)
+
+    fp: BytesIO = BytesIO()
+    image.save(fp, format="PNG")
+
+    return fp.getvalue()
+
+
+def create_random_grid(size: int, seed: int = 0) -> list[list[Codel]]:
+    """
+    ベンチマーク用grid生成
+
+    Arguments:
+        size (int): gridの幅 / 高さ
+        seed (int, optional): 乱数のseed
+
+    Returns:
+        list[list[Codel]]: 任意の色のCodelを配置したgrid
+    """
+    rand = random.Random(seed)
+    colors = [color for color in Color if color is not Color.COLOR_MAX]
+
+    return [[Codel(rand.choice(colors)) for _ in range(size)] for _ in range(size)]
+
+
+def main() -> None:
+    """
+    ベンチマーク実行
+    """
+    arg_parser = ArgumentParser(description="Benchmark of ProgramGenerator._translate.")
+    arg_parser.add_argument("--size", type=int, default=200, help="Grid width / height.")
+    arg_parser.add_argument("--codel_size", type=int, default=10, help="Pixel size of Codel.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Number of measurements.")
+    args = arg_parser.parse_args()
+
+    grid = create_random_grid(args.size)
+    gen = ProgramGenerator(None, None)  # type: ignore
+    codel_size: int = args.codel_size
+
+    def _measure(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    def _decode(image: bytes) -> bytes:
+        return Image.open(BytesIO(image)).convert("RGBA").tobytes()
+
+    putpixel_image = translate_by_putpixel(grid, codel_size)
+    putpixel_time = _measure(lambda: translate_by_putpixel(grid, codel_size))
+
+    print(f"grid={args.size}x{args.size} codel_size={codel_size}")
+    print(f"putpixel        : {putpixel_time * 1000:10.2f} ms {len(putpixel_image):10d} bytes")
+
+    for image_mode in ImageMode:
+        for name, func in [
+            ("pillow", lambda: translate_by_pillow(grid, codel_size, image_mode)),
+            ("writer", lambda: gen._translate(grid, codel_size, image_mode)),
+        ]:
+            image = func()
+            elapsed = _measure(func)
+
+            # 従来の実装と画素が同一であることを確認
+            identical = _decode(image) == _decode(putpixel_image)
+
+            print(f"{name:6s} {str(image_mode):8s} : {elapsed * 1000:10.2f} ms "
+                  f"{len(image):10d} bytes (x{putpixel_time / elapsed:.1f}) "
+                  f"identical={identical}")
+
+
+if __name__ == '__main__':
+    main()
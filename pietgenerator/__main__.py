@@ -1,16 +1,24 @@
 """
 Pietプラグラム: mainモジュール
 """
+import contextlib
 import os
+import secrets
 import sys
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
 from pathlib import Path
 from typing import Any
 
+from pietgenerator.command_generator.devs_tuner import DevsTuner
 from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
-from pietgenerator.command_layouter.square_layouter import SquareLayouter
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+from pietgenerator.command_generator.loop_generator import LoopCommandGenerator
+from pietgenerator.command_generator.packed_generator import PackedCommandGenerator
+from pietgenerator.command_layouter.loop_layouter import LoopLayouter
+from pietgenerator.command_layouter.square_layouter import FillMode, SquareLayouter
 from pietgenerator.piet_common import Color
 from pietgenerator.program_generator import GenerateProgramError, ProgramGenerator
+from pietgenerator.rasterizer import ImageMode
 
 
 class Main:
@@ -50,6 +58,17 @@ class Main:
         start_color: Color = Color.name_of(args.start_color)
         end_color: Color = Color.name_of(args.end_color)
         codel_size: int = args.codel_size
+        image_mode: ImageMode = ImageMode.name_of(args.image_mode)
+        compress_level: int = args.compress_level
+        seed: int | None = args.seed
+        fill_mode: FillMode = FillMode.name_of(args.fill_mode)
+        encoding: ValueEncoding = ValueEncoding.name_of(args.encoding)
+        # 除数の設定ファイルは、--devs を指定していない場合に使用する
+        devs: list[int] | None = args.devs if args.devs is not None else args.devs_config
+        delta: bool = args.delta
+        loop: bool = args.loop
+        packed: bool = args.packed
+        interleave: bool = args.interleave
 
         # codel_sizeが0以下の場合、画像の生成に失敗するため、別途判定
         if codel_size < 1:
@@ -58,22 +77,62 @@ class Main:
             print(f"{cls._PROG}: error: argument --codel_size: invalid int value: {codel_size}")
             return os.EX_USAGE
 
-        image: bytes | None = None
+        # 除数が2未満の場合、コマンドの生成に失敗するため、別途判定
+        if (devs is not None) and any(dev < 2 for dev in devs):
+            print(cls._USAGE)
+            print(f"{cls._PROG}: error: argument --devs: invalid int value: {min(devs)}")
+            return os.EX_USAGE
+
+        # 生成途中のPietプログラムファイル
+        temp_path: str | None = None
+
         try:
-            gen: ProgramGenerator = ProgramGenerator(FactorizeCommandGenerator(False),
-                                                     SquareLayouter(False, False))
-            image = gen.generate(message,
-                                 start_color=start_color,
-                                 abort_program_color=end_color,
-                                 codel_size=codel_size)
+            gen: ProgramGenerator
+            if packed:
+                # メッセージを整数にパックし、ループで取り出して出力する
+                gen = ProgramGenerator(PackedCommandGenerator(False,
+                                                              delta=delta,
+                                                              interleave=interleave),
+                                       LoopLayouter(False, False,
+                                                    seed=seed,
+                                                    fill_mode=fill_mode))
+            elif loop:
+                # 繰り返しをループで出力する
+                # (ループを含まないコマンドは、LoopLayouterがSquareLayouterで配置する)
+                gen = ProgramGenerator(LoopCommandGenerator(False, encoding, devs, delta,
+                                                            interleave),
+                                       LoopLayouter(False, False,
+                                                    seed=seed,
+                                                    fill_mode=fill_mode))
+            else:
+                gen = ProgramGenerator(FactorizeCommandGenerator(False, encoding, devs, delta,
+                                                                 interleave),
+                                       SquareLayouter(False, False,
+                                                      seed=seed,
+                                                      fill_mode=fill_mode))
+
+            # 生成したPietプログラムは、メモリ上に保持せず同一ディレクトリの一時ファイルに直接出力し、
+            # 生成に成功した場合のみ出力先のファイルを置き換える
+            temp_name: str = str(Path(output_path).with_name(
+                f".{Path(output_path).name}.{secrets.token_hex(8)}.tmp"))
+            with open(temp_name, "xb") as fp:
+                # 作成した一時ファイルのみ削除の対象とする
+                temp_path = temp_name
+                gen.generate_to(fp,
+                                message,
+                                start_color=start_color,
+                                abort_program_color=end_color,
+                                codel_size=codel_size,
+                                image_mode=image_mode,
+                                compress_level=compress_level)
+
+            os.replace(temp_path, output_path)
         except GenerateProgramError:
+            cls._remove_temp_file(temp_path)
             print(f"{cls._PROG}: error: internal error occurred.")
             return os.EX_SOFTWARE
-
-        try:
-            with open(output_path, "wb") as fp:
-                fp.write(image)
         except OSError:
+            cls._remove_temp_file(temp_path)
             print(f"{cls._PROG}: error: Piet program file create failed. path: '{output_path}'")
             return os.EX_OSERR
 
@@ -81,6 +140,44 @@ class Main:
 
         return os.EX_OK
 
+    @staticmethod
+    def _remove_temp_file(temp_path: str | None) -> None:
+        """
+        一時ファイル削除
+
+        生成途中のPietプログラムファイルを削除する。出力先の既存のファイルは削除しない。
+
+        Arguments:
+            temp_path (str | None): 一時ファイルのパス (None: 一時ファイルを作成していない)
+        """
+        if temp_path is None:
+            return
+
+        with contextlib.suppress(OSError):
+            Path(temp_path).unlink(missing_ok=True)
+
+    @staticmethod
+    def _load_devs_config(path: str) -> list[int]:
+        """
+        除数の設定ファイル読み込み
+
+        ArgumentParserの --devs_config の変換に使用する。
+
+        Arguments:
+            path (str): DevsTunerが出力した設定ファイルのパス
+
+        Returns:
+            list[int]: 設定ファイルの最適な除数
+
+        Raises:
+            ArgumentTypeError: 設定ファイルの読み込みに失敗した、または形式が不正である
+        """
+        try:
+            return list(DevsTuner.load(path))
+        except (ValueError, OSError) as e:
+            raise ArgumentTypeError(f"divisor config file load failed. path: '{path}' ({e})") \
+                from e
+
     @classmethod
     def _create_argparser(cls) -> ArgumentParser:
         """
@@ -138,6 +235,102 @@ class Main:
             type=int,
             default=10)
 
+        arg_parser.add_argument(
+            "--image_mode",
+            help=("Pixel format of generated Piet program file. "
+                  "RGBA: 32-bit RGBA, PALETTE: 8-bit indexed color. "
+                  "Default format is RGBA."),
+            type=str,
+            choices=[str(image_mode) for image_mode in ImageMode],
+            default="RGBA")
+
+        arg_parser.add_argument(
+            "--compress_level",
+            help=("zlib compression level of generated Piet program file. "
+                  "Set an int value from 0 to 9. "
+                  "Default level is 6."),
+            type=int,
+            choices=range(0, 10),
+            metavar="{0-9}",
+            default=6)
+
+        arg_parser.add_argument(
+            "--seed",
+            help=("Random seed for the layout of the Piet program. "
+                  "The same message and options with the same seed generate "
+                  "the same Piet program file. "
+                  "Default is a random layout on every run."),
+            type=int,
+            default=None)
+
+        arg_parser.add_argument(
+            "--fill_mode",
+            help=("Coloring of the cells not used by the program. "
+                  "PATTERN: fixed 5-color pattern, RANDOM: random colors. "
+                  "Default mode is PATTERN."),
+            type=str,
+            choices=[str(fill_mode) for fill_mode in FillMode],
+            default="PATTERN")
+
+        arg_parser.add_argument(
+            "--encoding",
+            help=("Encoding of the character code points into commands. "
+                  "FACTORIZE: product of factors, BINARY: signed binary digits, "
+                  "SHORTEST: shorter of FACTORIZE and BINARY per character. "
+                  "Default encoding is FACTORIZE."),
+            type=str,
+            choices=[str(encoding) for encoding in ValueEncoding],
+            default="FACTORIZE")
+
+        arg_parser.add_argument(
+            "--devs",
+            help=("Divisors used by the FACTORIZE encoding, in order of use. "
+                  "Set int values greater than 1. "
+                  "Default divisors are 2 3."),
+            type=int,
+            nargs="+",
+            default=None)
+
+        arg_parser.add_argument(
+            "--devs_config",
+            help=("Config file (JSON) written by pietgenerator.command_generator.devs_tuner. "
+                  "The best divisors in the file are used as --devs. "
+                  "When --devs is also set, --devs is used."),
+            type=cls._load_devs_config,
+            default=None)
+
+        arg_parser.add_argument(
+            "--delta",
+            help=("Build each character from the previous character by its difference "
+                  "when it is shorter than building the character from scratch."),
+            action="store_true")
+
+        arg_parser.add_argument(
+            "--loop",
+            help=("Output repeated patterns in the message with Piet loops, "
+                  "and lay out the commands in rows going back and forth. "
+                  "When the message has no repeated patterns, "
+                  "the commands are laid out in a spiral as without --loop."),
+            action="store_true")
+
+        arg_parser.add_argument(
+            "--packed",
+            help=("Pack the characters of the message into integers, "
+                  "and output them with a Piet loop that divides the integers. "
+                  "--encoding, --devs, --devs_config and --loop are ignored."),
+            action="store_true")
+
+        arg_parser.add_argument(
+            "--interleave",
+            help=("Output each character right after building it, "
+                  "so that the stack depth of the program does not grow with the message length. "
+                  "With --delta, up to 4 consecutive characters may be built together "
+                  "before they are output. The program is never longer than with "
+                  "--interleave alone, but may be slightly longer than with --delta alone. "
+                  "With --packed, the packed integers are pushed and output "
+                  "in groups of a fixed size."),
+            action="store_true")
+
         return arg_parser
 
 
@@ -0,0 +1,421 @@
+"""
+Pietプラグラム: grid (Codel配置領域) モジュール
+"""
+from typing import Iterator, Self, Sequence
+
+from pietgenerator.piet_common import HUED_COLOR_NUM, Codel, Color
+
+
+class CodelGrid:
+    """
+    CodelGridは、Codelを配置するgridを実現するクラスである。
+    gridの各セルは、配置されたCodelのColor.indexを1byteとして、
+    行優先(左上を原点(0, 0))の1つのbytearrayに格納する。
+    Codelが配置されていないセルにはEMPTYを格納する。
+
+    従来の list[list[Codel | None]] と同様に grid[y][x] でCodelを参照 / 設定できる
+    アダプタ(CodelGridRow)を提供する。
+    """
+
+    EMPTY: int = 0xFF
+    """ Codelが配置されていないセルの値 """
+
+    _COLOR_BITS: tuple[int, ...] = tuple((1 << index) if index < HUED_COLOR_NUM else 0
+                                         for index in range(EMPTY + 1))
+    """ セルの値 -> 隣接色マスクのbit 変換テーブル (白 / 黒 / EMPTYは0) """
+
+    def __init__(self, w: int, h: int) -> None:
+        """
+        インスタンス初期化
+
+        すべてのセルにCodelが配置されていないgridを生成する。
+
+        Arguments:
+            w (int): gridの幅
+            h (int): gridの高さ
+
+        Raises:
+            ValueError: 引数: w / h が1未満である
+        """
+        if (w < 1) or (h < 1):
+            raise ValueError(f"w={w} h={h} is invalid grid size.")
+
+        self._w = w
+        self._h = h
+        self._cells = bytearray((self.EMPTY,)) * (w * h)
+
+    @classmethod
+    def from_codels(cls, codels: list[list[Codel | None]]) -> Self:
+        """
+        list[list[Codel | None]] -> CodelGrid生成
+
+        Arguments:
+            codels (list[list[Codel | None]]): Codel(または None)を配置したgrid
+
+        Returns:
+            CodelGrid: 生成したCodelGrid
+        """
+        grid = cls(len(codels[0]), len(codels))
+
+        for y, row in enumerate(codels):
+            for x, codel in enumerate(row):
+                if codel is not None:
+                    grid.set(x, y, codel.color.index)
+
+        return grid
+
+    def to_codels(self) -> list[list[Codel | None]]:
+        """
+        CodelGrid -> list[list[Codel | None]] 変換
+
+        Returns:
+            list[list[Codel | None]]: Codel(または None)を配置したgrid
+        """
+        return [list(row) for row in self]
+
+    @property
+    def width(self) -> int:
+        """
+        gridの幅取得
+
+        Returns:
+            int: gridの幅
+        """
+        return self._w
+
+    @property
+    def height(self) -> int:
+        """
+        gridの高さ取得
+
+        Returns:
+            int: gridの高さ
+        """
+        return self._h
+
+    def get(self, x: int, y: int) -> int:
+        """
+        セル取得
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            int: セルに配置されたCodelのColor.index (Codelが配置されていない場合はEMPTY)
+        """
+        return self._cells[(y * self._w) + x]
+
+    def set(self, x: int, y: int, index: int) -> None:
+        """
+        セル設定
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+            index (int): セルに配置するCodelのColor.index (EMPTYの場合はCodelを削除する)
+        """
+        self._cells[(y * self._w) + x] = index
+
+    def get_color(self, x: int, y: int) -> Color | None:
+        """
+        セルの色取得
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            Color | None: セルに配置されたCodelの色 (Codelが配置されていない場合はNone)
+        """
+        index: int = self.get(x, y)
+        return None if index == self.EMPTY else Color.index_of(index)
+
+    def set_color(self, x: int, y: int, color: Color) -> None:
+        """
+        セルの色設定
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+            color (Color): セルに配置するCodelの色
+        """
+        self.set(x, y, color.index)
+
+    def is_empty(self, x: int, y: int) -> bool:
+        """
+        空セル判定
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            bool: セルにCodelが配置されていない場合はTrue
+        """
+        return self.get(x, y) == self.EMPTY
+
+    def is_fill_all(self) -> bool:
+        """
+        全セルCodel配置済み判定
+
+        Returns:
+            bool: すべてのセルにCodelが配置されている場合はTrue
+        """
+        return self.EMPTY not in self._cells
+
+    def has_neighbor(self, x: int, y: int, index: int) -> bool:
+        """
+        隣接セル判定
+
+        引数: x / y で与えられた座標の上下左右に隣接するセルに、引数: index の
+        Codelが配置されているか判定する。
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+            index (int): 判定するColor.index
+
+        Returns:
+            bool: 隣接するセルに引数: index のCodelが配置されている場合はTrue
+        """
+        cells: bytearray = self._cells
+        w: int = self._w
+        pos: int = (y * w) + x
+
+        return (((x > 0) and (cells[pos - 1] == index)) or
+                ((x < w - 1) and (cells[pos + 1] == index)) or
+                ((y > 0) and (cells[pos - w] == index)) or
+                ((y < self._h - 1) and (cells[pos + w] == index)))
+
+    def neighbor_mask(self, x: int, y: int) -> int:
+        """
+        隣接色マスク取得
+
+        引数: x / y で与えられた座標の上下左右に隣接するセルに配置された、色相 / 明度を持つ
+        Codelの色について、Color.indexのbitを立てたマスクを取得する。
+        同一セルに対して複数の色の競合判定を行う場合は、本マスクを1度だけ取得し、
+        (mask >> Color.index) & 1 で判定できる。
+        白 / 黒は競合判定の対象外であるため、マスクには含まない。
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            int: 隣接するセルの色のColor.indexのbitを立てた18bitのマスク
+        """
+        cells: bytearray = self._cells
+        bits: tuple[int, ...] = self._COLOR_BITS
+        w: int = self._w
+        pos: int = (y * w) + x
+        mask: int = 0
+
+        if x > 0:
+            mask |= bits[cells[pos - 1]]
+        if x < w - 1:
+            mask |= bits[cells[pos + 1]]
+        if y > 0:
+            mask |= bits[cells[pos - w]]
+        if y < self._h - 1:
+            mask |= bits[cells[pos + w]]
+
+        return mask
+
+    def fill_empty(self, pattern: Sequence[bytes]) -> int:
+        """
+        空セル一括配置
+
+        Codelが配置されていないすべてのセルに、引数: pattern を原点から敷き詰めた位置の色を
+        1度の走査で配置する。
+        敷き詰めた色が隣接するセルの色と同一となる(競合が発生する)セルには、隣接するセルの色を
+        除いた、Color.indexが最小の色相 / 明度を持つ色を配置する。
+        隣接するセルの色は配置時点のgridから判定するため、配置したセルで競合は発生しない。
+
+        Arguments:
+            pattern (Sequence[bytes]): 敷き詰める色のColor.indexを1行ずつ格納したバイト列
+
+        Returns:
+            int: 配置したセル数
+        """
+        cells: bytearray = self._cells
+        bits: tuple[int, ...] = self._COLOR_BITS
+        w: int = self._w
+        last_x: int = w - 1
+        last_y: int = self._h - 1
+        pattern_w: int = len(pattern[0])
+        pattern_h: int = len(pattern)
+        hued_mask: int = (1 << HUED_COLOR_NUM) - 1
+        count: int = 0
+
+        # 配置済みのセルは走査せず、空セルのみを順に検索する
+        pos: int = cells.find(self.EMPTY)
+        while pos >= 0:
+            y, x = divmod(pos, w)
+
+            mask: int = 0
+            if x > 0:
+                mask |= bits[cells[pos - 1]]
+            if x < last_x:
+                mask |= bits[cells[pos + 1]]
+            if y > 0:
+                mask |= bits[cells[pos - w]]
+            if y < last_y:
+                mask |= bits[cells[pos + w]]
+
+            index: int = pattern[y % pattern_h][x % pattern_w]
+            if (mask >> index) & 1:
+                # 競合が発生するため、隣接するセルの色を除いた最小のColor.indexの色で補正
+                free: int = hued_mask & ~mask
+                index = (free & -free).bit_length() - 1
+
+            cells[pos] = index
+            count += 1
+            pos = cells.find(self.EMPTY, pos + 1)
+
+        return count
+
+    def row(self, y: int) -> memoryview:
+        """
+        行ビュー取得
+
+        Arguments:
+            y (int): y座標
+
+        Returns:
+            memoryview: gridの1行分のColor.indexを参照するビュー (コピーは行わない)
+        """
+        return memoryview(self._cells)[y * self._w:(y + 1) * self._w]
+
+    def to_index_rows(self) -> list[bytes]:
+        """
+        index配列変換
+
+        Returns:
+            list[bytes]: gridの1行分のColor.indexを格納したバイト列のリスト
+        """
+        cells: bytearray = self._cells
+        w: int = self._w
+
+        return [bytes(cells[y * w:(y + 1) * w]) for y in range(self._h)]
+
+    def __len__(self) -> int:
+        """
+        gridの高さ取得 (list[list[Codel | None]] 互換)
+
+        Returns:
+            int: gridの高さ
+        """
+        return self._h
+
+    def __getitem__(self, y: int) -> "CodelGridRow":
+        """
+        行取得 (list[list[Codel | None]] 互換)
+
+        Arguments:
+            y (int): y座標
+
+        Returns:
+            CodelGridRow: gridの1行を list[Codel | None] として参照 / 設定するアダプタ
+
+        Raises:
+            IndexError: 引数: y がgridの範囲外である
+        """
+        if y < 0:
+            y += self._h
+
+        if not 0 <= y < self._h:
+            raise IndexError(f"y={y} is out of range.")
+
+        return CodelGridRow(self, y)
+
+    def __iter__(self) -> Iterator["CodelGridRow"]:
+        """
+        行イテレータ取得 (list[list[Codel | None]] 互換)
+
+        Returns:
+            Iterator[CodelGridRow]: gridの各行のアダプタ
+        """
+        return (CodelGridRow(self, y) for y in range(self._h))
+
+
+class CodelGridRow:
+    """
+    CodelGridRowは、CodelGridの1行を list[Codel | None] として参照 / 設定するアダプタである。
+    参照時はセルのColor.indexからCodelを生成し、設定時はCodelのColor.indexをセルに格納する。
+    """
+
+    def __init__(self, grid: CodelGrid, y: int) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            grid (CodelGrid): 参照するgrid
+            y (int): 参照する行のy座標
+        """
+        self._grid = grid
+        self._y = y
+
+    def _to_x(self, x: int) -> int:
+        """
+        x座標補正
+
+        Arguments:
+            x (int): x座標 (負の値の場合は行末からの位置)
+
+        Returns:
+            int: 補正したx座標
+
+        Raises:
+            IndexError: 引数: x がgridの範囲外である
+        """
+        w: int = self._grid.width
+        if x < 0:
+            x += w
+
+        if not 0 <= x < w:
+            raise IndexError(f"x={x} is out of range.")
+
+        return x
+
+    def __len__(self) -> int:
+        """
+        gridの幅取得
+
+        Returns:
+            int: gridの幅
+        """
+        return self._grid.width
+
+    def __getitem__(self, x: int) -> Codel | None:
+        """
+        Codel取得
+
+        Arguments:
+            x (int): x座標
+
+        Returns:
+            Codel | None: セルに配置されたCodel (Codelが配置されていない場合はNone)
+        """
+        color: Color | None = self._grid.get_color(self._to_x(x), self._y)
+        return None if color is None else Codel(color)
+
+    def __setitem__(self, x: int, codel: Codel | None) -> None:
+        """
+        Codel設定
+
+        Arguments:
+            x (int): x座標
+            codel (Codel | None): セルに配置するCodel (Noneの場合はCodelを削除する)
+        """
+        self._grid.set(self._to_x(x), self._y,
+                       CodelGrid.EMPTY if codel is None else codel.color.index)
+
+    def __iter__(self) -> Iterator[Codel | None]:
+        """
+        Codelイテレータ取得
+
+        Returns:
+            Iterator[Codel | None]: 行の各セルのCodel
+        """
+        return (self[x] for x in range(self._grid.width))
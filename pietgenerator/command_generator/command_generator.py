@@ -2,7 +2,8 @@
 Pietプラグラム: メッセージ出力コマンド生成器インタフェースモジュール
 """
 import abc
-from typing import NoReturn
+import itertools
+from typing import Callable, NoReturn, Sequence
 
 from pietgenerator.piet_common import Command
 
@@ -27,6 +28,9 @@ class ICommandGenerator(metaclass=abc.ABCMeta):
     メッセージ出力コマンド生成器クラスは本クラスを継承し、未実装のインタフェースを定義すること。
     """
 
+    _INTERLEAVE_BLOCK_MAX: int = 4
+    """ 差分で構築する場合に、まとめて構築してから出力する文字数の最大値 """
+
     def __init__(self, debug: bool) -> None:
         """
         インスタンス初期化
@@ -46,6 +50,8 @@ class ICommandGenerator(metaclass=abc.ABCMeta):
 
         - コマンドのリストの先頭にNONEコマンドを格納すること。
         - メッセージ文字数分のOUT_CHARコマンドを格納すること。
+          ただし、ループ(LOOP_BEGIN / LOOP_ENDコマンド)を格納する場合は、ループ本体の
+          OUT_CHARコマンドを繰り返し実行し、実行するOUT_CHARコマンドをメッセージ文字数分とすること。
         - コマンドをリストの先頭から実行した際に、メッセージが正しく出力されること。
 
         Arguments:
@@ -62,6 +68,237 @@ class ICommandGenerator(metaclass=abc.ABCMeta):
         except Exception as e:
             raise GenerateCommandError() from e
 
+    @staticmethod
+    def _select_delta_commands(previous: int,
+                               value: int,
+                               commands: Sequence[Command],
+                               get_commands: Callable[[int], Sequence[Command]],
+                               divide: bool = False) -> Sequence[Command]:
+        """
+        差分コマンド選択
+
+        stack先頭に直前に構築した値 引数: previous が格納されている場合に、その値を複製して
+        引数: value を構築するコマンドと、引数: commands (value を新たに構築するコマンド)のうち、
+        コマンド数が最小のコマンドを選択する。コマンド数が同じ場合は 引数: commands を選択する。
+
+        - previous DUPLICATE                   : value == previous
+        - previous DUPLICATE [差] ADD / SUBTRACT : value = previous ± 差
+        - previous DUPLICATE [倍数] MULTIPLY     : value = previous * 倍数
+        - previous DUPLICATE [約数] DIVIDE       : value = previous / 約数 (引数: divide がTrueの場合)
+
+        Arguments:
+            previous (int): stack先頭の値 (0: 値が格納されていない)
+            value (int): 構築する0より大きい整数
+            commands (Sequence[Command]): value を新たに構築するコマンド
+            get_commands (Callable[[int], Sequence[Command]]): 0より大きい整数 -> 構築するコマンド
+            divide (bool, optional): True: DIVIDEによる構築を選択肢に含める; False: 含めない
+
+        Returns:
+            Sequence[Command]: 実行時に value をstackに格納するコマンド
+        """
+        # 差分のコマンドは、DUPLICATE / 差 / 演算 の最低3コマンドとなる
+        if (previous == 0) or (len(commands) <= 1):
+            return commands
+
+        if value == previous:
+            return (Command.DUPLICATE,)
+
+        if len(commands) <= 3:
+            return commands
+
+        step: Sequence[Command] = get_commands(abs(value - previous))
+        if len(step) + 2 < len(commands):
+            commands = (Command.DUPLICATE, *step,
+                        Command.ADD if value > previous else Command.SUBTRACT)
+
+        if (previous > 1) and (value > previous) and (value % previous == 0):
+            factor: Sequence[Command] = get_commands(value // previous)
+            if len(factor) + 2 < len(commands):
+                commands = (Command.DUPLICATE, *factor, Command.MULTIPLY)
+
+        if divide and (value > 1) and (previous > value) and (previous % value == 0):
+            divisor: Sequence[Command] = get_commands(previous // value)
+            if len(divisor) + 2 < len(commands):
+                commands = (Command.DUPLICATE, *divisor, Command.DIVIDE)
+
+        return commands
+
+    @classmethod
+    def _interleave_commands(cls,
+                             message: str,
+                             get_commands: Callable[[int], Sequence[Command]],
+                             delta: bool) -> list[Command]:
+        """
+        メッセージ -> 文字ごとの出力コマンド変換
+
+        引数: message の先頭の文字から順に、文字を構築するコマンドの直後にOUT_CHARコマンドを
+        格納する。
+
+        - 引数: delta がFalseの場合は、同じ文字が連続する場合は一度だけ構築して
+          DUPLICATE OUT_CHAR を繰り返す。stackに格納する値は文字数によらず1つ以下となり、
+          コマンド数は、メッセージ全体を後方から格納して末尾でOUT_CHARコマンドを実行する場合と
+          同じとなる。
+        - 引数: delta がTrueの場合は、文字ごとに以下の何れかで構築する。
+          前後の文字から構築する組み合わせは、コマンド数が最小となるよう動的計画法で選択する。
+
+          - 新たに構築する
+          - 直前の文字を出力前に DUPLICATE で複製し、複製した値から差分で構築する
+          - 次の文字を先に構築し、複製した値から差分で構築する
+            (_INTERLEAVE_BLOCK_MAX 文字までをまとめて構築してから出力する)
+
+          後方から格納する場合の MULTIPLY による差分は、先頭から順に構築すると DIVIDE となるため、
+          DIVIDEによる差分も選択肢に含める。
+          stackに格納する値は文字数によらず _INTERLEAVE_BLOCK_MAX 以下となる。
+          コマンド数は差分で構築しない場合以下となるが、メッセージ全体を後方から格納する場合を
+          上回る場合がある。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+            get_commands (Callable[[int], Sequence[Command]]): 0より大きい整数 -> 構築するコマンド
+            delta (bool): True: 前後の文字との差分で構築するコマンドが短い場合は、
+                          差分で構築する; False: 文字ごとに新たに構築する
+
+        Returns:
+            list[Command]: メッセージを出力するコマンドのリスト (先頭のNONEコマンドを含まない)
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+        """
+        commands: list[Command] = []
+
+        if not delta:
+            # 同じ文字が連続する場合は、一度だけ構築してDUPLICATEで複製する
+            for ch, run in itertools.groupby(message):
+                commands.extend(get_commands(ord(ch)))
+                commands.extend([Command.DUPLICATE, Command.OUT_CHAR] * (sum(1 for _ in run) - 1))
+                commands.append(Command.OUT_CHAR)
+
+            return commands
+
+        values: list[int] = [ord(ch) for ch in message]
+        fresh: list[Sequence[Command]] = [get_commands(value) for value in values]
+
+        # 直前の文字 / 次の文字の複製から差分で構築するコマンド (差分で構築しない場合はNone)
+        from_previous: list[Sequence[Command] | None] = [None] * len(values)
+        from_next: list[Sequence[Command] | None] = [None] * len(values)
+        for i in range(1, len(values)):
+            for source, target, selected in ((i - 1, i, from_previous), (i, i - 1, from_next)):
+                delta_commands: Sequence[Command] = cls._select_delta_commands(
+                    values[source], values[target], fresh[target], get_commands, divide=True)
+                if delta_commands[0] is Command.DUPLICATE:
+                    selected[target] = delta_commands
+
+        _, blocks = cls._plan_interleave_blocks(fresh, from_previous, from_next,
+                                                cls._INTERLEAVE_BLOCK_MAX)
+
+        return cls._blocks_to_commands(blocks, fresh, from_previous, from_next)
+
+    @staticmethod
+    def _plan_interleave_blocks(fresh: list[Sequence[Command]],
+                                from_previous: list[Sequence[Command] | None],
+                                from_next: list[Sequence[Command] | None],
+                                block_max: int) -> tuple[int, list[tuple[int, int, bool]]]:
+        """
+        文字ごとの構築方法選択
+
+        メッセージを、以下の何れかの文字の区間に分割する。
+        メッセージ全体のコマンド数が最小となる分割を、動的計画法で求める。
+
+        - 1文字を新たに構築する、または直前の文字の複製から構築する
+        - 末尾の文字を新たに構築し、末尾以外の文字を次の文字の複製から構築する
+          (区間の文字数は 引数: block_max 以下)
+
+        Arguments:
+            fresh (list[Sequence[Command]]): 文字ごとの、新たに構築するコマンド
+            from_previous (list[Sequence[Command] | None]): 文字ごとの、直前の文字の複製から
+                                                            構築するコマンド
+            from_next (list[Sequence[Command] | None]): 文字ごとの、次の文字の複製から
+                                                        構築するコマンド
+            block_max (int): 区間の最大の文字数
+
+        Returns:
+            tuple[int, list[tuple[int, int, bool]]]: コマンド数 / (区間の先頭, 区間の末尾,
+                                                     直前の文字の複製から構築する) のリスト
+        """
+        length: int = len(fresh)
+
+        # 先頭から i 文字を出力する最小のコマンド数と、最後の区間
+        best: list[int] = [0] * (length + 1)
+        last_blocks: list[tuple[int, int, bool]] = [(0, 0, False)] * (length + 1)
+
+        for end in range(length):
+            best[end + 1] = best[end] + len(fresh[end]) + 1
+            last_blocks[end + 1] = (end, end, False)
+
+            previous_commands: Sequence[Command] | None = from_previous[end]
+            if (previous_commands is not None) and \
+                    (best[end] + len(previous_commands) + 1 < best[end + 1]):
+                best[end + 1] = best[end] + len(previous_commands) + 1
+                last_blocks[end + 1] = (end, end, True)
+
+            # 区間の末尾から先頭に向かって、次の文字の複製から構築する文字を追加する
+            block_cost: int = len(fresh[end]) + 1
+            for start in range(end - 1, max(-1, end - block_max), -1):
+                next_commands: Sequence[Command] | None = from_next[start]
+                if next_commands is None:
+                    break
+
+                block_cost += len(next_commands) + 1
+                if best[start] + block_cost < best[end + 1]:
+                    best[end + 1] = best[start] + block_cost
+                    last_blocks[end + 1] = (start, end, False)
+
+        blocks: list[tuple[int, int, bool]] = []
+        end = length
+        while end > 0:
+            blocks.append(last_blocks[end])
+            end = last_blocks[end][0]
+
+        return best[length], blocks[::-1]
+
+    @staticmethod
+    def _blocks_to_commands(blocks: list[tuple[int, int, bool]],
+                            fresh: list[Sequence[Command]],
+                            from_previous: list[Sequence[Command] | None],
+                            from_next: list[Sequence[Command] | None]) -> list[Command]:
+        """
+        文字の区間 -> 出力コマンド変換
+
+        区間ごとに文字を構築し、区間の先頭の文字から順に出力するコマンドを生成する。
+        次の区間を直前の文字の複製から構築する場合は、区間の末尾の文字を複製して出力する。
+
+        Arguments:
+            blocks (list[tuple[int, int, bool]]): (区間の先頭, 区間の末尾,
+                                                   直前の文字の複製から構築する) のリスト
+            fresh (list[Sequence[Command]]): 文字ごとの、新たに構築するコマンド
+            from_previous (list[Sequence[Command] | None]): 文字ごとの、直前の文字の複製から
+                                                            構築するコマンド
+            from_next (list[Sequence[Command] | None]): 文字ごとの、次の文字の複製から
+                                                        構築するコマンド
+
+        Returns:
+            list[Command]: メッセージを出力するコマンドのリスト
+        """
+        commands: list[Command] = []
+
+        for i, (start, end, derived) in enumerate(blocks):
+            if derived:
+                # 直前の文字はstack先頭に複製済みのため、DUPLICATEを除いて構築する
+                commands.extend((from_previous[start] or ())[1:])
+            else:
+                # 末尾の文字を新たに構築し、後方から順に次の文字の複製から構築する
+                commands.extend(fresh[end])
+                for j in range(end - 1, start - 1, -1):
+                    commands.extend(from_next[j] or ())
+
+            commands.extend([Command.OUT_CHAR] * (end - start))
+            if (i + 1 < len(blocks)) and blocks[i + 1][2]:
+                # 次の文字の差分の構築のため、複製して出力する
+                commands.append(Command.DUPLICATE)
+            commands.append(Command.OUT_CHAR)
+
+        return commands
+
     @abc.abstractmethod
     def _generate_impl(self, message: str) -> list[Command] | NoReturn:
         """
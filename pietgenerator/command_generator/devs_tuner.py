@@ -0,0 +1,281 @@
+"""
+Pietプラグラム: FactorizeCommandGeneratorの除数チューニングモジュール
+
+メッセージのコーパスについて、候補の除数ごとにFactorizeCommandGeneratorが生成するコマンド数を
+評価し、コマンド数が最小となる除数を設定ファイル(JSON形式)に出力する。
+
+Usage:
+    python -m pietgenerator.command_generator.devs_tuner [corpus_path ...] [output_path]
+        [--primes PRIMES ...] [--encoding ENCODING]
+"""
+import itertools
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+from typing import Any, NamedTuple, Sequence
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+
+
+class DevsTuningResult(NamedTuple):
+    """
+    DevsTuningResultは、除数ごとのコマンド数の評価結果である。
+    """
+
+    devs: tuple[int, ...]
+    """ 評価した除数 """
+    commands: int
+    """ コーパスから生成したコマンド数 """
+
+
+class DevsTuner:
+    """
+    DevsTunerは、FactorizeCommandGeneratorの除数をコーパスに合わせて選択するクラスである。
+    候補の除数ごとに、コーパスから生成するコマンド数を評価する。
+    """
+
+    PRIMES: tuple[int, ...] = (2, 3, 5, 7)
+    """ 候補の除数を生成する際に使用する素数の既定値 """
+
+    PRIMES_MAX: int = 6
+    """
+    候補の除数を生成する際に使用する値の最大数
+    候補の数は値の数の階乗に比例して増加するため、6個(1956通り)までとする。
+    """
+
+    def __init__(self,
+                 encoding: ValueEncoding = ValueEncoding.FACTORIZE,
+                 candidates: Sequence[Sequence[int]] | None = None) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            encoding (ValueEncoding, optional): FactorizeCommandGeneratorの変換方式
+            candidates (Sequence[Sequence[int]] | None, optional): 候補の除数
+                None: PRIMES から create_candidatesメソッドで生成する
+
+        Raises:
+            ValueError: 引数: candidates が空である、または不正な除数を含む
+        """
+        if candidates is None:
+            candidates = self.create_candidates(self.PRIMES)
+
+        if not candidates:
+            raise ValueError("candidates is empty.")
+
+        self._encoding: ValueEncoding = encoding
+        # 不正な除数は、FactorizeCommandGeneratorの生成時にValueErrorを送出する
+        self._generators: list[FactorizeCommandGenerator] = [
+            FactorizeCommandGenerator(False, encoding, devs) for devs in candidates
+        ]
+
+    @property
+    def encoding(self) -> ValueEncoding:
+        """
+        変換方式取得
+
+        Returns:
+            ValueEncoding: FactorizeCommandGeneratorの変換方式
+        """
+        return self._encoding
+
+    @property
+    def candidates(self) -> list[tuple[int, ...]]:
+        """
+        候補の除数取得
+
+        Returns:
+            list[tuple[int, ...]]: 候補の除数
+        """
+        return [generator.devs for generator in self._generators]
+
+    @staticmethod
+    def create_candidates(primes: Sequence[int]) -> list[tuple[int, ...]]:
+        """
+        候補の除数生成
+
+        FactorizeCommandGeneratorは除数を先頭から順に使用するため、
+        引数: primes の空でないすべての部分集合について、すべての並び順を候補とする。
+        重複する値は1つとして扱う。
+
+        Arguments:
+            primes (Sequence[int]): 候補の除数に使用する値 (PRIMES_MAX 個以下)
+
+        Returns:
+            list[tuple[int, ...]]: 候補の除数
+
+        Raises:
+            ValueError: 引数: primes の値の数が PRIMES_MAX を超える
+
+        Examples:
+            >>> print(DevsTuner.create_candidates([2, 3]))
+            [(2,), (3,), (2, 3), (3, 2)]
+        """
+        primes = list(dict.fromkeys(primes))
+        if len(primes) > DevsTuner.PRIMES_MAX:
+            raise ValueError(f"primes: '{primes}' has more than {DevsTuner.PRIMES_MAX} values.")
+
+        return [devs
+                for length in range(1, len(primes) + 1)
+                for subset in itertools.combinations(primes, length)
+                for devs in itertools.permutations(subset)]
+
+    def evaluate(self, generator: FactorizeCommandGenerator, corpus: str) -> int:
+        """
+        コマンド数評価
+
+        引数: corpus をメッセージとして、FactorizeCommandGenerator.generateメソッドが生成する
+        コマンド数を計算する。コマンドは文字の種類ごとに1度だけ生成する。
+        同じ文字の連続は、先頭の文字のみ構築し、以降の文字はDUPLICATEの1コマンドとして計算する。
+
+        Arguments:
+            generator (FactorizeCommandGenerator): 評価するコマンド生成器
+            corpus (str): コーパス
+
+        Returns:
+            int: コーパスから生成されるコマンド数
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+        """
+        # 連続する文字の先頭
+        heads: Counter[str] = Counter(ch for ch, _ in itertools.groupby(corpus))
+
+        # 先頭のNONEコマンド / 文字数分のOUT_CHARコマンド / 連続する文字のDUPLICATEコマンド
+        commands: int = 1 + len(corpus) + (len(corpus) - heads.total())
+
+        # 候補ごとのコマンドでキャッシュを埋めないよう、キャッシュを使用せずに変換する
+        to_commands = generator._character_to_commands  # pylint: disable=protected-access
+        for ch, count in heads.items():
+            commands += count * len(to_commands(ch))
+
+        return commands
+
+    def tune(self, corpus: str) -> list[DevsTuningResult]:
+        """
+        除数チューニング
+
+        すべての候補の除数について、引数: corpus から生成するコマンド数を評価する。
+
+        Arguments:
+            corpus (str): コーパス
+
+        Returns:
+            list[DevsTuningResult]: コマンド数の昇順(同数の場合は除数の少ない順)の評価結果
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+        """
+        results: list[DevsTuningResult] = [
+            DevsTuningResult(generator.devs, self.evaluate(generator, corpus))
+            for generator in self._generators
+        ]
+
+        return sorted(results, key=lambda result: (result.commands, len(result.devs)))
+
+    def save(self, path: str, results: list[DevsTuningResult]) -> None:
+        """
+        設定ファイル出力
+
+        引数: results の先頭の除数を、最適な除数として設定ファイル(JSON形式)に出力する。
+
+        Arguments:
+            path (str): 設定ファイルのパス
+            results (list[DevsTuningResult]): tuneメソッドの評価結果
+
+        Raises:
+            OSError: 設定ファイルの出力に失敗した
+        """
+        config: dict[str, Any] = {
+            "encoding": str(self._encoding),
+            "devs": list(results[0].devs),
+            "commands": results[0].commands,
+            "results": [{"devs": list(result.devs), "commands": result.commands}
+                        for result in results],
+        }
+
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump(config, fp, indent=2)
+            fp.write("\n")
+
+    @staticmethod
+    def load(path: str) -> tuple[int, ...]:
+        """
+        設定ファイル読み込み
+
+        saveメソッドで出力した設定ファイルから、最適な除数を読み込む。
+
+        Arguments:
+            path (str): 設定ファイルのパス
+
+        Returns:
+            tuple[int, ...]: 最適な除数
+
+        Raises:
+            OSError: 設定ファイルの読み込みに失敗した
+            ValueError: 設定ファイルの形式が不正である
+        """
+        with open(path, "r", encoding="utf-8") as fp:
+            config: Any = json.load(fp)
+
+        devs: Any = config.get("devs") if isinstance(config, dict) else None
+        if (not isinstance(devs, list)) or (not devs) or \
+                any((not isinstance(dev, int)) or (dev < 2) for dev in devs):
+            raise ValueError(f"devs: '{devs}' is invalid.")
+
+        return tuple(devs)
+
+
+def main() -> int:
+    """
+    mainメソッド
+
+    Returns:
+        int: 終了ステータスコード
+    """
+    arg_parser = ArgumentParser(
+        prog="python -m pietgenerator.command_generator.devs_tuner",
+        description="Tune the divisors of FactorizeCommandGenerator for message corpora.")
+    arg_parser.add_argument("corpus_path", nargs="+", help="Message corpus file paths (UTF-8).")
+    arg_parser.add_argument("output_path", help="Output config file path (JSON).")
+    arg_parser.add_argument("--primes", type=int, nargs="+", default=list(DevsTuner.PRIMES),
+                            help=("Values used for the candidate divisors (at most "
+                                  f"{DevsTuner.PRIMES_MAX} values). Default is 2 3 5 7."))
+    arg_parser.add_argument("--encoding", type=str,
+                            choices=[str(encoding) for encoding in ValueEncoding],
+                            default="FACTORIZE", help="Encoding of FactorizeCommandGenerator.")
+    args = arg_parser.parse_args()
+
+    try:
+        corpus: str = "".join(Path(path).read_text(encoding="utf-8")
+                              for path in args.corpus_path)
+        tuner = DevsTuner(ValueEncoding.name_of(args.encoding),
+                          DevsTuner.create_candidates(args.primes))
+        results: list[DevsTuningResult] = tuner.tune(corpus)
+        tuner.save(args.output_path, results)
+    except ValueError as e:
+        print(f"devs_tuner: error: {e}")
+        return os.EX_DATAERR
+    except OSError as e:
+        print(f"devs_tuner: error: {e}")
+        return os.EX_OSERR
+
+    default_commands: int = tuner.evaluate(FactorizeCommandGenerator(False, tuner.encoding),
+                                           corpus)
+    for result in results[:5]:
+        print(f"devs={list(result.devs)}: commands={result.commands} "
+              f"({(result.commands - default_commands) / default_commands * 100:+.1f} %)")
+    print(f"default devs={list(FactorizeCommandGenerator(False).devs)}: "
+          f"commands={default_commands}")
+    print(f"devs_tuner: best devs={list(results[0].devs)} is written to '{args.output_path}'. "
+          f"(pietgenerator option: --devs_config {args.output_path})")
+
+    return os.EX_OK
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,35 +1,293 @@
 """
 Pietプラグラム: メッセージ出力コマンド生成器モジュール（素因数分解アルゴリズム）
 """
-from typing import Any
+import itertools
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Hashable, Iterator, NamedTuple, Self, Sequence
 
 from pietgenerator.command_generator.command_generator import ICommandGenerator
 from pietgenerator.piet_common import Command
 
 
+class ValueEncoding(Enum):
+    """
+    ValueEncodingは、FactorizeCommandGeneratorが文字のコードポイントをコマンドに変換する方式である。
+    """
+
+    FACTORIZE = "FACTORIZE"
+    """ 素因数分解した値の積として構築する """
+    BINARY = "BINARY"
+    """
+    符号付き2進数の各桁を上位から順に、倍加(DUPLICATE / ADD)と ±1 で構築する
+    コマンド数はコードポイントの対数に比例する。
+    """
+    SHORTEST = "SHORTEST"
+    """ FACTORIZE / BINARY のうち、コマンド数が少ない方を文字ごとに選択する """
+
+    def __str__(self) -> str:
+        """
+        文字列表現
+
+        Returns:
+            str: 自身の名前
+        """
+        return self.name
+
+    @classmethod
+    def name_of(cls, name: str) -> Self:
+        """
+        名前 -> ValueEncoding取得
+
+        名前が一致するValueEncodingを取得する。
+
+        Arguments:
+            name (str): 名前
+
+        Returns:
+            ValueEncoding: 名前が一致するValueEncoding
+
+        Raises:
+            ValueError: 名前が一致するValueEncodingが存在しない
+        """
+        for encoding in cls:
+            if encoding.name == name:
+                return encoding
+
+        raise ValueError(f"name={name} is not found.")
+
+
+class CommandCacheInfo(NamedTuple):
+    """
+    CommandCacheInfoは、文字ごとのコマンドのキャッシュの統計情報である。
+    """
+
+    hits: int
+    """ キャッシュから取得した回数 """
+    misses: int
+    """ キャッシュに存在せず、コマンドを生成した回数 """
+    size: int
+    """ キャッシュしている文字数 """
+    max_size: int
+    """ キャッシュする最大の文字数 """
+
+
+class CommandCache:
+    """
+    CommandCacheは、文字ごとのコマンドのキャッシュである。
+    直近に使用した文字から順に、最大 max_size 文字分のコマンドを保持する。
+    スレッドセーフではないため、複数のスレッドから同時に使用しないこと。
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            max_size (int): キャッシュする最大の文字数 (0: キャッシュしない)
+        """
+        self._max_size: int = max_size
+        self._entries: OrderedDict[Hashable, tuple[Command, ...]] = OrderedDict()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def __iter__(self) -> Iterator[Hashable]:
+        """
+        キー取得
+
+        Returns:
+            Iterator[Hashable]: 最も長く使用されていない文字から順に、キャッシュのキー
+        """
+        return iter(self._entries)
+
+    def get(self, key: Hashable) -> tuple[Command, ...] | None:
+        """
+        コマンド取得
+
+        キャッシュに存在する場合は、直近に使用した文字とする。
+
+        Arguments:
+            key (Hashable): キャッシュのキー
+
+        Returns:
+            tuple[Command, ...] | None: キャッシュしたコマンド (None: キャッシュに存在しない)
+        """
+        commands: tuple[Command, ...] | None = self._entries.get(key)
+        if commands is None:
+            return None
+
+        # 直近に使用した文字として末尾に移動
+        self._entries.move_to_end(key)
+        self._hits += 1
+
+        return commands
+
+    def put(self, key: Hashable, commands: tuple[Command, ...]) -> None:
+        """
+        コマンド格納
+
+        キャッシュに存在せず、生成したコマンドを格納する。
+        max_size 文字を超えた場合は、最も長く使用されていない文字を削除する。
+
+        Arguments:
+            key (Hashable): キャッシュのキー
+            commands (tuple[Command, ...]): 格納するコマンド
+        """
+        self._misses += 1
+
+        if self._max_size <= 0:
+            return
+
+        self._entries[key] = commands
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def info(self) -> CommandCacheInfo:
+        """
+        キャッシュ情報取得
+
+        Returns:
+            CommandCacheInfo: キャッシュの統計情報
+        """
+        return CommandCacheInfo(self._hits, self._misses, len(self._entries), self._max_size)
+
+    def clear(self) -> None:
+        """
+        キャッシュ削除
+
+        キャッシュしたコマンド、および統計情報を削除する。
+        """
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+
 class FactorizeCommandGenerator(ICommandGenerator):
     """
     FactorizeCommandGeneratorは、Pietプラグラムのメッセージ出力コマンド生成器クラスである。
     メッセージからコマンドを生成する際、メッセージの文字を表すASCIIコードを小さい数に分解する
     アルゴリズムとして、素因数分解を使用する。
-    ※ 厳密には FactorizeCommandGenerator._DEVS で指定した数値、および -1 に分解する。
+    ※ 厳密にはインスタンス初期化時に指定した除数(省略時は FactorizeCommandGenerator._DEVS)、
+    および -1 に分解する。
+    コードポイントが大きい文字(日本語 / 絵文字など)のコマンド数を削減するため、
+    ValueEncodingで符号付き2進数による変換を選択できる。
     """
 
     _DEVS = [2, 3]
     """
-    メッセージの文字を表すASCIIコードを素因数分解する際に使用する除数
-    ASCIIコードは _DEVS 内の数値、および -1 を含むリストに分解される。
+    メッセージの文字を表すASCIIコードを素因数分解する際に使用する除数の既定値
+    ASCIIコードは除数、および -1 を含むリストに分解される。
     """
 
-    def __init__(self, debug: bool = True) -> None:
+    _CACHE_SIZE: int = 4096
+    """ 文字ごとのコマンドをキャッシュする最大の文字数 """
+
+    _cache: CommandCache = CommandCache(_CACHE_SIZE)
+    """
+    ((除数, 変換方式), 文字のコードポイント) -> 文字から生成したコマンド のキャッシュ
+    すべてのインスタンスで共有し、直近に使用した文字から順に _CACHE_SIZE 文字分保持する。
+    排他制御を行わないため、複数のスレッドから同時にコマンドを生成しないこと。
+    """
+
+    def __init__(self,
+                 debug: bool = True,
+                 encoding: ValueEncoding = ValueEncoding.FACTORIZE,
+                 devs: Sequence[int] | None = None,
+                 delta: bool = False,
+                 interleave: bool = False) -> None:
         """
         インスタンス初期化
 
         Arguments:
             debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
+            encoding (ValueEncoding, optional): 文字のコードポイントをコマンドに変換する方式
+            devs (Sequence[int] | None, optional): 素因数分解に使用する除数 (先頭から順に使用する)
+                                                   None: _DEVS を使用する
+            delta (bool, optional): True: 直前に構築した文字との差分で構築するコマンドが
+                                    短い場合は、差分で構築する; False: 文字ごとに新たに構築する
+            interleave (bool, optional): True: 文字を構築した直後に出力し、stackの深さを一定とする;
+                                         False: 全文字をstackに格納した後に出力する
+
+        Raises:
+            ValueError: 引数: devs が空である、または2未満の値を含む
         """
         super().__init__(debug)
 
+        if devs is None:
+            devs = self._DEVS
+
+        if not devs:
+            raise ValueError("devs is empty.")
+
+        if any(dev < 2 for dev in devs):
+            raise ValueError(f"devs: '{list(devs)}' contains a value less than 2.")
+
+        self._encoding: ValueEncoding = encoding
+        self._devs: list[int] = list(devs)
+        self._delta: bool = delta
+        self._interleave: bool = interleave
+        self._cache_key_prefix: tuple[tuple[int, ...], ValueEncoding] = (tuple(devs), encoding)
+
+    @property
+    def encoding(self) -> ValueEncoding:
+        """
+        変換方式取得
+
+        Returns:
+            ValueEncoding: 文字のコードポイントをコマンドに変換する方式
+        """
+        return self._encoding
+
+    @property
+    def devs(self) -> tuple[int, ...]:
+        """
+        除数取得
+
+        Returns:
+            tuple[int, ...]: 素因数分解に使用する除数
+        """
+        return tuple(self._devs)
+
+    @property
+    def delta(self) -> bool:
+        """
+        差分による構築の有無取得
+
+        Returns:
+            bool: True: 直前に構築した文字との差分で構築する; False: 文字ごとに新たに構築する
+        """
+        return self._delta
+
+    @property
+    def interleave(self) -> bool:
+        """
+        文字ごとの出力の有無取得
+
+        Returns:
+            bool: True: 文字を構築した直後に出力する; False: 全文字をstackに格納した後に出力する
+        """
+        return self._interleave
+
+    @classmethod
+    def cache_info(cls) -> CommandCacheInfo:
+        """
+        キャッシュ情報取得
+
+        Returns:
+            CommandCacheInfo: 文字ごとのコマンドのキャッシュの統計情報
+        """
+        return cls._cache.info()
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """
+        キャッシュ削除
+
+        文字ごとのコマンドのキャッシュ、および統計情報を削除する。
+        """
+        cls._cache.clear()
+
     def _generate_impl(self, message: str) -> list[Command]:
         """
         メッセージ -> コマンド生成実装
@@ -47,16 +305,79 @@ class FactorizeCommandGenerator(ICommandGenerator):
         """
         # 先頭にNONEコマンドを格納
         commands: list[Command] = [Command.NONE]
+        commands.extend(self._message_to_commands(message))
+
+        if self._debug:
+            print(f"generate_impl: exit. commands={[str(command) for command in commands]}")
+
+        return commands
+
+    def _message_to_commands(self, message: str) -> list[Command]:
+        """
+        メッセージ -> 出力コマンド変換
+
+        引数: message のすべての文字をstackに格納し、先頭の文字から順に出力するコマンドを生成する。
+        インスタンス初期化時に interleave を指定した場合は、文字ごとに構築した直後に出力する。
+        コマンドの実行前後で、stackに格納された値は変化しない。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+
+        Returns:
+            list[Command]: メッセージを出力するコマンドのリスト (先頭のNONEコマンドを含まない)
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+        """
+        get_character_commands = self._get_character_commands
+        if self._interleave:
+            return self._interleave_commands(message,
+                                             lambda value: get_character_commands(chr(value)),
+                                             self._delta)
+
+        commands: list[Command] = []
 
         # メッセージを後方から一文字ずつコマンドに変換して格納
-        for ch in message[::-1]:
-            commands.extend(self._character_to_commands(ch))
+        if not self._delta:
+            # 同じ文字が連続する場合は、一度だけ構築してDUPLICATEで複製する
+            for ch, run in itertools.groupby(reversed(message)):
+                commands.extend(get_character_commands(ch))
+                commands.extend([Command.DUPLICATE] * (sum(1 for _ in run) - 1))
+        else:
+            # stack先頭には、直前に変換した(メッセージ上では次の)文字が格納されている
+            previous: int = 0
+            for ch in reversed(message):
+                value: int = ord(ch)
+                commands.extend(self._select_delta_commands(
+                    previous, value, get_character_commands(ch),
+                    lambda step: get_character_commands(chr(step))))
+                previous = value
 
         # メッセージの文字数分、OUT_CHARコマンドを格納
         commands.extend([Command.OUT_CHAR] * len(message))
 
-        if self._debug:
-            print(f"generate_impl: exit. commands={[str(command) for command in commands]}")
+        return commands
+
+    def _get_character_commands(self, character: str) -> tuple[Command, ...]:
+        """
+        文字 -> コマンド取得
+
+        引数: character から生成したコマンドをキャッシュから取得する。
+        キャッシュに存在しない場合は、コマンドを生成してキャッシュに格納する。
+
+        Arguments:
+            character (str): コマンドを取得する文字
+
+        Returns:
+            tuple[Command, ...]: 文字から生成されたコマンド
+        """
+        key: tuple[tuple[tuple[int, ...], ValueEncoding], int] = (self._cache_key_prefix,
+                                                                  ord(character))
+
+        commands: tuple[Command, ...] | None = self._cache.get(key)
+        if commands is None:
+            commands = tuple(self._character_to_commands(character))
+            self._cache.put(key, commands)
 
         return commands
 
@@ -64,22 +385,41 @@ class FactorizeCommandGenerator(ICommandGenerator):
         """
         文字 -> コマンド変換
 
-        引数: character をコマンドに変換する。
+        引数: character を、インスタンス初期化時に指定した変換方式でコマンドに変換する。
 
         Arguments:
             character (str): コマンドに変換する文字
 
         Returns:
             list[Command]: 文字から生成されたコマンドのリスト
+
+        Raises:
+            ValueError: 文字のコードポイントが1未満の値である
         """
-        factorized: list[int | list[Any]] = self._factorize(ord(character), self._DEVS)
-        commands: list[Command] = self._values_to_commands(factorized)
+        value: int = ord(character)
+        commands: list[Command] = []
 
-        if self._debug:
-            print("character_to_commands: "
-                  f"character='{character}'({ord(character):02x}) "
-                  f"factorized={factorized} "
-                  f"commands={[str(command) for command in commands]}")
+        if self._encoding is not ValueEncoding.BINARY:
+            factorized: list[int | list[Any]] = self._factorize(value, self._devs)
+            commands = self._values_to_commands(factorized)
+
+            if self._debug:
+                print("character_to_commands: "
+                      f"character='{character}'({value:02x}) "
+                      f"factorized={factorized} "
+                      f"commands={[str(command) for command in commands]}")
+
+        if self._encoding is not ValueEncoding.FACTORIZE:
+            binary_commands: list[Command] = self._value_to_binary_commands(value)
+
+            if self._debug:
+                print("character_to_commands: "
+                      f"character='{character}'({value:02x}) "
+                      f"binary_commands={[str(command) for command in binary_commands]}")
+
+            # SHORTEST: コマンド数が同じ場合は、FACTORIZEのコマンドを使用する
+            if (not commands) or (len(binary_commands) < len(commands)):
+                commands = binary_commands
 
         return commands
 
@@ -103,8 +443,8 @@ class FactorizeCommandGenerator(ICommandGenerator):
             ValueError: 引数: value が1未満の値である
 
         Note:
-            仕様通りに動作するには、引数: devs には素数が格納されている必要があるが、
-            現状では引数: devs には固定値 (_DEVS) のみ設定されるため、正当性のチェックは行わない。
+            引数: devs には、インスタンス初期化時に検証した2以上の値のみ設定されるため、
+            正当性のチェックは行わない。素数以外の値を含む場合も、コマンドの計算結果は正しい。
 
         Examples:
             >>> MessageOutputCommandGenerator gen = MessageOutputCommandGenerator()
@@ -154,6 +494,58 @@ class FactorizeCommandGenerator(ICommandGenerator):
 
         return values
 
+    def _value_to_binary_commands(self, value: int) -> list[Command]:
+        """
+        値 -> コマンド変換 (符号付き2進数)
+
+        引数: value を、上位の桁から順に構築するコマンドに変換する。
+        1桁ごとに、stack先頭の値を倍加(DUPLICATE / ADD)し、桁の値に応じて 1 を加算 / 減算する。
+        上位の桁から順に、構築済みの値 v (value の上位の桁) / v + 1 を構築する最短のコマンドを
+        それぞれ保持し、次の桁の値により以下から選択する。
+        - 2v     : v を倍加
+        - 2v + 1 : v を倍加して 1 を加算 / v + 1 を倍加して 1 を減算 のうち短い方
+        - 2v + 2 : v + 1 を倍加
+        コマンド数は 引数: value の対数に比例し、stackは最大2つまでしか使用しない。
+
+        Arguments:
+            value (int): コマンドに変換する0より大きい整数
+
+        Returns:
+            list[Command]: 実行時に value となるコマンドのリスト
+
+        Raises:
+            ValueError: 引数: value が1未満の値である
+
+        Examples:
+            >>> gen = FactorizeCommandGenerator()
+            >>> print([str(command) for command in gen._value_to_binary_commands(3)])
+            [PUSH, DUPLICATE, ADD, PUSH, ADD]
+            >>> print([str(command) for command in gen._value_to_binary_commands(15)])
+            [PUSH, DUPLICATE, ADD, DUPLICATE, ADD, DUPLICATE, ADD, DUPLICATE, ADD, PUSH, SUBTRACT]
+        """
+        if value < 1:
+            # 1未満の値は計算不可
+            raise ValueError(f"value: '{value}' is less than 1.")
+
+        double: list[Command] = [Command.DUPLICATE, Command.ADD]
+
+        # 最上位の桁(1)から開始
+        lower: list[Command] = [Command.PUSH]
+        upper: list[Command] = [Command.PUSH, *double]
+
+        for bit in bin(value)[3:]:
+            odd_from_lower: list[Command] = [*lower, *double, Command.PUSH, Command.ADD]
+            odd_from_upper: list[Command] = [*upper, *double, Command.PUSH, Command.SUBTRACT]
+            odd: list[Command] = (odd_from_lower if len(odd_from_lower) <= len(odd_from_upper)
+                                  else odd_from_upper)
+
+            if bit == "0":
+                lower, upper = [*lower, *double], odd
+            else:
+                lower, upper = odd, [*upper, *double]
+
+        return lower
+
     def _values_to_commands(self,
                             values: list[int | list[Any]],
                             before_value: int = 0) -> list[Command]:
@@ -171,8 +563,9 @@ class FactorizeCommandGenerator(ICommandGenerator):
         Returns:
             list[Command]: 実行時に values の計算結果となるコマンドのリスト
 
-        Todo:
-            values に大きな値が格納されている場合、現状のアルゴリズムでは非効率であるため、要再検討。
+        Note:
+            values に大きな値が格納されている場合、コマンド数が値に比例して増加するため、
+            コードポイントが大きい文字には ValueEncoding.BINARY / SHORTEST を使用する。
 
         Examples:
             >>> MessageOutputCommandGenerator gen = MessageOutputCommandGenerator()
@@ -226,13 +619,15 @@ class FactorizeCommandGenerator(ICommandGenerator):
 
                 before_value = value
 
-        if values[-1] != -1:
-            # すべての値で乗算を行うため、(値の数 - 1) 分、MULTIPLYコマンドを格納
-            commands.extend([Command.MULTIPLY] * (len(values) - 1))
-        else:
-            # -1 以外のすべての値で乗算を行うため、(値の数 - 2) 分、MULTIPLYコマンドを格納
-            commands.extend([Command.MULTIPLY] * (len(values) - 2))
-            # PUSHコマンド / SUBTRACTコマンドを格納
-            commands.extend([Command.PUSH, Command.SUBTRACT])
+        # 末尾の -1 の数 (除数で割り切れるまで 1 を加算した回数)
+        # 除数に 2 を含まない場合は、複数回加算することがある
+        decrements: int = 0
+        while values[-1 - decrements] == -1:
+            decrements += 1
+
+        # -1 以外のすべての値で乗算を行うため、(値の数 - -1 の数 - 1) 分、MULTIPLYコマンドを格納
+        commands.extend([Command.MULTIPLY] * (len(values) - decrements - 1))
+        # -1 の数分、PUSHコマンド / SUBTRACTコマンドを格納
+        commands.extend([Command.PUSH, Command.SUBTRACT] * decrements)
 
         return commands
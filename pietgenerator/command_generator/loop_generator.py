@@ -0,0 +1,226 @@
+"""
+Pietプラグラム: メッセージ出力コマンド生成器モジュール (ループによる繰り返し出力)
+"""
+import itertools
+import math
+import sys
+from typing import NamedTuple
+
+from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+
+
+class MessageRepeat(NamedTuple):
+    """
+    MessageRepeatは、メッセージ中で同一のパターンが連続する区間である。
+    """
+
+    start: int
+    """ 区間の先頭のメッセージ上の位置 """
+    pattern: str
+    """ 繰り返すパターン """
+    repeats: int
+    """ パターンの繰り返し回数 """
+
+    @property
+    def end(self) -> int:
+        """
+        区間の末尾取得
+
+        Returns:
+            int: 区間の末尾の次のメッセージ上の位置
+        """
+        return self.start + (len(self.pattern) * self.repeats)
+
+
+class LoopCommandGenerator(FactorizeCommandGenerator):
+    """
+    LoopCommandGeneratorは、メッセージ中の繰り返しをPietのループで出力するコマンドを生成するクラスである。
+    同一のパターンが連続する区間は、パターンを1回分だけ出力するループ本体と、繰り返し回数の
+    カウンタで出力する。それ以外の区間は、FactorizeCommandGeneratorと同じコマンドで出力する。
+
+    ループは以下のコマンドで生成する。
+
+    - [繰り返し回数] LOOP_BEGIN [パターンの出力] PUSH SUBTRACT DUPLICATE LOOP_END POP
+
+    LOOP_BEGIN / LOOP_ENDコマンドはPietの仕様に存在しないため、生成したコマンドは
+    LoopLayouterで配置すること。
+    """
+
+    _PATTERN_MAX: int = 32
+    """ ループ本体で出力するパターンの最大文字数 """
+
+    _LOOP_COMMANDS: int = 6
+    """
+    ループのカウンタの構築 / パターンの出力以外のコマンド数
+    (LOOP_BEGIN / LOOP_ENDコマンド、カウンタの減算 / 判定 / 破棄のコマンド)
+    """
+
+    def _generate_impl(self, message: str) -> list[Command]:
+        """
+        メッセージ -> コマンド生成実装
+
+        ICommandGenerator.generateメソッドの実装を行う。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+
+        Returns:
+            list[Command]: メッセージから生成されたコマンドのリスト
+
+        Raises:
+            GenerateCommandError: コマンドの生成に失敗した
+        """
+        # 先頭にNONEコマンドを格納
+        commands: list[Command] = [Command.NONE]
+
+        # 繰り返し区間をループで、その間の区間を文字ごとのコマンドで出力する
+        position: int = 0
+        for repeat in self._find_repeats(message):
+            commands.extend(self._message_to_commands(message[position:repeat.start]))
+            commands.extend(self._repeat_to_commands(repeat))
+            position = repeat.end
+
+        commands.extend(self._message_to_commands(message[position:]))
+
+        if self._debug:
+            print(f"generate_impl: exit. commands={[str(command) for command in commands]}")
+
+        return commands
+
+    def _find_repeats(self, message: str) -> list[MessageRepeat]:
+        """
+        繰り返し区間検索
+
+        引数: message 中で同一のパターンが2回以上連続する区間のうち、ループで出力すると
+        コマンド数が減少する区間を、コマンドの減少数の合計が最大となるように選択する。
+        コマンド数は、同じ文字の連続をDUPLICATEで複製する、文字ごとのコマンドで見積もる。
+        LoopLayouterはループごとに、gridの1行分の戻り経路と、ループ本体の先頭を行頭に合わせるための
+        折り返しを配置するため、ループごとに2行分のセル数(全コマンド数の平方根の2倍)を
+        コマンドの減少数から差し引いて評価する。
+
+        Arguments:
+            message (str): 検索するメッセージ
+
+        Returns:
+            list[MessageRepeat]: 重複しない繰り返し区間 (メッセージ上の位置の昇順)
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+
+        Examples:
+            >>> gen = LoopCommandGenerator(False)
+            >>> print(gen._find_repeats('>' + '-=' * 20 + '<'))
+            [MessageRepeat(start=1, pattern='-=', repeats=20)]
+        """
+        n: int = len(message)
+        if n < 2:
+            return []
+
+        # 各文字を出力するコマンド数 (直前と同じ文字はDUPLICATEで複製する)
+        character_costs: dict[str, int] = {
+            ch: len(self._get_character_commands(ch)) + 1 for ch in set(message)
+        }
+        costs: list[int] = [
+            2 if (i > 0) and (ch == message[i - 1]) else character_costs[ch]
+            for i, ch in enumerate(message)
+        ]
+        total_costs: list[int] = [0, *itertools.accumulate(costs)]
+        row_cells: int = math.isqrt(total_costs[n])
+
+        # 区間の末尾 -> (区間, 戻り経路を差し引いたコマンドの減少数)
+        candidates: dict[int, list[tuple[MessageRepeat, int]]] = {}
+
+        for length in range(1, min(self._PATTERN_MAX, n // 2) + 1):
+            # length 文字後と同じ文字が連続する区間は、周期 length の繰り返しとなる
+            start: int = 0
+            for same, run in itertools.groupby(a == b for a, b in zip(message,
+                                                                      message[length:])):
+                run_length: int = sum(1 for _ in run)
+                repeat_count: int = min((run_length + length) // length, sys.maxunicode)
+
+                if same and (repeat_count >= 2):
+                    pattern: str = message[start:start + length]
+
+                    # より短い周期のパターンの繰り返しは、短い周期で評価済み
+                    if not any(pattern == pattern[:d] * (length // d)
+                               for d in range(1, length) if length % d == 0):
+                        repeat = MessageRepeat(start, pattern, repeat_count)
+                        saving: int = (total_costs[repeat.end] - total_costs[start] - costs[start] +
+                                       character_costs[message[start]] - (2 * row_cells) -
+                                       self._estimate_repeat_commands(repeat, character_costs))
+                        if saving > 0:
+                            candidates.setdefault(repeat.end, []).append((repeat, saving))
+
+                start += run_length
+
+        # 重複しない区間の、コマンドの減少数の合計が最大となる組み合わせを求める
+        best: list[int] = [0] * (n + 1)
+        choices: list[MessageRepeat | None] = [None] * (n + 1)
+        for end in range(1, n + 1):
+            best[end] = best[end - 1]
+            for repeat, saving in candidates.get(end, []):
+                if best[repeat.start] + saving > best[end]:
+                    best[end] = best[repeat.start] + saving
+                    choices[end] = repeat
+
+        repeats: list[MessageRepeat] = []
+        end = n
+        while end > 0:
+            choice: MessageRepeat | None = choices[end]
+            if choice is None:
+                end -= 1
+            else:
+                repeats.append(choice)
+                end = choice.start
+
+        return repeats[::-1]
+
+    def _estimate_repeat_commands(self,
+                                  repeat: MessageRepeat,
+                                  character_costs: dict[str, int]) -> int:
+        """
+        ループのコマンド数見積もり
+
+        Arguments:
+            repeat (MessageRepeat): ループで出力する繰り返し区間
+            character_costs (dict[str, int]): 文字 -> 文字の構築 / 出力のコマンド数
+
+        Returns:
+            int: 繰り返し区間をループで出力するコマンド数 (カウンタの構築 / 破棄を含む)
+        """
+        pattern_commands: int = sum(character_costs[ch] + (2 * (sum(1 for _ in run) - 1))
+                                    for ch, run in itertools.groupby(repeat.pattern))
+
+        return (len(self._get_character_commands(chr(repeat.repeats))) + pattern_commands +
+                self._LOOP_COMMANDS)
+
+    def _repeat_to_commands(self, repeat: MessageRepeat) -> list[Command]:
+        """
+        繰り返し区間 -> ループ変換
+
+        stackに繰り返し回数のカウンタを格納し、パターンを出力するたびにカウンタを減算して、
+        カウンタが0になるまでループするコマンドを生成する。
+        ループの終了後は、カウンタをstackから破棄する。
+
+        Arguments:
+            repeat (MessageRepeat): ループで出力する繰り返し区間
+
+        Returns:
+            list[Command]: 繰り返し区間を出力するコマンドのリスト
+
+        Raises:
+            ValueError: コマンドに変換できない文字が含まれている
+        """
+        return [
+            # カウンタ
+            *self._get_character_commands(chr(repeat.repeats)),
+            Command.LOOP_BEGIN,
+            *self._message_to_commands(repeat.pattern),
+            # カウンタを減算し、減算後のカウンタが0以外であればLOOP_BEGINに戻る
+            Command.PUSH,
+            Command.SUBTRACT,
+            Command.DUPLICATE,
+            Command.LOOP_END,
+            Command.POP,
+        ]
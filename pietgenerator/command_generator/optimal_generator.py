@@ -0,0 +1,617 @@
+"""
+Pietプラグラム: メッセージ出力コマンド生成器モジュール（最短コマンド探索）
+"""
+import itertools
+import math
+from collections import deque
+
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.piet_common import Command
+
+_Rule = tuple[int, tuple[Command | int, ...]]
+"""
+値を構築する規則
+(基にする値, 後続の要素) であり、基にする値のコマンドの後に、後続の要素を順に展開したコマンドを
+実行すると値となる。後続の要素の int は、その値を構築するコマンドに展開する。
+基にする値が 0 の場合は、後続の要素のみで値を構築する。
+"""
+
+
+class ShortestCommandTable:
+    """
+    ShortestCommandTableは、値をstackに格納するコマンドのうち、最短のコマンドを保持する表である。
+    1 ～ max_value の値について、以下の2段階の探索で求めたコマンドをインスタンス初期化時に計算する。
+
+    1. stackの状態を頂点とした幅優先探索
+       PUSH / DUPLICATE / ADD / SUBTRACT / MULTIPLY で遷移し、search_depth 以下のコマンド数で
+       構築できる値は、stackの深さが _SEARCH_STACK_MAX 以下のコマンドの中で最短となる。
+    2. 値を頂点とし、コマンド数の少ない値から順に確定するDijkstra法
+       確定済みの値を組み合わせ、2項演算 / DUPLICATEで複製した値の再利用により大きな値を構築する。
+
+    max_value より大きい値は、表の値から d 進数の桁ごとに構築する。
+    DIVIDE / MOD は、探索範囲でコマンド数を削減しないため使用しない。
+    """
+
+    _SEARCH_STACK_MAX: int = 4
+    """ 幅優先探索でのstackの最大の深さ """
+
+    _OPERAND_MAX: int = 32
+    """ 加算 / 減算 / 桁の基数に使用する値の最大値 """
+
+    def __init__(self, max_value: int, search_depth: int) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            max_value (int): 最短のコマンドを計算する値の最大値
+            search_depth (int): 幅優先探索を行う最大のコマンド数 (0: 幅優先探索を行わない)
+
+        Raises:
+            ValueError: 引数: max_value が1未満、または 引数: search_depth が0未満の値である
+        """
+        if max_value < 1:
+            raise ValueError(f"max_value: '{max_value}' is less than 1.")
+
+        if search_depth < 0:
+            raise ValueError(f"search_depth: '{search_depth}' is less than 0.")
+
+        self._max_value: int = max_value
+        self._search_depth: int = search_depth
+
+        # 加算 / 減算の結果が max_value となる値まで表に保持する
+        self._limit: int = max(max_value, self._OPERAND_MAX) + self._OPERAND_MAX
+        self._costs: bytearray = bytearray(self._limit + 1)
+        self._rules: list[_Rule | None] = [None] * (self._limit + 1)
+        self._large_rules: dict[int, tuple[int, _Rule]] = {}
+        self._commands: dict[int, tuple[Command, ...]] = {}
+
+        self._build(self._search(search_depth))
+
+    @property
+    def max_value(self) -> int:
+        """
+        最短のコマンドを計算する値の最大値取得
+
+        Returns:
+            int: 最短のコマンドを計算する値の最大値
+        """
+        return self._max_value
+
+    @property
+    def search_depth(self) -> int:
+        """
+        幅優先探索を行う最大のコマンド数取得
+
+        Returns:
+            int: 幅優先探索を行う最大のコマンド数
+        """
+        return self._search_depth
+
+    def cost(self, value: int) -> int:
+        """
+        コマンド数取得
+
+        Arguments:
+            value (int): 0より大きい整数
+
+        Returns:
+            int: 引数: value をstackに格納するコマンドの数
+
+        Raises:
+            ValueError: 引数: value が1未満の値である
+        """
+        if value < 1:
+            raise ValueError(f"value: '{value}' is less than 1.")
+
+        if value <= self._limit:
+            return self._costs[value]
+
+        return self._get_large_rule(value)[0]
+
+    def commands(self, value: int) -> tuple[Command, ...]:
+        """
+        コマンド取得
+
+        引数: value をstackに格納するコマンドを取得する。
+        取得したコマンドは値ごとに保持し、再度取得する際は保持したコマンドを返却する。
+
+        Arguments:
+            value (int): 0より大きい整数
+
+        Returns:
+            tuple[Command, ...]: 実行時に value をstackに格納するコマンド
+
+        Raises:
+            ValueError: 引数: value が1未満の値である
+        """
+        if value < 1:
+            raise ValueError(f"value: '{value}' is less than 1.")
+
+        commands: tuple[Command, ...] | None = self._commands.get(value)
+        if commands is not None:
+            return commands
+
+        rule: _Rule | None = (self._rules[value] if value <= self._limit
+                              else self._get_large_rule(value)[1])
+        assert rule is not None
+
+        base, tail = rule
+        expanded: list[Command] = list(self.commands(base)) if base > 0 else []
+        for item in tail:
+            if isinstance(item, Command):
+                expanded.append(item)
+            else:
+                expanded.extend(self.commands(item))
+
+        commands = tuple(expanded)
+        self._commands[value] = commands
+
+        return commands
+
+    def _search(self, depth: int) -> dict[int, tuple[Command, ...]]:
+        """
+        幅優先探索
+
+        空のstackから、引数: depth 以下のコマンド数でstackに1つの値のみが格納された状態を探索する。
+        stackの値は 1 ～ 表に保持する値の最大値 の範囲に限定する。
+
+        Arguments:
+            depth (int): 探索する最大のコマンド数
+
+        Returns:
+            dict[int, tuple[Command, ...]]: 値 -> 値を構築する最短のコマンド
+        """
+        limit: int = self._limit
+        stack_max: int = self._SEARCH_STACK_MAX
+
+        # stackの状態 -> (直前の状態, 実行したコマンド)
+        parents: dict[tuple[int, ...], tuple[tuple[int, ...], Command]] = {}
+        queue: deque[tuple[tuple[int, ...], int]] = deque([((), 0)])
+        found: dict[int, tuple[Command, ...]] = {}
+
+        while queue:
+            state, length = queue.popleft()
+
+            if (len(state) == 1) and (state[0] not in found):
+                commands: list[Command] = []
+                node: tuple[int, ...] = state
+                while node:
+                    node, command = parents[node]
+                    commands.append(command)
+                found[state[0]] = tuple(reversed(commands))
+
+            if length >= depth:
+                continue
+
+            nexts: list[tuple[tuple[int, ...], Command]] = []
+            if len(state) < stack_max:
+                nexts.append(((*state, 1), Command.PUSH))
+                if state:
+                    nexts.append(((*state, state[-1]), Command.DUPLICATE))
+            if len(state) >= 2:
+                rest: tuple[int, ...] = state[:-2]
+                lhs, rhs = state[-2], state[-1]
+                nexts.append(((*rest, lhs + rhs), Command.ADD))
+                nexts.append(((*rest, lhs - rhs), Command.SUBTRACT))
+                nexts.append(((*rest, lhs * rhs), Command.MULTIPLY))
+
+            for next_state, command in nexts:
+                if (not 1 <= next_state[-1] <= limit) or (next_state in parents):
+                    continue
+
+                parents[next_state] = (state, command)
+                queue.append((next_state, length + 1))
+
+        return found
+
+    def _build(self, found: dict[int, tuple[Command, ...]]) -> None:
+        """
+        Dijkstra法による表の計算
+
+        コマンド数 L の値を、コマンド数が L 未満の確定済みの値から以下の規則で構築する。
+        同一のコマンド数で構築できる値は、先に構築した規則を使用する。
+
+        - 幅優先探索で見つかったコマンド
+        - a DUPLICATE ADD / MULTIPLY                   : 2a, a^2
+        - a b ADD / SUBTRACT (b <= _OPERAND_MAX)       : a + b, a - b
+        - a b MULTIPLY                                 : a * b
+        - a DUPLICATE [f] ADD / MULTIPLY               : a + f(a), a * f(a)
+          f(a) は、a を複製した値から数コマンドで構築する値 (a^2, a + c, (a + c)^2 など)
+
+        規則ごとの値の確定は、コマンド数 L の値のリストを渡して _relax_* メソッドで行う。
+
+        Arguments:
+            found (dict[int, tuple[Command, ...]]): 幅優先探索で見つかった値 -> コマンド
+        """
+        operand_max: int = self._OPERAND_MAX
+
+        found_levels: dict[int, list[int]] = {}
+        for value, commands in found.items():
+            found_levels.setdefault(len(commands), []).append(value)
+
+        levels: list[list[int]] = [[]]
+        target: int = max(self._max_value, operand_max)
+        remaining: int = target
+        level: int = 0
+
+        while remaining > 0:
+            level += 1
+            values: list[int] = []
+
+            if level == 1:
+                self._relax(level, values, 1, 0, (Command.PUSH,))
+
+            for value in found_levels.get(level, []):
+                self._relax(level, values, value, 0, found[value])
+
+            self._relax_duplicate(level, levels, values)
+            self._relax_binary(level, levels, values)
+            self._relax_patterns(level, levels, values)
+
+            values.sort()
+            levels.append(values)
+            remaining -= sum(1 for value in values if value <= target)
+
+    def _relax(self,
+               level: int,
+               values: list[int],
+               value: int,
+               base: int,
+               tail: tuple[Command | int, ...]) -> None:
+        """
+        値の確定
+
+        引数: value が表の範囲内の未確定の値である場合は、コマンド数を 引数: level として
+        規則を確定し、引数: values に追加する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            values (list[int]): コマンド数が level の値のリスト
+            value (int): 構築する値
+            base (int): 基にする値
+            tail (tuple[Command | int, ...]): 後続の要素
+        """
+        if (0 < value <= self._limit) and (self._costs[value] == 0):
+            self._costs[value] = level
+            self._rules[value] = (base, tail)
+            values.append(value)
+
+    def _relax_duplicate(self, level: int, levels: list[list[int]], values: list[int]) -> None:
+        """
+        DUPLICATEで複製した値の演算による値の確定
+
+        a DUPLICATE ADD / MULTIPLY により、2a, a^2 を確定する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            levels (list[list[int]]): コマンド数 -> 確定済みの値のリスト
+            values (list[int]): コマンド数が level の値のリスト
+        """
+        if level < 3:
+            return
+
+        for a in levels[level - 2]:
+            self._relax(level, values, a * 2, a, (Command.DUPLICATE, Command.ADD))
+            self._relax(level, values, a * a, a, (Command.DUPLICATE, Command.MULTIPLY))
+
+    def _relax_binary(self, level: int, levels: list[list[int]], values: list[int]) -> None:
+        """
+        2項演算による値の確定
+
+        a b ADD / SUBTRACT (b <= _OPERAND_MAX)、a b MULTIPLY により、a + b, a - b, a * b を
+        確定する。組み合わせが多いため、未確定の値のみ規則を生成する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            levels (list[list[int]]): コマンド数 -> 確定済みの値のリスト
+            values (list[int]): コマンド数が level の値のリスト
+        """
+        limit: int = self._limit
+        operand_max: int = self._OPERAND_MAX
+        costs: bytearray = self._costs
+
+        for b_level in range(1, level - 1):
+            a_values: list[int] = levels[level - 1 - b_level]
+            for b in levels[b_level]:
+                if b > operand_max:
+                    break
+                for a in a_values:
+                    if (a + b <= limit) and (costs[a + b] == 0):
+                        self._relax(level, values, a + b, a, (b, Command.ADD))
+                    if (a > b) and (costs[a - b] == 0):
+                        self._relax(level, values, a - b, a, (b, Command.SUBTRACT))
+
+        for a_level in range(1, ((level - 1) // 2) + 1):
+            b_values: list[int] = levels[level - 1 - a_level]
+            for a in levels[a_level]:
+                if a < 2:
+                    continue
+                for b in b_values:
+                    if a * b > limit:
+                        break
+                    if (b >= 2) and (costs[a * b] == 0):
+                        self._relax(level, values, a * b, a, (b, Command.MULTIPLY))
+
+    def _relax_patterns(self, level: int, levels: list[list[int]], values: list[int]) -> None:
+        """
+        a DUPLICATE [f] ADD / MULTIPLY による値の確定
+
+        a を複製した値から数コマンドで構築する f(a) により、a + f(a), a * f(a) を確定する。
+        複製した値の再利用は、結果が表の範囲内となる小さな a のみ対象とする。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            levels (list[list[int]]): コマンド数 -> 確定済みの値のリスト
+            values (list[int]): コマンド数が level の値のリスト
+        """
+        root: int = math.isqrt(self._limit) + self._OPERAND_MAX
+
+        for a_level in range(1, level - 2):
+            a_values: list[int] = [a for a in levels[a_level] if a <= root]
+            # f(a) のコマンド数 (DUPLICATE / 最後の演算を除く)
+            f_cost: int = level - 2 - a_level
+
+            if f_cost == 2:
+                for a in a_values:
+                    self._relax_square_patterns(level, values, a)
+            elif f_cost == 4:
+                for a in a_values:
+                    self._relax(level, values, a + (a * 2) ** 2, a,
+                                (Command.DUPLICATE, Command.DUPLICATE, Command.ADD,
+                                 Command.DUPLICATE, Command.MULTIPLY, Command.ADD))
+
+            # f(a) = a + c / a - c / a * c
+            if 1 <= f_cost - 1 < level:
+                self._relax_constant_patterns(level, values, a_values, levels[f_cost - 1])
+
+            # f(a) = (a + c)^2 / (a - c)^2
+            if 1 <= f_cost - 3 < level:
+                self._relax_squared_constant_patterns(level, values, a_values,
+                                                      levels[f_cost - 3])
+
+    def _relax_square_patterns(self, level: int, values: list[int], a: int) -> None:
+        """
+        f(a) = a^2 / 2a の値の確定
+
+        a DUPLICATE DUPLICATE [MULTIPLY / ADD] [ADD / MULTIPLY] により、
+        a + a^2, a^3, 2a^2, 3a を確定する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            values (list[int]): コマンド数が level の値のリスト
+            a (int): 基にする値
+        """
+        self._relax(level, values, a + (a * a), a, (Command.DUPLICATE, Command.DUPLICATE,
+                                                    Command.MULTIPLY, Command.ADD))
+        self._relax(level, values, a * a * a, a, (Command.DUPLICATE, Command.DUPLICATE,
+                                                  Command.MULTIPLY, Command.MULTIPLY))
+        self._relax(level, values, a * a * 2, a, (Command.DUPLICATE, Command.DUPLICATE,
+                                                  Command.ADD, Command.MULTIPLY))
+        self._relax(level, values, a * 3, a, (Command.DUPLICATE, Command.DUPLICATE,
+                                              Command.ADD, Command.ADD))
+
+    def _relax_constant_patterns(self,
+                                 level: int,
+                                 values: list[int],
+                                 a_values: list[int],
+                                 c_values: list[int]) -> None:
+        """
+        f(a) = a + c / a - c / a * c の値の確定
+
+        a DUPLICATE c [ADD / SUBTRACT / MULTIPLY] MULTIPLY により、
+        a(a + c), a(a - c), a^2 c を確定する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            values (list[int]): コマンド数が level の値のリスト
+            a_values (list[int]): 基にする値のリスト
+            c_values (list[int]): f(a) の定数 c のリスト
+        """
+        for c in c_values:
+            if c > self._OPERAND_MAX:
+                break
+            for a in a_values:
+                self._relax(level, values, a * (a + c), a, (Command.DUPLICATE, c, Command.ADD,
+                                                            Command.MULTIPLY))
+                self._relax(level, values, a * (a - c), a, (Command.DUPLICATE, c,
+                                                            Command.SUBTRACT, Command.MULTIPLY))
+                self._relax(level, values, a * a * c, a, (Command.DUPLICATE, c,
+                                                          Command.MULTIPLY, Command.MULTIPLY))
+
+    def _relax_squared_constant_patterns(self,
+                                         level: int,
+                                         values: list[int],
+                                         a_values: list[int],
+                                         c_values: list[int]) -> None:
+        """
+        f(a) = (a + c)^2 / (a - c)^2 の値の確定
+
+        a DUPLICATE c [ADD / SUBTRACT] DUPLICATE MULTIPLY [ADD / MULTIPLY] により、
+        a + f(a), a * f(a) を確定する。
+
+        Arguments:
+            level (int): 確定するコマンド数
+            values (list[int]): コマンド数が level の値のリスト
+            a_values (list[int]): 基にする値のリスト
+            c_values (list[int]): f(a) の定数 c のリスト
+        """
+        for c in c_values:
+            if c > self._OPERAND_MAX:
+                break
+            for a in a_values:
+                for op, f_value in ((Command.ADD, (a + c) ** 2),
+                                    (Command.SUBTRACT, (a - c) ** 2)):
+                    self._relax(level, values, a + f_value, a,
+                                (Command.DUPLICATE, c, op, Command.DUPLICATE,
+                                 Command.MULTIPLY, Command.ADD))
+                    self._relax(level, values, a * f_value, a,
+                                (Command.DUPLICATE, c, op, Command.DUPLICATE,
+                                 Command.MULTIPLY, Command.MULTIPLY))
+
+    def _get_large_rule(self, value: int) -> tuple[int, _Rule]:
+        """
+        表の範囲外の値の規則取得
+
+        引数: value を d 進数 (d <= _OPERAND_MAX) の上位の桁と最下位の桁に分け、
+        q * d + r / (q + 1) * d - (d - r) のうちコマンド数が最小となる規則を求める。
+        上位の桁 q も表の範囲外の場合は、再帰的に求める。
+
+        Arguments:
+            value (int): 表の範囲外の値
+
+        Returns:
+            tuple[int, _Rule]: コマンド数 / 値を構築する規則
+        """
+        large_rule: tuple[int, _Rule] | None = self._large_rules.get(value)
+        if large_rule is not None:
+            return large_rule
+
+        costs: bytearray = self._costs
+
+        for d in range(2, self._OPERAND_MAX + 1):
+            q, r = divmod(value, d)
+
+            candidates: list[tuple[int, _Rule]] = []
+            if r == 0:
+                candidates.append((self.cost(q) + costs[d] + 1, (q, (d, Command.MULTIPLY))))
+            else:
+                candidates.append((self.cost(q) + costs[d] + costs[r] + 2,
+                                   (q, (d, Command.MULTIPLY, r, Command.ADD))))
+                candidates.append((self.cost(q + 1) + costs[d] + costs[d - r] + 2,
+                                   (q + 1, (d, Command.MULTIPLY, d - r, Command.SUBTRACT))))
+
+            for candidate in candidates:
+                if (large_rule is None) or (candidate[0] < large_rule[0]):
+                    large_rule = candidate
+
+        assert large_rule is not None
+        self._large_rules[value] = large_rule
+
+        return large_rule
+
+
+class OptimalCommandGenerator(ICommandGenerator):
+    """
+    OptimalCommandGeneratorは、Pietプラグラムのメッセージ出力コマンド生成器クラスである。
+    メッセージの文字のコードポイントを、ShortestCommandTableで探索した最短のコマンドに変換する。
+    ShortestCommandTableは、同一の引数で生成したすべてのインスタンスで共有する。
+    """
+
+    _tables: dict[tuple[int, int], ShortestCommandTable] = {}
+    """ (max_value, search_depth) -> 計算済みのShortestCommandTable """
+
+    def __init__(self,
+                 debug: bool = True,
+                 max_value: int = 0x1FFFF,
+                 search_depth: int = 17,
+                 delta: bool = False,
+                 interleave: bool = False) -> None:
+        """
+        インスタンス初期化
+
+        引数: max_value / search_depth のShortestCommandTableが計算済みでない場合は、
+        ShortestCommandTableを計算する。
+
+        Arguments:
+            debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
+            max_value (int, optional): 最短のコマンドを計算するコードポイントの最大値
+            search_depth (int, optional): 幅優先探索を行う最大のコマンド数
+            delta (bool, optional): True: 直前に構築した文字との差分で構築するコマンドが
+                                    短い場合は、差分で構築する; False: 文字ごとに新たに構築する
+            interleave (bool, optional): True: 文字を構築した直後に出力し、stackの深さを一定とする;
+                                         False: 全文字をstackに格納した後に出力する
+
+        Raises:
+            ValueError: 引数: max_value が1未満、または 引数: search_depth が0未満の値である
+        """
+        super().__init__(debug)
+
+        generator = OptimalCommandGenerator
+        key: tuple[int, int] = (max_value, search_depth)
+
+        table: ShortestCommandTable | None = generator._tables.get(key)
+        if table is None:
+            table = ShortestCommandTable(max_value, search_depth)
+            generator._tables[key] = table
+
+        self._table: ShortestCommandTable = table
+        self._delta: bool = delta
+        self._interleave: bool = interleave
+
+    @property
+    def table(self) -> ShortestCommandTable:
+        """
+        最短のコマンドの表取得
+
+        Returns:
+            ShortestCommandTable: コードポイントをコマンドに変換する表
+        """
+        return self._table
+
+    @property
+    def delta(self) -> bool:
+        """
+        差分による構築の有無取得
+
+        Returns:
+            bool: True: 直前に構築した文字との差分で構築する; False: 文字ごとに新たに構築する
+        """
+        return self._delta
+
+    @property
+    def interleave(self) -> bool:
+        """
+        文字ごとの出力の有無取得
+
+        Returns:
+            bool: True: 文字を構築した直後に出力する; False: 全文字をstackに格納した後に出力する
+        """
+        return self._interleave
+
+    def _generate_impl(self, message: str) -> list[Command]:
+        """
+        メッセージ -> コマンド生成実装
+
+        ICommandGenerator.generateメソッドの実装を行う。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+
+        Returns:
+            list[Command]: メッセージから生成されたコマンドのリスト
+
+        Raises:
+            GenerateCommandError: コマンドの生成に失敗した
+        """
+        # 先頭にNONEコマンドを格納
+        commands: list[Command] = [Command.NONE]
+
+        table_commands = self._table.commands
+        if self._interleave:
+            # メッセージを先頭から一文字ずつ、構築した直後に出力するコマンドに変換して格納
+            commands.extend(self._interleave_commands(message, table_commands, self._delta))
+        elif not self._delta:
+            # メッセージを後方から一文字ずつコマンドに変換して格納
+            # 同じ文字が連続する場合は、一度だけ構築してDUPLICATEで複製する
+            for ch, run in itertools.groupby(reversed(message)):
+                commands.extend(table_commands(ord(ch)))
+                commands.extend([Command.DUPLICATE] * (sum(1 for _ in run) - 1))
+        else:
+            # メッセージを後方から一文字ずつコマンドに変換して格納
+            # stack先頭には、直前に変換した(メッセージ上では次の)文字が格納されている
+            previous: int = 0
+            for ch in reversed(message):
+                value: int = ord(ch)
+                commands.extend(self._select_delta_commands(previous, value,
+                                                            table_commands(value),
+                                                            table_commands))
+                previous = value
+
+        if not self._interleave:
+            # メッセージの文字数分、OUT_CHARコマンドを格納
+            commands.extend([Command.OUT_CHAR] * len(message))
+
+        if self._debug:
+            print(f"generate_impl: exit. commands={[str(command) for command in commands]}")
+
+        return commands
@@ -0,0 +1,268 @@
+"""
+Pietプラグラム: メッセージ出力コマンド生成器モジュール (多倍長整数へのパック)
+"""
+import itertools
+import math
+from typing import NamedTuple
+
+from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+
+
+class PackedFormat(NamedTuple):
+    """
+    PackedFormatは、メッセージの文字をパックした整数の形式である。
+    文字 ch は、ord(ch) - offset を base 進数の1桁とし、chunk_size 文字ごとに1つの整数にパックする。
+    """
+
+    base: int
+    """ 桁の基数 """
+    offset: int
+    """ 文字のコードポイントから減算して桁の値とする値 (桁の値は1以上となる) """
+    chunk_size: int
+    """ 1つの整数にパックする文字数 """
+
+    def pack(self, chunk: str) -> int:
+        """
+        文字列 -> 整数パック
+
+        Arguments:
+            chunk (str): パックする chunk_size 文字の文字列
+
+        Returns:
+            int: 先頭の文字を最下位の桁とした整数
+        """
+        value: int = 0
+        for ch in reversed(chunk):
+            value = (value * self.base) + (ord(ch) - self.offset)
+
+        return value
+
+
+class PackedCommandGenerator(OptimalCommandGenerator):
+    """
+    PackedCommandGeneratorは、メッセージの文字を整数にパックして出力するコマンドを生成するクラスである。
+    メッセージの文字をメッセージ中の文字の範囲を基数とする整数の桁とし、複数の文字を1つの整数として
+    ShortestCommandTableの最短のコマンドで構築する。
+    実行時は、ループ本体でDIVIDE / MODコマンドにより整数から1文字ずつ取り出して出力する。
+
+    パックしたメッセージは以下のコマンドで生成する。
+
+    - PUSH NOT [整数の構築(末尾から)] LOOP_BEGIN [DIVIDE / MODによる1整数分の出力] DUPLICATE LOOP_END
+      POP [残りの文字の出力]
+
+    stackの底の0を番兵とし、取り出した次の整数が0となるまでループする。
+    整数にパックできない末尾の文字、およびパックしてもコマンド数が減少しないメッセージは、
+    OptimalCommandGeneratorと同じコマンドで出力する。
+    インスタンス初期化時に interleave を指定した場合は、パックした整数を _INTERLEAVE_CHUNKS_MAX 個
+    ごとに格納して出力するループを繰り返し、stackに格納する値の数をメッセージの文字数によらず
+    一定以下とする。
+
+    LOOP_BEGIN / LOOP_ENDコマンドはPietの仕様に存在しないため、生成したコマンドは
+    LoopLayouterで配置すること。
+    """
+
+    _CHUNK_MAX: int = 4
+    """ 1つの整数にパックする最大文字数 """
+
+    _INTERLEAVE_CHUNKS_MAX: int = 64
+    """ interleave を指定した場合に、1つのループで出力するパックした整数の最大数 """
+
+    _LOOP_COMMANDS: int = 6
+    """
+    整数の構築 / 取り出し以外のコマンド数
+    (番兵の構築 / 破棄、LOOP_BEGIN / LOOP_ENDコマンド、次の整数の判定のコマンド)
+    """
+
+    def _generate_impl(self, message: str) -> list[Command]:
+        """
+        メッセージ -> コマンド生成実装
+
+        ICommandGenerator.generateメソッドの実装を行う。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+
+        Returns:
+            list[Command]: メッセージから生成されたコマンドのリスト
+
+        Raises:
+            GenerateCommandError: コマンドの生成に失敗した
+        """
+        commands: list[Command] = super()._generate_impl(message)
+
+        packed_format: PackedFormat | None = self._select_format(message, len(commands))
+        if packed_format is not None:
+            packed_length: int = (len(message) // packed_format.chunk_size) * \
+                packed_format.chunk_size
+            commands = [
+                Command.NONE,
+                *self._packed_to_commands(message[:packed_length], packed_format),
+                *super()._generate_impl(message[packed_length:])[1:],
+            ]
+
+        if self._debug:
+            print(f"generate_impl: exit. commands={[str(command) for command in commands]}")
+
+        return commands
+
+    def _select_format(self, message: str, commands_num: int) -> PackedFormat | None:
+        """
+        パック形式選択
+
+        パックする文字数ごとにコマンド数を見積もり、コマンド数が最小となる形式を選択する。
+        パックした整数の最大値は、ShortestCommandTableの計算範囲とする。
+        LoopLayouterはループごとに2行分のセルを使用するため、全コマンド数の平方根の2倍を
+        ループごとにパックしたコマンド数に加算して評価する。
+
+        Arguments:
+            message (str): コマンドを生成するメッセージ
+            commands_num (int): 文字ごとのコマンドでメッセージを出力するコマンド数
+
+        Returns:
+            PackedFormat | None: 選択した形式 (None: パックしてもコマンド数が減少しない)
+
+        Examples:
+            >>> gen = PackedCommandGenerator(False)
+            >>> print(gen._select_format('abc' * 20, 1000))
+            PackedFormat(base=4, offset=96, chunk_size=3)
+        """
+        if not message:
+            return None
+
+        code_points: list[int] = [ord(ch) for ch in message]
+        offset: int = min(code_points) - 1
+        base: int = max(code_points) - offset + 1
+        row_cells: int = math.isqrt(commands_num)
+
+        best: tuple[int, PackedFormat] | None = None
+        for chunk_size in range(1, self._CHUNK_MAX + 1):
+            packed_format = PackedFormat(base, offset, chunk_size)
+            if ((base ** chunk_size) - 1 > self._table.max_value) or \
+                    (len(message) < chunk_size):
+                break
+
+            packed_length: int = (len(message) // chunk_size) * chunk_size
+            loops: int = (math.ceil((packed_length // chunk_size) / self._INTERLEAVE_CHUNKS_MAX)
+                          if self._interleave else 1)
+            estimate: int = (self._estimate_packed_commands(message[:packed_length],
+                                                            packed_format) +
+                             len(super()._generate_impl(message[packed_length:])) +
+                             (2 * row_cells * loops))
+            if (estimate < commands_num) and ((best is None) or (estimate < best[0])):
+                best = (estimate, packed_format)
+
+        return best[1] if best is not None else None
+
+    def _estimate_packed_commands(self, message: str, packed_format: PackedFormat) -> int:
+        """
+        パックしたメッセージのコマンド数見積もり
+
+        Arguments:
+            message (str): パックするメッセージ (文字数は chunk_size の倍数)
+            packed_format (PackedFormat): パック形式
+
+        Returns:
+            int: パックしたメッセージを出力するコマンド数
+        """
+        cost = self._table.cost
+        chunk_size: int = packed_format.chunk_size
+        values: list[int] = [packed_format.pack(message[i:i + chunk_size])
+                             for i in range(0, len(message), chunk_size)]
+
+        loop_commands: int = len(self._unpack_commands(packed_format)) + self._LOOP_COMMANDS
+
+        # 同じ整数が連続する場合は、一度だけ構築してDUPLICATEで複製する
+        return sum(sum(cost(value) + sum(1 for _ in run) - 1
+                       for value, run in itertools.groupby(group)) + loop_commands
+                   for group in self._group_chunks(values))
+
+    def _packed_to_commands(self, message: str, packed_format: PackedFormat) -> list[Command]:
+        """
+        メッセージ -> パックした整数の出力コマンド変換
+
+        stackに番兵の0と、メッセージの末尾から順にパックした整数を格納し、
+        stack先頭の整数から文字を取り出して出力するループのコマンドを生成する。
+        ループの終了後は、番兵をstackから破棄する。
+        インスタンス初期化時に interleave を指定した場合は、_INTERLEAVE_CHUNKS_MAX 個の整数ごとに
+        ループのコマンドを生成する。
+
+        Arguments:
+            message (str): パックするメッセージ (文字数は chunk_size の倍数)
+            packed_format (PackedFormat): パック形式
+
+        Returns:
+            list[Command]: パックしたメッセージを出力するコマンドのリスト
+        """
+        chunk_size: int = packed_format.chunk_size
+        values: list[int] = [packed_format.pack(message[i:i + chunk_size])
+                             for i in range(0, len(message), chunk_size)]
+
+        unpack_commands: list[Command] = self._unpack_commands(packed_format)
+        commands: list[Command] = []
+
+        for group in self._group_chunks(values):
+            # 番兵
+            commands.extend([Command.PUSH, Command.NOT])
+
+            # パックした整数を後方から格納
+            for value, run in itertools.groupby(reversed(group)):
+                commands.extend(self._table.commands(value))
+                commands.extend([Command.DUPLICATE] * (sum(1 for _ in run) - 1))
+
+            commands.extend([
+                Command.LOOP_BEGIN,
+                *unpack_commands,
+                # 次の整数が0(番兵)以外であればLOOP_BEGINに戻る
+                Command.DUPLICATE,
+                Command.LOOP_END,
+                Command.POP,
+            ])
+
+        return commands
+
+    def _group_chunks(self, values: list[int]) -> list[list[int]]:
+        """
+        パックした整数のループごとの分割
+
+        Arguments:
+            values (list[int]): メッセージの先頭から順にパックした整数
+
+        Returns:
+            list[list[int]]: 1つのループで出力する整数のリスト
+                             (interleave を指定した場合は、_INTERLEAVE_CHUNKS_MAX 個ごとに分割する)
+        """
+        if not self._interleave:
+            return [values] if values else []
+
+        return [values[i:i + self._INTERLEAVE_CHUNKS_MAX]
+                for i in range(0, len(values), self._INTERLEAVE_CHUNKS_MAX)]
+
+    def _unpack_commands(self, packed_format: PackedFormat) -> list[Command]:
+        """
+        パックした整数の取り出しコマンド生成
+
+        stack先頭の整数を base で除算した余りから、最下位の桁の文字を順に出力するコマンドを
+        生成する。最上位の桁は、除算した商をそのまま文字として出力する。
+
+        Arguments:
+            packed_format (PackedFormat): パック形式
+
+        Returns:
+            list[Command]: stack先頭の整数から chunk_size 文字を出力するコマンドのリスト
+        """
+        base_commands: tuple[Command, ...] = self._table.commands(packed_format.base)
+        offset_commands: tuple[Command, ...] = ((*self._table.commands(packed_format.offset),
+                                                 Command.ADD)
+                                                if packed_format.offset > 0 else ())
+
+        digit_commands: list[Command] = [
+            Command.DUPLICATE, *base_commands, Command.MOD,
+            *offset_commands, Command.OUT_CHAR,
+            *base_commands, Command.DIVIDE,
+        ]
+
+        return [
+            *(digit_commands * (packed_format.chunk_size - 1)),
+            *offset_commands, Command.OUT_CHAR,
+        ]
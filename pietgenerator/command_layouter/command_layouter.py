@@ -6,7 +6,8 @@ import random
 from enum import Enum
 from typing import Any, NoReturn, TypeGuard
 
-from pietgenerator.piet_common import Codel, Color, Command
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Codel, Color, Command, HUED_COLOR_NUM
 
 
 class LayoutCommandError(Exception):
@@ -61,23 +62,103 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
     コマンド配置器クラスは本クラスを継承し、未実装のインタフェースを定義すること。
     """
 
-    def __init__(self, debug: bool, trace: bool) -> None:
+    _RANDOM_COLORS: tuple[Color, ...] = (
+        Color.LIGHT_RED,
+        Color.LIGHT_YELLOW,
+        Color.LIGHT_GREEN,
+        Color.LIGHT_CYAN,
+        Color.LIGHT_BLUE,
+        Color.LIGHT_MAGENTA,
+        Color.RED,
+        Color.YELLOW,
+        Color.GREEN,
+        Color.CYAN,
+        Color.BLUE,
+        Color.MAGENTA,
+        Color.DARK_RED,
+        Color.DARK_YELLOW,
+        Color.DARK_GREEN,
+        Color.DARK_CYAN,
+        Color.DARK_BLUE,
+        Color.DARK_MAGENTA,
+    )
+    """ 任意の色として選択する色 (Color.indexの昇順のため、位置がColor.indexとなる) """
+
+    _RANDOM_COLOR_MASK: int = (1 << HUED_COLOR_NUM) - 1
+    """ 任意の色として選択する色のColor.indexのbitを立てたマスク """
+
+    _RANDOM_COMMANDS: tuple[Command, ...] = (
+        # Command.NONE,
+        Command.PUSH,
+        Command.POP,
+        Command.ADD,
+        Command.SUBTRACT,
+        Command.MULTIPLY,
+        Command.DIVIDE,
+        Command.MOD,
+        Command.NOT,
+        Command.GREATER,
+        # Command.POINTER,
+        # Command.SWITCH,
+        Command.DUPLICATE,
+        # Command.ROLL,
+        # Command.IN_NUMBER,
+        # Command.IN_CHAR,
+        # Command.OUT_NUMBER,
+        # Command.OUT_CHAR,
+    )
+    """ 任意のコマンドとして選択するコマンド (Command.command_idの昇順) """
+
+    _RANDOM_COMMANDS_BY_ID: dict[int, Command] = {
+        command.command_id: command for command in _RANDOM_COMMANDS
+    }
+    """ Command.command_id -> 任意のコマンドとして選択するコマンド の変換テーブル """
+
+    _RANDOM_COMMAND_MASK: int = sum(1 << command.command_id for command in _RANDOM_COMMANDS)
+    """ 任意のコマンドとして選択するコマンドのCommand.command_idのbitを立てたマスク """
+
+    # pylint: disable=line-too-long
+    _FILL_PATTERN: list[list[Color]] = [
+        [Color.LIGHT_YELLOW, Color.CYAN,         Color.DARK_MAGENTA, Color.LIGHT_GREEN,  Color.BLUE],          # noqa: E241,E501
+        [Color.DARK_MAGENTA, Color.LIGHT_GREEN,  Color.BLUE,         Color.LIGHT_YELLOW, Color.CYAN],          # noqa: E241,E501
+        [Color.BLUE,         Color.LIGHT_YELLOW, Color.CYAN,         Color.DARK_MAGENTA, Color.LIGHT_GREEN],   # noqa: E241,E501
+        [Color.CYAN,         Color.DARK_MAGENTA, Color.LIGHT_GREEN,  Color.BLUE,         Color.LIGHT_YELLOW],  # noqa: E241,E501
+        [Color.LIGHT_GREEN,  Color.BLUE,         Color.LIGHT_YELLOW, Color.CYAN,         Color.DARK_MAGENTA],  # noqa: E241,E501
+    ]
+    """
+    未使用のセルに敷き詰める模様 (FillMode.PATTERN用)
+    (x, y) の色は5色の (x + 2 * y) % 5 番目であり、敷き詰めた模様の上下左右の色は常に異なる
+    """
+
+    def __init__(self,
+                 debug: bool,
+                 trace: bool,
+                 seed: int | random.Random | None = None) -> None:
         """
         インスタンス初期化
 
-        デバッグオプションの設定
+        デバッグオプション / 乱数の設定
+
+        引数: seed にintを指定した場合は、do_layoutごとに乱数を初期化するため、
+        同一の引数のdo_layoutは常に同一のgridを返却する。
+        引数: seed にrandom.Randomを指定した場合は、指定した乱数生成器を使用する。
+        引数: seed を省略した場合は、OSの乱数源で初期化した乱数生成器を使用する。
 
         Arguments:
             debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
             trace (bool): True: トレースログ有効化; False: トレースログ無効化
+            seed (int | random.Random | None, optional): 乱数のseed、または乱数生成器
         """
         self._debug = debug
         self._trace = trace
+        self._seed = seed
+        self._random: random.Random = seed if isinstance(seed, random.Random) else \
+            random.Random(seed)
 
     def do_layout(self,
                   commands: list[Command],
                   start_color: Color,
-                  abort_program_color: Color) -> list[list[Codel]]:
+                  abort_program_color: Color) -> CodelGrid:
         """
         コマンド配置
 
@@ -96,18 +177,25 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
             abort_program_color (Color): 停止用プログラムに配置するCodelの色
 
         Returns:
-            list[list[Codel]]: Codelを配置したgrid
+            CodelGrid: Codelを配置したgrid
 
         Raises:
             LayoutCommandError: コマンドの配置に失敗した
         """
+        if isinstance(self._seed, int):
+            # 同一の引数に対して同一のgridを返却するため、乱数を初期化する
+            self._random.seed(self._seed)
+
         try:
-            grid: list[list[Any]] = self._do_layout_impl(commands, start_color, abort_program_color)
+            grid: CodelGrid = self._do_layout_impl(commands, start_color, abort_program_color)
 
             if not self._is_fill_all(grid):
                 # Codelが配置されていないセルが存在する
                 raise RuntimeError("has invalid cells.")
 
+            # _is_fill_allはlist[list[Codel]]も許容するため、CodelGridに絞り込む
+            assert isinstance(grid, CodelGrid)
+
             return grid
         except Exception as e:
             raise LayoutCommandError() from e
@@ -115,7 +203,7 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
     def _do_layout_impl(self,
                         commands: list[Command],
                         start_color: Color,
-                        abort_program_color: Color) -> list[list[Any]] | NoReturn:
+                        abort_program_color: Color) -> CodelGrid | NoReturn:
         """
         コマンド配置実装
 
@@ -133,14 +221,16 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         raise NotImplementedError
 
     @staticmethod
-    def _is_fill_all(grid: list[list[Any]]) -> TypeGuard[list[list[Codel]]]:
+    def _is_fill_all(
+            grid: CodelGrid | list[list[Any]]) -> TypeGuard[CodelGrid | list[list[Codel]]]:
         """
         全セルCodel配置済み判定
 
         引数: grid のすべてのセルにCodelが配置されているか判定する。
+        引数: grid には、CodelGrid / list[list[Codel | None]] の何れも指定できる。
 
         Arguments:
-            grid (list[list[Any]]): 判定するgrid
+            grid (CodelGrid | list[list[Any]]): 判定するgrid
 
         Returns:
             bool: すべてのセルにCodelが配置されている場合はTrue
@@ -149,6 +239,9 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
             本メソッドはTypeGuardであるため、本メソッド実行後は引数: grid の
             すべてのセルにCodelが配置されていることを保証する。
         """
+        if isinstance(grid, CodelGrid):
+            return grid.is_fill_all()
+
         for row in grid:
             for codel in row:
                 if not isinstance(codel, Codel):
@@ -158,7 +251,10 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         return True
 
     @staticmethod
-    def _is_conflict(color: Color, grid: list[list[None | Codel]], x: int, y: int) -> bool:
+    def _is_conflict(color: Color,
+                     grid: CodelGrid | list[list[None | Codel]],
+                     x: int,
+                     y: int) -> bool:
         """
         競合判定
 
@@ -167,10 +263,11 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         ここで、競合の発生とは隣接する配置済みのCodelが保持するColorと同一色の
         Codelの配置を行うことを指す。
         ただし、白色 (Color.WHITE)、および黒色 (Color.BLACK)は競合の対象外とする。
+        引数: grid には、CodelGrid / list[list[Codel | None]] の何れも指定できる。
 
         Arguments:
             color (Color): 競合判定を行う色
-            grid (list[list[None | Codel]]): grid
+            grid (CodelGrid | list[list[None | Codel]]): grid
             x (int): 競合判定を行うx座標
             y (int): 競合判定を行うy座標
 
@@ -181,6 +278,9 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
             # 競合判定対象外
             return False
 
+        if isinstance(grid, CodelGrid):
+            return grid.has_neighbor(x, y, color.index)
+
         h: int = len(grid)
         w: int = len(grid[0])
 
@@ -199,14 +299,23 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         return color in {upper_color, under_color, left_color, right_color}
 
     @staticmethod
-    def _get_random_color(exclude_colors: list[Color] | None = None) -> Color | NoReturn:
+    def _get_random_color(exclude_colors: list[Color] | None = None,
+                          exclude_mask: int = 0,
+                          rand: random.Random | None = None) -> Color | NoReturn:
         """
         任意の色取得
 
-        引数: exclude_colors に含まれない、色相 / 明度を持つ任意の色を取得する。
+        引数: exclude_colors に含まれず、引数: exclude_mask でbitが立っていない、
+        色相 / 明度を持つ任意の色を取得する。
+        残りの色は、選択対象の色のマスクから除外する色のbitを落としたマスクで表し、
+        残りの色から一様に選択する。
 
         Arguments:
             exclude_colors (list[Color], optional): 除外する色
+            exclude_mask (int, optional): 除外する色のColor.indexのbitを立てたマスク
+                                          (CodelGrid.neighbor_maskを指定すると、
+                                          競合が発生する色を除外できる)
+            rand (random.Random, optional): 使用する乱数生成器 (省略時はrandomモジュール)
 
         Returns:
             Color: 任意の色
@@ -214,43 +323,32 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         Raises:
             RuntimeError: すべての色が除外された場合
         """
-        colors: list[Color] = [
-            Color.LIGHT_RED,
-            Color.LIGHT_YELLOW,
-            Color.LIGHT_GREEN,
-            Color.LIGHT_CYAN,
-            Color.LIGHT_BLUE,
-            Color.LIGHT_MAGENTA,
-            Color.RED,
-            Color.YELLOW,
-            Color.GREEN,
-            Color.CYAN,
-            Color.BLUE,
-            Color.MAGENTA,
-            Color.DARK_RED,
-            Color.DARK_YELLOW,
-            Color.DARK_GREEN,
-            Color.DARK_CYAN,
-            Color.DARK_BLUE,
-            Color.DARK_MAGENTA
-        ]
+        mask: int = ICommandLayouter._RANDOM_COLOR_MASK & ~exclude_mask
 
         if exclude_colors:
             for exclude_color in exclude_colors:
-                colors.remove(exclude_color)
+                mask &= ~(1 << exclude_color.index)
 
-        if not colors:
+        if not mask:
             # すべての色が除外された
             raise RuntimeError("No color left.")
 
-        return random.choice(colors)
+        if mask == ICommandLayouter._RANDOM_COLOR_MASK:
+            # 除外する色がない
+            colors: tuple[Color, ...] = ICommandLayouter._RANDOM_COLORS
+            return random.choice(colors) if rand is None else rand.choice(colors)
+
+        return ICommandLayouter._RANDOM_COLORS[ICommandLayouter._choice_bit(mask, rand)]
 
     @staticmethod
-    def _get_random_command(exclude_commands: list[Command] | None = None) -> Command | NoReturn:
+    def _get_random_command(exclude_commands: list[Command] | None = None,
+                            exclude_mask: int = 0,
+                            rand: random.Random | None = None) -> Command | NoReturn:
         """
         任意のコマンド取得
 
-        引数: exclude_commands に含まれない任意のコマンドを取得する。
+        引数: exclude_commands に含まれず、引数: exclude_mask でbitが立っていない
+        任意のコマンドを取得する。
         ただし、以下のコマンドは返却しない。
 
         - NONEコマンド: 連続した色のCodelが配置される。
@@ -261,6 +359,8 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
 
         Arguments:
             exclude_commands (list[Command], optional): 除外するコマンド
+            exclude_mask (int, optional): 除外するコマンドのCommand.command_idのbitを立てたマスク
+            rand (random.Random, optional): 使用する乱数生成器 (省略時はrandomモジュール)
 
         Returns:
             Command: 任意のコマンド
@@ -268,33 +368,44 @@ class ICommandLayouter(metaclass=abc.ABCMeta):
         Raises:
             RuntimeError: すべてのコマンドが除外された場合
         """
-        commands: list[Command] = [
-            # Command.NONE,
-            Command.PUSH,
-            Command.POP,
-            Command.ADD,
-            Command.SUBTRACT,
-            Command.MULTIPLY,
-            Command.DIVIDE,
-            Command.MOD,
-            Command.NOT,
-            Command.GREATER,
-            # Command.POINTER,
-            # Command.SWITCH,
-            Command.DUPLICATE,
-            # Command.ROLL,
-            # Command.IN_NUMBER,
-            # Command.IN_CHAR,
-            # Command.OUT_NUMBER,
-            # Command.OUT_CHAR,
-        ]
+        mask: int = ICommandLayouter._RANDOM_COMMAND_MASK & ~exclude_mask
 
         if exclude_commands:
             for exclude_command in exclude_commands:
-                commands.remove(exclude_command)
+                mask &= ~(1 << exclude_command.command_id)
 
-        if not commands:
+        if not mask:
             # すべてのコマンドが除外された
             raise RuntimeError("No command left.")
 
-        return random.choice(commands)
+        if mask == ICommandLayouter._RANDOM_COMMAND_MASK:
+            # 除外するコマンドがない
+            commands: tuple[Command, ...] = ICommandLayouter._RANDOM_COMMANDS
+            return random.choice(commands) if rand is None else rand.choice(commands)
+
+        return ICommandLayouter._RANDOM_COMMANDS_BY_ID[ICommandLayouter._choice_bit(mask, rand)]
+
+    @staticmethod
+    def _choice_bit(mask: int, rand: random.Random | None = None) -> int:
+        """
+        任意のbit位置取得
+
+        引数: mask で立っているbitの位置から、任意の1つを一様に選択する。
+        立っているbitを下位から数えた順序を乱数で選択するため、立っているbitの位置を
+        昇順に並べたシーケンスからrandom.choiceで選択した場合と同一の結果となる。
+
+        Arguments:
+            mask (int): 選択対象のbitを立てたマスク (0以外)
+            rand (random.Random, optional): 使用する乱数生成器 (省略時はrandomモジュール)
+
+        Returns:
+            int: 選択したbitの位置
+        """
+        count: int = mask.bit_count()
+        order: int = random.randrange(count) if rand is None else rand.randrange(count)
+
+        # 下位から order 個のbitを落とし、最下位のbitの位置を求める
+        for _ in range(order):
+            mask &= mask - 1
+
+        return (mask & -mask).bit_length() - 1
@@ -0,0 +1,833 @@
+"""
+Pietプラグラム: コマンド配置器モジュール (ループ)
+"""
+import bisect
+import math
+import random
+from typing import Callable, NoReturn
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Color, Command
+from pietgenerator.piet_common import get_command_from_color, get_color_from_command
+from pietgenerator.command_layouter.command_layouter import (ICommandLayouter,
+                                                             LayoutCommand,
+                                                             LayoutCommandError)
+from pietgenerator.command_layouter.square_layouter import FillMode, SquareLayouter
+
+
+class GridResizeError(LayoutCommandError):
+    """
+    GridResizeErrorは、コマンドの配置中にgridの幅、または行数が不足した際に送出される例外である。
+    本例外はモジュール内で補足し、モジュール外に送出しない。
+    """
+
+    def __init__(self, w: int, h: int) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            w (int): 次に配置を試行するgridの幅
+            h (int): 次に配置を試行するgridの高さ
+        """
+        super().__init__()
+        self._w = w
+        self._h = h
+
+    def __str__(self) -> str:
+        """
+        文字列表現
+
+        Returns:
+            str: 例外送出時のメッセージ
+        """
+        return f"{self.__class__.__name__}: grid is too small. next w={self._w} h={self._h}"
+
+    @property
+    def w(self) -> int:
+        """
+        gridの幅取得
+
+        Returns:
+            int: 次に配置を試行するgridの幅
+        """
+        return self._w
+
+    @property
+    def h(self) -> int:
+        """
+        gridの高さ取得
+
+        Returns:
+            int: 次に配置を試行するgridの高さ
+        """
+        return self._h
+
+
+class LoopLayouter(ICommandLayouter):
+    """
+    LoopLayouterは、ループ(LOOP_BEGIN / LOOP_ENDコマンド)を含むPietプラグラムのコマンドを、
+    gridの行を往復する蛇行状に配置するクラスである。
+    LoopLayouterは、以下のようにコマンドの配置を行う。
+
+    - 左上を原点(0, 0)とし、偶数行は右方向、奇数行は左方向にコマンドを配置する。
+    - 行末ではPOINTERコマンドを2回実行して、次の行に折り返す。
+    - ループは2行目以降の行頭から配置し、ループ本体と分岐の次の行に戻り経路を配置する。
+    - 最後の行では、行の途中でPOINTERコマンドを実行して下に移動し、その下の行に配置した
+      停止用プログラムに移動する。
+
+    ループ(ループ本体の先頭の行の行頭を合流点X、戻り経路の行頭をPとする)は、以下のように実行する。
+    (Xが偶数行の場合を示す。奇数行の場合は左右を反転し、v = 2 * NOT(NOT(c)) + 1 を積む)
+
+    - Xには、前の行からPOINTERコマンド(3回転)で進入し、右方向に本体を実行する。
+    - LOOP_ENDでは、stack先頭の値cから v = 2 * NOT(c) + 1 を2つ積み、次の行に折り返す。
+    - 戻り経路の白色のCodelを通過し、PのPOINTERコマンドで v 回転する。
+      c が0以外(v = 1)の場合は上に移動し、Xの直下のCodelからXへの移動のPOINTERコマンドで
+      右方向に回転して本体を繰り返す。
+      c が0(v = 3)の場合は下に移動し、次の行の先頭のPOINTERコマンドで右方向に回転する。
+    - Xの直下のCodelの色を、Xに進入する前の行の末尾のセルと同一とすることで、
+      何れの経路からもXへの移動でPOINTERコマンドを実行する。
+    - ループ本体が複数の行にわたる場合は、Xの列を空けて本体を配置し、
+      PからXの直下のCodelまでのXの列を白色で通過する。
+
+    ループを含まないコマンドは、行末の折り返しのコマンドが不要なSquareLayouterで配置する。
+    """
+
+    # pylint: disable=line-too-long
+    _ABORT_PROGRAM: list[list[None | Command | LayoutCommand]] = [
+        [None,         Command.EDGE,        None,                Command.EDGE,        None],          # noqa: E241,E501
+        [Command.EDGE, LayoutCommand.ABORT, LayoutCommand.ABORT, LayoutCommand.ABORT, Command.EDGE],  # noqa: E241,E501
+        [None,         Command.EDGE,        LayoutCommand.ABORT, Command.EDGE,        None],          # noqa: E241,E501
+        [None,         None,                Command.EDGE,        None,                None],          # noqa: E241,E501
+    ]
+    """
+    停止用プログラム (最後の行のPOINTERコマンドの直下の行から、中央の列を合わせて配置する)
+    先頭の行の中央のセルには、停止用プログラムに移動する直前の色を配置する
+    最終行はgridの下端で代替するため、配置しない
+    """
+
+    _RIGHT_TURN: tuple[Command, ...] = (
+        Command.PUSH,
+        Command.DUPLICATE,
+        Command.POINTER,
+    )
+    """ 右方向の行末に配置する、下 -> 左に折り返すコマンド (1を2つ積み、時計回りに1回転ずつ) """
+
+    _LEFT_TURN: tuple[Command, ...] = (
+        Command.PUSH,
+        Command.DUPLICATE,
+        Command.DUPLICATE,
+        Command.ADD,
+        Command.ADD,
+        Command.DUPLICATE,
+        Command.POINTER,
+    )
+    """ 左方向の行末に配置する、下 -> 右に折り返すコマンド (3を2つ積み、時計回りに3回転ずつ) """
+
+    _RIGHT_LOOP_TURN: tuple[Command, ...] = (
+        Command.NOT,
+        Command.DUPLICATE,
+        Command.ADD,
+        Command.PUSH,
+        Command.ADD,
+        Command.DUPLICATE,
+        *_RIGHT_TURN,
+    )
+    """ 右方向のループ本体の行末に配置する、分岐の回転数 v = 2 * NOT(c) + 1 を2つ積んで折り返すコマンド """
+
+    _LEFT_LOOP_TURN: tuple[Command, ...] = (
+        Command.NOT,
+        Command.NOT,
+        Command.DUPLICATE,
+        Command.ADD,
+        Command.PUSH,
+        Command.ADD,
+        Command.DUPLICATE,
+        *_LEFT_TURN,
+    )
+    """ 左方向のループ本体の行末に配置する、分岐の回転数 v = 2 * NOT(NOT(c)) + 1 を2つ積んで折り返すコマンド """
+
+    _MIN_WIDTH: int = 18
+    """ gridの最小の幅 (戻り経路の列を除く左方向の行に、分岐と、競合を解決したコマンドを配置できる幅) """
+
+    _IN_OUT_COMMANDS: tuple[Command, ...] = (
+        Command.IN_CHAR,
+        Command.IN_NUMBER,
+        Command.OUT_CHAR,
+        Command.OUT_NUMBER,
+    )
+    """ 停止用プログラムへの移動で実行してはならないコマンド """
+
+    _ABORT_EXCLUDE_COMMANDS: tuple[Command, ...] = (
+        Command.POINTER,
+        Command.SWITCH,
+        *_IN_OUT_COMMANDS,
+    )
+    """ 停止用プログラムの直前の色への移動で実行してはならないコマンド """
+
+    def __init__(self,
+                 debug: bool = True,
+                 trace: bool = False,
+                 seed: int | random.Random | None = None,
+                 fill_mode: FillMode = FillMode.PATTERN) -> None:
+        """
+        インスタンス初期化
+
+        デバッグオプション / 乱数 / 未使用のセルの配置方法の設定
+
+        Arguments:
+            debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
+            trace (bool): True: トレースログ有効化; False: トレースログ無効化
+            seed (int | random.Random | None, optional): 乱数のseed、または乱数生成器
+            fill_mode (FillMode, optional): 未使用のセルに配置する色の決定方法
+        """
+        super().__init__(debug, trace, seed)
+
+        self._fill_mode = fill_mode
+        self._layout_attempts: int = 0
+        self._return_x: int | None = None
+
+    @property
+    def layout_attempts(self) -> int:
+        """
+        配置試行回数取得
+
+        Returns:
+            int: 直近のコマンド配置で、gridにコマンドの配置を試行した回数
+        """
+        return self._layout_attempts
+
+    def _do_layout_impl(self,
+                        commands: list[Command],
+                        start_color: Color,
+                        abort_program_color: Color) -> CodelGrid | NoReturn:
+        """
+        コマンド配置実装
+
+        ICommandLayouter.do_layoutメソッドの実装を行う。
+        gridの幅 / 行数が不足した場合は、拡張したgridで配置を再試行する。
+        コマンドにループが含まれない場合は、同一の乱数生成器を使用するSquareLayouterで配置する。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
+
+        Returns:
+            CodelGrid: Codelを配置したgrid
+
+        Raises:
+            LayoutCommandError: コマンドの配置に失敗した
+        """
+        loops: dict[int, int] = self._find_loops(commands)
+        self._layout_attempts = 0
+
+        if not loops:
+            if self._debug:
+                print("do_layout_impl: exit. no loops, layout with SquareLayouter.")
+            return SquareLayouter(self._debug, self._trace,
+                                  seed=self._random,
+                                  fill_mode=self._fill_mode).do_layout(commands,
+                                                                       start_color,
+                                                                       abort_program_color)
+
+        # 行末の折り返しの割合を抑えつつ正方形に近いgridとなるよう、コマンド数からgridの幅を決定する
+        w: int = max(self._MIN_WIDTH, math.isqrt(len(commands) * 2))
+        h: int = (2 * math.ceil(len(commands) / (w - 10))) + (2 * len(loops)) + 6
+
+        while True:
+            self._layout_attempts += 1
+
+            try:
+                grid: CodelGrid = self._try_layout(commands, loops, w, h,
+                                                   start_color, abort_program_color)
+                break
+            except GridResizeError as e:
+                if self._debug:
+                    print(f"do_layout_impl: retry. {e}")
+                w = e.w
+                h = e.h
+
+        self._put_to_empty_cells(grid)
+
+        if self._debug:
+            print("do_layout_impl: exit. "
+                  f"w={grid.width} h={grid.height} loops={len(loops)} "
+                  f"attempts={self._layout_attempts}")
+
+        return grid
+
+    @staticmethod
+    def _find_loops(commands: list[Command]) -> dict[int, int]:
+        """
+        ループ検索
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+
+        Returns:
+            dict[int, int]: LOOP_BEGINコマンドのindex -> 対応するLOOP_ENDコマンドのindex
+
+        Raises:
+            ValueError: LOOP_BEGIN / LOOP_ENDコマンドが対応していない、またはループが入れ子である
+        """
+        loops: dict[int, int] = {}
+        begin: int | None = None
+
+        for index, command in enumerate(commands):
+            if command is Command.LOOP_BEGIN:
+                if begin is not None:
+                    raise ValueError(f"nested loop is not supported. index={index}")
+                begin = index
+            elif command is Command.LOOP_END:
+                if begin is None:
+                    raise ValueError(f"LOOP_END without LOOP_BEGIN. index={index}")
+                loops[begin] = index
+                begin = None
+
+        if begin is not None:
+            raise ValueError(f"LOOP_BEGIN without LOOP_END. index={begin}")
+
+        return loops
+
+    def _try_layout(self,
+                    commands: list[Command],
+                    loops: dict[int, int],
+                    w: int,
+                    h: int,
+                    start_color: Color,
+                    abort_program_color: Color) -> CodelGrid:
+        """
+        コマンド配置試行
+
+        幅が 引数: w 、高さが 引数: h のgridにコマンドを配置し、
+        停止用プログラムまでの行数に切り詰めたgridを返却する。
+        返却するgridの未使用のセルには、Codelが配置されていない。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            loops (dict[int, int]): LOOP_BEGINコマンドのindex -> 対応するLOOP_ENDコマンドのindex
+            w (int): gridの幅
+            h (int): gridの高さ
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
+
+        Returns:
+            CodelGrid: コマンドを配置したgrid
+
+        Raises:
+            GridResizeError: gridの幅、または行数が不足した
+        """
+        grid: CodelGrid = CodelGrid(w, h)
+        grid.set_color(0, 0, start_color)
+        self._return_x = None
+
+        begins: list[int] = sorted(loops)
+        index: int = 1
+        x: int = 1
+        y: int = 0
+        color: Color = start_color
+
+        while index < len(commands):
+            end: int | None = loops.get(index)
+            if end is not None:
+                x, y, color = self._put_loop(grid, commands, index, end, x, y, color)
+                index = end + 1
+                continue
+
+            # 次のループの手前までのコマンドを、行を折り返しながら配置する
+            next_loop: int = bisect.bisect_right(begins, index)
+            stop: int = begins[next_loop] if next_loop < len(begins) else len(commands)
+            index, x, color = self._put_codels_on_row(commands, grid, index, stop, x, y, color,
+                                                      self._get_turn(y))
+            if index < stop:
+                x, y, color = self._put_turn(grid, x, y, color, self._get_turn(y))
+
+        h = self._put_codels_to_abort_program(grid, x, y, color, abort_program_color)
+
+        # 停止用プログラムまでの行数に切り詰める
+        result: CodelGrid = CodelGrid(grid.width, h)
+        for row_y in range(h):
+            result.row(row_y)[:] = grid.row(row_y)
+
+        return result
+
+    def _get_turn(self, y: int) -> tuple[Command, ...]:
+        """
+        折り返しコマンド取得
+
+        Arguments:
+            y (int): 行のy座標
+
+        Returns:
+            tuple[Command, ...]: 行末に配置する折り返しのコマンド
+        """
+        return self._RIGHT_TURN if (y % 2) == 0 else self._LEFT_TURN
+
+    def _get_loop_turn(self, y: int) -> tuple[Command, ...]:
+        """
+        分岐コマンド取得
+
+        Arguments:
+            y (int): 行のy座標
+
+        Returns:
+            tuple[Command, ...]: ループ本体の末尾の行の行末に配置する分岐のコマンド
+        """
+        return self._RIGHT_LOOP_TURN if (y % 2) == 0 else self._LEFT_LOOP_TURN
+
+    def _get_head_x(self, grid: CodelGrid, y: int) -> int:
+        """
+        行頭のx座標取得
+
+        Arguments:
+            grid (CodelGrid): grid
+            y (int): 行のy座標
+
+        Returns:
+            int: 前の行から折り返すPOINTERコマンドを配置する行頭のx座標
+        """
+        return 0 if (y % 2) == 0 else (grid.width - 1)
+
+    def _get_last_x(self, grid: CodelGrid, y: int) -> int:
+        """
+        行末のx座標取得
+
+        Arguments:
+            grid (CodelGrid): grid
+            y (int): 行のy座標
+
+        Returns:
+            int: 行末のx座標 (ループ本体の配置中は、戻り経路の列を除く)
+        """
+        last_x: int = self._get_head_x(grid, y + 1)
+        if last_x == self._return_x:
+            last_x += -1 if (y % 2) == 0 else 1
+
+        return last_x
+
+    def _get_remain(self, grid: CodelGrid, x: int, y: int, turn: tuple[Command, ...]) -> int:
+        """
+        残りセル数取得
+
+        Arguments:
+            grid (CodelGrid): grid
+            x (int): x座標
+            y (int): y座標
+            turn (tuple[Command, ...]): 行末に配置する折り返しのコマンド
+
+        Returns:
+            int: 引数: x から、行末の折り返しのコマンドの手前までのセル数
+        """
+        return abs(self._get_last_x(grid, y) - x) + 1 - len(turn)
+
+    def _put_codel(self, grid: CodelGrid, x: int, y: int, color: Color, command: Command) -> None:
+        """
+        Codel配置
+
+        Arguments:
+            grid (CodelGrid): grid
+            x (int): x座標
+            y (int): y座標
+            color (Color): 配置するCodelの色
+            command (Command): 配置するCodelで実行するコマンド (トレースログ用)
+        """
+        grid.set_color(x, y, color)
+
+        if self._trace:
+            print(f"put_codel: pos=({x}, {y}) command={command} color={color}")
+
+    def _choose_color(self, predicate: Callable[[Color], bool]) -> Color:
+        """
+        任意の色選択
+
+        Arguments:
+            predicate (Callable[[Color], bool]): 色の条件
+
+        Returns:
+            Color: 引数: predicate を満たす色から乱数で選択した色
+
+        Raises:
+            RuntimeError: 引数: predicate を満たす色が存在しない
+        """
+        for color in self._random.sample(self._RANDOM_COLORS, len(self._RANDOM_COLORS)):
+            if predicate(color):
+                return color
+
+        raise RuntimeError("No color left.")
+
+    def _can_put_turn(self,
+                      grid: CodelGrid,
+                      x: int,
+                      y: int,
+                      color: Color,
+                      turn: tuple[Command, ...],
+                      landing: bool = True) -> bool:
+        """
+        折り返し配置判定
+
+        Arguments:
+            grid (CodelGrid): grid
+            x (int): 折り返しのコマンドの先頭のx座標
+            y (int): y座標
+            color (Color): 折り返しのコマンドを実行する直前の色
+            turn (tuple[Command, ...]): 行末に配置する折り返しのコマンド
+            landing (bool, optional): True: 次の行の先頭のPOINTERコマンドも判定する
+
+        Returns:
+            bool: 折り返しのコマンド(と次の行の先頭のPOINTERコマンド)で、
+                  競合が発生しない場合はTrue
+        """
+        dx: int = 1 if (y % 2) == 0 else -1
+
+        for command in turn:
+            color = get_color_from_command(command, color)
+            if self._is_conflict(color, grid, x, y):
+                return False
+            x += dx
+
+        return (not landing) or \
+            (not self._is_conflict(get_color_from_command(Command.POINTER, color),
+                                   grid, x - dx, y + 1))
+
+    def _put_codels_on_row(self,
+                           commands: list[Command],
+                           grid: CodelGrid,
+                           index: int,
+                           stop: int,
+                           x: int,
+                           y: int,
+                           color: Color,
+                           turn: tuple[Command, ...]) -> tuple[int, int, Color]:
+        """
+        1行分のコマンド配置
+
+        引数: commands の 引数: index から 引数: stop の手前までのコマンドを、
+        行末の折り返しのコマンドを配置できる位置まで配置する。
+        競合が発生した場合は、白色と競合しない任意の色の2セルを配置して解決する。
+        折り返しのコマンドの直前まで配置できる場合を除き、行末の折り返しのコマンドの手前には、
+        白色と任意の色の2セル分の余白を残す。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            grid (CodelGrid): grid
+            index (int): 配置するコマンドの先頭のindex
+            stop (int): 配置するコマンドの末尾の次のindex
+            x (int): 配置を開始するx座標
+            y (int): 配置する行のy座標
+            color (Color): 直前に配置したCodelの色
+            turn (tuple[Command, ...]): 行末に配置する折り返しのコマンド
+
+        Returns:
+            (int, int, Color): 次に配置するコマンドのindex / x座標、最後に配置したCodelの色
+        """
+        dx: int = 1 if (y % 2) == 0 else -1
+
+        while index < stop:
+            remain: int = self._get_remain(grid, x, y, turn)
+            command: Command = commands[index]
+            command_color: Color = get_color_from_command(command, color)
+            conflict: bool = self._is_conflict(command_color, grid, x, y)
+
+            if (not conflict) and (remain >= 3):
+                self._put_codel(grid, x, y, command_color, command)
+                index += 1
+                x += dx
+                color = command_color
+                continue
+
+            if conflict and (remain >= 5):
+                # 競合が発生したため、白色と、コマンドの色が競合しない任意の色を配置する
+                x_: int = x
+                free_color: Color = self._choose_color(
+                    lambda c: (not self._is_conflict(c, grid, x_ + dx, y)) and
+                    (not self._is_conflict(get_color_from_command(command, c),
+                                           grid, x_ + (2 * dx), y)))
+                self._put_codel(grid, x, y, Color.WHITE, Command.NONE)
+                self._put_codel(grid, x + dx, y, free_color, Command.NONE)
+                x += 2 * dx
+                color = free_color
+                continue
+
+            if (not conflict) and (remain == 2) and (index + 1 < stop):
+                # 2コマンドで折り返しのコマンドの直前まで配置できる場合のみ配置する
+                next_command: Command = commands[index + 1]
+                next_color: Color = get_color_from_command(next_command, command_color)
+                if (not self._is_conflict(next_color, grid, x + dx, y)) and \
+                        self._can_put_turn(grid, x + (2 * dx), y, next_color, turn):
+                    self._put_codel(grid, x, y, command_color, command)
+                    self._put_codel(grid, x + dx, y, next_color, next_command)
+                    index += 2
+                    x += 2 * dx
+                    color = next_color
+
+            break
+
+        return index, x, color
+
+    def _put_turn(self,
+                  grid: CodelGrid,
+                  x: int,
+                  y: int,
+                  color: Color,
+                  turn: tuple[Command, ...]) -> tuple[int, int, Color]:
+        """
+        折り返し配置
+
+        行末に折り返しのコマンドを配置し、次の行の先頭にPOINTERコマンドを配置する。
+        折り返しのコマンドの手前のセルには、白色と任意の色を配置する。
+
+        Arguments:
+            grid (CodelGrid): grid
+            x (int): 折り返しのコマンドの手前の余白の先頭のx座標
+            y (int): y座標
+            color (Color): 直前に配置したCodelの色
+            turn (tuple[Command, ...]): 行末に配置する折り返しのコマンド
+
+        Returns:
+            (int, int, Color): 次の行の次に配置するx座標 / y座標、最後に配置したCodelの色
+
+        Raises:
+            GridResizeError: 次の行以降に、ループ / 停止用プログラムを配置する行数が不足した
+        """
+        if y + 3 >= grid.height:
+            raise GridResizeError(grid.width, grid.height * 2)
+
+        dx: int = 1 if (y % 2) == 0 else -1
+        remain: int = self._get_remain(grid, x, y, turn)
+
+        if (remain > 0) or (not self._can_put_turn(grid, x, y, color, turn)):
+            if remain < 2:
+                raise RuntimeError(f"no cells left for turn. pos=({x}, {y})")
+
+            # 白色で余白を埋め、折り返しのコマンドが競合しない任意の色を配置する
+            for _ in range(remain - 1):
+                self._put_codel(grid, x, y, Color.WHITE, Command.NONE)
+                x += dx
+
+            x_: int = x
+            color = self._choose_color(
+                lambda c: (not self._is_conflict(c, grid, x_, y)) and
+                self._can_put_turn(grid, x_ + dx, y, c, turn))
+            self._put_codel(grid, x, y, color, Command.NONE)
+            x += dx
+
+        for command in turn:
+            color = get_color_from_command(command, color)
+            self._put_codel(grid, x, y, color, command)
+            x += dx
+
+        # 次の行の先頭のPOINTERコマンド
+        color = get_color_from_command(Command.POINTER, color)
+        self._put_codel(grid, x - dx, y + 1, color, Command.POINTER)
+
+        return x - (2 * dx), y + 1, color
+
+    def _put_loop(self,
+                  grid: CodelGrid,
+                  commands: list[Command],
+                  begin: int,
+                  end: int,
+                  x: int,
+                  y: int,
+                  color: Color) -> tuple[int, int, Color]:
+        """
+        ループ配置
+
+        次の行(2行目以降)の行頭を合流点とし、その行からループ本体と分岐を、
+        その次の行に戻り経路を配置する。
+        ループ本体が1行に収まらない場合は、合流点の列を空けて複数の行に配置し、
+        戻り経路は合流点の列を上に移動して合流点に戻る。
+
+        Arguments:
+            grid (CodelGrid): grid
+            commands (list[Command]): 配置するコマンドのリスト
+            begin (int): LOOP_BEGINコマンドのindex
+            end (int): LOOP_ENDコマンドのindex
+            x (int): 次に配置するx座標
+            y (int): 次に配置するy座標
+            color (Color): 直前に配置したCodelの色
+
+        Returns:
+            (int, int, Color): ループの次の行の次に配置するx座標 / y座標、最後に配置したCodelの色
+
+        Raises:
+            GridResizeError: 行数が不足した
+        """
+        # 合流点X(2行目以降の行頭)まで移動する
+        while (y == 0) or (x != self._get_head_x(grid, y) + (1 if (y % 2) == 0 else -1)):
+            x, y, color = self._put_turn(grid, x, y, color, self._get_turn(y))
+
+        dx: int = 1 if (y % 2) == 0 else -1
+        head_x: int = self._get_head_x(grid, y)
+        loop_turn: tuple[Command, ...] = self._get_loop_turn(y)
+
+        # 合流点の直下のCodelは、合流点の直前の行のセルと同一色とする
+        # (何れの経路からも、合流点への移動でPOINTERコマンドとなる)
+        back_color: Color = grid.get_color(head_x, y - 1)  # type: ignore[assignment]
+        self._put_codel(grid, head_x, y + 1, back_color, Command.POINTER)
+        # ループ本体が1行に収まる場合は、合流点の直下のCodelをPとし、その手前はPでPOINTERとなる色
+        self._put_codel(grid, head_x + dx, y + 1, self._get_color_before_pointer(back_color),
+                        Command.NONE)
+
+        # ループ本体の配置中は、合流点の列を戻り経路とする
+        self._return_x = head_x
+        body_y: int = y
+        index: int = begin + 1
+
+        while True:
+            turn: tuple[Command, ...] = self._get_turn(y)
+            if ((y % 2) == (body_y % 2)) and \
+                    (end - index <= self._get_remain(grid, x, y, loop_turn)):
+                # 残りのループ本体をこの行に配置できる場合は、行末に分岐を配置する
+                turn = loop_turn
+
+            index, x, color = self._put_codels_on_row(commands, grid, index, end, x, y, color,
+                                                      turn)
+            if (index == end) and (turn is loop_turn):
+                break
+
+            if y == body_y:
+                # ループ本体が1行に収まらないため、Pの手前のCodelを取り除く
+                grid.set(head_x + dx, y + 1, CodelGrid.EMPTY)
+
+            x, y, color = self._put_turn(grid, x, y, color, self._get_turn(y))
+
+        x, y, color = self._put_turn(grid, x, y, color, loop_turn)
+        self._return_x = None
+
+        # 戻り経路は白色で通過する
+        for white_x in range(x, head_x + dx, -dx):
+            self._put_codel(grid, white_x, y, Color.WHITE, Command.NONE)
+
+        exit_color: Color = back_color
+        if y > body_y + 1:
+            # 合流点の列を白色で上に通過し、合流点の直下のCodelから合流点に進入する
+            for white_y in range(body_y + 2, y):
+                self._put_codel(grid, head_x, white_y, Color.WHITE, Command.NONE)
+
+            exit_color = self._choose_color(
+                lambda c: (not self._is_conflict(c, grid, head_x, y)) and
+                (not self._is_conflict(self._get_color_before_pointer(c), grid, head_x + dx, y)))
+            self._put_codel(grid, head_x, y, exit_color, Command.POINTER)
+            self._put_codel(grid, head_x + dx, y, self._get_color_before_pointer(exit_color),
+                            Command.NONE)
+
+        # 次の行の先頭のPOINTERコマンド (ループの終了時のみ実行する)
+        color = get_color_from_command(Command.POINTER, exit_color)
+        self._put_codel(grid, head_x, y + 1, color, Command.POINTER)
+
+        return head_x + dx, y + 1, color
+
+    def _get_color_before_pointer(self, color: Color) -> Color:
+        """
+        POINTERコマンドの直前の色取得
+
+        Arguments:
+            color (Color): POINTERコマンドを実行した後の色
+
+        Returns:
+            Color: 引数: color への移動でPOINTERコマンドとなる色
+        """
+        return next(c for c in self._RANDOM_COLORS
+                    if get_color_from_command(Command.POINTER, c) is color)
+
+    def _put_codels_to_abort_program(self,
+                                     grid: CodelGrid,
+                                     x: int,
+                                     y: int,
+                                     color: Color,
+                                     abort_program_color: Color) -> int:
+        """
+        停止用プログラム配置
+
+        行の途中に折り返しのコマンドを配置して下に移動し、その下の行に停止用プログラムを配置する。
+        停止用プログラムの中央の列は、偶数行では行末の2つ手前、奇数行では行頭の2つ先とし、
+        現在の行に折り返しのコマンドを配置できない場合は、次の行に配置する。
+
+        Arguments:
+            grid (CodelGrid): grid
+            x (int): 次に配置するx座標
+            y (int): 次に配置するy座標
+            color (Color): 直前に配置したCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
+
+        Returns:
+            int: 停止用プログラムまでのgridの行数
+
+        Raises:
+            GridResizeError: 停止用プログラムを配置する行数が不足した
+        """
+        center: int = len(self._ABORT_PROGRAM[0]) // 2
+
+        while True:
+            turn: tuple[Command, ...] = self._get_turn(y)
+            dx: int = 1 if (y % 2) == 0 else -1
+            center_x: int = self._get_last_x(grid, y) - (center * dx)
+            remain: int = ((center_x - x) * dx) + 1 - len(turn)
+
+            if (remain == 0) and self._can_put_turn(grid, x, y, color, turn, False):
+                break
+
+            if remain >= 2:
+                # 白色で余白を埋め、折り返しのコマンドが競合しない任意の色を配置する
+                for _ in range(remain - 1):
+                    self._put_codel(grid, x, y, Color.WHITE, Command.NONE)
+                    x += dx
+
+                x_: int = x
+                color = self._choose_color(
+                    lambda c: (not self._is_conflict(c, grid, x_, y)) and
+                    self._can_put_turn(grid, x_ + dx, y, c, turn, False))
+                self._put_codel(grid, x, y, color, Command.NONE)
+                x += dx
+                break
+
+            x, y, color = self._put_turn(grid, x, y, color, turn)
+
+        if y + len(self._ABORT_PROGRAM) >= grid.height:
+            raise GridResizeError(grid.width, grid.height * 2)
+
+        for command in turn:
+            color = get_color_from_command(command, color)
+            self._put_codel(grid, x, y, color, command)
+            x += dx
+
+        # 最終行はgridの下端で代替する
+        abort_command: None | Command | LayoutCommand
+        for abort_y, row in enumerate(self._ABORT_PROGRAM[:-1], y + 1):
+            for abort_x, abort_command in enumerate(row, center_x - center):
+                if abort_command is Command.EDGE:
+                    self._put_codel(grid, abort_x, abort_y, Color.BLACK, abort_command)
+                elif abort_command is LayoutCommand.ABORT:
+                    self._put_codel(grid, abort_x, abort_y, abort_program_color, Command.NONE)
+
+        # 停止用プログラムの直前の色は、POINTERコマンドからの移動で進行方向を変えず、
+        # 停止用プログラムへの移動でIN / OUTコマンドとならない色とする
+        self._put_codel(grid, center_x, y + 1, self._choose_color(
+            lambda c: (not self._is_conflict(c, grid, center_x, y + 1)) and
+            (get_command_from_color(color, c) not in self._ABORT_EXCLUDE_COMMANDS) and
+            (get_command_from_color(c, abort_program_color) not in self._IN_OUT_COMMANDS)),
+            Command.NONE)
+
+        return y + len(self._ABORT_PROGRAM)
+
+    def _put_to_empty_cells(self, grid: CodelGrid) -> None:
+        """
+        空セルコマンド配置
+
+        引数: grid で渡されたgrid中、Codelが配置されていないすべてのセルに対して、
+        競合が発生しない色を設定したCodelを配置する。
+        配置する色は、インスタンス初期化時に指定したFillModeで決定する。
+
+        Arguments:
+            grid (CodelGrid): 塗りつぶしを行うgrid
+        """
+        if self._fill_mode is FillMode.PATTERN:
+            grid.fill_empty([bytes(color.index for color in row) for row in self._FILL_PATTERN])
+            return
+
+        for y in range(grid.height):
+            for x in range(grid.width):
+                if grid.is_empty(x, y):
+                    grid.set_color(x, y, self._get_random_color(None, grid.neighbor_mask(x, y),
+                                                                self._random))
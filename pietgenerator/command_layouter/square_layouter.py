@@ -2,22 +2,75 @@
 Pietプラグラム: コマンド配置器モジュール (正方形)
 """
 import math
-from typing import Any, Callable, NoReturn
-
-from pietgenerator.piet_common import Codel, Color, Command, DirectionPointer
+import multiprocessing
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from enum import Enum
+from typing import Any, Callable, NamedTuple, NoReturn, Self
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Color, Command, DirectionPointer
 from pietgenerator.piet_common import get_command_from_color, get_color_from_command
 from pietgenerator.command_layouter.command_layouter import (ICommandLayouter,
                                                              LayoutCommand,
                                                              LayoutCommandError)
 
 
+class FillMode(Enum):
+    """
+    FillModeは、コマンド配置器がgrid上の未使用のセルに配置する色の決定方法である。
+    """
+
+    PATTERN = "PATTERN"
+    """ 固定の模様を敷き詰め、競合が発生するセルのみ色を補正する (乱数を使用しない) """
+    RANDOM = "RANDOM"
+    """ 競合が発生しない色から、セルごとに乱数で選択する """
+
+    def __str__(self) -> str:
+        """
+        文字列表現
+
+        Returns:
+            str: 自身の名前
+        """
+        return self.name
+
+    @classmethod
+    def name_of(cls, name: str) -> Self:
+        """
+        名前 -> FillMode取得
+
+        名前が一致するFillModeを取得する。
+
+        Arguments:
+            name (str): 名前
+
+        Returns:
+            FillMode: 名前が一致するFillMode
+
+        Raises:
+            ValueError: 名前が一致するFillModeが存在しない
+        """
+        for fill_mode in cls:
+            if fill_mode.name == name:
+                return fill_mode
+
+        raise ValueError(f"name={name} is not found.")
+
+
 class GridTooSmallError(LayoutCommandError):
     """
     GridTooSmallErrorは、コマンドの配置中にgrid内のセルが不足した際に送出される例外である。
     本例外はモジュール内で補足し、モジュール外に送出しない。
     """
 
-    def __init__(self, w: int, h: int, x: int, y: int) -> None:
+    def __init__(self,
+                 w: int,
+                 h: int,
+                 x: int,
+                 y: int,
+                 command_index: int | None = None,
+                 used_cells: int | None = None) -> None:
         """
         インスタンス初期化
 
@@ -26,11 +79,18 @@ class GridTooSmallError(LayoutCommandError):
             h (int): gridの高さ
             x (int): 例外送出時のx座標
             y (int): 例外送出時のy座標
+            command_index (int | None, optional): 例外送出時までに配置したコマンド数
+                                                  (不明な場合はNone)
+            used_cells (int | None, optional): 例外送出時までに使用した螺旋上のコマンドを
+                                               配置できるセル数 (螺旋上のすべてのセルを
+                                               使用した場合はNone)
         """
         self._w = w
         self._h = h
         self._x = x
         self._y = y
+        self._command_index = command_index
+        self._used_cells = used_cells
 
     def __str__(self) -> str:
         """
@@ -42,6 +102,334 @@ class GridTooSmallError(LayoutCommandError):
         return (f"{self.__class__.__name__}: grid is too small. "
                 f"w={self._w} h={self._h} pos=({self._x}, {self._y})")
 
+    @property
+    def command_index(self) -> int | None:
+        """
+        配置済みコマンド数取得
+
+        Returns:
+            int | None: 例外送出時までに配置したコマンド数 (不明な場合はNone)
+        """
+        return self._command_index
+
+    @property
+    def used_cells(self) -> int | None:
+        """
+        使用済みセル数取得
+
+        Returns:
+            int | None: 例外送出時までに使用した螺旋上のコマンドを配置できるセル数
+                        (螺旋上のすべてのセルを使用した場合はNone)
+        """
+        return self._used_cells
+
+
+class LayoutCancelledError(LayoutCommandError):
+    """
+    LayoutCancelledErrorは、並列配置で、より小さいgridへのコマンドの配置が成功したため、
+    コマンドの配置を中断した際に送出される例外である。
+    本例外はモジュール内で補足し、モジュール外に送出しない。
+    """
+
+
+class LayoutCheckpoint(NamedTuple):
+    """
+    LayoutCheckpointは、螺旋状のコマンド配置における1周ごとの配置状態である。
+    """
+
+    command_index: int
+    """ 周回開始時のcommandsのindex """
+    x: int
+    """ 周回開始時のx座標 """
+    y: int
+    """ 周回開始時のy座標 """
+    dp: DirectionPointer
+    """ 周回開始時のDP """
+    color: Color
+    """ 周回開始時の色 """
+    used_cells: int
+    """ 周回開始時までに使用した螺旋上のコマンドを配置できるセル数 """
+
+
+class SpiralLine(NamedTuple):
+    """
+    SpiralLineは、螺旋状のコマンド配置における1ライン(直線部)である。
+    """
+
+    x: int
+    """ ライン先頭のx座標 """
+    y: int
+    """ ライン先頭のy座標 """
+    dp: DirectionPointer
+    """ ラインの進行方向 """
+    length: int
+    """ ラインのセル数 (末尾の回転用のPUSH / POINTERコマンドの2セルを含む) """
+
+
+class LayoutGeometry:
+    """
+    LayoutGeometryは、SquareLayouterのgridサイズごとの配置形状を保持するクラスである。
+    gridのサイズから一意に定まる以下の値を、インスタンス生成時に1度だけ算出する。
+
+    - 停止用プログラムとその配置位置(原点からのオフセット量)
+    - 停止用プログラムの領域 (停止用プログラムへの移動領域である左側一列を含む)
+    - 停止用プログラムへの進入位置
+    - 原点から停止用プログラムの領域に到達するまでの螺旋の各ラインと、各周回の開始位置
+    """
+
+    def __init__(self,
+                 w: int,
+                 h: int,
+                 abort_program: list[list[None | Command | LayoutCommand]]) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            w (int): gridの幅
+            h (int): gridの高さ
+            abort_program (list[list[None | Command | LayoutCommand]]): 停止用プログラム
+        """
+        self._w = w
+        self._h = h
+        self._abort_program = abort_program
+
+        abort_program_h: int = len(abort_program)
+        abort_program_w: int = len(abort_program[0])
+
+        # 停止用プログラムの配置位置(原点からのオフセット量)
+        self._offset_x: int = (w // 2) - (abort_program_w // 2)
+        self._offset_y: int = (h // 2) - (abort_program_h // 2)
+
+        # 停止用プログラムの領域 (停止用プログラムへの移動領域分、最小のx座標を補正)
+        self._min_x: int = self._offset_x - 1
+        self._min_y: int = self._offset_y
+        self._max_x: int = self._offset_x + abort_program_w
+        self._max_y: int = self._offset_y + abort_program_h
+
+        # 停止用プログラムの移動領域から、最初に到達するABORTコマンドのセル
+        self._entry: tuple[int, int] = ((w - 1) // 2, h // 2)
+
+        # 螺旋の各ライン / 各周回の開始時までのコマンドを配置できるセル数
+        lines: list[SpiralLine] = []
+        ring_cells: list[int] = []
+        cells: int = 0
+        x: int = 0
+        y: int = 0
+        dp: DirectionPointer = DirectionPointer.RIGHT
+
+        while not self.is_in_abort_program_area(x, y):
+            length: int = self._calc_line_length(x, y, dp)
+            if length < 3:
+                # 回転用のコマンドも配置できない
+                break
+
+            if dp is DirectionPointer.RIGHT:
+                ring_cells.append(cells)
+
+            lines.append(SpiralLine(x, y, dp, length))
+            cells += length - 2
+
+            # ライン末尾のPOINTERコマンドで時計回りに回転し、次のラインの先頭に移動する
+            x += dp.dx * (length - 1)
+            y += dp.dy * (length - 1)
+            dp = DirectionPointer.rotate(dp, 1)
+            x += dp.dx
+            y += dp.dy
+
+        self._lines: tuple[SpiralLine, ...] = tuple(lines)
+        self._line_lengths: dict[tuple[int, int], int] = {
+            (line.x, line.y): line.length for line in lines
+        }
+        self._ring_cells: tuple[int, ...] = tuple(ring_cells)
+        self._spiral_cells: int = cells
+
+    @property
+    def width(self) -> int:
+        """
+        gridの幅取得
+
+        Returns:
+            int: gridの幅
+        """
+        return self._w
+
+    @property
+    def height(self) -> int:
+        """
+        gridの高さ取得
+
+        Returns:
+            int: gridの高さ
+        """
+        return self._h
+
+    @property
+    def abort_program(self) -> list[list[None | Command | LayoutCommand]]:
+        """
+        停止用プログラム取得
+
+        Returns:
+            list[list[None | Command | LayoutCommand]]: gridのサイズに適した停止用プログラム
+        """
+        return self._abort_program
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        """
+        停止用プログラムの配置位置取得
+
+        Returns:
+            (int, int): 停止用プログラムの原点からのx方向 / y方向のオフセット量
+        """
+        return self._offset_x, self._offset_y
+
+    @property
+    def abort_program_area(self) -> tuple[int, int, int, int]:
+        """
+        停止用プログラムの領域取得
+
+        Returns:
+            (int, int, int, int): 停止用プログラムの領域の最小x座標 / 最小y座標 /
+                                  最大x座標 + 1 / 最大y座標 + 1
+                                  (停止用プログラムへの移動領域である左側一列を含む)
+        """
+        return self._min_x, self._min_y, self._max_x, self._max_y
+
+    @property
+    def entry(self) -> tuple[int, int]:
+        """
+        停止用プログラムへの進入位置取得
+
+        Returns:
+            (int, int): 停止用プログラムへの移動で、最初に到達するABORTコマンドのx座標 / y座標
+        """
+        return self._entry
+
+    @property
+    def lines(self) -> tuple[SpiralLine, ...]:
+        """
+        螺旋のライン取得
+
+        Returns:
+            tuple[SpiralLine, ...]: 原点から停止用プログラムの領域に到達するまでの螺旋の各ライン
+        """
+        return self._lines
+
+    @property
+    def ring_cells(self) -> tuple[int, ...]:
+        """
+        螺旋の周回の境界取得
+
+        Returns:
+            tuple[int, ...]: 螺旋の各周回の開始時までに使用する、コマンドを配置できるセル数
+        """
+        return self._ring_cells
+
+    @property
+    def spiral_cells(self) -> int:
+        """
+        螺旋上のコマンド配置可能セル数取得
+
+        Returns:
+            int: 原点から停止用プログラムの領域に到達するまでの螺旋上の、
+                 メッセージ出力用コマンドを配置できるセル数
+                 (各ラインの末尾2セルの回転用コマンドを除く)
+        """
+        return self._spiral_cells
+
+    def is_in_abort_program_area(self, x: int, y: int) -> bool:
+        """
+        停止用プログラム領域侵入判定
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            bool: 停止用プログラムの領域内である場合はTrue
+        """
+        return (self._min_x <= x < self._max_x) and (self._min_y <= y < self._max_y)
+
+    def get_abort_program_command(self, x: int, y: int) -> None | Command | LayoutCommand:
+        """
+        停止用プログラムのコマンド取得
+
+        Arguments:
+            x (int): x座標
+            y (int): y座標
+
+        Returns:
+            None | Command | LayoutCommand: 停止用プログラムのコマンド
+                                            (停止用プログラムのセルではない場合はNone)
+        """
+        abort_x: int = x - self._offset_x
+        abort_y: int = y - self._offset_y
+
+        if (0 <= abort_y < len(self._abort_program)) and \
+                (0 <= abort_x < len(self._abort_program[0])):
+            return self._abort_program[abort_y][abort_x]
+
+        return None
+
+    def get_line_length(self, x: int, y: int, dp: DirectionPointer) -> int:
+        """
+        ライン長取得
+
+        x / y座標、およびDPの方向から、螺旋状に配置する1ライン分のコマンドの長さを取得する。
+        螺旋のラインの先頭である場合は、算出済みの値を返却する。
+
+        Arguments:
+            x (int): ライン先頭のx座標
+            y (int): ライン先頭のy座標
+            dp (DirectionPointer): ラインの進行方向
+
+        Returns:
+            int: 1ライン分のコマンドの長さ
+        """
+        length: int | None = self._line_lengths.get((x, y))
+        return self._calc_line_length(x, y, dp) if length is None else length
+
+    def _calc_line_length(self, x: int, y: int, dp: DirectionPointer) -> int:
+        """
+        ライン長算出
+
+        x / y座標、およびDPの方向から、螺旋状に配置する1ライン分のコマンドの長さを算出する。
+        配置するコマンドの長さは、現在のx / y座標からプログラム端、またはコマンド配置済みの
+        セルに到達するまでのセル数となる。
+
+        Arguments:
+            x (int): ライン先頭のx座標
+            y (int): ライン先頭のy座標
+            dp (DirectionPointer): ラインの進行方向
+
+        Returns:
+            int: 1ライン分のコマンドの長さ
+        """
+        w: int = self._w
+        h: int = self._h
+
+        # 進行方向のコマンド配置済みのセル数は、進行方向ではない方向の座標から求める
+        if dp is DirectionPointer.RIGHT:
+            offset_right: int = y
+            return w - offset_right - x
+
+        if dp is DirectionPointer.DOWN:
+            offset_bottom: int = (w - 1) - x
+            return h - offset_bottom - y
+
+        if dp is DirectionPointer.LEFT:
+            offset_left: int = (h - 1) - y
+            return x - offset_left + 1
+
+        offset_top: int = x + 1
+        return y - offset_top + 1
+
+
+_LayoutOutcome = tuple[
+    tuple[CodelGrid, int, int, DirectionPointer, Color] | GridTooSmallError | None,
+    list[LayoutCheckpoint]]
+""" 並列配置のワーカープロセスでの試行結果 (配置結果 / 配置失敗時の例外 / 中断時はNone, チェックポイント) """
+
 
 class SquareLayouter(ICommandLayouter):
     """
@@ -74,22 +462,73 @@ class SquareLayouter(ICommandLayouter):
     ]
     """ 停止用プログラム (偶数プログラム(grid)用) """
 
-    def __init__(self, debug: bool = True, trace: bool = False) -> None:
+    _EARLY_ABORT_MARGIN: float = 0.02
+    """ 残りのコマンドが配置しきれないと判定する、必要セル数の見積もりの余裕 (割合) """
+
+    def __init__(self,
+                 debug: bool = True,
+                 trace: bool = False,
+                 workers: int = 1,
+                 seed: int | random.Random | None = None,
+                 fill_mode: FillMode = FillMode.PATTERN) -> None:
         """
         インスタンス初期化
 
-        デバッグオプションの設定
+        デバッグオプション / 並列配置 / 乱数 / 未使用のセルの配置方法の設定
+
+        引数: workers が2以上の場合は、予測したgridサイズ周辺の複数のサイズへのコマンドの配置を
+        引数: workers 個のプロセスで並列に試行し、配置に成功した最小のgridを採用する。
+        配置の試行ごとの乱数は、do_layoutごとに引数: seed から生成したseedとgridの幅から
+        初期化するため、同一のseedでは並列配置の有無によらず同一サイズのgridは同一となる。
 
         Arguments:
             debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
             trace (bool): True: トレースログ有効化; False: トレースログ無効化
+            workers (int, optional): コマンドの配置を試行するプロセス数 (1の場合は並列化しない)
+            seed (int | random.Random | None, optional): 乱数のseed、または乱数生成器
+            fill_mode (FillMode, optional): 未使用のセルに配置する色の決定方法
+
+        Raises:
+            ValueError: 引数: workers が1未満である
+        """
+        super().__init__(debug, trace, seed)
+
+        if workers < 1:
+            raise ValueError(f"workers={workers} is less than 1.")
+
+        self._workers = workers
+        self._fill_mode = fill_mode
+        self._layout_attempts: int = 0
+        self._checkpoints: list[LayoutCheckpoint] = []
+        self._geometries: dict[tuple[int, int], LayoutGeometry] = {}
+        self._cancel_w: Any = None
+        self._layout_seed: int = 0
+        self._attempt_random: random.Random = random.Random(0)
+
+    @property
+    def layout_attempts(self) -> int:
+        """
+        配置試行回数取得
+
+        Returns:
+            int: 直近のコマンド配置で、gridにコマンドの配置を試行した回数
+        """
+        return self._layout_attempts
+
+    @property
+    def checkpoints(self) -> list[LayoutCheckpoint]:
+        """
+        チェックポイント取得
+
+        Returns:
+            list[LayoutCheckpoint]: 直近のコマンド配置の試行で記録した、1周ごとの配置状態
         """
-        super().__init__(debug, trace)
+        return list(self._checkpoints)
 
     def _do_layout_impl(self,
                         commands: list[Command],
                         start_color: Color,
-                        abort_program_color: Color) -> list[list[Any]] | NoReturn:
+                        abort_program_color: Color) -> CodelGrid | NoReturn:
         """
         メッセージ -> コマンド生成実装
 
@@ -101,55 +540,432 @@ class SquareLayouter(ICommandLayouter):
             abort_program_color (Color): 停止用プログラムに配置するCodelの色
 
         Returns:
-            list[list[Any]]: Codelを配置したgrid
+            CodelGrid: Codelを配置したgrid
 
         Raises:
             LayoutCommandError: コマンドの配置に失敗した
         """
+        if (Command.LOOP_BEGIN in commands) or (Command.LOOP_END in commands):
+            # ループの配置は未対応 (LoopLayouterで配置する)
+            raise ValueError("loop commands are not supported.")
+
         # 試行回数を少なくするため、メッセージ出力用コマンドのコマンド数からgridサイズを予測する
         w, h = self._predict_grid_size(commands)
+        self._layout_attempts = 0
+        self._geometries = {}
+        self._layout_seed = self._random.getrandbits(64)
 
-        while True:
-            # Pietプログラム開始位置 / DP / 色
-            # Pietプログラム開始位置は、Pietの仕様で"左上"(原点(0, 0))と定められている
-            # DPの初期値は、Pietの仕様で"右"と定められている
-            x = 0
-            y = 0
-            dp = DirectionPointer.RIGHT
-            color = start_color
+        # 螺旋上のセル数がコマンド数に満たないgridには配置できないため、試行せずに除外する
+        min_w: int = self._get_min_grid_size(len(commands))
+        if w < min_w:
+            w = h = min_w
 
-            # grid生成
-            grid: list[list[Codel | None]] = self._create_grid(w, h, abort_program_color)
+        result: tuple[CodelGrid, int, int, DirectionPointer, Color]
+        if self._workers > 1:
+            result, w = self._layout_parallel(commands, w, min_w, start_color, abort_program_color)
+        else:
+            result, w = self._layout_serial(commands, w, min_w, start_color, abort_program_color)
 
-            try:
-                # メッセージ出力用コマンドをgridに螺旋状に配置する
-                x, y, dp, color = self._put_codels(commands, grid, x, y, dp, color)
+        h = w
+        grid, x, y, dp, color = result
 
-                # 停止用プログラムまで移動するコマンドをgridに配置する
-                x, y, dp, color = self._put_codels_to_abort_area(commands, grid, x, y, dp, color)
-                x, y, dp, color = self._put_codels_to_abort_program(abort_program_color,
-                                                                    grid, x, y, dp, color)
+        if self._debug:
+            print("do_layout_impl: exit. "
+                  f"pos=({x}, {y}) dp={str(dp)} color={color} "
+                  f"w={w} h={h} attempts={self._layout_attempts}")
+            self._dump_grid(grid)
+
+        return grid
+
+    def _layout_serial(self,
+                       commands: list[Command],
+                       w: int,
+                       min_w: int,
+                       start_color: Color,
+                       abort_program_color: Color
+                       ) -> tuple[tuple[CodelGrid, int, int, DirectionPointer, Color], int]:
+        """
+        コマンド配置 (逐次)
 
-                # grid上の未使用のLayoutCodelに任意のコマンド(色)を配置する
-                self._put_to_empty_cells(grid)
+        引数: w の幅のgridから、すべてのコマンドを配置できるgridを1サイズずつ探索する。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            w (int): 最初に配置を試行するgridの幅
+            min_w (int): 螺旋上のセル数から算出したgridの最小幅
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
 
+        Returns:
+            ((CodelGrid, int, int, DirectionPointer, Color), int):
+                _try_layoutの返却値 / 配置に成功したgridの幅
+        """
+        # 配置できないことが確定している最大のgridの幅
+        failed_w: int = min_w - 1
+        has_failed: bool = False
+
+        while True:
+            try:
+                result: tuple[CodelGrid, int, int, DirectionPointer, Color] = self._try_layout(
+                    commands, w, w, start_color, abort_program_color)
                 break
             except GridTooSmallError as e:
                 # gridにコマンドが配置しきれなかった
-                if self._debug:
-                    print(e)
-                    self._dump_grid(grid)
+                # 配置できたコマンド数から、すべてのコマンドを配置できるgridサイズを見積もる
+                failed_w = w
+                has_failed = True
+                w = self._estimate_grid_size(len(commands), w, w, e)
+
+        # 見積もりが過大であった場合は、配置に失敗したサイズとの間を二分探索し、
+        # すべてのコマンドを配置できる最小のgridを求める
+        while has_failed and ((w - failed_w) > 1):
+            mid_w: int = (failed_w + w) // 2
+            try:
+                result = self._try_layout(commands, mid_w, mid_w, start_color, abort_program_color)
+                w = mid_w
+            except GridTooSmallError:
+                failed_w = mid_w
+
+        return result, w
+
+    def _layout_parallel(self,
+                         commands: list[Command],
+                         w: int,
+                         min_w: int,
+                         start_color: Color,
+                         abort_program_color: Color
+                         ) -> tuple[tuple[CodelGrid, int, int, DirectionPointer, Color], int]:
+        """
+        コマンド配置 (並列)
+
+        引数: w の幅を中心とした複数のサイズのgridへのコマンドの配置を、プロセスプールで並列に
+        試行し、配置に成功した最小のgridを採用する。
+        配置に成功したgridより大きいgridへの配置は、螺旋の1周ごとに中断する。
+        すべてのサイズで配置に失敗した場合は、失敗した最大のgridから見積もったサイズを中心に
+        再度試行し、配置に失敗したサイズとの間に未試行のサイズが残る場合は、その間を並列に探索する。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            w (int): 予測したgridの幅
+            min_w (int): 螺旋上のセル数から算出したgridの最小幅
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
 
-                # gridを拡大してリトライ
-                w += 1
-                h += 1
+        Returns:
+            ((CodelGrid, int, int, DirectionPointer, Color), int):
+                _try_layoutの返却値 / 配置に成功したgridの幅
+        """
+        # 配置に成功した最小のgridの幅をワーカープロセス間で共有する (0: 未成功)
+        context = multiprocessing.get_context()
+        best_w: Any = context.Value("i", 0)
+
+        result: tuple[CodelGrid, int, int, DirectionPointer, Color] | None = None
+        result_w: int = 0
+        # 配置できないことが確定している最大のgridの幅
+        failed_w: int = min_w - 1
+        has_failed: bool = False
+
+        executor = ProcessPoolExecutor(self._workers,
+                                       mp_context=context,
+                                       initializer=_init_layout_worker,
+                                       initargs=(best_w,))
+        try:
+            while True:
+                candidates: list[int] = self._get_candidate_sizes(w, failed_w, result_w,
+                                                                  has_failed)
+                if not candidates:
+                    break
+
+                outcomes: dict[int, _LayoutOutcome] = self._run_layout_candidates(
+                    executor, best_w, candidates, commands, start_color, abort_program_color)
+
+                error: GridTooSmallError | None = None
+                for candidate_w in sorted(outcomes):
+                    outcome, checkpoints = outcomes[candidate_w]
+
+                    if (result is not None) and (candidate_w > result_w):
+                        # 配置に成功したgridより大きいgridの結果は使用しない
+                        break
+
+                    if isinstance(outcome, GridTooSmallError):
+                        failed_w = max(failed_w, candidate_w)
+                        has_failed = True
+                        error = outcome
+                    elif outcome is not None:
+                        result = outcome
+                        result_w = candidate_w
+                        self._checkpoints = checkpoints
+
+                if (result is None) and (error is not None):
+                    # すべてのサイズで配置に失敗したため、失敗した最大のgridからサイズを見積もる
+                    w = self._estimate_grid_size(len(commands), failed_w, failed_w, error)
+        finally:
+            # 中断待ちのワーカープロセスは、螺旋の1周ごとの判定で終了する
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        assert result is not None
+
+        return result, result_w
+
+    def _get_candidate_sizes(self,
+                             w: int,
+                             failed_w: int,
+                             result_w: int,
+                             has_failed: bool) -> list[int]:
+        """
+        並列配置の候補サイズ取得
+
+        配置に成功したgridがない場合は、引数: w を中心とした、引数: failed_w より大きい
+        ワーカープロセス数分のサイズを返却する。
+        配置に成功したgridがあり、配置に失敗したサイズとの間に未試行のサイズが残る場合は、
+        その間を等間隔に分割したサイズを返却する。
+
+        Arguments:
+            w (int): 予測(見積もり)したgridの幅
+            failed_w (int): 配置できないことが確定している最大のgridの幅
+            result_w (int): 配置に成功した最小のgridの幅 (0: 未成功)
+            has_failed (bool): 配置に失敗したgridがある場合はTrue
+
+        Returns:
+            list[int]: 配置を試行するgridの幅 (昇順) (探索が完了した場合は空リスト)
+        """
+        if result_w == 0:
+            first_w: int = max(failed_w + 1, w - (self._workers // 2))
+            return list(range(first_w, first_w + self._workers))
+
+        if (not has_failed) or ((result_w - failed_w) <= 1):
+            return []
+
+        gap: int = result_w - failed_w - 1
+        if gap <= self._workers:
+            return list(range(failed_w + 1, result_w))
+
+        return sorted({failed_w + 1 + ((gap * i) // self._workers) for i in range(self._workers)})
+
+    def _run_layout_candidates(self,
+                               executor: ProcessPoolExecutor,
+                               best_w: Any,
+                               candidates: list[int],
+                               commands: list[Command],
+                               start_color: Color,
+                               abort_program_color: Color) -> dict[int, _LayoutOutcome]:
+        """
+        候補サイズへのコマンド配置の並列試行
+
+        引数: candidates のサイズのgridへのコマンドの配置をワーカープロセスで試行する。
+        配置に成功したgridより小さいgridの試行がすべて完了した時点で、残りの試行を中断する。
+
+        Arguments:
+            executor (ProcessPoolExecutor): 試行を実行するプロセスプール
+            best_w (Any): 配置に成功した最小のgridの幅を共有する共有メモリ
+            candidates (list[int]): 配置を試行するgridの幅
+            commands (list[Command]): 配置するコマンドのリスト
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
+
+        Returns:
+            dict[int, _LayoutOutcome]: 完了した試行のgridの幅ごとの結果
+        """
+        futures: dict[Future, int] = {
+            executor.submit(_layout_worker, self._debug, self._trace, self._fill_mode, commands,
+                            candidate_w, start_color, abort_program_color,
+                            self._layout_seed): candidate_w
+            for candidate_w in candidates
+        }
+        self._layout_attempts += len(futures)
+
+        outcomes: dict[int, _LayoutOutcome] = {}
+        pending: set[Future] = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcomes[futures[future]] = future.result()
+
+            succeeded: list[int] = [candidate_w for candidate_w, (outcome, _) in outcomes.items()
+                                    if isinstance(outcome, tuple)]
+            if not succeeded:
+                continue
+
+            # より大きいgridで試行中のワーカープロセスに中断を通知する
+            with best_w.get_lock():
+                if (best_w.value == 0) or (min(succeeded) < best_w.value):
+                    best_w.value = min(succeeded)
+
+            if all(futures[future] > min(succeeded) for future in pending):
+                # 配置に成功したgridより小さいgridの試行がすべて完了した
+                for future in pending:
+                    future.cancel()
+                break
+
+        return outcomes
+
+    def _try_layout(self,
+                    commands: list[Command],
+                    w: int,
+                    h: int,
+                    start_color: Color,
+                    abort_program_color: Color
+                    ) -> tuple[CodelGrid, int, int, DirectionPointer, Color]:
+        """
+        コマンド配置試行
+
+        引数: w / h で渡されたサイズのgridを生成し、引数: commands で渡されたコマンドを配置する。
+
+        Arguments:
+            commands (list[Command]): 配置するコマンドのリスト
+            w (int): gridの幅
+            h (int): gridの高さ
+            start_color (Color): 原点に配置するCodelの色
+            abort_program_color (Color): 停止用プログラムに配置するCodelの色
+
+        Returns:
+            (CodelGrid, int, int, DirectionPointer, Color):
+                Codelを配置したgrid / 配置完了時のx座標 / y座標 / DP / 色
+
+        Raises:
+            GridTooSmallError: gridにコマンドが配置しきれなかった
+        """
+        self._layout_attempts += 1
+
+        # 試行の結果がgridの幅のみで定まるよう、配置のseedとgridの幅から乱数を初期化する
+        self._attempt_random = random.Random((self._layout_seed << 32) + w)
+
+        # Pietプログラム開始位置 / DP / 色
+        # Pietプログラム開始位置は、Pietの仕様で"左上"(原点(0, 0))と定められている
+        # DPの初期値は、Pietの仕様で"右"と定められている
+        x = 0
+        y = 0
+        dp = DirectionPointer.RIGHT
+        color = start_color
+
+        # grid生成
+        grid: CodelGrid = self._create_grid(w, h, abort_program_color)
+
+        # 停止用プログラムまでの移動で末尾にコマンドが追加されるため、試行ごとに複製して使用する
+        commands = list(commands)
+
+        try:
+            # メッセージ出力用コマンドをgridに螺旋状に配置する
+            x, y, dp, color = self._put_codels(commands, grid, x, y, dp, color)
+
+            # 停止用プログラムまで移動するコマンドをgridに配置する
+            x, y, dp, color = self._put_codels_to_abort_area(commands, grid, x, y, dp, color)
+            x, y, dp, color = self._put_codels_to_abort_program(abort_program_color,
+                                                                grid, x, y, dp, color)
+
+            # grid上の未使用のLayoutCodelに任意のコマンド(色)を配置する
+            self._put_to_empty_cells(grid)
+        except GridTooSmallError as e:
+            if self._debug:
+                print(e)
+                self._dump_grid(grid)
+
+            raise
+
+        return grid, x, y, dp, color
+
+    def _estimate_grid_size(self,
+                            command_num: int,
+                            w: int,
+                            h: int,
+                            error: GridTooSmallError) -> int:
+        """
+        gridサイズ見積もり
+
+        引数: w / h のgridでの配置失敗時に配置できたコマンド数から、引数: command_num 個の
+        コマンドを配置できる最小のgridの幅を見積もる。
+        配置できたコマンド数が不明な場合は、引数: w + 1 を返却する。
+
+        Arguments:
+            command_num (int): 配置するコマンド数
+            w (int): 配置に失敗したgridの幅
+            h (int): 配置に失敗したgridの高さ
+            error (GridTooSmallError): 配置失敗時に送出された例外
+
+        Returns:
+            int: 見積もったgridの幅 (引数: w より大きい値)
+        """
+        if not error.command_index:
+            return w + 1
+
+        # 失敗したgridの螺旋上でコマンドの配置に使用したセル数と、実際に配置できたコマンド数から、
+        # 1コマンドあたりに必要なセル数(競合解決による増分を含む)を求める
+        used_cells: int = (self._count_spiral_cells(w, h) if error.used_cells is None else
+                           error.used_cells)
+        cells_per_command: float = used_cells / error.command_index
+        need_cells: float = cells_per_command * command_num
+
+        new_w: int = w + 1
+        while self._count_spiral_cells(new_w, new_w) < need_cells:
+            new_w += 1
 
         if self._debug:
-            print("do_layout_impl: exit. "
-                  f"pos=({x}, {y}) dp={str(dp)} color={color}")
-            self._dump_grid(grid)
+            print("estimate_grid_size: exit. "
+                  f"command_num={command_num} placed={error.command_index} "
+                  f"w={w} -> {new_w}")
 
-        return grid
+        return new_w
+
+    def _get_min_grid_size(self, command_num: int) -> int:
+        """
+        最小gridサイズ算出
+
+        螺旋上のコマンドを配置できるセル数が、引数: command_num 以上となる最小のgridの幅を
+        算出する。これより小さいgridには、競合の発生有無に関わらずコマンドを配置できない。
+
+        Arguments:
+            command_num (int): 配置するコマンド数
+
+        Returns:
+            int: gridの最小幅
+        """
+        # 最小でも停止用プログラムを一周できるサイズ
+        # また、螺旋上のセル数はgridのセル数を超えないため、sqrt(コマンド数)から探索する
+        w: int = max(len(self._ABORT_PROGRAM_ODD[0]) + 2, math.isqrt(command_num))
+
+        while self._count_spiral_cells(w, w) < command_num:
+            w += 1
+
+        return w
+
+    def _count_spiral_cells(self, w: int, h: int) -> int:
+        """
+        螺旋上のコマンド配置可能セル数取得
+
+        引数: w / h のgridで、原点から停止用プログラムの領域に到達するまでの螺旋上の、
+        メッセージ出力用コマンドを配置できるセル数を取得する。
+        各ラインの末尾2セルは、回転用のPUSH / POINTERコマンドに使用するため除外する。
+
+        Arguments:
+            w (int): gridの幅
+            h (int): gridの高さ
+
+        Returns:
+            int: コマンドを配置できるセル数
+        """
+        return self._get_geometry(w, h).spiral_cells
+
+    def _get_geometry(self, w: int, h: int) -> LayoutGeometry:
+        """
+        配置形状取得
+
+        引数: w / h のgridの配置形状を取得する。
+        配置形状は、コマンド配置(do_layout)ごとに、gridのサイズごとに1度だけ生成する。
+
+        Arguments:
+            w (int): gridの幅
+            h (int): gridの高さ
+
+        Returns:
+            LayoutGeometry: gridの配置形状
+        """
+        geometry: LayoutGeometry | None = self._geometries.get((w, h))
+        if geometry is None:
+            geometry = LayoutGeometry(w, h, self._get_abort_program(w, h))
+            self._geometries[(w, h)] = geometry
+
+        return geometry
 
     def _predict_grid_size(self, commands: list[Command]) -> tuple[int, int]:
         """
@@ -199,13 +1015,13 @@ class SquareLayouter(ICommandLayouter):
 
         return w, h
 
-    def _create_grid(self, w: int, h: int, abort_program_color: Color) -> list[list[None | Codel]]:
+    def _create_grid(self, w: int, h: int, abort_program_color: Color) -> CodelGrid:
         """
         grid生成
 
         引数: w / h で渡されたサイズのgridを生成する。
         生成したgridの中央のセルには、引数: abort_program_color で指定した色で
-        停止用プログラムが配置されており、それ以外のセルにはNoneが配置されている。
+        停止用プログラムが配置されており、それ以外のセルにはCodelが配置されていない。
 
         Arguments:
             w (int): gridの幅
@@ -213,27 +1029,22 @@ class SquareLayouter(ICommandLayouter):
             abort_program_color (Color): 停止用プログラムに配置するCodelの色
 
         Returns:
-            list[list[None | Codel]]: grid
+            CodelGrid: grid
         """
-        grid: list[list[None | Codel]] = [[None] * w for _ in range(h)]
+        grid: CodelGrid = CodelGrid(w, h)
 
-        # gridのサイズから停止用プログラムを取得
-        abort_program = self._get_abort_program(w, h)
-        abort_program_h = len(abort_program)
-        abort_program_w = len(abort_program[0])
-
-        # 停止用プログラムの配置位置(原点からのオフセット量)を算出
-        offset_x = (w // 2) - (abort_program_w // 2)
-        offset_y = (h // 2) - (abort_program_h // 2)
+        # gridのサイズから停止用プログラム / 配置位置(原点からのオフセット量)を取得
+        geometry: LayoutGeometry = self._get_geometry(w, h)
+        abort_program = geometry.abort_program
+        offset_x, offset_y = geometry.offset
 
         # 停止用プログラムを配置
-        for y in range(abort_program_h):
-            for x in range(abort_program_w):
-                command = abort_program[y][x]
+        for y, row in enumerate(abort_program):
+            for x, command in enumerate(row):
                 if command is Command.EDGE:
-                    grid[y + offset_y][x + offset_x] = Codel(Color.BLACK)
+                    grid.set_color(x + offset_x, y + offset_y, Color.BLACK)
                 elif command is LayoutCommand.ABORT:
-                    grid[y + offset_y][x + offset_x] = Codel(abort_program_color)
+                    grid.set_color(x + offset_x, y + offset_y, abort_program_color)
 
         return grid
 
@@ -253,7 +1064,7 @@ class SquareLayouter(ICommandLayouter):
         """
         return self._ABORT_PROGRAM_EVEN if (w % 2) == 0 else self._ABORT_PROGRAM_ODD
 
-    def _is_in_abort_program_area(self, grid: list[list[None | Codel]], x: int, y: int) -> bool:
+    def _is_in_abort_program_area(self, grid: CodelGrid, x: int, y: int) -> bool:
         """
         停止用プログラム領域侵入判定
 
@@ -263,34 +1074,18 @@ class SquareLayouter(ICommandLayouter):
         停止用プログラムの領域内であると判定する。
 
         Arguments:
-            grid (list[list[None | Codel]]): grid
+            grid (CodelGrid): grid
             x (int): x座標
             y (int): y座標
 
         Returns:
             bool: 停止用プログラムの領域内である場合はTrue
         """
-        # 停止用プログラムの領域の最大 / 最小インデックスを算出
-        h: int = len(grid)
-        w: int = len(grid[0])
-
-        abort_program: list[list[None | Command | LayoutCommand]] = self._get_abort_program(w, h)
-        abort_program_h: int = len(abort_program)
-        abort_program_w: int = len(abort_program[0])
-
-        min_x: int = (w // 2) - (abort_program_w // 2)
-        min_y: int = (h // 2) - (abort_program_h // 2)
-        max_x: int = min_x + abort_program_w
-        max_y: int = min_y + abort_program_h
-
-        # 停止用プログラムへの移動領域分、インデックスを補正
-        min_x -= 1
-
-        return ((min_x <= x < max_x) and (min_y <= y < max_y))
+        return self._get_geometry(grid.width, grid.height).is_in_abort_program_area(x, y)
 
     def _put_codels(self,
                     commands: list[Command],
-                    grid: list[list[None | Codel]],
+                    grid: CodelGrid,
                     x: int,
                     y: int,
                     dp: DirectionPointer,
@@ -303,9 +1098,13 @@ class SquareLayouter(ICommandLayouter):
         配置が正常に完了した場合は、配置後の x / y / dp / color を返却する。
         Codelの配置中に停止用プログラムの領域に到達した場合は、GridTooSmallErrorを送出する。
 
+        螺旋の1周ごとに配置状態をチェックポイントとして記録し、それまでの1コマンドあたりの
+        使用セル数から、残りのコマンドが残りのセルに配置しきれないと見積もられた場合は、
+        停止用プログラムの領域への到達を待たずにGridTooSmallErrorを送出する。
+
         Arguments:
             commands (list[Command]): 配置するコマンドのリスト
-            grid (list[list[None | Codel]]): Codelの配置を行うgrid
+            grid (CodelGrid): Codelの配置を行うgrid
             x (int): 配置開始時のx座標
             y (int): 配置開始時のy座標
             dp (DirectionPointer): 配置開始時のDP
@@ -315,19 +1114,47 @@ class SquareLayouter(ICommandLayouter):
             (int, int, DirectionPointer, Color): 配置完了時のx座標 / y座標 / DP / 色
 
         Raises:
-            GridTooSmallError: コマンドの配置中に停止用プログラムの領域に到達した
+            GridTooSmallError: コマンドの配置中に停止用プログラムの領域に到達した、
+                               または残りのコマンドが配置しきれないと見積もられた
         """
-        h: int = len(grid)
-        w: int = len(grid[0])
+        h: int = grid.height
+        w: int = grid.width
         command_index: int = 0
+        command_num: int = len(commands)
+        geometry: LayoutGeometry = self._get_geometry(w, h)
+        total_cells: int = geometry.spiral_cells
+        used_cells: int = 0
+
+        self._checkpoints = []
 
         # すべてのコマンドの配置が完了するまで実行
-        while command_index < len(commands):
-            if self._is_in_abort_program_area(grid, x, y):
+        while command_index < command_num:
+            if geometry.is_in_abort_program_area(x, y):
                 # コマンドがgridに配置しきれなかった
-                raise GridTooSmallError(w, h, x, y)
+                raise GridTooSmallError(w, h, x, y, command_index)
+
+            if dp is DirectionPointer.RIGHT:
+                # 螺旋の1周の開始位置
+                self._checkpoints.append(
+                    LayoutCheckpoint(command_index, x, y, dp, color, used_cells))
+
+                if (self._cancel_w is not None) and (0 < self._cancel_w.value < w):
+                    # 並列配置で、より小さいgridへの配置が成功した
+                    raise LayoutCancelledError()
+
+                if ((command_index > 0) and
+                    ((command_num - command_index) * used_cells / command_index >
+                     (total_cells - used_cells) * (1 + self._EARLY_ABORT_MARGIN))):
+                    # 残りのコマンドが配置しきれない
+                    if self._debug:
+                        print("put_codels: early abort. "
+                              f"pos=({x}, {y}) command_index={command_index} "
+                              f"used_cells={used_cells} total_cells={total_cells}")
+
+                    raise GridTooSmallError(w, h, x, y, command_index, used_cells)
 
             # 1ライン分のCodelを配置
+            used_cells += geometry.get_line_length(x, y, dp) - 2
             command_index, x, y, dp, color = self._put_codels_on_line(commands, command_index,
                                                                       grid, x, y, dp, color)
 
@@ -339,7 +1166,7 @@ class SquareLayouter(ICommandLayouter):
 
     def _put_codels_to_abort_area(self,
                                   commands: list[Command],
-                                  grid: list[list[None | Codel]],
+                                  grid: CodelGrid,
                                   x: int,
                                   y: int,
                                   dp: DirectionPointer,
@@ -360,7 +1187,7 @@ class SquareLayouter(ICommandLayouter):
 
         Arguments:
             commands (list[Command]): 配置済みコマンドのリスト
-            grid (list[list[None | Codel]]): Codelを配置するgrid
+            grid (CodelGrid): Codelを配置するgrid
             x (int): 移動開始時のx座標
             y (int): 移動開始時のy座標
             dp (DirectionPointer): 移動開始時のDP
@@ -375,14 +1202,15 @@ class SquareLayouter(ICommandLayouter):
         # 開始地点より前に配置したコマンドのコマンド数を保存
         original_command_length: int = len(commands)
         command_index: int = original_command_length
+        geometry: LayoutGeometry = self._get_geometry(grid.width, grid.height)
 
         while True:
-            if self._is_in_abort_program_area(grid, x, y):
+            if geometry.is_in_abort_program_area(x, y):
                 # 停止用プログラムまで到達した
 
                 if command_index < original_command_length:
                     # 再配置が必要なコマンドの再配置が行われていない
-                    raise GridTooSmallError(len(grid[0]), len(grid), x, y)
+                    raise GridTooSmallError(grid.width, grid.height, x, y)
 
                 # 配置完了
                 break
@@ -390,7 +1218,8 @@ class SquareLayouter(ICommandLayouter):
             if command_index >= len(commands):
                 # 配置するコマンドが不足した場合は、末尾に不足数分の任意のコマンドを追加する
                 need_command_num = command_index - len(commands) + 1
-                commands += [self._get_random_command() for _ in range(need_command_num)]
+                commands += [self._get_random_command(None, 0, self._attempt_random)
+                             for _ in range(need_command_num)]
 
             # 1ライン分のコマンドを配置
             command_index, x, y, dp, color = self._put_codels_on_line(commands, command_index,
@@ -404,7 +1233,7 @@ class SquareLayouter(ICommandLayouter):
 
     def _put_codels_to_abort_program(self,
                                      abort_program_color: Color,
-                                     grid: list[list[None | Codel]],
+                                     grid: CodelGrid,
                                      x: int,
                                      y: int,
                                      dp: DirectionPointer,
@@ -448,7 +1277,7 @@ class SquareLayouter(ICommandLayouter):
             E:     停止用プログラムのEDGEコマンドが配置されたセル
 
         Arguments:
-            grid (list[list[LayoutCodel]]): 移動を行うgrid
+            grid (CodelGrid): 移動を行うgrid
             x (int): 移動開始時のx座標
             y (int): 移動開始時のy座標
             dp (DirectionPointer): 移動開始時のDP
@@ -458,11 +1287,13 @@ class SquareLayouter(ICommandLayouter):
             (int, int, DirectionPointer, Color): 移動完了時のx座標 / y座標 / DP / 色
         """
         # 3セル直進し、右に曲がる
-        exclude_commands: list[Command] = []
+        # 除外するコマンドは、Command.command_idのbitを立てたマスクで保持する
+        exclude_commands: int = 0
 
         while True:
             # 1セル目: 任意のコマンド
-            random_command: Command = self._get_random_command(exclude_commands)
+            random_command: Command = self._get_random_command(None, exclude_commands,
+                                                               self._attempt_random)
             random_color: Color = get_color_from_command(random_command, color)
             # 2セル目: PUSHコマンド
             push_color: Color = get_color_from_command(Command.PUSH, random_color)
@@ -473,14 +1304,14 @@ class SquareLayouter(ICommandLayouter):
                 self._is_conflict(push_color, grid, x + (dp.dx * 1), y + (dp.dy * 1)) or
                 self._is_conflict(pointer_color, grid, x + (dp.dx * 2), y + (dp.dy * 2))):
                 # 色の競合が発生した場合はリトライ
-                exclude_commands.append(random_command)
+                exclude_commands |= 1 << random_command.command_id
                 continue
 
             # 競合が発生しない色でコマンドが確定したのでgridに配置し、x / y / dp / colorを更新
             for (command_, color_) in [(random_command, random_color),
                                        (Command.PUSH, push_color),
                                        (Command.POINTER, pointer_color)]:
-                grid[y][x] = Codel(color_)
+                grid.set_color(x, y, color_)
 
                 if self._trace:
                     print("put_codels_to_abort_program: "
@@ -498,25 +1329,27 @@ class SquareLayouter(ICommandLayouter):
             break
 
         # 2セル直進する
-        exclude_commands1: list[Command] = []
-        exclude_commands2: list[Command] = []
+        exclude_commands1: int = 0
+        exclude_commands2: int = 0
         while True:
             # 1セル目: 任意のコマンド
-            random_command1: Command = self._get_random_command(exclude_commands1)
+            random_command1: Command = self._get_random_command(None, exclude_commands1,
+                                                                self._attempt_random)
             random_color1: Color = get_color_from_command(random_command1, color)
 
             if self._is_conflict(random_color1, grid, x + (dp.dx * 0), y + (dp.dy * 0)):
                 # 色の競合が発生した場合はリトライ
-                exclude_commands1.append(random_command1)
+                exclude_commands1 |= 1 << random_command1.command_id
                 continue
 
             # 2セル目: 任意のコマンド
-            random_command2: Command = self._get_random_command(exclude_commands2)
+            random_command2: Command = self._get_random_command(None, exclude_commands2,
+                                                                self._attempt_random)
             random_color2: Color = get_color_from_command(random_command2, random_color1)
 
             if self._is_conflict(random_color2, grid, x + (dp.dx * 1), y + (dp.dy * 1)):
                 # 色の競合が発生した場合はリトライ
-                exclude_commands2.append(random_command2)
+                exclude_commands2 |= 1 << random_command2.command_id
                 continue
 
             if get_command_from_color(random_color2, abort_program_color) in [
@@ -527,13 +1360,13 @@ class SquareLayouter(ICommandLayouter):
             ]:
                 # 停止用プログラムがコマンドとして実行された際に、
                 # IN / OUTコマンドとして実行される場合はリトライ
-                exclude_commands2.append(random_command2)
+                exclude_commands2 |= 1 << random_command2.command_id
                 continue
 
             # 競合が発生しない色でコマンドが確定したのでgridに配置し、x / y / dp / colorを更新
             for (command_, color_) in [(random_command1, random_color1),
                                        (random_command2, random_color2)]:
-                grid[y][x] = Codel(color_)
+                grid.set_color(x, y, color_)
 
                 if self._trace:
                     print("put_codels_to_abort_program: "
@@ -559,7 +1392,7 @@ class SquareLayouter(ICommandLayouter):
     def _put_codels_on_line(self,
                             commands: list[Command],
                             command_index: int,
-                            grid: list[list[None | Codel]],
+                            grid: CodelGrid,
                             x: int,
                             y: int,
                             dp: DirectionPointer,
@@ -576,7 +1409,7 @@ class SquareLayouter(ICommandLayouter):
         Arguments:
             commands (list[Command]): 配置するコマンドのリスト
             command_index (int): 配置開始時のcommandsのindex
-            grid (list[list[None | Codel]]): Codelを配置するgrid
+            grid (CodelGrid): Codelを配置するgrid
             x (int): 配置開始時のx座標
             y (int): 配置開始時のy座標
             dp (DirectionPointer): 配置開始時のDP
@@ -598,7 +1431,8 @@ class SquareLayouter(ICommandLayouter):
             """
             last_free_x: int = -1
             last_free_y: int = -1
-            exclude_colors: list[Color] = []
+            # 除外する色は、Color.indexのbitを立てたマスクで保持する
+            exclude_colors: int = 0
             last_resolve_color: Color = Color.BLACK
 
             def _resolve_conflict(relocate_command_num: int) -> None:
@@ -627,7 +1461,7 @@ class SquareLayouter(ICommandLayouter):
                     y -= (dp.dy * relocate_command_num)
 
                     # FREE_ZONEコマンドを配置し、配置したx / y座標を保存する
-                    grid[y][x] = Codel(Color.WHITE)
+                    grid.set_color(x, y, Color.WHITE)
                     last_free_x = x
                     last_free_y = y
 
@@ -645,11 +1479,16 @@ class SquareLayouter(ICommandLayouter):
                     x = last_free_x + dp.dx
                     y = last_free_y + dp.dy
 
+                # 競合の解決を行うセルの隣接色マスク
+                # リトライ中はgridを更新しないため、1度だけ取得してbit判定で競合を判定する
+                conflict_mask: int = grid.neighbor_mask(x, y)
+
                 resolve_color: Color = Color.BLACK
                 while True:
                     # 競合の解決に使用する色を取得
                     try:
-                        resolve_color = self._get_random_color(exclude_colors)
+                        resolve_color = self._get_random_color(None, exclude_colors,
+                                                               self._attempt_random)
                     except RuntimeError as e:
                         # 競合の解決に使用可能な色が枯渇
                         # (last_free_x, last_free_y)では、以降に発生するすべての競合を解決できなかった
@@ -661,21 +1500,21 @@ class SquareLayouter(ICommandLayouter):
                         resolve_color = last_resolve_color
                         last_free_x = -1
                         last_free_y = -1
-                        exclude_colors.clear()
+                        exclude_colors = 0
                         break
 
-                    if self._is_conflict(resolve_color, grid, x, y):
-                        exclude_colors.append(resolve_color)
+                    if (conflict_mask >> resolve_color.index) & 1:
+                        exclude_colors |= 1 << resolve_color.index
                         continue
 
                     # 競合の解決に使用する色が決定した
 
                     # 使用する色はlast_resolve_colorに保存する
                     last_resolve_color = resolve_color
-                    exclude_colors.append(resolve_color)
+                    exclude_colors |= 1 << resolve_color.index
                     break
 
-                grid[y][x] = Codel(resolve_color)
+                grid.set_color(x, y, resolve_color)
 
                 if self._trace:
                     print("resolve_conflict: "
@@ -687,10 +1526,13 @@ class SquareLayouter(ICommandLayouter):
                 color = resolve_color
 
                 if self._debug:
+                    exclude_color_names: list[str] = [
+                        str(exclude_color) for exclude_color in self._RANDOM_COLORS
+                        if (exclude_colors >> exclude_color.index) & 1
+                    ]
                     print("resolve_conflict: conflict resolved. "
                           f"pos=({x}, {y}) command_index={command_index} color={resolve_color} "
-                          "exclude_colors="
-                          f"{[str(exclude_color) for exclude_color in exclude_colors]}")
+                          f"exclude_colors={exclude_color_names}")
 
             return _resolve_conflict
 
@@ -698,26 +1540,7 @@ class SquareLayouter(ICommandLayouter):
         start_x: int = x
         start_y: int = y
 
-        w: int = len(grid[0])
-        h: int = len(grid)
-        length: int = 0
-
-        # x / y座標、およびDPの方向から、配置するコマンドの長さを決定する
-        # 配置するコマンドの長さは、現在のx / y座標からプログラム端、またはコマンド配置済みの
-        # セルに到達するまでのセル数となる
-        # 進行方向のコマンド配置済みのセル数は、進行方向ではない方向の座標から求める
-        if dp is DirectionPointer.RIGHT:
-            offset_right: int = y
-            length = w - offset_right - x
-        elif dp is DirectionPointer.DOWN:
-            offset_bottom: int = (w - 1) - x
-            length = h - offset_bottom - y
-        elif dp is DirectionPointer.LEFT:
-            offset_left: int = (h - 1) - y
-            length = x - offset_left + 1
-        elif dp is DirectionPointer.UP:
-            offset_top: int = x + 1
-            length = y - offset_top + 1
+        length: int = self._get_geometry(grid.width, grid.height).get_line_length(x, y, dp)
 
         while True:
             if (abs(x - start_x) + abs(y - start_y)) == (length - 2):
@@ -742,7 +1565,7 @@ class SquareLayouter(ICommandLayouter):
 
                 for (command_, color_) in [(Command.PUSH, push_color),
                                            (Command.POINTER, pointer_color)]:
-                    grid[y][x] = Codel(color_)
+                    grid.set_color(x, y, color_)
 
                     if self._trace:
                         print("put_codels_on_line: "
@@ -780,7 +1603,7 @@ class SquareLayouter(ICommandLayouter):
                 continue
 
             # コマンドの色から生成したCodelをgridに配置する
-            grid[y][x] = Codel(command_color)
+            grid.set_color(x, y, command_color)
 
             if self._trace:
                 print("put_codels_on_line: "
@@ -796,101 +1619,104 @@ class SquareLayouter(ICommandLayouter):
 
         return command_index, x, y, dp, color
 
-    def _put_to_empty_cells(self, grid: list[list[None | Codel]]) -> None:
+    def _put_to_empty_cells(self, grid: CodelGrid) -> None:
         """
         空セルコマンド配置
 
-        引数: grid で渡されたgrid中、Noneが設定されている、その時点で未使用の
-        すべてのセルに対して、競合が発生しない任意の色を設定したCodelを配置する。
+        引数: grid で渡されたgrid中、Codelが配置されていない、その時点で未使用の
+        すべてのセルに対して、競合が発生しない色を設定したCodelを配置する。
+        配置する色は、インスタンス初期化時に指定したFillModeで決定する。
+
+        - FillMode.PATTERN: 固定の模様を敷き詰め、競合が発生するセルのみ色を補正する。
+        - FillMode.RANDOM: 競合が発生しない色から、セルごとに乱数で選択する。
 
         Arguments:
-            grid (list[list[None | Codel]]): 塗りつぶしを行うgrid
+            grid (CodelGrid): 塗りつぶしを行うgrid
         """
-        h: int = len(grid)
-        w: int = len(grid[0])
+        h: int = grid.height
+        w: int = grid.width
 
-        for y in range(h):
-            for x in range(w):
-                if grid[y][x]:
-                    # 塗りつぶし対象外
-                    continue
+        if self._fill_mode is FillMode.PATTERN:
+            # トレースログ用に、配置前の空セルの座標を保存
+            empty_cells: list[tuple[int, int]] = [
+                (x, y) for y in range(h) for x in range(w) if grid.is_empty(x, y)
+            ] if self._trace else []
 
-                exclude_colors: list[Color] = []
+            grid.fill_empty([bytes(color.index for color in row) for row in self._FILL_PATTERN])
 
-                while True:
-                    random_color: Color = self._get_random_color(exclude_colors)
+            for x, y in empty_cells:
+                print(f"put_to_empty_cells: pos=({x}, {y}) command_index=--- "
+                      f"command={LayoutCommand.NOT_USE} color={grid.get_color(x, y)}")
 
-                    if self._is_conflict(random_color, grid, x, y):
-                        exclude_colors.append(random_color)
-                        # 競合発生 -> 色を変更してリトライ
-                        continue
+            return
 
-                    grid[y][x] = Codel(random_color)
+        for y in range(h):
+            for x in range(w):
+                if not grid.is_empty(x, y):
+                    # 塗りつぶし対象外
+                    continue
 
-                    if self._trace:
-                        print(f"put_to_empty_cells: pos=({x}, {y}) command_index=--- "
-                              f"command={LayoutCommand.NOT_USE} color={random_color}")
+                # 隣接色マスクで競合する色を除外して、任意の色を取得
+                random_color: Color = self._get_random_color(None, grid.neighbor_mask(x, y),
+                                                             self._attempt_random)
+                grid.set_color(x, y, random_color)
 
-                    break
+                if self._trace:
+                    print(f"put_to_empty_cells: pos=({x}, {y}) command_index=--- "
+                          f"command={LayoutCommand.NOT_USE} color={random_color}")
 
-    def _dump_grid(self, grid: list[list[Codel | None]]) -> None:
+    def _dump_grid(self, grid: CodelGrid) -> None:
         """
         dump
 
         引数: grid で渡されたgridの内容を標準出力に出力する。
 
         Arguments:
-            grid (list[list[Codel | None]]): dumpするgrid
+            grid (CodelGrid): dumpするgrid
         """
         # dump用に (Command, Color) のtupleを生成
-        w: int = len(grid[0])
-        h: int = len(grid)
+        w: int = grid.width
+        h: int = grid.height
+        geometry: LayoutGeometry = self._get_geometry(w, h)
         dumps: list[list[None | tuple[Command | LayoutCommand, Color]]] = [
             [None] * w for _ in range(h)
         ]
 
         def _dump_abort_program_codels(
-                grid: list[list[None | Codel]],
+                grid: CodelGrid,
                 dumps: list[list[None | tuple[Command | LayoutCommand, Color]]]) -> None:
             # 停止用プログラム部のdumpを生成
-            initial_grid: list[list[None | Codel]] = self._create_grid(w, h, Color.WHITE)
-            for y in range(h):
-                for x in range(w):
-                    initial_codel: Codel | None = initial_grid[y][x]
-                    codel: Codel | None = grid[y][x]
-                    if initial_codel and codel:
-                        dumps[y][x] = (
-                            LayoutCommand.ABORT if initial_codel.color is Color.WHITE else
-                            Command.EDGE,
-                            codel.color)
+            offset_x, offset_y = geometry.offset
+            for abort_y, row in enumerate(geometry.abort_program):
+                for abort_x, command in enumerate(row):
+                    x: int = abort_x + offset_x
+                    y: int = abort_y + offset_y
+                    color: Color | None = grid.get_color(x, y)
+                    if (command is not None) and color:
+                        dumps[y][x] = (command, color)
 
         def _dump_command_codels(
-                grid: list[list[None | Codel]],
+                grid: CodelGrid,
                 dumps: list[list[None | tuple[Command | LayoutCommand, Color]]]) -> None:
             # プログラム開始位置から末尾までのdumpを生成
-            if not grid[0][0]:
+            before_color: Color | None = grid.get_color(0, 0)
+            if before_color is None:
                 # Codelが一つも配置されていない
                 return
 
             x = 0
             y = 0
             dp = DirectionPointer.RIGHT
-            before_color = grid[0][0].color
-            abort_program_x = (len(grid[0]) - 1) // 2
-            abort_program_y = len(grid) // 2
+            abort_program_x, abort_program_y = geometry.entry
 
             while True:
                 if (x == abort_program_x) and (y == abort_program_y):
                     # 停止用プログラムに到達
                     break
 
-                codel: Codel | None = grid[y][x]
-                if not codel:
-                    # Codel未設定の箇所まで到達
-                    break
-
-                color = codel.color
+                color: Color | None = grid.get_color(x, y)
                 if color is None:
+                    # Codel未設定の箇所まで到達
                     break
 
                 command = get_command_from_color(before_color, color)
@@ -904,14 +1730,14 @@ class SquareLayouter(ICommandLayouter):
                 before_color = color
 
         def _dump_not_use_codels(
-                grid: list[list[None | Codel]],
+                grid: CodelGrid,
                 dumps: list[list[None | tuple[Command | LayoutCommand, Color]]]) -> None:
             # プログラム未使用部のdumpを生成
             for y in range(h):
                 for x in range(w):
-                    codel: Codel | None = grid[y][x]
-                    if (not dumps[y][x]) and codel:
-                        dumps[y][x] = (LayoutCommand.NOT_USE, codel.color)
+                    color: Color | None = grid.get_color(x, y)
+                    if (not dumps[y][x]) and color:
+                        dumps[y][x] = (LayoutCommand.NOT_USE, color)
 
         # 内部関数を使用してdumpを生成
         _dump_abort_program_codels(grid, dumps)
@@ -922,3 +1748,56 @@ class SquareLayouter(ICommandLayouter):
         print("\n".join(["\t".join(
               [f"({str(dump[0])} : {str(dump[1])})" if dump else "(empty)"
                for dump in row]) for row in dumps]))
+
+
+_worker_best_w: Any = None
+""" ワーカープロセスで共有する、配置に成功した最小のgridの幅 (ワーカープロセス内でのみ設定) """
+
+
+def _init_layout_worker(best_w: Any) -> None:
+    """
+    並列配置のワーカープロセス初期化
+
+    Arguments:
+        best_w (Any): 配置に成功した最小のgridの幅を共有する共有メモリ
+    """
+    global _worker_best_w  # pylint: disable=global-statement
+    _worker_best_w = best_w
+
+
+def _layout_worker(debug: bool,
+                   trace: bool,
+                   fill_mode: FillMode,
+                   commands: list[Command],
+                   w: int,
+                   start_color: Color,
+                   abort_program_color: Color,
+                   layout_seed: int) -> _LayoutOutcome:
+    """
+    並列配置のワーカープロセスでのコマンド配置試行
+
+    Arguments:
+        debug (bool): True: デバッグログ有効化; False: デバッグログ無効化
+        trace (bool): True: トレースログ有効化; False: トレースログ無効化
+        fill_mode (FillMode): 未使用のセルに配置する色の決定方法
+        commands (list[Command]): 配置するコマンドのリスト
+        w (int): gridの幅
+        start_color (Color): 原点に配置するCodelの色
+        abort_program_color (Color): 停止用プログラムに配置するCodelの色
+        layout_seed (int): 配置のseed
+
+    Returns:
+        _LayoutOutcome: 試行結果
+    """
+    layouter = SquareLayouter(debug, trace, fill_mode=fill_mode)
+    # pylint: disable=protected-access
+    layouter._cancel_w = _worker_best_w
+    layouter._layout_seed = layout_seed
+
+    try:
+        result = layouter._try_layout(commands, w, w, start_color, abort_program_color)
+        return result, layouter.checkpoints
+    except GridTooSmallError as e:
+        return e, layouter.checkpoints
+    except LayoutCancelledError:
+        return None, layouter.checkpoints
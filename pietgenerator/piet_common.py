@@ -105,11 +105,15 @@ class DirectionPointer(Enum):
         Raises:
             ValueError: indexが一致するDirectionPointerが存在しない
         """
-        for dp in cls:
-            if dp.index == index:
-                return dp
+        dp: DirectionPointer | None = _DIRECTION_POINTERS.get(index)
+        if dp is None:
+            raise ValueError(f"{index} is not found.")
 
-        raise ValueError(f"{index} is not found.")
+        return dp  # type: ignore[return-value]
+
+
+_DIRECTION_POINTERS: dict[int, DirectionPointer] = {dp.index: dp for dp in DirectionPointer}
+""" index -> DirectionPointer 変換テーブル """
 
 
 class CodelChooser(Enum):
@@ -182,11 +186,15 @@ class CodelChooser(Enum):
         Raises:
             ValueError: indexが一致するCodelChooserが存在しない
         """
-        for cc in cls:
-            if cc.index == index:
-                return cc
+        cc: CodelChooser | None = _CODEL_CHOOSERS.get(index)
+        if cc is None:
+            raise ValueError(f"{index} is not found.")
+
+        return cc  # type: ignore[return-value]
 
-        raise ValueError(f"{index} is not found.")
+
+_CODEL_CHOOSERS: dict[int, CodelChooser] = {cc.index: cc for cc in CodelChooser}
+""" index -> CodelChooser 変換テーブル """
 
 
 class Command(Enum):
@@ -234,6 +242,13 @@ class Command(Enum):
     """ FREE_ZONEコマンド (白色Codel用) """
     EDGE = (101, 0, 0)
     """ EDGEコマンド (黒色Codel用)  """
+    LOOP_BEGIN = (102, 0, 0)
+    """ LOOP_BEGINコマンド (ループの先頭位置。コマンド配置器がループの合流点を配置する) """
+    LOOP_END = (103, 0, 0)
+    """
+    LOOP_ENDコマンド (ループの末尾位置。コマンド配置器がループの分岐を配置する)
+    stackの先頭の値を取り出し、0以外の場合はLOOP_BEGINに戻り、0の場合は後続のコマンドを実行する
+    """
 
     def __init__(self, command_id: int, hue_step: int, lightness_step: int) -> None:
         """
@@ -257,6 +272,16 @@ class Command(Enum):
         """
         return self.name
 
+    @property
+    def command_id(self) -> int:
+        """
+        コマンドID取得
+
+        Returns:
+            int: コマンドを示す一意のID (Pietのコマンドは 0 - 17)
+        """
+        return self._command_id
+
     @property
     def hue_step(self) -> int:
         """
@@ -294,11 +319,22 @@ class Command(Enum):
         Raises:
             ValueError: 色相差 / 明度差が一致するCommandが存在しない
         """
-        for command in cls:
-            if (command.hue_step == hue_step) and (command.lightness_step == lightness_step):
-                return command
+        command: Command | None = _COMMANDS.get((hue_step, lightness_step))
+        if command is None:
+            raise ValueError(f"command=({hue_step}, {lightness_step}) is not found.")
+
+        return command  # type: ignore[return-value]
+
 
-        raise ValueError(f"command=({hue_step}, {lightness_step}) is not found.")
+# 色相差 / 明度差が重複するコマンド(FREE_ZONE / EDGE / LOOP_BEGIN / LOOP_END)は、
+# 先に定義したコマンド(NONE)を優先するため、定義と逆順に登録する
+_COMMANDS: dict[tuple[int, int], Command] = {
+    (command.hue_step, command.lightness_step): command for command in reversed(Command)
+}
+""" (色相差, 明度差) -> Command 変換テーブル """
+
+_COMMANDS_BY_ID: dict[int, Command] = {command.command_id: command for command in Command}
+""" コマンドID -> Command 変換テーブル """
 
 
 class Color(Enum):
@@ -306,60 +342,63 @@ class Color(Enum):
     Colorは、Piet言語のColorを実現するクラスである。
     """
 
-    BLACK = (0x000000, None, None)
+    BLACK = (19, 0x000000, None, None)
     """ BLACK (0x000000) (色相 / 明度なし) """
-    WHITE = (0xFFFFFF, None, None)
+    WHITE = (18, 0xFFFFFF, None, None)
     """ WHITE (0xFFFFFF) (色相 / 明度なし) """
 
-    LIGHT_RED = (0xFFC0C0, 0, 0)
+    LIGHT_RED = (0, 0xFFC0C0, 0, 0)
     """ LIGHT RED (0xFFC0C0) """
-    LIGHT_YELLOW = (0xFFFFC0, 1, 0)
+    LIGHT_YELLOW = (1, 0xFFFFC0, 1, 0)
     """ LIGHT YELLOW (0xFFFFC0) """
-    LIGHT_GREEN = (0xC0FFC0, 2, 0)
+    LIGHT_GREEN = (2, 0xC0FFC0, 2, 0)
     """ LIGHT GREEN (0xC0FFC0) """
-    LIGHT_CYAN = (0xC0FFFF, 3, 0)
+    LIGHT_CYAN = (3, 0xC0FFFF, 3, 0)
     """ LIGHT CYAN (0xC0FFFF) """
-    LIGHT_BLUE = (0xC0C0FF, 4, 0)
+    LIGHT_BLUE = (4, 0xC0C0FF, 4, 0)
     """ LIGHT BLUE (0xC0C0FF) """
-    LIGHT_MAGENTA = (0xFFC0FF, 5, 0)
+    LIGHT_MAGENTA = (5, 0xFFC0FF, 5, 0)
     """ LIGHT MAGENTA (0xFFC0FF) """
-    RED = (0xFF0000, 0, 1)
+    RED = (6, 0xFF0000, 0, 1)
     """ RED (0xFF0000) """
-    YELLOW = (0xFFFF00, 1, 1)
+    YELLOW = (7, 0xFFFF00, 1, 1)
     """ YELLOW (0xFFFF00) """
-    GREEN = (0x00FF00, 2, 1)
+    GREEN = (8, 0x00FF00, 2, 1)
     """ GREEN (0x00FF00) """
-    CYAN = (0x00FFFF, 3, 1)
+    CYAN = (9, 0x00FFFF, 3, 1)
     """ CYAN (0x00FFFF) """
-    BLUE = (0x0000FF, 4, 1)
+    BLUE = (10, 0x0000FF, 4, 1)
     """ BLUE (0x0000FF) """
-    MAGENTA = (0xFF00FF, 5, 1)
+    MAGENTA = (11, 0xFF00FF, 5, 1)
     """ MAGENTA (0xFF00FF) """
-    DARK_RED = (0xC00000, 0, 2)
+    DARK_RED = (12, 0xC00000, 0, 2)
     """ DARK RED (0xC00000) """
-    DARK_YELLOW = (0xC0C000, 1, 2)
+    DARK_YELLOW = (13, 0xC0C000, 1, 2)
     """ DARK YELLOW (0xC0C000) """
-    DARK_GREEN = (0x00C000, 2, 2)
+    DARK_GREEN = (14, 0x00C000, 2, 2)
     """ DARK GREEN (0x00C000) """
-    DARK_CYAN = (0x00C0C0, 3, 2)
+    DARK_CYAN = (15, 0x00C0C0, 3, 2)
     """ DARK CYAN (0x00C0C0) """
-    DARK_BLUE = (0x0000C0, 4, 2)
+    DARK_BLUE = (16, 0x0000C0, 4, 2)
     """ DARK BLUE (0x0000C0) """
-    DARK_MAGENTA = (0xC000C0, 5, 2)
+    DARK_MAGENTA = (17, 0xC000C0, 5, 2)
     """ DARK MAGENTA (0xC000C0) """
 
-    COLOR_MAX = (None, 6, 3)
+    COLOR_MAX = (None, None, 6, 3)
     """ 色相 / 明度最大値 """
 
-    def __init__(self, rgb: int, hue: int, lightness: int) -> None:
+    def __init__(self, index: int, rgb: int, hue: int, lightness: int) -> None:
         """
         インスタンス初期化
 
         Arguments:
+            index (int): index(0 - 19)
+                          色相 / 明度を持つ色は (明度 * 6 + 色相)、WHITEは18、BLACKは19
             rgb (int): 0xRRGGBBで表現する24bitカラーコード
             hue (int): 色相(0 - 5)
             lightness (int): 明度(0 - 2)
         """
+        self._index = index
         self._rgb = rgb
         self._hue = hue
         self._lightness = lightness
@@ -373,6 +412,16 @@ class Color(Enum):
         """
         return self.name
 
+    @property
+    def index(self) -> int:
+        """
+        index取得
+
+        Returns:
+            int: index(0 - 19)
+        """
+        return self._index
+
     @property
     def hue(self) -> int:
         """
@@ -452,14 +501,36 @@ class Color(Enum):
         Raises:
             ValueError: 色相 / 明度が一致するColorが存在しない
         """
-        if (hue >= cls.COLOR_MAX.hue) or (lightness >= cls.COLOR_MAX.lightness):
-            raise ValueError(f"color=({hue}, {lightness}) is out of range.")
+        color: Color | None = _COLORS.get((hue, lightness))
+        if color is None:
+            if (hue >= cls.COLOR_MAX.hue) or (lightness >= cls.COLOR_MAX.lightness):
+                raise ValueError(f"color=({hue}, {lightness}) is out of range.")
 
-        for color in cls:
-            if (color.hue == hue) and (color.lightness == lightness):
-                return color
+            raise ValueError(f"color=({hue}, {lightness}) is not found.")
 
-        raise ValueError(f"color=({hue}, {lightness}) is not found.")
+        return color  # type: ignore[return-value]
+
+    @classmethod
+    def index_of(cls, index: int) -> Self:
+        """
+        index -> Color取得
+
+        indexが一致するColorを取得する。
+
+        Arguments:
+            index (int): index(0 - 19)
+
+        Returns:
+            Color: indexが一致するColor
+
+        Raises:
+            ValueError: indexが一致するColorが存在しない
+        """
+        color: Color | None = _COLORS_BY_INDEX.get(index)
+        if color is None:
+            raise ValueError(f"{index} is not found.")
+
+        return color  # type: ignore[return-value]
 
     @classmethod
     def name_of(cls, name: str) -> Self:
@@ -477,11 +548,21 @@ class Color(Enum):
         Raises:
             ValueError: 名前が一致するColorが存在しない
         """
-        for color in cls:
-            if color.name == name:
-                return color
+        color: Color | None = cls.__members__.get(name)
+        if color is None:
+            raise ValueError(f"name={name} is not found.")
+
+        return color  # type: ignore[return-value]
+
 
-        raise ValueError(f"name={name} is not found.")
+_COLORS: dict[tuple[int, int], Color] = {
+    (color.hue, color.lightness): color
+    for color in Color if (color.index is not None) and (color.hue is not None)
+}
+""" (色相, 明度) -> Color 変換テーブル (色相 / 明度を持つ色のみ) """
+
+_COLORS_BY_INDEX: dict[int, Color] = {color.index: color for color in Color}
+""" index -> Color 変換テーブル """
 
 
 class Codel:
@@ -525,6 +606,47 @@ def get_color_from_command(command: Command, color: Color) -> Color:
     引数: color のCodelから引数: command を実行する場合に、そのコマンドとなる
     色相差 / 明度差の色を取得する。
 
+    Arguments:
+        command (Command): 実行するコマンド
+        color (Color): コマンドを実行する直前の色
+
+    Returns:
+        Color: 実行するコマンドの色
+    """
+    try:
+        return _COLORS_BY_INDEX[COLOR_TRANSITION_TABLE[color.index][command.command_id]]
+    except (IndexError, TypeError):
+        # 変換テーブルの範囲外(色相 / 明度を持たない色、Pietの仕様に存在しないコマンド)
+        return _calc_color_from_command(command, color)
+
+
+def get_command_from_color(color: Color, next_color: Color) -> Command:
+    """
+    色により実行されるコマンド取得
+
+    引数: color のCodelから引数: next_color のCodelに移動した際の色相差 / 明度差から
+    実行するコマンドを取得する。
+
+    Arguments:
+        color (Color): コマンドを実行する直前の色
+        next_color (Color): 実行するコマンドの色
+
+    Returns:
+        Color: 実行するコマンド
+    """
+    try:
+        return COMMAND_TRANSITION_TABLE[color.index][next_color.index]
+    except (IndexError, TypeError):
+        # 変換テーブルの範囲外(BLACK)
+        return _calc_command_from_color(color, next_color)
+
+
+def _calc_color_from_command(command: Command, color: Color) -> Color:
+    """
+    実行コマンド色算出
+
+    色相 / 明度の演算により、get_color_from_commandの結果を算出する。
+
     Arguments:
         command (Command): 実行するコマンド
         color (Color): コマンドを実行する直前の色
@@ -540,12 +662,11 @@ def get_color_from_command(command: Command, color: Color) -> Color:
     return Color.get_color(hue, lightness)
 
 
-def get_command_from_color(color: Color, next_color: Color) -> Command:
+def _calc_command_from_color(color: Color, next_color: Color) -> Command:
     """
-    色により実行されるコマンド取得
+    色により実行されるコマンド算出
 
-    引数: color のCodelから引数: next_color のCodelに移動した際の色相差 / 明度差から
-    実行するコマンドを取得する。
+    色相 / 明度の演算により、get_command_from_colorの結果を算出する。
 
     Arguments:
         color (Color): コマンドを実行する直前の色
@@ -568,3 +689,38 @@ def get_command_from_color(color: Color, next_color: Color) -> Command:
 
     # 色相差 / 明度差が一致するCommandを取得
     return Command.get_command(hue_step, lightness_step)
+
+
+HUED_COLOR_NUM: int = Color.COLOR_MAX.hue * Color.COLOR_MAX.lightness
+""" 色相 / 明度を持つ色の数 (Color.index: 0 - 17) """
+
+PIET_COMMAND_NUM: int = HUED_COLOR_NUM
+""" Pietのコマンド数 (Command.command_id: 0 - 17) """
+
+COLOR_TRANSITION_TABLE: tuple[bytes, ...] = tuple(
+    bytes(_calc_color_from_command(_COMMANDS_BY_ID[command_id], Color.index_of(index)).index
+          for command_id in range(PIET_COMMAND_NUM))
+    for index in range(HUED_COLOR_NUM)
+)
+"""
+色遷移テーブル
+
+COLOR_TRANSITION_TABLE[color.index][command.command_id] で、引数: color の次に
+command を実行する色のColor.indexを取得する。
+color は色相 / 明度を持つ色 (Color.index: 0 - 17)、command はPietのコマンド
+(Command.command_id: 0 - 17)を対象とする。
+"""
+
+COMMAND_TRANSITION_TABLE: tuple[tuple[Command, ...], ...] = tuple(
+    tuple(_calc_command_from_color(Color.index_of(index), Color.index_of(next_index))
+          for next_index in range(HUED_COLOR_NUM + 1))
+    for index in range(HUED_COLOR_NUM + 1)
+)
+"""
+コマンド遷移テーブル
+
+COMMAND_TRANSITION_TABLE[color.index][next_color.index] で、引数: color から
+next_color に移動した際に実行するCommandを取得する。
+color / next_color は色相 / 明度を持つ色、およびWHITE (Color.index: 0 - 18)を対象とし、
+color がWHITEの場合はNONE、next_color がWHITEの場合はFREE_ZONEとなる。
+"""
@@ -0,0 +1,167 @@
+"""
+Pietプラグラム: PNG形式画像ファイル出力モジュール
+"""
+import struct
+import zlib
+from typing import BinaryIO
+
+from pietgenerator.rasterizer import ImageMode, PALETTE_RGB, rasterize_row
+
+
+class PngWriter:
+    """
+    PngWriterは、index配列からPNG形式の画像ファイルを出力するクラスである。
+    PietプログラムのCodelの繰り返し構造を利用して、以下のように画像データを生成する。
+
+    - Codel 1行につき、1つのスキャンラインのみ生成する。
+    - Codel 1行内の2行目以降のスキャンラインは、PNGの"Up"フィルタを使用し、
+      すべて0のスキャンラインとして出力する。
+    - 画像データは zlib.compressobj でCodel 1行(バンド)ずつ逐次圧縮し、IDATチャンクとして
+      出力先のストリームに直接出力する。画像全体の画素データは保持しない。
+    """
+
+    _SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+    """ PNGシグネチャ """
+
+    _FILTER_NONE: int = 0
+    """ フィルタタイプ: None """
+    _FILTER_UP: int = 2
+    """ フィルタタイプ: Up """
+
+    _BIT_DEPTH: int = 8
+    """ ビット深度 """
+
+    _COLOR_TYPES: dict[ImageMode, int] = {
+        ImageMode.RGBA: 6,
+        ImageMode.PALETTE: 3,
+    }
+    """ ImageMode -> PNGのカラータイプ """
+
+    _BYTES_PER_PIXEL: dict[ImageMode, int] = {
+        ImageMode.RGBA: 4,
+        ImageMode.PALETTE: 1,
+    }
+    """ ImageMode -> 1pixelあたりのバイト数 """
+
+    _BAND_SIZE: int = 1048576
+    """ 一度に圧縮する"Up"フィルタのスキャンラインの最大データサイズ [byte] """
+
+    def __init__(self,
+                 image_mode: ImageMode = ImageMode.RGBA,
+                 compress_level: int = zlib.Z_DEFAULT_COMPRESSION,
+                 chunk_size: int = 65536) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            image_mode (ImageMode, optional): 画素形式
+            compress_level (int, optional): zlibの圧縮レベル(-1 - 9)
+            chunk_size (int, optional): IDATチャンク1つあたりの最大データサイズ [byte]
+        """
+        self._image_mode = image_mode
+        self._compress_level = compress_level
+        self._chunk_size = chunk_size
+
+    def write(self, fp: BinaryIO, rows: list[bytes], codel_size: int) -> None:
+        """
+        PNG形式画像ファイル出力
+
+        引数: rows で渡されたindex配列を、1つのCodelを 引数: codel_size pixel四方に拡大した
+        PNG形式の画像ファイルとして、引数: fp に出力する。
+
+        Arguments:
+            fp (BinaryIO): 出力先のバイナリストリーム
+            rows (list[bytes]): to_index_rowsで変換したindex配列
+            codel_size (int): 1つのCodelのサイズ [px]
+        """
+        self.write_header(fp, len(rows[0]) * codel_size, len(rows) * codel_size)
+        self.write_rows(fp, rows, codel_size)
+
+    def write_header(self, fp: BinaryIO, width: int, height: int) -> None:
+        """
+        ヘッダ出力
+
+        PNGシグネチャ、IHDRチャンク、およびPLTEチャンク(インデックスカラー形式の場合のみ)を
+        引数: fp に出力する。
+
+        Arguments:
+            fp (BinaryIO): 出力先のバイナリストリーム
+            width (int): 画像の幅 [px]
+            height (int): 画像の高さ [px]
+        """
+        fp.write(self._SIGNATURE)
+        self._write_chunk(fp, b"IHDR", struct.pack(">IIBBBBB",
+                                                   width,
+                                                   height,
+                                                   self._BIT_DEPTH,
+                                                   self._COLOR_TYPES[self._image_mode],
+                                                   0,    # 圧縮方式: deflate
+                                                   0,    # フィルタ方式: 適応フィルタ
+                                                   0))   # インターレース: なし
+
+        if self._image_mode is ImageMode.PALETTE:
+            self._write_chunk(fp, b"PLTE", PALETTE_RGB)
+
+    def write_rows(self, fp: BinaryIO, rows: list[bytes], codel_size: int) -> None:
+        """
+        画像データ / 終端出力
+
+        引数: rows で渡されたindex配列の画像データをIDATチャンクとして出力し、
+        最後にIENDチャンクを出力する。
+
+        Arguments:
+            fp (BinaryIO): 出力先のバイナリストリーム
+            rows (list[bytes]): to_index_rowsで変換したindex配列
+            codel_size (int): 1つのCodelのサイズ [px]
+        """
+        compressor = zlib.compressobj(self._compress_level)
+        pending: list[bytes] = []
+        pending_size: int = 0
+
+        # Codel 1行内の2行目以降のスキャンライン
+        # "Up"フィルタにより、直前のスキャンラインとの差分(すべて0)となる
+        # codel_sizeが大きい場合もメモリ使用量が一定となるよう、_BAND_SIZE単位で圧縮する
+        stride: int = len(rows[0]) * codel_size * self._BYTES_PER_PIXEL[self._image_mode]
+        up_line: bytes = bytes((self._FILTER_UP,)) + bytes(stride)
+        band_lines: int = max(1, min(codel_size - 1, self._BAND_SIZE // len(up_line)))
+        up_band: bytes = up_line * band_lines
+
+        for row in rows:
+            scanline: bytes = rasterize_row(row, codel_size, self._image_mode)
+            blocks: list[bytes] = [bytes((self._FILTER_NONE,)) + scanline]
+
+            rest_lines: int = codel_size - 1
+            while rest_lines > 0:
+                blocks.append(up_band if rest_lines >= band_lines else up_line * rest_lines)
+                rest_lines -= band_lines
+
+            for block in blocks:
+                data: bytes = compressor.compress(block)
+                if data:
+                    pending.append(data)
+                    pending_size += len(data)
+
+            if pending_size >= self._chunk_size:
+                # 圧縮済みのデータが一定量に達したら、IDATチャンクとして出力する
+                self._write_chunk(fp, b"IDAT", b"".join(pending))
+                pending.clear()
+                pending_size = 0
+
+        pending.append(compressor.flush())
+        self._write_chunk(fp, b"IDAT", b"".join(pending))
+        self._write_chunk(fp, b"IEND", b"")
+
+    @staticmethod
+    def _write_chunk(fp: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+        """
+        チャンク出力
+
+        Arguments:
+            fp (BinaryIO): 出力先のバイナリストリーム
+            chunk_type (bytes): チャンクタイプ
+            data (bytes): チャンクデータ
+        """
+        fp.write(struct.pack(">I", len(data)))
+        fp.write(chunk_type)
+        fp.write(data)
+        fp.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
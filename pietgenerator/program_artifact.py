@@ -0,0 +1,223 @@
+"""
+Pietプラグラム: 生成済みPietプログラム(codel_size=1)モジュール
+"""
+import zlib
+from collections import OrderedDict
+from io import BytesIO
+from typing import BinaryIO, Self
+
+from PIL import Image
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Codel
+from pietgenerator.png_writer import PngWriter
+from pietgenerator.rasterizer import ImageMode, PALETTE, PALETTE_RGB, to_index_rows
+
+
+class ProgramArtifact:
+    """
+    ProgramArtifactは、生成済みのPietプログラムを codel_size=1 で保持するクラスである。
+    PietプログラムはgridのColor.indexを格納したindex配列、およびgridの幅 / 高さとして保持し、
+    任意の codel_size のPietプログラムファイルを、コマンドの生成 / 配置を再実行せずに
+    拡大して生成する。
+    生成したPietプログラムファイルは、直近に使用した codel_size から順に一定数キャッシュする。
+    """
+
+    def __init__(self, rows: list[bytes], cache_size: int = 8) -> None:
+        """
+        インスタンス初期化
+
+        Arguments:
+            rows (list[bytes]): gridの1行分のColor.indexを格納したバイト列のリスト
+            cache_size (int, optional): キャッシュするPietプログラムファイルの最大数
+
+        Raises:
+            ValueError: 引数: rows が空である、または行ごとに幅が異なる
+        """
+        if (not rows) or (not rows[0]):
+            raise ValueError("rows is empty.")
+
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError("rows have different widths.")
+
+        self._rows = [bytes(row) for row in rows]
+        self._cache_size = cache_size
+        self._cache: OrderedDict[tuple[int, ImageMode, int], bytes] = OrderedDict()
+
+    @classmethod
+    def from_grid(cls, grid: CodelGrid | list[list[Codel]], cache_size: int = 8) -> Self:
+        """
+        grid -> ProgramArtifact生成
+
+        Arguments:
+            grid (CodelGrid | list[list[Codel]]): Codelを配置したgrid
+            cache_size (int, optional): キャッシュするPietプログラムファイルの最大数
+
+        Returns:
+            ProgramArtifact: 生成したProgramArtifact
+        """
+        return cls(to_index_rows(grid), cache_size)
+
+    @classmethod
+    def from_png(cls, data: bytes, cache_size: int = 8) -> Self:
+        """
+        PNG形式画像ファイル -> ProgramArtifact生成
+
+        to_pngで出力した codel_size=1 のPNG形式の画像ファイルからProgramArtifactを生成する。
+        画素形式は、インデックスカラー形式 / RGBA形式のいずれにも対応する。
+
+        Arguments:
+            data (bytes): codel_size=1 のPNG形式の画像ファイル
+            cache_size (int, optional): キャッシュするPietプログラムファイルの最大数
+
+        Returns:
+            ProgramArtifact: 生成したProgramArtifact
+
+        Raises:
+            ValueError: Pietの色ではない画素が含まれている
+        """
+        image = Image.open(BytesIO(data))
+        w, h = image.size
+
+        if (image.mode == "P") and (bytes(image.getpalette() or []) == PALETTE_RGB):
+            # PALETTEと同一のパレットを持つインデックスカラー形式の場合は、そのままindexとなる
+            indexes: bytes = image.tobytes()
+        else:
+            # RGB -> Color.index の変換テーブル
+            color_indexes: dict[bytes, int] = {
+                bytes((color.r, color.g, color.b)): color.index for color in PALETTE
+            }
+
+            pixels: bytes = image.convert("RGB").tobytes()
+            try:
+                indexes = bytes([color_indexes[pixels[i:i + 3]]
+                                 for i in range(0, len(pixels), 3)])
+            except KeyError as e:
+                raise ValueError(f"color={e.args[0].hex()} is not Piet color.") from e
+
+        return cls([bytes(indexes[y * w:(y + 1) * w]) for y in range(h)], cache_size)
+
+    @property
+    def width(self) -> int:
+        """
+        gridの幅取得
+
+        Returns:
+            int: gridの幅
+        """
+        return len(self._rows[0])
+
+    @property
+    def height(self) -> int:
+        """
+        gridの高さ取得
+
+        Returns:
+            int: gridの高さ
+        """
+        return len(self._rows)
+
+    @property
+    def rows(self) -> list[bytes]:
+        """
+        index配列取得
+
+        Returns:
+            list[bytes]: gridの1行分のColor.indexを格納したバイト列のリスト
+        """
+        return list(self._rows)
+
+    def to_png(self,
+               image_mode: ImageMode = ImageMode.PALETTE,
+               compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
+        """
+        codel_size=1 のPNG形式画像ファイル生成
+
+        保存用の codel_size=1 のPNG形式の画像ファイルを生成する。
+        生成した画像ファイルは、from_pngでProgramArtifactに復元できる。
+
+        Arguments:
+            image_mode (ImageMode, optional): 画素形式
+            compress_level (int, optional): zlibの圧縮レベル(-1 - 9)
+
+        Returns:
+            bytes: codel_size=1 のPietプログラムファイル(PNG形式の画像ファイル)
+        """
+        return self.render(1, image_mode, compress_level)
+
+    def render(self,
+               codel_size: int,
+               image_mode: ImageMode = ImageMode.RGBA,
+               compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
+        """
+        Pietプログラムファイル生成
+
+        保持しているPietプログラムを 引数: codel_size に拡大したPNG形式の画像ファイルを生成する。
+        同一の引数で生成済みのPietプログラムファイルがキャッシュに存在する場合は、
+        キャッシュしたPietプログラムファイルを返却する。
+
+        Arguments:
+            codel_size (int): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): 画素形式
+            compress_level (int, optional): zlibの圧縮レベル(-1 - 9)
+
+        Returns:
+            bytes: Pietプログラムファイル(PNG形式の画像ファイル)
+
+        Raises:
+            ValueError: 引数: codel_size が1未満である
+        """
+        key: tuple[int, ImageMode, int] = (codel_size, image_mode, compress_level)
+
+        image: bytes | None = self._cache.get(key)
+        if image is not None:
+            # 直近に使用したPietプログラムファイルとして末尾に移動
+            self._cache.move_to_end(key)
+            return image
+
+        fp: BytesIO = BytesIO()
+        self.render_to(fp, codel_size, image_mode, compress_level)
+        image = fp.getvalue()
+
+        if self._cache_size > 0:
+            self._cache[key] = image
+
+            if len(self._cache) > self._cache_size:
+                # 最も長く使用されていないPietプログラムファイルを削除
+                self._cache.popitem(last=False)
+
+        return image
+
+    def render_to(self,
+                  stream: BinaryIO,
+                  codel_size: int,
+                  image_mode: ImageMode = ImageMode.RGBA,
+                  compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        """
+        Pietプログラムファイル出力
+
+        保持しているPietプログラムを 引数: codel_size に拡大したPNG形式の画像ファイルを
+        引数: stream に直接出力する。本メソッドはキャッシュを使用しない。
+
+        Arguments:
+            stream (BinaryIO): 出力先のバイナリストリーム
+            codel_size (int): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): 画素形式
+            compress_level (int, optional): zlibの圧縮レベル(-1 - 9)
+
+        Raises:
+            ValueError: 引数: codel_size が1未満である
+        """
+        if codel_size < 1:
+            raise ValueError(f"codel_size: '{codel_size}' is less than 1.")
+
+        PngWriter(image_mode, compress_level).write(stream, self._rows, codel_size)
+
+    def cache_info(self) -> tuple[int, int]:
+        """
+        キャッシュ情報取得
+
+        Returns:
+            (int, int): キャッシュしているPietプログラムファイルの数 / 最大数
+        """
+        return len(self._cache), self._cache_size
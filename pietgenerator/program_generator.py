@@ -1,13 +1,17 @@
 """
 Pietプラグラム生成モジュール
 """
+import zlib
 from io import BytesIO
-
-from PIL import Image
+from typing import BinaryIO
 
 from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.codel_grid import CodelGrid
 from pietgenerator.command_layouter.command_layouter import ICommandLayouter
 from pietgenerator.piet_common import Codel, Color, Command
+from pietgenerator.png_writer import PngWriter
+from pietgenerator.program_artifact import ProgramArtifact
+from pietgenerator.rasterizer import ImageMode, to_index_rows
 
 
 class GenerateProgramError(Exception):
@@ -49,7 +53,9 @@ class ProgramGenerator:
                  message: str,
                  start_color: Color = Color.LIGHT_RED,
                  abort_program_color: Color = Color.LIGHT_GREEN,
-                 codel_size: int = 10) -> bytes:
+                 codel_size: int = 10,
+                 image_mode: ImageMode = ImageMode.RGBA,
+                 compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
         """
         Pietプラグラム生成
 
@@ -61,6 +67,8 @@ class ProgramGenerator:
             start_color (Color, optional): 原点に配置するCodelの色
             abort_program_color (Color, optional): 停止用プログラムに配置するCodelの色
             codel_size (int, optional): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): Pietプログラムファイルの画素形式
+            compress_level (int, optional): Pietプログラムファイルのzlib圧縮レベル(-1 - 9)
 
         Returns:
             bytes: Pietプログラムファイル(PNG形式の画像ファイル)
@@ -70,45 +78,135 @@ class ProgramGenerator:
         """
         try:
             commands: list[Command] = self._command_generator.generate(message)
-            grid: list[list[Codel]] = self._command_layouter.do_layout(commands,
-                                                                       start_color,
-                                                                       abort_program_color)
-            image: bytes = self._translate(grid, codel_size)
+            grid: CodelGrid = self._command_layouter.do_layout(commands,
+                                                               start_color,
+                                                               abort_program_color)
+            image: bytes = self._translate(grid, codel_size, image_mode, compress_level)
 
             return image
         except Exception as e:
             raise GenerateProgramError() from e
 
-    def _translate(self, grid: list[list[Codel]], codel_size: int) -> bytes:
+    def generate_to(self,
+                    stream: BinaryIO,
+                    message: str,
+                    start_color: Color = Color.LIGHT_RED,
+                    abort_program_color: Color = Color.LIGHT_GREEN,
+                    codel_size: int = 10,
+                    image_mode: ImageMode = ImageMode.RGBA,
+                    compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        """
+        Pietプラグラム生成 (ストリーム出力)
+
+        引数: message を出力するPietプログラムを生成する。
+        生成したPietプログラムは、PNG形式の画像ファイルとして引数: stream に直接出力する。
+        画像ファイルはCodel 1行ずつ圧縮して出力するため、画像全体の画素データ、および
+        画像ファイル全体のバイトオブジェクトを保持しない。
+
+        Args:
+            stream (BinaryIO): Pietプログラムファイルの出力先のバイナリストリーム
+            message (str): Pietプログラムが出力するメッセージ
+            start_color (Color, optional): 原点に配置するCodelの色
+            abort_program_color (Color, optional): 停止用プログラムに配置するCodelの色
+            codel_size (int, optional): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): Pietプログラムファイルの画素形式
+            compress_level (int, optional): Pietプログラムファイルのzlib圧縮レベル(-1 - 9)
+
+        Raises:
+            GeneratorProgramError: Pietプログラムの生成に失敗した
+            OSError: 引数: stream への出力に失敗した
+        """
+        try:
+            commands: list[Command] = self._command_generator.generate(message)
+            grid: CodelGrid = self._command_layouter.do_layout(commands,
+                                                               start_color,
+                                                               abort_program_color)
+            self._translate_to(stream, grid, codel_size, image_mode, compress_level)
+        except OSError:
+            # ストリームへの出力エラーは呼び出し元で判別できるよう、そのまま送出する
+            raise
+        except Exception as e:
+            raise GenerateProgramError() from e
+
+    def generate_artifact(self,
+                          message: str,
+                          start_color: Color = Color.LIGHT_RED,
+                          abort_program_color: Color = Color.LIGHT_GREEN,
+                          cache_size: int = 8) -> ProgramArtifact:
+        """
+        Pietプラグラム生成 (codel_size=1)
+
+        引数: message を出力するPietプログラムを生成し、codel_size=1 のProgramArtifactとして
+        返却する。任意の codel_size のPietプログラムファイルは、ProgramArtifact.render で
+        コマンドの生成 / 配置を再実行せずに生成できる。
+
+        Args:
+            message (str): Pietプログラムが出力するメッセージ
+            start_color (Color, optional): 原点に配置するCodelの色
+            abort_program_color (Color, optional): 停止用プログラムに配置するCodelの色
+            cache_size (int, optional): ProgramArtifactがキャッシュするPietプログラムファイルの
+                                        最大数
+
+        Returns:
+            ProgramArtifact: 生成したPietプログラム
+
+        Raises:
+            GeneratorProgramError: Pietプログラムの生成に失敗した
+        """
+        try:
+            commands: list[Command] = self._command_generator.generate(message)
+            grid: CodelGrid = self._command_layouter.do_layout(commands,
+                                                               start_color,
+                                                               abort_program_color)
+
+            return ProgramArtifact.from_grid(grid, cache_size)
+        except Exception as e:
+            raise GenerateProgramError() from e
+
+    def _translate(self,
+                   grid: CodelGrid | list[list[Codel]],
+                   codel_size: int,
+                   image_mode: ImageMode = ImageMode.RGBA,
+                   compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
         """
         Pietプログラムファイル生成
 
         引数: grid で渡されたgridの色を基にPietプログラムファイルとなるPNG画像ファイルを生成する。
+        引数: image_mode がImageMode.PALETTEである場合は、Colorから生成した20色のパレットを持つ
+        インデックスカラー(8bit)形式の画像ファイルを生成する。
 
         Args:
-            grid (list[list[Codel]]): PIL.Imageを生成するgrid
+            grid (CodelGrid | list[list[Codel]]): PNG画像ファイルを生成するgrid
             codel_size (int): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): Pietプログラムファイルの画素形式
+            compress_level (int, optional): Pietプログラムファイルのzlib圧縮レベル(-1 - 9)
 
         Returns:
             bytes: Pietプログラムファイル(PNG形式の画像ファイル)
         """
-        h = len(grid)
-        w = len(grid[0])
+        fp: BytesIO = BytesIO()
+        self._translate_to(fp, grid, codel_size, image_mode, compress_level)
 
-        image = Image.new("RGBA", (w * codel_size, h * codel_size))
+        return fp.getvalue()
 
-        for y in range(h):
-            for x in range(w):
-                r = grid[y][x].color.r
-                g = grid[y][x].color.g
-                b = grid[y][x].color.b
-                a = grid[y][x].color.a
+    def _translate_to(self,
+                      stream: BinaryIO,
+                      grid: CodelGrid | list[list[Codel]],
+                      codel_size: int,
+                      image_mode: ImageMode = ImageMode.RGBA,
+                      compress_level: int = zlib.Z_DEFAULT_COMPRESSION) -> None:
+        """
+        Pietプログラムファイル出力
 
-                for i in range(codel_size):
-                    for j in range(codel_size):
-                        image.putpixel(((x * codel_size) + j, (y * codel_size) + i), (r, g, b, a))
+        引数: grid で渡されたgridの色を基にPietプログラムファイルとなるPNG画像ファイルを生成し、
+        引数: stream に出力する。
 
-        fp: BytesIO = BytesIO()
-        image.save(fp, format="PNG")
-
-        return fp.getvalue()
+        Args:
+            stream (BinaryIO): Pietプログラムファイルの出力先のバイナリストリーム
+            grid (CodelGrid | list[list[Codel]]): PNG画像ファイルを生成するgrid
+            codel_size (int): 1つのCodelのサイズ [px]
+            image_mode (ImageMode, optional): Pietプログラムファイルの画素形式
+            compress_level (int, optional): Pietプログラムファイルのzlib圧縮レベル(-1 - 9)
+        """
+        # gridをindex配列に変換し、Codelの繰り返し構造を利用してPNG形式で出力する
+        PngWriter(image_mode, compress_level).write(stream, to_index_rows(grid), codel_size)
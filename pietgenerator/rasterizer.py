@@ -0,0 +1,179 @@
+"""
+Pietプラグラム: gridラスタライズモジュール
+"""
+import functools
+from enum import Enum
+from typing import Self
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Codel, Color
+
+
+class ImageMode(Enum):
+    """
+    ImageModeは、Pietプログラムファイル(PNG形式の画像ファイル)の画素形式である。
+    """
+
+    RGBA = "RGBA"
+    """ 32bit RGBA (1pixelあたり4byte) """
+    PALETTE = "P"
+    """ インデックスカラー (PALETTEのColor.indexを1pixelあたり1byteで格納) """
+
+    def __str__(self) -> str:
+        """
+        文字列表現
+
+        Returns:
+            str: 自身の名前
+        """
+        return self.name
+
+    @property
+    def pil_mode(self) -> str:
+        """
+        PIL.Imageの画素形式取得
+
+        Returns:
+            str: PIL.Imageの画素形式
+        """
+        return self.value
+
+    @classmethod
+    def name_of(cls, name: str) -> Self:
+        """
+        名前 -> ImageMode取得
+
+        名前が一致するImageModeを取得する。
+
+        Arguments:
+            name (str): 名前
+
+        Returns:
+            ImageMode: 名前が一致するImageMode
+
+        Raises:
+            ValueError: 名前が一致するImageModeが存在しない
+        """
+        for image_mode in cls:
+            if image_mode.name == name:
+                return image_mode
+
+        raise ValueError(f"name={name} is not found.")
+
+
+PALETTE: tuple[Color, ...] = tuple(Color.index_of(index) for index in range(20))
+"""
+Color.indexの順に並べたColor
+本タプルのindexはColor.indexと一致する。
+"""
+
+PALETTE_RGB: bytes = b"".join(bytes((color.r, color.g, color.b)) for color in PALETTE)
+""" インデックスカラー用のパレット (PALETTEの各ColorをRGBの順に格納したバイト列) """
+
+_PIXELS: dict[ImageMode, tuple[bytes, ...]] = {
+    ImageMode.RGBA: tuple(bytes((color.r, color.g, color.b, color.a)) for color in PALETTE),
+    ImageMode.PALETTE: tuple(bytes((index,)) for index in range(len(PALETTE))),
+}
+""" ImageMode -> Color.indexに対応する1pixel分のバイト列 """
+
+
+def to_index_rows(grid: CodelGrid | list[list[Codel]]) -> list[bytes]:
+    """
+    grid -> index配列変換
+
+    引数: grid の各行を、CodelのColor.indexを1byteずつ格納したバイト列に変換する。
+    CodelGridの場合は、保持しているColor.indexの配列をそのまま切り出す。
+
+    Arguments:
+        grid (CodelGrid | list[list[Codel]]): 変換するgrid
+
+    Returns:
+        list[bytes]: gridの1行分のColor.indexを格納したバイト列のリスト
+    """
+    if isinstance(grid, CodelGrid):
+        return grid.to_index_rows()
+
+    return [bytes([codel.color.index for codel in row]) for row in grid]
+
+
+@functools.lru_cache(maxsize=32)
+def _get_codel_pixels(codel_size: int, image_mode: ImageMode) -> tuple[bytes, ...]:
+    """
+    Codel 1行分のバイト列取得
+
+    Arguments:
+        codel_size (int): 1つのCodelのサイズ [px]
+        image_mode (ImageMode): 画素形式
+
+    Returns:
+        tuple[bytes, ...]: Color.index -> Codel 1行分(codel_size pixel)のバイト列
+    """
+    return tuple(pixel * codel_size for pixel in _PIXELS[image_mode])
+
+
+def rasterize_row(row: bytes, codel_size: int, image_mode: ImageMode) -> bytes:
+    """
+    1行分ラスタライズ
+
+    引数: row で渡されたgrid 1行分のindex配列を、1つのCodelの幅を 引数: codel_size pixelに
+    拡大した1pixel行(スキャンライン)分の画素データに変換する。
+    Codelの横方向の拡大は1pixel分のバイト列の繰り返しで行うため、pixel単位の処理は行わない。
+
+    Arguments:
+        row (bytes): to_index_rowsで変換したindex配列の1行
+        codel_size (int): 1つのCodelのサイズ [px]
+        image_mode (ImageMode): 画素形式
+
+    Returns:
+        bytes: 1pixel行分の画素データ
+    """
+    return b"".join(map(_get_codel_pixels(codel_size, image_mode).__getitem__, row))
+
+
+def rasterize(rows: list[bytes], codel_size: int, image_mode: ImageMode) -> bytes:
+    """
+    ラスタライズ
+
+    引数: rows で渡されたindex配列を、1つのCodelを 引数: codel_size pixel四方に拡大した
+    引数: image_mode の画素形式の画素データに変換する。
+    Codelの縦方向の拡大は、rasterize_rowで生成した1pixel行分のバイト列の繰り返しで行う。
+
+    Arguments:
+        rows (list[bytes]): to_index_rowsで変換したindex配列
+        codel_size (int): 1つのCodelのサイズ [px]
+        image_mode (ImageMode): 画素形式
+
+    Returns:
+        bytes: 左上から行順に並べた画素データ
+    """
+    return b"".join([rasterize_row(row, codel_size, image_mode) * codel_size for row in rows])
+
+
+def rasterize_rgba(rows: list[bytes], codel_size: int) -> bytes:
+    """
+    RGBA形式ラスタライズ
+
+    Arguments:
+        rows (list[bytes]): to_index_rowsで変換したindex配列
+        codel_size (int): 1つのCodelのサイズ [px]
+
+    Returns:
+        bytes: 左上から行順に並べたRGBA形式の画素データ
+    """
+    return rasterize(rows, codel_size, ImageMode.RGBA)
+
+
+def rasterize_palette(rows: list[bytes], codel_size: int) -> bytes:
+    """
+    インデックスカラー形式ラスタライズ
+
+    各pixelはPALETTE_RGBのindex(Color.index)を1byteで表す。
+
+    Arguments:
+        rows (list[bytes]): to_index_rowsで変換したindex配列
+        codel_size (int): 1つのCodelのサイズ [px]
+
+    Returns:
+        bytes: 左上から行順に並べたインデックスカラー形式の画素データ
+    """
+    return rasterize(rows, codel_size, ImageMode.PALETTE)
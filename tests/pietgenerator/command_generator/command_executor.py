@@ -0,0 +1,63 @@
+from typing import NamedTuple
+
+from pietgenerator.piet_common import Command
+
+
+class ExecuteResult(NamedTuple):
+    output: str
+    stack: list[int]
+    # OUT_CHARコマンドの実行後にstackに残る値の最大数
+    remain: int
+
+
+_BINARY_OPERATIONS = {
+    Command.ADD: lambda value2, value1: value2 + value1,
+    Command.SUBTRACT: lambda value2, value1: value2 - value1,
+    Command.MULTIPLY: lambda value2, value1: value2 * value1,
+    Command.DIVIDE: lambda value2, value1: value2 // value1,
+    Command.MOD: lambda value2, value1: value2 % value1,
+}
+
+
+def execute(commands):
+    # コマンド生成器が生成したコマンドを実行する
+    # LOOP_ENDコマンドは、stack先頭の値が0以外であれば対応するLOOP_BEGINコマンドに戻る
+    stack = []
+    output = []
+    remain = 0
+    begins = []
+    index = 0
+
+    while index < len(commands):
+        command = commands[index]
+
+        if command is Command.NONE:
+            pass
+        elif command is Command.PUSH:
+            stack.append(1)
+        elif command is Command.POP:
+            stack.pop(-1)
+        elif command is Command.DUPLICATE:
+            stack.append(stack[-1])
+        elif command is Command.NOT:
+            stack.append(1 if stack.pop(-1) == 0 else 0)
+        elif command in _BINARY_OPERATIONS:
+            value1 = stack.pop(-1)
+            value2 = stack.pop(-1)
+            stack.append(_BINARY_OPERATIONS[command](value2, value1))
+        elif command is Command.OUT_CHAR:
+            output.append(chr(stack.pop(-1)))
+            remain = max(remain, len(stack))
+        elif command is Command.LOOP_BEGIN:
+            begins.append(index)
+        elif command is Command.LOOP_END:
+            if stack.pop(-1) != 0:
+                index = begins[-1]
+            else:
+                begins.pop(-1)
+        else:
+            assert False
+
+        index += 1
+
+    return ExecuteResult("".join(output), stack, remain)
@@ -1,8 +1,10 @@
 
 import pytest
 
+from pietgenerator.piet_common import Command
 from pietgenerator.command_generator.command_generator import ICommandGenerator
 from pietgenerator.command_generator.command_generator import GenerateCommandError
+from tests.pietgenerator.command_generator.command_executor import execute
 
 
 def test_generate_command_error_str():
@@ -31,4 +33,105 @@ def test__generate_impl_raise_not_implemented_error(mocker):
     gen = TestCommandGenerator(True)
 
     with pytest.raises(NotImplementedError):
-        _ = gen._generate_impl("")
\ No newline at end of file
+        _ = gen._generate_impl("")
+
+def _get_commands(value):
+    # 1 を value 回加算するコマンド
+    return [Command.PUSH] + [Command.PUSH, Command.ADD] * (value - 1)
+
+
+@pytest.mark.parametrize('previous, value, expect', [
+    # stack先頭に値が格納されていない
+    pytest.param(0, 10, _get_commands(10), id='previous=0'),
+    # 直前の値と一致
+    pytest.param(10, 10, [Command.DUPLICATE], id='previous=value'),
+    # 差分で構築
+    pytest.param(10, 12, [Command.DUPLICATE] + _get_commands(2) + [Command.ADD],
+                 id='previous<value'),
+    pytest.param(12, 10, [Command.DUPLICATE] + _get_commands(2) + [Command.SUBTRACT],
+                 id='previous>value'),
+    # 倍数で構築
+    pytest.param(5, 15, [Command.DUPLICATE] + _get_commands(3) + [Command.MULTIPLY],
+                 id='previous*3=value'),
+    # 新たに構築する方が短い
+    pytest.param(20, 2, _get_commands(2), id='previous>>value'),
+    # コマンド数が同じ場合は、新たに構築する
+    pytest.param(1, 3, _get_commands(3), id='same length'),
+])
+def test__select_delta_commands(previous, value, expect):
+    actual = ICommandGenerator._select_delta_commands(previous, value, _get_commands(value),
+                                                      _get_commands)
+
+    assert list(actual) == expect
+
+
+@pytest.mark.parametrize('divide, expect', [
+    pytest.param(False, _get_commands(5), id='divide=False'),
+    pytest.param(True, [Command.DUPLICATE] + _get_commands(3) + [Command.DIVIDE], id='divide=True'),
+])
+def test__select_delta_commands_divide(divide, expect):
+    actual = ICommandGenerator._select_delta_commands(15, 5, _get_commands(5), _get_commands,
+                                                      divide)
+
+    assert list(actual) == expect
+
+
+@pytest.mark.parametrize('message, delta, expect', [
+    pytest.param('\x02\x02\x03', False,
+                 _get_commands(2) + [Command.DUPLICATE, Command.OUT_CHAR, Command.OUT_CHAR] +
+                 _get_commands(3) + [Command.OUT_CHAR], id='delta=False'),
+    # 直前の文字の複製から構築
+    pytest.param('\x05\x0f', True,
+                 _get_commands(5) + [Command.DUPLICATE, Command.OUT_CHAR] +
+                 _get_commands(3) + [Command.MULTIPLY, Command.OUT_CHAR], id='delta=True previous'),
+    # 次の文字を先に構築し、複製から構築
+    pytest.param('\x0f\x05', True,
+                 _get_commands(5) + [Command.DUPLICATE] + _get_commands(3) +
+                 [Command.MULTIPLY, Command.OUT_CHAR, Command.OUT_CHAR], id='delta=True next'),
+    pytest.param('\x0a\x0a\x0c\x02', True,
+                 _get_commands(2) +
+                 [Command.DUPLICATE] + _get_commands(6) + [Command.MULTIPLY] +
+                 [Command.DUPLICATE] + _get_commands(2) + [Command.SUBTRACT] +
+                 [Command.DUPLICATE] + [Command.OUT_CHAR] * 4, id='delta=True block'),
+])
+def test__interleave_commands(message, delta, expect):
+    commands = ICommandGenerator._interleave_commands(message, _get_commands, delta)
+
+    assert commands == expect
+
+    # 文字ごと、またはまとめて構築した文字ごとに出力する
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain < ICommandGenerator._INTERLEAVE_BLOCK_MAX
+
+
+def test__interleave_commands_block_max():
+    # 末尾の文字のみ新たに構築するコマンドが短い場合も、まとめて構築する文字数を制限する
+    message = '\x0c\x0b\x0a\x09\x08\x07\x06'
+    commands = ICommandGenerator._interleave_commands(message, _get_commands, True)
+
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain < ICommandGenerator._INTERLEAVE_BLOCK_MAX
+
+    # 差分で構築しない場合よりも長くならない
+    assert len(commands) <= len(ICommandGenerator._interleave_commands(message, _get_commands,
+                                                                       False))
+
+
+@pytest.mark.parametrize('length', [
+    pytest.param(49, id='length=49'),
+    pytest.param(199, id='length=199'),
+    pytest.param(999, id='length=999'),
+])
+def test__interleave_commands_descending(length):
+    # 降順の文字の連続は次の文字から差分で構築できるが、stackの深さはメッセージの文字数によらない
+    message = ''.join(chr(value) for value in range(length + 1, 1, -1))
+    commands = ICommandGenerator._interleave_commands(message, _get_commands, True)
+
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain < ICommandGenerator._INTERLEAVE_BLOCK_MAX
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from pietgenerator.command_generator.devs_tuner import DevsTuner, DevsTuningResult
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+
+
+def test_create_candidates():
+    assert DevsTuner.create_candidates([2, 3]) == [(2,), (3,), (2, 3), (3, 2)]
+    assert len(DevsTuner.create_candidates([2, 3, 5, 7])) == 4 + 12 + 24 + 24
+
+    # 重複する値は1つとして扱う
+    assert DevsTuner.create_candidates([2, 3, 2]) == [(2,), (3,), (2, 3), (3, 2)]
+    assert len(DevsTuner.create_candidates([2, 3, 5, 7, 11, 13])) == 1956
+
+
+def test_create_candidates_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = DevsTuner.create_candidates([2, 3, 5, 7, 11, 13, 17])
+
+
+def test_init():
+    tuner = DevsTuner()
+
+    assert tuner.encoding is ValueEncoding.FACTORIZE
+    assert tuner.candidates == DevsTuner.create_candidates(DevsTuner.PRIMES)
+
+    tuner = DevsTuner(ValueEncoding.SHORTEST, [[2, 3], [5]])
+
+    assert tuner.encoding is ValueEncoding.SHORTEST
+    assert tuner.candidates == [(2, 3), (5,)]
+
+
+@pytest.mark.parametrize('candidates', [
+    pytest.param([], id='candidates=[]'),
+    pytest.param([[2, 3], []], id='candidates=[[2, 3], []]'),
+    pytest.param([[1]], id='candidates=[[1]]'),
+])
+def test_init_raise_value_error(candidates):
+    with pytest.raises(ValueError):
+        _ = DevsTuner(candidates=candidates)
+
+
+@pytest.mark.parametrize('devs', [
+    pytest.param([2, 3], id='devs=[2, 3]'),
+    pytest.param([5, 7], id='devs=[5, 7]'),
+])
+@pytest.mark.parametrize('corpus', [
+    pytest.param('Hello World!', id='corpus="Hello World!"'),
+    pytest.param('吾輩は猫である。名前はまだ無い。', id='corpus="吾輩は猫である。名前はまだ無い。"'),
+])
+def test_evaluate(devs, corpus):
+    tuner = DevsTuner()
+    gen = FactorizeCommandGenerator(False, devs=devs)
+
+    # FactorizeCommandGenerator.generateが生成するコマンド数と一致する
+    assert tuner.evaluate(gen, corpus) == len(gen.generate(corpus))
+
+
+def test_evaluate_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = DevsTuner().evaluate(FactorizeCommandGenerator(False), 'A\0')
+
+
+def test_tune():
+    corpus = '吾輩は猫である。名前はまだ無い。'
+    tuner = DevsTuner(candidates=[[2, 3], [5], [2, 3, 5], [3, 5]])
+
+    results = tuner.tune(corpus)
+
+    assert sorted(result.devs for result in results) == [(2, 3), (2, 3, 5), (3, 5), (5,)]
+    assert all(isinstance(result, DevsTuningResult) for result in results)
+    assert [result.commands for result in results] == sorted(
+        len(FactorizeCommandGenerator(False, devs=result.devs).generate(corpus))
+        for result in results)
+    # 既定の除数よりコマンド数が少ない除数が選択される
+    assert results[0].commands < tuner.evaluate(FactorizeCommandGenerator(False), corpus)
+
+
+def test_tune_same_commands():
+    # コマンド数が同じ場合は、除数の少ない順
+    results = DevsTuner(candidates=[[2, 3], [2]]).tune('\x01')
+
+    assert results == [DevsTuningResult((2,), 3), DevsTuningResult((2, 3), 3)]
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / 'devs.json')
+    tuner = DevsTuner(candidates=[[2, 3], [5]])
+    results = tuner.tune('Hello World!')
+
+    tuner.save(path, results)
+
+    with open(path, encoding='utf-8') as fp:
+        config = json.load(fp)
+
+    assert config['encoding'] == 'FACTORIZE'
+    assert config['devs'] == list(results[0].devs)
+    assert config['commands'] == results[0].commands
+    assert config['results'] == [{'devs': list(result.devs), 'commands': result.commands}
+                                 for result in results]
+    assert DevsTuner.load(path) == results[0].devs
+
+
+@pytest.mark.parametrize('config', [
+    pytest.param([], id='config=[]'),
+    pytest.param({}, id='config={}'),
+    pytest.param({'devs': []}, id='devs=[]'),
+    pytest.param({'devs': [2, 1]}, id='devs=[2, 1]'),
+    pytest.param({'devs': ['2']}, id='devs=["2"]'),
+])
+def test_load_raise_value_error(tmp_path, config):
+    path = tmp_path / 'devs.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        _ = DevsTuner.load(str(path))
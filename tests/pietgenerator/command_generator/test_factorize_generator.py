@@ -4,8 +4,12 @@ import random
 import pytest
 
 from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.factorize_generator import CommandCache
 from pietgenerator.command_generator.command_generator import GenerateCommandError
+from pietgenerator.command_generator.factorize_generator import CommandCacheInfo
 from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+from tests.pietgenerator.command_generator.command_executor import execute
 
 
 def test_init():
@@ -17,6 +21,40 @@ def test_init():
 
     gen = FactorizeCommandGenerator(debug=False)
     assert gen._debug is False
+    assert gen.encoding is ValueEncoding.FACTORIZE
+
+    gen = FactorizeCommandGenerator(False, ValueEncoding.BINARY)
+    assert gen.encoding is ValueEncoding.BINARY
+    assert gen.devs == (2, 3)
+
+    assert gen.delta is False
+    assert gen.interleave is False
+
+    gen = FactorizeCommandGenerator(False, devs=[5, 2])
+    assert gen.devs == (5, 2)
+
+
+@pytest.mark.parametrize('devs', [
+    pytest.param([], id='devs=[]'),
+    pytest.param([2, 1], id='devs=[2, 1]'),
+    pytest.param([0], id='devs=[0]'),
+])
+def test_init_raise_value_error(devs):
+    with pytest.raises(ValueError):
+        _ = FactorizeCommandGenerator(False, devs=devs)
+
+
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
+def test_value_encoding_name_of(encoding):
+    assert str(encoding) == encoding.name
+    assert ValueEncoding.name_of(str(encoding)) is encoding
+
+
+def test_value_encoding_name_of_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = ValueEncoding.name_of("UNKNOWN")
 
 
 def _inspect_character_commands(commands, expect):
@@ -65,23 +103,172 @@ def test__character_to_commands(ch):
     _inspect_character_commands(commands, chr(ch))
 
 
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
+@pytest.mark.parametrize('ch', [
+    # ASCII / ひらがな / CJK統合漢字 / 絵文字 / コードポイントの最大値
+    pytest.param(ch, id=f"ch=0x{ch:02X}")
+    for ch in [*range(1, 256), 0x3042, 0x3093, 0x4E00, 0x6F22, 0x9FFF, 0x1F600, 0x10FFFF]
+])
+def test__character_to_commands_encoding(ch, encoding):
+    gen = FactorizeCommandGenerator(False, encoding)
+    commands = gen._character_to_commands(chr(ch))
+
+    _inspect_character_commands(commands, chr(ch))
+
+
+@pytest.mark.parametrize('devs', [
+    pytest.param([2], id='devs=[2]'),
+    pytest.param([5], id='devs=[5]'),
+    pytest.param([3, 2], id='devs=[3, 2]'),
+    pytest.param([2, 3, 5, 7], id='devs=[2, 3, 5, 7]'),
+    pytest.param([7, 4], id='devs=[7, 4]'),
+])
+def test__character_to_commands_devs(devs):
+    gen = FactorizeCommandGenerator(False, devs=devs)
+
+    for ch in [*range(1, 256), 0x3042, 0x6F22, 0x1F600]:
+        _inspect_character_commands(gen._character_to_commands(chr(ch)), chr(ch))
+
+
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
 @pytest.mark.parametrize('ch', [
     pytest.param(0x00, id=f"ch=0x00"),
 ])
-def test__character_to_commands_raise_value_error(ch):
-    gen = FactorizeCommandGenerator()
+def test__character_to_commands_raise_value_error(ch, encoding):
+    gen = FactorizeCommandGenerator(True, encoding)
 
     with pytest.raises(ValueError):
         _ = gen._character_to_commands(chr(ch))
 
 
+def test__character_to_commands_shortest():
+    factorize_gen = FactorizeCommandGenerator(False, ValueEncoding.FACTORIZE)
+    binary_gen = FactorizeCommandGenerator(False, ValueEncoding.BINARY)
+    shortest_gen = FactorizeCommandGenerator(False, ValueEncoding.SHORTEST)
+
+    for ch in [*range(1, 0x800, 7), *range(0x3041, 0x3097), 0x1F600]:
+        factorize_commands = factorize_gen._character_to_commands(chr(ch))
+        binary_commands = binary_gen._character_to_commands(chr(ch))
+        shortest_commands = shortest_gen._character_to_commands(chr(ch))
+
+        # コマンド数が同じ場合は、FACTORIZEのコマンドを使用する
+        if len(binary_commands) < len(factorize_commands):
+            assert shortest_commands == binary_commands
+        else:
+            assert shortest_commands == factorize_commands
+
+
+@pytest.mark.parametrize('value, expect', [
+    pytest.param(1, [Command.PUSH], id='value=1'),
+    pytest.param(2, [Command.PUSH, Command.DUPLICATE, Command.ADD], id='value=2'),
+    pytest.param(3, [Command.PUSH, Command.DUPLICATE, Command.ADD, Command.PUSH, Command.ADD],
+                 id='value=3'),
+    pytest.param(15, [Command.PUSH] + [Command.DUPLICATE, Command.ADD] * 4 +
+                 [Command.PUSH, Command.SUBTRACT], id='value=15'),
+])
+def test__value_to_binary_commands(value, expect):
+    gen = FactorizeCommandGenerator(False, ValueEncoding.BINARY)
+
+    assert gen._value_to_binary_commands(value) == expect
+
+
+def test__value_to_binary_commands_length():
+    gen = FactorizeCommandGenerator(False, ValueEncoding.BINARY)
+
+    for value in [*range(1, 1025), 0x10FFFF]:
+        commands = gen._value_to_binary_commands(value)
+        bits = value.bit_length()
+
+        # コマンド数は値の対数に比例し、2進数の桁数のみで倍加 / 加算するより多くならない
+        assert len(commands) <= 1 + (bits - 1) * 2 + (bin(value).count("1") - 1) * 2
+        assert len(commands) <= 1 + (bits - 1) * 4
+
+
+def test__get_character_commands():
+    FactorizeCommandGenerator.cache_clear()
+    gen = FactorizeCommandGenerator(False)
+
+    commands = gen._get_character_commands('A')
+
+    assert isinstance(commands, tuple)
+    assert list(commands) == gen._character_to_commands('A')
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(0, 1, 1, 4096)
+
+    # キャッシュはインスタンス間で共有する
+    assert FactorizeCommandGenerator(False)._get_character_commands('A') is commands
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(1, 1, 1, 4096)
+
+    # 変換に失敗した文字はキャッシュしない
+    with pytest.raises(ValueError):
+        _ = gen._get_character_commands(chr(0))
+
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(1, 1, 1, 4096)
+
+    # 除数が異なる場合は、別の文字としてキャッシュする
+    devs_commands = FactorizeCommandGenerator(False, devs=[5])._get_character_commands('A')
+
+    assert devs_commands == tuple(FactorizeCommandGenerator(False, devs=[5])
+                                  ._character_to_commands('A'))
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(1, 2, 2, 4096)
+
+    # 変換方式が異なる場合は、別の文字としてキャッシュする
+    binary_gen = FactorizeCommandGenerator(False, ValueEncoding.BINARY)
+    binary_commands = binary_gen._get_character_commands('A')
+
+    assert list(binary_commands) == gen._value_to_binary_commands(ord('A'))
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(1, 3, 3, 4096)
+
+    FactorizeCommandGenerator.cache_clear()
+
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(0, 0, 0, 4096)
+
+
+def test__get_character_commands_cache_size(monkeypatch):
+    FactorizeCommandGenerator.cache_clear()
+    monkeypatch.setattr(FactorizeCommandGenerator, '_cache', CommandCache(2))
+    gen = FactorizeCommandGenerator(False)
+
+    for ch in 'ABAC':
+        gen._get_character_commands(ch)
+
+    # 最も長く使用されていない文字(B)から削除する
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(1, 3, 2, 2)
+    assert [key[1] for key in FactorizeCommandGenerator._cache] == [ord('A'), ord('C')]
+
+    FactorizeCommandGenerator.cache_clear()
+
+
+def test_generate_cache():
+    FactorizeCommandGenerator.cache_clear()
+    gen = FactorizeCommandGenerator(False)
+
+    commands = gen.generate('Hello')
+
+    # 連続する'l'は一度だけ取得する
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(0, 4, 4, 4096)
+
+    # キャッシュから取得した場合も、同一のコマンドとなるかテスト
+    assert gen.generate('Hello') == commands
+    assert FactorizeCommandGenerator.cache_info() == CommandCacheInfo(4, 4, 4, 4096)
+
+    FactorizeCommandGenerator.cache_clear()
+
+
 @pytest.mark.parametrize('message', [
     pytest.param(' ', id='message=" "'),
     pytest.param('A', id='message="A"'),
-    pytest.param('Hello World!', id='message="Hello World!"')
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('こんにちは、世界🌏', id='message="こんにちは、世界🌏"'),
 ])
-def test_generate(message):
-    gen = FactorizeCommandGenerator()
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
+def test_generate(message, encoding):
+    gen = FactorizeCommandGenerator(True, encoding)
     commands = gen.generate(message)
 
     none_command = commands[:1]
@@ -94,6 +281,102 @@ def test_generate(message):
     _inspect_character_commands(message_commands, message)
 
 
+@pytest.mark.parametrize('message, runs', [
+    pytest.param('aaaaaaaa', ['a'], id='message="aaaaaaaa"'),
+    pytest.param('== Title ==', ['=', ' ', 'T', 'i', 't', 'l', 'e', ' ', '='],
+                 id='message="== Title =="'),
+    pytest.param('ああ、いいい', ['あ', '、', 'い'], id='message="ああ、いいい"'),
+])
+def test_generate_runs(message, runs):
+    gen = FactorizeCommandGenerator(False)
+    commands = gen.generate(message)
+
+    _inspect_character_commands(commands[1:len(commands) - len(message)], message)
+
+    # 連続する文字は一度だけ構築し、DUPLICATEで複製する
+    expect = 1 + len(message) + (len(message) - len(runs))
+    expect += sum(len(gen._character_to_commands(ch)) for ch in runs)
+    assert len(commands) == expect
+
+
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('aaa', id='message="aaa"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('0123456789', id='message="0123456789"'),
+    pytest.param('吾輩は猫である。🐱', id='message="吾輩は猫である。🐱"'),
+])
+def test_generate_delta(message, encoding):
+    gen = FactorizeCommandGenerator(False, encoding, delta=True)
+    commands = gen.generate(message)
+
+    assert gen.delta is True
+    assert commands[:1] == [Command.NONE]
+    assert commands[len(commands) - len(message):] == [Command.OUT_CHAR] * len(message)
+
+    _inspect_character_commands(commands[1:len(commands) - len(message)], message)
+
+    # 文字ごとに新たに構築するより長くならない
+    assert len(commands) <= len(FactorizeCommandGenerator(False, encoding).generate(message))
+
+
+def test_generate_delta_raise_generate_command_error():
+    gen = FactorizeCommandGenerator(False, delta=True)
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("A\0")
+
+
+@pytest.mark.parametrize('encoding', [
+    pytest.param(encoding, id=f"encoding={encoding}") for encoding in ValueEncoding
+])
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('aaa', id='message="aaa"'),
+    pytest.param('== Hello World! ==', id='message="== Hello World! =="'),
+    pytest.param('0123456789', id='message="0123456789"'),
+    pytest.param('吾輩は猫である。🐱', id='message="吾輩は猫である。🐱"'),
+])
+def test_generate_interleave(message, encoding):
+    gen = FactorizeCommandGenerator(False, encoding, interleave=True)
+    commands = gen.generate(message)
+
+    assert gen.interleave is True
+    assert commands[:1] == [Command.NONE]
+    assert commands.count(Command.OUT_CHAR) == len(message)
+
+    # 文字ごとに出力し、出力後のstackには連続する文字の複製元のみ残る
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain <= 1
+
+    # 全文字をstackに格納した後に出力する場合とコマンド数が同じ
+    assert len(commands) == len(FactorizeCommandGenerator(False, encoding).generate(message))
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('aaa', id='message="aaa"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('<<<ZZZ-->>>', id='message="<<<ZZZ-->>>"'),
+    pytest.param('吾輩は猫である。🐱', id='message="吾輩は猫である。🐱"'),
+])
+def test_generate_interleave_delta(message):
+    gen = FactorizeCommandGenerator(False, delta=True, interleave=True)
+    commands = gen.generate(message)
+
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain < FactorizeCommandGenerator._INTERLEAVE_BLOCK_MAX
+
+    # 差分で構築しない場合よりも長くならない
+    assert len(commands) <= len(FactorizeCommandGenerator(False, interleave=True).generate(message))
+
+
 def test_generate_too_long_message():
     message = "".join([chr(random.randrange(1, 256)) for _ in range(10000)])
     gen = FactorizeCommandGenerator()
@@ -115,3 +398,28 @@ def test_generate_raises_generate_command_error(mocker):
 
     with pytest.raises(GenerateCommandError):
         _ = gen.generate("")
+
+
+def test_command_cache():
+    cache = CommandCache(2)
+
+    assert cache.get('A') is None
+    cache.put('A', (Command.PUSH,))
+    cache.put('B', (Command.DUPLICATE,))
+    assert cache.get('A') == (Command.PUSH,)
+
+    # 最も長く使用されていない文字(B)から削除する
+    cache.put('C', (Command.NOT,))
+    assert list(cache) == ['A', 'C']
+    assert cache.info() == CommandCacheInfo(1, 3, 2, 2)
+
+    cache.clear()
+    assert cache.info() == CommandCacheInfo(0, 0, 0, 2)
+
+
+def test_command_cache_disabled():
+    cache = CommandCache(0)
+    cache.put('A', (Command.PUSH,))
+
+    assert cache.get('A') is None
+    assert cache.info() == CommandCacheInfo(0, 1, 0, 0)
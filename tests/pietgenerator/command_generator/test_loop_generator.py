@@ -0,0 +1,98 @@
+import pytest
+
+from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.command_generator import GenerateCommandError
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.loop_generator import LoopCommandGenerator
+from pietgenerator.command_generator.loop_generator import MessageRepeat
+from tests.pietgenerator.command_generator.command_executor import execute
+
+
+def test_message_repeat():
+    repeat = MessageRepeat(3, 'ab', 4)
+
+    assert repeat.start == 3
+    assert repeat.pattern == 'ab'
+    assert repeat.repeats == 4
+    assert repeat.end == 11
+
+
+@pytest.mark.parametrize('message, expect', [
+    pytest.param('', [], id='message=""'),
+    pytest.param('A', [], id='message="A"'),
+    pytest.param('Hello World!', [], id='message="Hello World!"'),
+    pytest.param('>' + '-=' * 20 + '<', [MessageRepeat(1, '-=', 20)], id='message=">-=-=...<"'),
+    pytest.param('Hello World! ' * 10, [MessageRepeat(0, 'Hello World! ', 10)],
+                 id='message="Hello World! " * 10'),
+    pytest.param('=' * 40 + '\n Title \n' + '=' * 40,
+                 [MessageRepeat(0, '=', 40), MessageRepeat(49, '=', 40)],
+                 id='message="=== Title ==="'),
+])
+def test__find_repeats(message, expect):
+    gen = LoopCommandGenerator(False)
+
+    assert gen._find_repeats(message) == expect
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('>' + '-=' * 20 + '<', id='message=">-=-=...<"'),
+    pytest.param('Hello World! ' * 10, id='message="Hello World! " * 10'),
+    pytest.param('=' * 40 + '\n Title \n' + '=' * 40, id='message="=== Title ==="'),
+    pytest.param('ああああああああああ、' * 3, id='message="ああああああああああ、" * 3'),
+])
+def test_generate(message):
+    gen = LoopCommandGenerator(False)
+    commands = gen.generate(message)
+
+    assert commands[:1] == [Command.NONE]
+    assert commands.count(Command.LOOP_BEGIN) == len(gen._find_repeats(message))
+
+    # ループを実行して出力したメッセージ、およびstackは、ループを含まないコマンドと同一
+    output, stack, _ = execute(commands)
+    assert output == message
+    assert stack == []
+
+    factorize_commands = FactorizeCommandGenerator(False).generate(message)
+    if Command.LOOP_BEGIN in commands:
+        assert len(commands) < len(factorize_commands)
+    else:
+        assert commands == factorize_commands
+
+
+@pytest.mark.parametrize('delta', [
+    pytest.param(False, id='delta=False'),
+    pytest.param(True, id='delta=True'),
+])
+def test_generate_delta(delta):
+    message = '[' + '0123' * 8 + ']'
+    gen = LoopCommandGenerator(False, delta=delta)
+    commands = gen.generate(message)
+
+    assert Command.LOOP_BEGIN in commands
+    assert execute(commands)[:2] == (message, [])
+
+
+def test_generate_raises_generate_command_error():
+    gen = LoopCommandGenerator(False)
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("A\0")
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("\0" * 10)
+
+
+def test_generate_interleave():
+    message = '<' + '-=' * 20 + '> ' + 'Hello World! ' * 5
+    gen = LoopCommandGenerator(False, interleave=True)
+    commands = gen.generate(message)
+
+    assert commands.count(Command.LOOP_BEGIN) == 2
+    assert execute(commands)[:2] == (message, [])
+
+    # ループ本体のパターンも文字ごとに出力する
+    begin = commands.index(Command.LOOP_BEGIN)
+    assert commands[begin + 1:].index(Command.OUT_CHAR) < \
+        len(gen._get_character_commands('-')) + 1
@@ -0,0 +1,208 @@
+import pytest
+
+from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.command_generator import GenerateCommandError
+from pietgenerator.command_generator.command_generator import ICommandGenerator
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.factorize_generator import ValueEncoding
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+from pietgenerator.command_generator.optimal_generator import ShortestCommandTable
+from tests.pietgenerator.command_generator.command_executor import execute
+
+
+@pytest.fixture(scope='module')
+def table():
+    return ShortestCommandTable(3000, 13)
+
+
+def test_shortest_command_table_init(table):
+    assert table.max_value == 3000
+    assert table.search_depth == 13
+
+
+@pytest.mark.parametrize('max_value, search_depth', [
+    pytest.param(0, 13, id='max_value=0'),
+    pytest.param(100, -1, id='search_depth=-1'),
+])
+def test_shortest_command_table_init_raise_value_error(max_value, search_depth):
+    with pytest.raises(ValueError):
+        _ = ShortestCommandTable(max_value, search_depth)
+
+
+def test_shortest_command_table_commands(table):
+    factorize_gen = FactorizeCommandGenerator(False, ValueEncoding.SHORTEST)
+
+    for value in range(1, 3001):
+        commands = table.commands(value)
+
+        assert execute(commands).stack == [value]
+        assert len(commands) == table.cost(value)
+        # FactorizeCommandGeneratorのコマンドより長くならない
+        assert len(commands) <= len(factorize_gen._character_to_commands(chr(value)))
+
+    # 取得したコマンドは保持する
+    assert table.commands(2000) is table.commands(2000)
+
+
+@pytest.mark.parametrize('value, expect', [
+    pytest.param(1, 1, id='value=1'),
+    pytest.param(2, 3, id='value=2'),
+    pytest.param(4, 5, id='value=4'),
+    # 2 + (2 + 1)^2: PUSH, PUSH, ADD, DUPLICATE, PUSH, ADD, DUPLICATE, MULTIPLY, ADD
+    pytest.param(11, 9, id='value=11'),
+])
+def test_shortest_command_table_cost(table, value, expect):
+    assert table.cost(value) == expect
+
+
+def test_shortest_command_table_search_depth():
+    # 幅優先探索を行わない場合も、すべての値のコマンドを計算する
+    table = ShortestCommandTable(500, 0)
+    searched_table = ShortestCommandTable(500, 13)
+
+    for value in range(1, 501):
+        assert execute(table.commands(value)).stack == [value]
+        assert table.cost(value) >= searched_table.cost(value)
+
+
+@pytest.mark.parametrize('value', [
+    pytest.param(value, id=f"value=0x{value:X}")
+    for value in [3001, 3097, 0x3042, 0x9FFF, 0x1F600, 0x10FFFF]
+])
+def test_shortest_command_table_commands_large(table, value):
+    # 表の範囲外の値
+    commands = table.commands(value)
+
+    assert execute(commands).stack == [value]
+    assert len(commands) == table.cost(value)
+
+
+@pytest.mark.parametrize('value', [
+    pytest.param(0, id='value=0'),
+    pytest.param(-1, id='value=-1'),
+])
+def test_shortest_command_table_raise_value_error(table, value):
+    with pytest.raises(ValueError):
+        _ = table.commands(value)
+
+    with pytest.raises(ValueError):
+        _ = table.cost(value)
+
+
+def test_init():
+    gen = OptimalCommandGenerator(False, 1000, 11)
+
+    assert gen._debug is False
+    assert gen.table.max_value == 1000
+    assert gen.table.search_depth == 11
+    assert gen.delta is False
+    assert gen.interleave is False
+
+    # 同一の引数で生成したインスタンスは、表を共有する
+    assert OptimalCommandGenerator(True, 1000, 11).table is gen.table
+    assert OptimalCommandGenerator(True, 1000, 12).table is not gen.table
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param(' ', id='message=" "'),
+    pytest.param('A', id='message="A"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('こんにちは、世界🌏', id='message="こんにちは、世界🌏"'),
+])
+def test_generate(message):
+    gen = OptimalCommandGenerator()
+    commands = gen.generate(message)
+
+    none_command = commands[:1]
+    message_commands = commands[1:len(commands) - len(message)]
+    output_commands = commands[len(commands) - len(message):]
+
+    assert none_command == [Command.NONE]
+    assert output_commands == [Command.OUT_CHAR] * len(message)
+    assert "".join(chr(value) for value in execute(message_commands).stack[::-1]) == message
+
+    # FactorizeCommandGeneratorよりコマンド数が少ない
+    assert len(commands) < len(FactorizeCommandGenerator(False).generate(message))
+
+
+@pytest.mark.parametrize('message, runs', [
+    pytest.param('aaaaaaaa', ['a'], id='message="aaaaaaaa"'),
+    pytest.param('== Title ==', ['=', ' ', 'T', 'i', 't', 'l', 'e', ' ', '='],
+                 id='message="== Title =="'),
+    pytest.param('ああ、いいい', ['あ', '、', 'い'], id='message="ああ、いいい"'),
+])
+def test_generate_runs(message, runs):
+    gen = OptimalCommandGenerator(False)
+    commands = gen.generate(message)
+
+    message_commands = commands[1:len(commands) - len(message)]
+    assert "".join(chr(value) for value in execute(message_commands).stack[::-1]) == message
+
+    # 連続する文字は一度だけ構築し、DUPLICATEで複製する
+    expect = 1 + len(message) + (len(message) - len(runs))
+    expect += sum(gen.table.cost(ord(ch)) for ch in runs)
+    assert len(commands) == expect
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('aaa', id='message="aaa"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('0123456789', id='message="0123456789"'),
+    pytest.param('吾輩は猫である。🐱', id='message="吾輩は猫である。🐱"'),
+])
+def test_generate_delta(message):
+    gen = OptimalCommandGenerator(False, delta=True)
+    commands = gen.generate(message)
+
+    assert gen.delta is True
+    assert commands[:1] == [Command.NONE]
+    assert commands[len(commands) - len(message):] == [Command.OUT_CHAR] * len(message)
+
+    message_commands = commands[1:len(commands) - len(message)]
+    assert "".join(chr(value) for value in execute(message_commands).stack[::-1]) == message
+
+    # 文字ごとに新たに構築するより長くならない
+    assert len(commands) <= len(OptimalCommandGenerator(False).generate(message))
+
+
+@pytest.mark.parametrize('delta', [
+    pytest.param(False, id='delta=False'),
+    pytest.param(True, id='delta=True'),
+])
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('== Hello World! ==', id='message="== Hello World! =="'),
+    pytest.param('吾輩は猫である。🐱', id='message="吾輩は猫である。🐱"'),
+])
+def test_generate_interleave(message, delta):
+    gen = OptimalCommandGenerator(False, delta=delta, interleave=True)
+    commands = gen.generate(message)
+
+    assert gen.interleave is True
+    assert commands[:1] == [Command.NONE]
+
+    # 文字を構築した直後に出力し、出力後のstackには複製元の値、またはまとめて構築した値のみ残る
+    output, stack, remain = execute(commands[1:])
+    assert output == message
+    assert stack == []
+    assert remain < (ICommandGenerator._INTERLEAVE_BLOCK_MAX if delta else 2)
+
+    # 全文字をstackに格納した後に出力する場合と比較し、差分で構築しない場合はコマンド数が同じ
+    # 差分で構築する場合は、差分で構築しない場合よりも長くならない
+    expect = len(OptimalCommandGenerator(False).generate(message))
+    if not delta:
+        assert len(commands) == expect
+    else:
+        assert len(commands) <= expect
+
+
+@pytest.mark.parametrize('delta', [
+    pytest.param(False, id='delta=False'),
+    pytest.param(True, id='delta=True'),
+])
+def test_generate_raises_generate_command_error(delta):
+    gen = OptimalCommandGenerator(False, 1000, 11, delta)
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("A\0")
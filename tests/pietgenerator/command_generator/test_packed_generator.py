@@ -0,0 +1,126 @@
+import pytest
+
+from pietgenerator.piet_common import Command
+from pietgenerator.command_generator.command_generator import GenerateCommandError
+from pietgenerator.command_generator.optimal_generator import OptimalCommandGenerator
+from pietgenerator.command_generator.packed_generator import PackedCommandGenerator
+from pietgenerator.command_generator.packed_generator import PackedFormat
+from tests.pietgenerator.command_generator.command_executor import execute
+
+
+@pytest.mark.parametrize('packed_format, chunk, expect', [
+    pytest.param(PackedFormat(4, 96, 3), 'abc', 1 + (2 * 4) + (3 * 16), id='chunk="abc"'),
+    pytest.param(PackedFormat(4, 96, 3), 'cca', 3 + (3 * 4) + (1 * 16), id='chunk="cca"'),
+    pytest.param(PackedFormat(256, 0, 2), 'Hi', ord('H') + (ord('i') * 256), id='chunk="Hi"'),
+])
+def test_packed_format_pack(packed_format, chunk, expect):
+    assert packed_format.pack(chunk) == expect
+
+
+def test_init():
+    gen = PackedCommandGenerator(False, 1000, 11)
+
+    assert gen._debug is False
+    assert gen.delta is False
+
+    # OptimalCommandGeneratorと表を共有する
+    assert gen.table is OptimalCommandGenerator(False, 1000, 11).table
+
+
+@pytest.mark.parametrize('message, expect', [
+    pytest.param('', None, id='message=""'),
+    pytest.param('A', None, id='message="A"'),
+    pytest.param('abc' * 20, PackedFormat(4, 96, 3), id='message="abc" * 20'),
+    pytest.param('0123456789' * 30, PackedFormat(11, 47, 3), id='message="0123456789" * 30'),
+    pytest.param('こんにちは世界' * 5, PackedFormat(17659, 12370, 1),
+                 id='message="こんにちは世界" * 5'),
+])
+def test__select_format(message, expect):
+    gen = PackedCommandGenerator(False)
+
+    commands_num = len(OptimalCommandGenerator(False).generate(message))
+    assert gen._select_format(message, commands_num) == expect
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('A', id='message="A"'),
+    pytest.param('Hello World!', id='message="Hello World!"'),
+    pytest.param('abc' * 20 + 'ab', id='message="abc" * 20 + "ab"'),
+    pytest.param('0123456789' * 30, id='message="0123456789" * 30'),
+    pytest.param('It was the best of times, it was the worst of times.',
+                 id='message="It was the best of times, ..."'),
+    pytest.param('こんにちは世界' * 5, id='message="こんにちは世界" * 5'),
+    pytest.param('  ' * 20, id='message="  " * 20'),
+])
+def test_generate(message):
+    gen = PackedCommandGenerator(False)
+    commands = gen.generate(message)
+
+    assert commands[:1] == [Command.NONE]
+
+    # ループを実行して出力したメッセージ、およびstack
+    output, stack, _ = execute(commands)
+    assert output == message
+    assert stack == []
+
+    # パックした場合はコマンド数が減少し、パックしない場合はOptimalCommandGeneratorと同一
+    optimal_commands = OptimalCommandGenerator(False).generate(message)
+    if Command.LOOP_BEGIN in commands:
+        assert commands.count(Command.LOOP_BEGIN) == 1
+        assert len(commands) < len(optimal_commands)
+    else:
+        assert commands == optimal_commands
+
+
+def test_generate_unpack():
+    message = '0123456789' * 30
+    commands = PackedCommandGenerator(False).generate(message)
+
+    # 3文字ごとにパックした整数から、ループ本体で3文字を取り出して出力する
+    body = commands[commands.index(Command.LOOP_BEGIN) + 1:commands.index(Command.LOOP_END)]
+    assert body.count(Command.MOD) == 2
+    assert body.count(Command.DIVIDE) == 2
+    assert body.count(Command.OUT_CHAR) == 3
+    assert commands.count(Command.OUT_CHAR) == 3
+
+    assert execute(commands)[:2] == (message, [])
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('Hello Piet World! ' * 5, id='message="Hello Piet World! " * 5'),
+    pytest.param('0123456789' * 30 + '01', id='message="0123456789" * 30 + "01"'),
+])
+def test_generate_delta(message):
+    gen = PackedCommandGenerator(False, delta=True)
+    commands = gen.generate(message)
+
+    assert execute(commands)[:2] == (message, [])
+
+    # 残りの文字、およびパックしないメッセージは差分で構築する
+    assert len(commands) <= len(OptimalCommandGenerator(False, delta=True).generate(message))
+
+
+def test_generate_interleave():
+    message = '0123456789' * 300
+    gen = PackedCommandGenerator(False, interleave=True)
+    commands = gen.generate(message)
+
+    # パックした整数を _INTERLEAVE_CHUNKS_MAX 個ごとに格納して出力する
+    output, stack, remain = execute(commands)
+    assert output == message
+    assert stack == []
+    assert remain <= PackedCommandGenerator._INTERLEAVE_CHUNKS_MAX + 1
+    assert commands.count(Command.LOOP_BEGIN) > 1
+
+    # 文字ごとに出力する場合よりもコマンド数が減少する
+    assert len(commands) < len(OptimalCommandGenerator(False, interleave=True).generate(message))
+
+
+def test_generate_raises_generate_command_error():
+    gen = PackedCommandGenerator(False)
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("A\0")
+
+    with pytest.raises(GenerateCommandError):
+        _ = gen.generate("\0" * 10)
@@ -1,6 +1,8 @@
+import random
 
 import pytest
 
+from pietgenerator.codel_grid import CodelGrid
 from pietgenerator.command_layouter.command_layouter import ICommandLayouter
 from pietgenerator.command_layouter.command_layouter import LayoutCommand
 from pietgenerator.command_layouter.command_layouter import LayoutCommandError
@@ -32,8 +34,8 @@ def test_layout_command_str(command, expect):
 
 
 class TestCommandLayouter(ICommandLayouter):
-    def __init__(self, debug, trace):
-        super().__init__(debug, trace)
+    def __init__(self, debug, trace, seed=None):
+        super().__init__(debug, trace, seed)
     
     def _do_layout_impl(self, commands, start_color, abort_program_color):
         return super()._do_layout_impl(commands, start_color, abort_program_color)
@@ -47,6 +49,39 @@ def test_i_command_Layouter_init():
     gen = TestCommandLayouter(False, True)
     assert gen._debug is False
     assert gen._trace is True
+    assert isinstance(gen._random, random.Random)
+
+    rand = random.Random(0)
+    gen = TestCommandLayouter(False, False, rand)
+    assert gen._random is rand
+
+
+class RandomCommandLayouter(ICommandLayouter):
+    def _do_layout_impl(self, commands, start_color, abort_program_color):
+        grid = CodelGrid(len(commands), 1)
+        for x in range(len(commands)):
+            grid.set_color(x, 0, self._get_random_color(rand=self._random))
+        return grid
+
+
+def _layout_colors(layouter):
+    grid = layouter.do_layout([Command.PUSH] * 20, Color.RED, Color.RED)
+    return [grid.get_color(x, 0) for x in range(grid.width)]
+
+
+def test_i_command_Layouter_do_layout_seed():
+    layouter = RandomCommandLayouter(False, False, 1)
+    expect = _layout_colors(layouter)
+
+    # seedにintを指定した場合は、do_layoutごとに乱数を初期化する
+    assert _layout_colors(layouter) == expect
+    assert _layout_colors(RandomCommandLayouter(False, False, 1)) == expect
+    assert _layout_colors(RandomCommandLayouter(False, False, 2)) != expect
+
+    # 乱数生成器を指定した場合は、乱数を初期化せずに使用する
+    layouter = RandomCommandLayouter(False, False, random.Random(1))
+    assert _layout_colors(layouter) == expect
+    assert _layout_colors(layouter) != expect
 
 
 def test_i_command_Layouter_do_layout_raise_not_implemented_error():
@@ -304,6 +339,10 @@ def test_i_command_Layouter__is_conflict(x, y, color, codels, expect):
 
         assert expect == actual
 
+        actual = ICommandLayouter._is_conflict(color, CodelGrid.from_codels(grid), x, y)
+
+        assert expect == actual
+
 
 
 @pytest.mark.parametrize('grid, expect', [
@@ -317,6 +356,10 @@ def test_i_command_Layouter__is_fill_all(grid, expect):
 
     assert expect == actual
 
+    actual = ICommandLayouter._is_fill_all(CodelGrid.from_codels(grid))
+
+    assert expect == actual
+
 
 @pytest.mark.parametrize('exclueds, expects', [
     pytest.param(
@@ -367,6 +410,41 @@ def test_i_command_Layouter__get_random_color(exclueds, expects):
         assert actual in expects
 
 
+@pytest.mark.parametrize('exclueds, exclude_mask, expects', [
+    pytest.param(
+        None,
+        (1 << Color.LIGHT_RED.index) | (1 << Color.RED.index),
+        [
+            Color.LIGHT_YELLOW, Color.LIGHT_GREEN, Color.LIGHT_CYAN, Color.LIGHT_BLUE, Color.LIGHT_MAGENTA,
+            Color.YELLOW, Color.GREEN, Color.CYAN, Color.BLUE, Color.MAGENTA,
+            Color.DARK_RED, Color.DARK_YELLOW, Color.DARK_GREEN, Color.DARK_CYAN, Color.DARK_BLUE, Color.DARK_MAGENTA
+        ],
+        id='exclude_mask=LIGHT_RED, RED'),
+    pytest.param(
+        [Color.BLUE],
+        ((1 << 18) - 1) & ~((1 << Color.BLUE.index) | (1 << Color.DARK_BLUE.index)),
+        [Color.DARK_BLUE],
+        id='exclude=BLUE exclude_mask=other than BLUE, DARK_BLUE'),
+])
+def test_i_command_Layouter__get_random_color_exclude_mask(exclueds, exclude_mask, expects):
+    for _ in range(1000):
+        actual = ICommandLayouter._get_random_color(exclueds, exclude_mask)
+        assert actual in expects
+
+
+@pytest.mark.parametrize('index', range(18))
+def test_i_command_Layouter__get_random_color_exclude_mask_index(index):
+    # bitが立っていない唯一の色が選択されるかテスト
+    actual = ICommandLayouter._get_random_color(None, ((1 << 18) - 1) & ~(1 << index))
+
+    assert actual.index == index
+
+
+def test_i_command_Layouter__get_random_color_exclude_mask_raises_runtime_error():
+    with pytest.raises(RuntimeError):
+        _ = ICommandLayouter._get_random_color([Color.RED], (1 << 18) - 1 - (1 << Color.RED.index))
+
+
 @pytest.mark.parametrize('exclueds', [
     pytest.param(
         [
@@ -426,6 +504,18 @@ def test_i_command_Layouter__get_random_command(exclueds, expects):
         assert actual in expects
 
 
+def test_i_command_Layouter__get_random_rand():
+    rand1 = random.Random(0)
+    rand2 = random.Random(0)
+
+    # 同一のseedの乱数生成器からは、同一の色 / コマンドを取得する
+    for _ in range(100):
+        assert (ICommandLayouter._get_random_color([Color.RED], 1 << Color.BLUE.index, rand1) is
+                ICommandLayouter._get_random_color([Color.RED], 1 << Color.BLUE.index, rand2))
+        assert (ICommandLayouter._get_random_command([Command.POP], 0, rand1) is
+                ICommandLayouter._get_random_command([Command.POP], 0, rand2))
+
+
 @pytest.mark.parametrize('exclueds', [
     pytest.param(
         [
@@ -438,3 +528,37 @@ def test_i_command_Layouter__get_random_command_raise_runtime_error(exclueds):
     for _ in range(10000):
         with pytest.raises(RuntimeError):
             _ = ICommandLayouter._get_random_command(exclueds)
+
+
+def test_i_command_Layouter__get_random_command_exclude_mask():
+    exclude_mask = (1 << Command.PUSH.command_id) | (1 << Command.DUPLICATE.command_id)
+
+    for _ in range(1000):
+        actual = ICommandLayouter._get_random_command([Command.POP], exclude_mask)
+        assert actual in [
+            Command.ADD, Command.SUBTRACT, Command.MULTIPLY,
+            Command.DIVIDE, Command.MOD, Command.NOT, Command.GREATER
+        ]
+
+    # 選択対象外のコマンドのbitは無視する
+    all_mask = sum(1 << command.command_id for command in Command if command.command_id < 18)
+    actual = ICommandLayouter._get_random_command(
+        None, all_mask & ~(1 << Command.NOT.command_id) & ~(1 << Command.POINTER.command_id))
+
+    assert actual is Command.NOT
+
+    with pytest.raises(RuntimeError):
+        _ = ICommandLayouter._get_random_command(None, all_mask)
+
+
+@pytest.mark.parametrize('mask', [0b1, 0b1000, 0b10110, (1 << 18) - 1, 0b101 << 40])
+def test_i_command_Layouter__choice_bit(mask):
+    positions = [i for i in range(mask.bit_length()) if (mask >> i) & 1]
+    rand1 = random.Random(0)
+    rand2 = random.Random(0)
+
+    # 立っているbitの位置の昇順のリストからrandom.choiceで選択した場合と同一となるかテスト
+    actuals = [ICommandLayouter._choice_bit(mask, rand1) for _ in range(1000)]
+
+    assert actuals == [rand2.choice(positions) for _ in range(1000)]
+    assert set(actuals) == set(positions)
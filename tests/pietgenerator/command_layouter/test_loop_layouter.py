@@ -0,0 +1,313 @@
+import random
+
+import pytest
+
+from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
+from pietgenerator.command_generator.loop_generator import LoopCommandGenerator
+from pietgenerator.command_generator.packed_generator import PackedCommandGenerator
+from pietgenerator.piet_common import CodelChooser
+from pietgenerator.piet_common import Color
+from pietgenerator.piet_common import Command
+from pietgenerator.piet_common import DirectionPointer
+from pietgenerator.piet_common import get_command_from_color
+from pietgenerator.command_layouter.command_layouter import LayoutCommandError
+from pietgenerator.command_layouter.loop_layouter import GridResizeError
+from pietgenerator.command_layouter.loop_layouter import LoopLayouter
+from pietgenerator.command_layouter.square_layouter import FillMode, SquareLayouter
+
+
+def _get_block(grid, x, y):
+    color = grid.get_color(x, y)
+    block = {(x, y)}
+    stack = [(x, y)]
+
+    while stack:
+        x, y = stack.pop(-1)
+        for dp in DirectionPointer:
+            nx = x + dp.dx
+            ny = y + dp.dy
+            if (0 <= nx < grid.width) and (0 <= ny < grid.height) and \
+                    ((nx, ny) not in block) and (grid.get_color(nx, ny) is color):
+                block.add((nx, ny))
+                stack.append((nx, ny))
+
+    return block
+
+
+def _get_exit(block, dp, cc):
+    # DPの方向の最も遠い辺のうち、CCの方向の最も遠いCodel
+    cc_dp = DirectionPointer.rotate(dp, 1 if cc is CodelChooser.RIGHT else 3)
+    edge = max((x * dp.dx) + (y * dp.dy) for x, y in block)
+
+    return max(((x, y) for x, y in block if (x * dp.dx) + (y * dp.dy) == edge),
+               key=lambda pos: (pos[0] * cc_dp.dx) + (pos[1] * cc_dp.dy))
+
+
+def _run(grid, max_steps=200000):
+    # Pietの仕様に従い、gridのプログラムを停止するまで実行する
+    def _is_blocked(x, y):
+        return not ((0 <= x < grid.width) and (0 <= y < grid.height)) or \
+            (grid.get_color(x, y) is Color.BLACK)
+
+    stack = []
+    output = []
+    x = 0
+    y = 0
+    dp = DirectionPointer.RIGHT
+    cc = CodelChooser.LEFT
+
+    for _ in range(max_steps):
+        color = grid.get_color(x, y)
+        block = _get_block(grid, x, y)
+
+        for attempt in range(8):
+            exit_x, exit_y = _get_exit(block, dp, cc)
+            if not _is_blocked(exit_x + dp.dx, exit_y + dp.dy):
+                break
+
+            if attempt % 2 == 0:
+                cc = CodelChooser.switch(cc, 1)
+            else:
+                dp = DirectionPointer.rotate(dp, 1)
+        else:
+            # 停止
+            return "".join(output), stack
+
+        x = exit_x + dp.dx
+        y = exit_y + dp.dy
+        next_color = grid.get_color(x, y)
+
+        if next_color is Color.WHITE:
+            # 白色のCodelは直進して通過する (本配置器は白色の先で行き止まりとならない)
+            while grid.get_color(x, y) is Color.WHITE:
+                x += dp.dx
+                y += dp.dy
+                assert not _is_blocked(x, y)
+            continue
+
+        command = get_command_from_color(color, next_color)
+
+        try:
+            if command is Command.PUSH:
+                stack.append(len(block))
+            elif command is Command.POP:
+                stack.pop(-1)
+            elif command in [Command.ADD, Command.SUBTRACT, Command.MULTIPLY,
+                             Command.DIVIDE, Command.MOD, Command.GREATER]:
+                value1 = stack.pop(-1)
+                value2 = stack.pop(-1)
+                if command is Command.ADD:
+                    stack.append(value2 + value1)
+                elif command is Command.SUBTRACT:
+                    stack.append(value2 - value1)
+                elif command is Command.MULTIPLY:
+                    stack.append(value2 * value1)
+                elif command is Command.DIVIDE:
+                    stack.append(value2 // value1)
+                elif command is Command.MOD:
+                    stack.append(value2 % value1)
+                else:
+                    stack.append(1 if value2 > value1 else 0)
+            elif command is Command.NOT:
+                stack.append(1 if stack.pop(-1) == 0 else 0)
+            elif command is Command.POINTER:
+                dp = DirectionPointer.rotate(dp, stack.pop(-1))
+            elif command is Command.SWITCH:
+                cc = CodelChooser.switch(cc, stack.pop(-1))
+            elif command is Command.DUPLICATE:
+                stack.append(stack[-1])
+            elif command is Command.ROLL:
+                stack.pop(-1)
+                stack.pop(-1)
+            elif command is Command.OUT_NUMBER:
+                output.append(str(stack.pop(-1)))
+            elif command is Command.OUT_CHAR:
+                output.append(chr(stack.pop(-1)))
+            else:
+                # IN_NUMBER / IN_CHARは配置しない
+                assert False
+        except (IndexError, ZeroDivisionError):
+            # 実行できないコマンドは無視する
+            pass
+
+    assert False
+
+
+def _assert_no_conflict(layouter, grid, abort_program_color):
+    # 停止用プログラム以外のセルに競合がないかテスト
+    for y in range(grid.height):
+        for x in range(grid.width):
+            color = grid.get_color(x, y)
+            if (color is not abort_program_color) or (y < grid.height - 3):
+                assert not layouter._is_conflict(color, grid, x, y)
+
+
+def test_grid_resize_error():
+    grid_resize_error = GridResizeError(13, 20)
+
+    assert isinstance(grid_resize_error, LayoutCommandError)
+    assert grid_resize_error.w == 13
+    assert grid_resize_error.h == 20
+    assert str(grid_resize_error) == "GridResizeError: grid is too small. next w=13 h=20"
+
+
+def test_loop_layouter_init():
+    layouter = LoopLayouter()
+
+    assert layouter._debug is True
+    assert layouter._trace is False
+    assert layouter._fill_mode is FillMode.PATTERN
+    assert layouter.layout_attempts == 0
+
+
+@pytest.mark.parametrize('message, start_color, abort_program_color', [
+    pytest.param('A', Color.LIGHT_RED, Color.DARK_MAGENTA, id='message="A"'),
+    pytest.param('Hello World!', Color.CYAN, Color.GREEN, id='message="Hello World!"'),
+    pytest.param('>' + '-=' * 20 + '<', Color.DARK_MAGENTA, Color.LIGHT_RED,
+                 id='message=">-=-=...<"'),
+    pytest.param('Hello World! ' * 10, Color.YELLOW, Color.BLUE,
+                 id='message="Hello World! " * 10'),
+    pytest.param('=' * 40 + '\n Title \n' + '=' * 40 + '\n' + 'xy' * 30, Color.LIGHT_BLUE,
+                 Color.DARK_RED, id='message="=== Title ===..."'),
+])
+def test_do_layout(message, start_color, abort_program_color):
+    commands = LoopCommandGenerator(False).generate(message)
+
+    layouter = LoopLayouter(False, False, seed=0)
+    grid = layouter.do_layout(commands, start_color, abort_program_color)
+
+    # プログラムがループを実行してメッセージを出力し、停止用プログラムで停止するかテスト
+    # (停止用プログラムへの移動で実行するコマンドにより、stackには値が残る)
+    assert _run(grid)[0] == message
+    assert grid.get_color(0, 0) is start_color
+    if Command.LOOP_BEGIN in commands:
+        # ループを含まないコマンドは、SquareLayouterで配置する
+        _assert_no_conflict(layouter, grid, abort_program_color)
+
+
+def test_do_layout_countdown():
+    # 4から1まで数値を出力するループ
+    commands = [
+        Command.NONE,
+        Command.PUSH, Command.DUPLICATE, Command.ADD, Command.DUPLICATE, Command.ADD,
+        Command.LOOP_BEGIN,
+        Command.DUPLICATE, Command.OUT_NUMBER,
+        Command.PUSH, Command.SUBTRACT, Command.DUPLICATE,
+        Command.LOOP_END,
+        Command.POP,
+    ]
+
+    layouter = LoopLayouter(False, False, seed=1)
+    grid = layouter.do_layout(commands, Color.LIGHT_GREEN, Color.RED)
+
+    assert _run(grid)[0] == "4321"
+
+
+@pytest.mark.parametrize('fill_mode', [FillMode.PATTERN, FillMode.RANDOM])
+def test_do_layout_fill_mode(fill_mode):
+    message = '*' * 30 + ' Piet ' + '*' * 30
+    commands = LoopCommandGenerator(False).generate(message)
+
+    layouter = LoopLayouter(False, False, seed=2, fill_mode=fill_mode)
+    grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.DARK_BLUE)
+
+    assert _run(grid)[0] == message
+    _assert_no_conflict(layouter, grid, Color.DARK_BLUE)
+
+
+@pytest.mark.parametrize('message', [
+    pytest.param('0123456789' * 30 + '0', id='message="0123456789" * 30 + "0"'),
+    pytest.param('It was the best of times, it was the worst of times.',
+                 id='message="It was the best of times, ..."'),
+])
+def test_do_layout_packed(message):
+    commands = PackedCommandGenerator(False).generate(message)
+    assert Command.LOOP_BEGIN in commands
+
+    # パックした整数をDIVIDE / MODで取り出すループを配置できるかテスト
+    layouter = LoopLayouter(False, False, seed=5)
+    grid = layouter.do_layout(commands, Color.LIGHT_MAGENTA, Color.YELLOW)
+
+    assert _run(grid)[0] == message
+    _assert_no_conflict(layouter, grid, Color.YELLOW)
+
+
+def test_do_layout_packed_interleave():
+    message = '0123456789' * 70
+    commands = PackedCommandGenerator(False, interleave=True).generate(message)
+    assert commands.count(Command.LOOP_BEGIN) > 1
+
+    # パックした整数を分割して出力する、連続したループを配置できるかテスト
+    layouter = LoopLayouter(False, False, seed=5)
+    grid = layouter.do_layout(commands, Color.LIGHT_MAGENTA, Color.YELLOW)
+
+    assert _run(grid)[0] == message
+    _assert_no_conflict(layouter, grid, Color.YELLOW)
+
+
+def test_do_layout_without_loop():
+    message = 'Hello Piet World!'
+    commands = FactorizeCommandGenerator(False).generate(message)
+
+    # ループを含まないコマンドは、SquareLayouterで配置するかテスト
+    layouter = LoopLayouter(False, False, seed=3)
+    grid = layouter.do_layout(commands, Color.CYAN, Color.MAGENTA)
+    expect = SquareLayouter(False, False, seed=random.Random(3)).do_layout(commands,
+                                                                          Color.CYAN,
+                                                                          Color.MAGENTA)
+
+    assert grid.to_index_rows() == expect.to_index_rows()
+    assert layouter.layout_attempts == 0
+
+
+def test_do_layout_seed():
+    commands = LoopCommandGenerator(False).generate('Hello Piet World! ' * 4)
+
+    def _layout(seed):
+        grid = LoopLayouter(False, False, seed).do_layout(
+            list(commands), Color.LIGHT_RED, Color.LIGHT_GREEN)
+        return grid.to_index_rows()
+
+    # 同一のseedでは、同一のgridとなるかテスト
+    expect = _layout(0)
+
+    assert _layout(0) == expect
+    assert _layout(1) != expect
+
+
+def test_do_layout_long_loop_body():
+    # gridの幅より長いループ本体は、複数の行にわたって配置する
+    message = 'The quick brown fox. ' * 10
+    commands = LoopCommandGenerator(False).generate(message)
+    assert Command.LOOP_BEGIN in commands
+
+    layouter = LoopLayouter(False, False, seed=4)
+    grid = layouter.do_layout(commands, Color.LIGHT_YELLOW, Color.DARK_CYAN)
+
+    body_length = commands.index(Command.LOOP_END) - commands.index(Command.LOOP_BEGIN) - 1
+    assert grid.width < body_length
+    assert layouter.layout_attempts == 1
+    assert _run(grid)[0] == message
+    _assert_no_conflict(layouter, grid, Color.DARK_CYAN)
+
+
+@pytest.mark.parametrize('commands', [
+    pytest.param([Command.NONE, Command.PUSH, Command.LOOP_BEGIN, Command.LOOP_BEGIN,
+                  Command.LOOP_END, Command.LOOP_END], id='nested'),
+    pytest.param([Command.NONE, Command.PUSH, Command.LOOP_END], id='without LOOP_BEGIN'),
+    pytest.param([Command.NONE, Command.PUSH, Command.LOOP_BEGIN], id='without LOOP_END'),
+])
+def test_do_layout_raise_layout_command_error(commands):
+    layouter = LoopLayouter(False, False)
+
+    with pytest.raises(LayoutCommandError):
+        _ = layouter.do_layout(commands, Color.LIGHT_RED, Color.DARK_MAGENTA)
+
+
+@pytest.mark.parametrize('commands, expect', [
+    pytest.param([Command.NONE, Command.PUSH], {}, id='no loop'),
+    pytest.param([Command.NONE, Command.LOOP_BEGIN, Command.PUSH, Command.LOOP_END,
+                  Command.LOOP_BEGIN, Command.LOOP_END], {1: 3, 4: 5}, id='two loops'),
+])
+def test__find_loops(commands, expect):
+    assert LoopLayouter._find_loops(commands) == expect
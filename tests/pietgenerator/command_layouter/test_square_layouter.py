@@ -1,9 +1,11 @@
 
 import copy
 import random
+import types
 
 import pytest
 
+from pietgenerator.codel_grid import CodelGrid
 from pietgenerator.command_generator.factorize_generator import FactorizeCommandGenerator
 from pietgenerator.piet_common import Codel
 from pietgenerator.piet_common import Color
@@ -12,7 +14,10 @@ from pietgenerator.piet_common import DirectionPointer
 from pietgenerator.piet_common import get_command_from_color
 from pietgenerator.command_layouter.command_layouter import LayoutCommand
 from pietgenerator.command_layouter.command_layouter import LayoutCommandError
+from pietgenerator.command_layouter.square_layouter import FillMode
 from pietgenerator.command_layouter.square_layouter import GridTooSmallError
+from pietgenerator.command_layouter.square_layouter import LayoutCancelledError
+from pietgenerator.command_layouter.square_layouter import LayoutGeometry
 from pietgenerator.command_layouter.square_layouter import SquareLayouter
 
 
@@ -28,6 +33,16 @@ def test_grid_too_small_error_init():
     assert grid_too_small_error._h == h
     assert grid_too_small_error._x == x
     assert grid_too_small_error._y == y
+    assert grid_too_small_error.command_index is None
+
+    grid_too_small_error = GridTooSmallError(w, h, x, y, 5)
+
+    assert grid_too_small_error.command_index == 5
+    assert grid_too_small_error.used_cells is None
+
+    grid_too_small_error = GridTooSmallError(w, h, x, y, 5, 6)
+
+    assert grid_too_small_error.used_cells == 6
 
 
 def test_grid_too_small_error_str():
@@ -46,6 +61,39 @@ def test_square_layouter_init():
 
     assert layouter._debug is True
     assert layouter._trace is False
+    assert layouter._workers == 1
+    assert layouter._fill_mode is FillMode.PATTERN
+
+
+@pytest.mark.parametrize('fill_mode, name', [
+    pytest.param(FillMode.PATTERN, 'PATTERN', id='PATTERN'),
+    pytest.param(FillMode.RANDOM,  'RANDOM',  id='RANDOM'),
+])
+def test_fill_mode(fill_mode, name):
+    assert str(fill_mode) == name
+    assert FillMode.name_of(name) is fill_mode
+
+
+def test_fill_mode_name_of_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = FillMode.name_of('NONE')
+
+
+def test_fill_pattern():
+    pattern = SquareLayouter._FILL_PATTERN
+    h = len(pattern)
+    w = len(pattern[0])
+
+    # 敷き詰めた模様の上下左右の色が常に異なるかテスト
+    for y in range(h):
+        for x in range(w):
+            assert pattern[y][x] is not pattern[y][(x + 1) % w]
+            assert pattern[y][x] is not pattern[(y + 1) % h][x]
+
+
+def test_square_layouter_init_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = SquareLayouter(workers=0)
 
 
 def _inspect_layout(layouter, grid, expect_commands, start_color, abort_program_color):
@@ -222,6 +270,80 @@ def test_do_layout(message, start_color, abort_program_color):
                     assert False
 
 
+@pytest.mark.parametrize('message, start_color, abort_program_color', [
+    pytest.param('Hello World!', Color.CYAN, Color.GREEN, id='message="Hello World!"'),
+    pytest.param('Hello Piet World!' * 8, Color.LIGHT_RED, Color.LIGHT_GREEN, id='message="Hello Piet World!" * 8'),
+])
+def test_do_layout_parallel(message, start_color, abort_program_color):
+    gen = FactorizeCommandGenerator(False)
+
+    commands = gen.generate(message)
+    message_commands = copy.copy(commands)
+
+    layouter = SquareLayouter(False, False, workers=3)
+    grid = layouter.do_layout(commands, start_color, abort_program_color)
+
+    # プログラムが停止プログラムに到達しメッセージ用コマンドがcommandsの順に配置されているかテスト
+    _inspect_layout(layouter, grid, message_commands, start_color, abort_program_color)
+
+    assert grid[0][0].color is start_color
+    assert layouter.layout_attempts >= 3
+    assert layouter.checkpoints[0] == (0, 0, 0, DirectionPointer.RIGHT, start_color, 0)
+
+    # 停止用プログラム以外のセルに競合がないかテスト
+    initial_grid = layouter._create_grid(len(grid[0]), len(grid), abort_program_color)
+
+    for y in range(len(grid)):
+        for x in range(len(grid[0])):
+            if not initial_grid[y][x]:
+                assert not layouter._is_conflict(grid[y][x].color, grid, x, y)
+            else:
+                assert grid[y][x].color is initial_grid[y][x].color
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_do_layout_seed(workers):
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+
+    def _layout(seed):
+        grid = SquareLayouter(False, False, workers, seed).do_layout(
+            list(commands), Color.LIGHT_RED, Color.LIGHT_GREEN)
+        return grid.to_index_rows()
+
+    # 同一のseedでは、同一のgridとなるかテスト
+    expect = _layout(0)
+
+    assert _layout(0) == expect
+    assert _layout(1) != expect
+
+
+def test__try_layout_seed():
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+    w, _ = SquareLayouter(False, False)._predict_grid_size(commands)
+    w += 1
+
+    # 試行の結果は、それまでの試行によらず配置のseedとgridの幅のみで定まるかテスト
+    actuals = []
+    for prior_attempt in [False, True]:
+        layouter = SquareLayouter(False, False)
+        layouter._layout_seed = 12345
+        if prior_attempt:
+            layouter._try_layout(commands, w + 1, w + 1, Color.LIGHT_RED, Color.LIGHT_GREEN)
+        grid, *_ = layouter._try_layout(commands, w, w, Color.LIGHT_RED, Color.LIGHT_GREEN)
+        actuals.append(grid.to_index_rows())
+
+    assert actuals[0] == actuals[1]
+
+
+def test_do_layout_loop_commands_raise_layout_command_error():
+    # ループ(LOOP_BEGIN / LOOP_ENDコマンド)は配置できない
+    commands = [Command.NONE, Command.PUSH, Command.LOOP_BEGIN, Command.DUPLICATE,
+                Command.LOOP_END, Command.POP]
+
+    with pytest.raises(LayoutCommandError):
+        _ = SquareLayouter(False, False).do_layout(commands, Color.LIGHT_RED, Color.DARK_MAGENTA)
+
+
 def test_do_layout_too_long_message(mocker):
     message = "".join([chr(random.randrange(1, 256)) for _ in range(1000)])
     start_color = Color.LIGHT_RED
@@ -324,6 +446,184 @@ def test__do_layout_expand_grid(side_effect__put_commands, side_effect__put_comm
     assert expect_h == len(grid[0])
 
 
+@pytest.mark.parametrize('side_effect__put_commands, expect_w, expect_attempts', [
+    pytest.param(
+        [GridTooSmallError(0, 0, 7, 7, 10),
+         (0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED),
+         GridTooSmallError(0, 0, 9, 9, 10),
+         (0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)],
+        10, 4, id='estimate: 11 bisect: 9 (ng) -> 10 (ok)'),
+    pytest.param(
+        [GridTooSmallError(0, 0, 7, 7, 10),
+         (0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED),
+         (0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED),
+         (0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)],
+        8, 4, id='estimate: 11 bisect: 9 (ok) -> 8 (ok)'),
+])
+def test__do_layout_estimate_grid(side_effect__put_commands, expect_w, expect_attempts, mocker):
+    layouter = SquareLayouter()
+
+    mocker.patch.object(layouter, "_predict_grid_size", mocker.MagicMock(return_value=(7, 7)))
+    mocker.patch.object(layouter, "_estimate_grid_size", mocker.MagicMock(return_value=11))
+    mocker.patch.object(layouter, "_put_codels", mocker.MagicMock(side_effect=side_effect__put_commands))
+    mocker.patch.object(layouter, "_put_codels_to_abort_area", mocker.MagicMock(return_value=(0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)))
+    mocker.patch.object(layouter, "_put_codels_to_abort_program", mocker.MagicMock(return_value=(0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)))
+    mocker.patch.object(layouter, "_put_to_empty_cells", mocker.MagicMock())
+    mocker.patch.object(layouter, "_is_fill_all", mocker.MagicMock(return_value=True))
+
+    grid = layouter.do_layout([], Color.LIGHT_RED, Color.LIGHT_GREEN)
+
+    assert expect_w == len(grid)
+    assert expect_w == len(grid[0])
+    assert expect_attempts == layouter.layout_attempts
+
+
+@pytest.mark.parametrize('w, failed_w, result_w, has_failed, expect', [
+    pytest.param(10, 6,  0,  False, [8, 9, 10, 11],   id='predict: 10'),
+    pytest.param(8,  6,  0,  False, [7, 8, 9, 10],    id='predict: 8 min: 7'),
+    pytest.param(14, 12, 0,  True,  [13, 14, 15, 16], id='estimate: 14 failed: 12'),
+    pytest.param(10, 6,  9,  False, [],               id='ok: 9'),
+    pytest.param(14, 12, 13, True,  [],               id='failed: 12 ok: 13'),
+    pytest.param(16, 12, 16, True,  [13, 14, 15],     id='failed: 12 ok: 16'),
+    pytest.param(30, 12, 30, True,  [13, 17, 21, 25], id='failed: 12 ok: 30'),
+])
+def test__get_candidate_sizes(w, failed_w, result_w, has_failed, expect):
+    layouter = SquareLayouter(False, False, workers=4)
+
+    assert layouter._get_candidate_sizes(w, failed_w, result_w, has_failed) == expect
+
+
+def test__put_codels_cancelled():
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+    layouter = SquareLayouter(False, False)
+    w, h = layouter._predict_grid_size(commands)
+
+    # より小さいgridへの配置が成功した場合は中断する
+    layouter._cancel_w = types.SimpleNamespace(value=w - 1)
+    grid = layouter._create_grid(w, h, Color.LIGHT_GREEN)
+
+    with pytest.raises(LayoutCancelledError):
+        layouter._put_codels(list(commands), grid, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)
+
+    # 配置に成功したgridがない場合は中断しない
+    layouter._cancel_w = types.SimpleNamespace(value=0)
+    w += 2
+    h += 2
+    grid = layouter._create_grid(w, h, Color.LIGHT_GREEN)
+
+    layouter._put_codels(list(commands), grid, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)
+
+
+@pytest.mark.parametrize('command_num', [
+    pytest.param(0,     id='0'),
+    pytest.param(100,   id='100'),
+    pytest.param(2000,  id='2000'),
+    pytest.param(20000, id='20000'),
+])
+def test__get_min_grid_size(command_num):
+    layouter = SquareLayouter()
+
+    actual = layouter._get_min_grid_size(command_num)
+
+    assert actual >= 7
+    assert layouter._count_spiral_cells(actual, actual) >= command_num
+
+    if actual > 7:
+        assert layouter._count_spiral_cells(actual - 1, actual - 1) < command_num
+
+
+def test__count_spiral_cells():
+    layouter = SquareLayouter()
+
+    # 7x7: 上端 / 右端 / 下端 の3ライン (7 + 6 + 6 セル) から回転用の2セルずつを除外
+    # 左端のラインの先頭は停止用プログラムへの移動領域となる
+    assert layouter._count_spiral_cells(7, 7) == (7 - 2) + (6 - 2) + (6 - 2)
+
+    cells = [layouter._count_spiral_cells(w, w) for w in range(7, 60)]
+
+    assert cells == sorted(cells)
+
+
+@pytest.mark.parametrize('command_index, expect', [
+    pytest.param(None, 21, id='command_index=None'),
+    pytest.param(0,    21, id='command_index=0'),
+])
+def test__estimate_grid_size_unknown(command_index, expect):
+    layouter = SquareLayouter()
+
+    actual = layouter._estimate_grid_size(1000, 20, 20, GridTooSmallError(20, 20, 0, 0, command_index))
+
+    assert expect == actual
+
+
+def test__estimate_grid_size():
+    layouter = SquareLayouter()
+    w = 20
+    cells = layouter._count_spiral_cells(w, w)
+
+    # 螺旋上のセルの半分しかコマンドを配置できなかった場合は、セル数が約2倍となるサイズとなる
+    actual = layouter._estimate_grid_size(cells, w, w, GridTooSmallError(w, w, 0, 0, cells // 2))
+
+    assert layouter._count_spiral_cells(actual, actual) >= cells * 2
+    assert layouter._count_spiral_cells(actual - 1, actual - 1) < cells * 2
+
+
+def test__estimate_grid_size_used_cells():
+    layouter = SquareLayouter()
+    w = 20
+    cells = layouter._count_spiral_cells(w, w)
+
+    # 螺旋の途中で中断した場合は、中断までに使用したセル数から見積もる
+    actual = layouter._estimate_grid_size(cells, w, w, GridTooSmallError(w, w, 0, 0, 50, 100))
+
+    assert layouter._count_spiral_cells(actual, actual) >= cells * 2
+    assert layouter._count_spiral_cells(actual - 1, actual - 1) < cells * 2
+
+
+def test__put_codels_checkpoints():
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+    layouter = SquareLayouter(False, False)
+    w, h = layouter._predict_grid_size(commands)
+    w += 2
+    h += 2
+
+    grid = layouter._create_grid(w, h, Color.LIGHT_GREEN)
+    layouter._put_codels(list(commands), grid, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)
+
+    checkpoints = layouter.checkpoints
+
+    assert len(checkpoints) >= 2
+    assert checkpoints[0] == (0, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED, 0)
+
+    for ring, checkpoint in enumerate(checkpoints):
+        # 1周ごとに内側の周回の開始位置となる
+        assert (checkpoint.x, checkpoint.y) == (ring, ring)
+        assert checkpoint.dp is DirectionPointer.RIGHT
+
+        if ring > 0:
+            assert grid.get_color(checkpoint.x - 1, checkpoint.y) is checkpoint.color
+            assert checkpoint.command_index > checkpoints[ring - 1].command_index
+            assert checkpoint.used_cells > checkpoints[ring - 1].used_cells
+
+
+def test__put_codels_early_abort():
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!" * 4)
+    layouter = SquareLayouter(False, False)
+    w = 20
+
+    assert layouter._count_spiral_cells(w, w) < len(commands)
+
+    grid = layouter._create_grid(w, w, Color.LIGHT_GREEN)
+
+    with pytest.raises(GridTooSmallError) as e:
+        layouter._put_codels(list(commands), grid, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)
+
+    # 停止用プログラムの領域に到達する前に、2周目の開始位置で中断する
+    assert len(layouter.checkpoints) == 2
+    assert e.value.command_index == layouter.checkpoints[1].command_index
+    assert e.value.used_cells == layouter.checkpoints[1].used_cells
+
+
 def test_generate_raises_generate_command_error(mocker):
     layouter = SquareLayouter()
     mocker.patch.object(layouter, "_do_layout_impl", mocker.MagicMock(side_effect=LayoutCommandError))
@@ -468,6 +768,88 @@ def test__is_in_abort_program_area(w, h, expect):
             assert expect is layouter._is_in_abort_program_area(grid, x, y)
 
 
+@pytest.mark.parametrize('w, abort_program, expect_offset, expect_area, expect_entry', [
+    pytest.param(7,  SquareLayouter._ABORT_PROGRAM_ODD,  (1, 1), (0, 1, 6, 6), (3, 3), id='7 x 7'),
+    pytest.param(8,  SquareLayouter._ABORT_PROGRAM_EVEN, (1, 1), (0, 1, 7, 7), (3, 4), id='8 x 8'),
+    pytest.param(9,  SquareLayouter._ABORT_PROGRAM_ODD,  (2, 2), (1, 2, 7, 7), (4, 4), id='9 x 9'),
+    pytest.param(10, SquareLayouter._ABORT_PROGRAM_EVEN, (2, 2), (1, 2, 8, 8), (4, 5), id='10 x 10'),
+])
+def test_layout_geometry(w, abort_program, expect_offset, expect_area, expect_entry):
+    geometry = LayoutGeometry(w, w, abort_program)
+
+    assert geometry.width == w
+    assert geometry.height == w
+    assert geometry.abort_program is abort_program
+    assert geometry.offset == expect_offset
+    assert geometry.abort_program_area == expect_area
+    assert geometry.entry == expect_entry
+
+    # 進入位置は停止用プログラムのABORTコマンドのセル
+    assert geometry.get_abort_program_command(*geometry.entry) is LayoutCommand.ABORT
+    assert geometry.get_abort_program_command(0, 0) is None
+
+
+def test_layout_geometry_lines():
+    geometry = LayoutGeometry(7, 7, SquareLayouter._ABORT_PROGRAM_ODD)
+
+    # 7x7: 上端 / 右端 / 下端 の3ライン
+    assert geometry.lines == (
+        (0, 0, DirectionPointer.RIGHT, 7),
+        (6, 1, DirectionPointer.DOWN,  6),
+        (5, 6, DirectionPointer.LEFT,  6),
+    )
+    assert geometry.ring_cells == (0,)
+    assert geometry.spiral_cells == (7 - 2) + (6 - 2) + (6 - 2)
+
+
+@pytest.mark.parametrize('w', [7, 8, 20, 21])
+def test_layout_geometry_lines_spiral(w):
+    layouter = SquareLayouter()
+    geometry = layouter._get_geometry(w, w)
+    grid = CodelGrid(w, w)
+
+    # 螺旋の各ラインが重複せず、停止用プログラムの領域外で連続するかテスト
+    x, y = 0, 0
+    for line in geometry.lines:
+        assert (line.x, line.y) == (x, y)
+        assert line.length >= 3
+        assert line.length == geometry.get_line_length(line.x, line.y, line.dp)
+
+        for i in range(line.length):
+            cell_x = line.x + line.dp.dx * i
+            cell_y = line.y + line.dp.dy * i
+            assert grid.is_empty(cell_x, cell_y)
+            assert not geometry.is_in_abort_program_area(cell_x, cell_y)
+            grid.set_color(cell_x, cell_y, Color.RED)
+
+        next_dp = DirectionPointer.rotate(line.dp, 1)
+        x = line.x + line.dp.dx * (line.length - 1) + next_dp.dx
+        y = line.y + line.dp.dy * (line.length - 1) + next_dp.dy
+
+    assert geometry.spiral_cells == sum(line.length - 2 for line in geometry.lines)
+    assert geometry.spiral_cells == layouter._count_spiral_cells(w, w)
+
+    # 配置形状はgridのサイズごとに1度だけ生成する
+    assert layouter._get_geometry(w, w) is geometry
+
+
+def test_layout_geometry_ring_cells():
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+    layouter = SquareLayouter(False, False)
+    w, h = layouter._predict_grid_size(commands)
+    w += 2
+    h += 2
+
+    grid = layouter._create_grid(w, h, Color.LIGHT_GREEN)
+    layouter._put_codels(list(commands), grid, 0, 0, DirectionPointer.RIGHT, Color.LIGHT_RED)
+
+    # 各周回の開始位置で記録したチェックポイントの使用セル数と、周回の境界が一致するかテスト
+    ring_cells = layouter._get_geometry(w, h).ring_cells
+
+    assert [checkpoint.used_cells for checkpoint in layouter.checkpoints] == \
+        list(ring_cells[:len(layouter.checkpoints)])
+
+
 @pytest.mark.parametrize('grid, random_colors', [
     pytest.param([
             [None, None, None],
@@ -498,13 +880,15 @@ def test__is_in_abort_program_area(w, h, expect):
 ])
 def test__put_to_empty_cells(grid, random_colors, mocker):
     expect = copy.deepcopy(grid)
+    grid = CodelGrid.from_codels(grid)
 
-    layouter = SquareLayouter()
+    layouter = SquareLayouter(fill_mode=FillMode.RANDOM)
     mocker.patch.object(
         layouter,
         '_get_random_color',
-        side_effect=lambda exclude_colors: random.choice(
-            [color for color in random_colors if color not in exclude_colors]))
+        side_effect=lambda exclude_colors, exclude_mask, rand: random.choice(
+            [color for color in random_colors
+             if (color not in (exclude_colors or [])) and not ((exclude_mask >> color.index) & 1)]))
     layouter._put_to_empty_cells(grid)
 
     for y in range(len(grid)):
@@ -514,3 +898,44 @@ def test__put_to_empty_cells(grid, random_colors, mocker):
 
             if expect[y][x] is not None:
                 assert expect[y][x].color == grid[y][x].color 
+
+
+@pytest.mark.parametrize('grid', [
+    pytest.param([[None] * 7 for _ in range(6)], id='all empty'),
+    pytest.param([
+            [None,                      Codel(Color.CYAN),  None,                     None],
+            [Codel(Color.LIGHT_YELLOW), None,               Codel(Color.BLUE),        None],
+            [None,                      Codel(Color.WHITE), None,                     Codel(Color.BLACK)],
+            [Codel(Color.DARK_MAGENTA), None,               Codel(Color.LIGHT_GREEN), None],
+        ],
+        id='conflict with pattern'),
+])
+def test__put_to_empty_cells_pattern(grid, mocker):
+    expect = copy.deepcopy(grid)
+    grid = CodelGrid.from_codels(grid)
+
+    layouter = SquareLayouter(False, False)
+    get_random_color_spy = mocker.spy(layouter, '_get_random_color')
+    layouter._put_to_empty_cells(grid)
+
+    # 乱数を使用せずに、競合が発生しない色を配置するかテスト
+    assert get_random_color_spy.call_count == 0
+
+    for y in range(len(grid)):
+        for x in range(len(grid[0])):
+            assert not grid[y][x] is None
+            assert not layouter._is_conflict(grid[y][x].color, grid, x, y)
+
+            if expect[y][x] is not None:
+                assert expect[y][x].color == grid[y][x].color
+
+
+@pytest.mark.parametrize('fill_mode', [FillMode.PATTERN, FillMode.RANDOM])
+def test_do_layout_fill_mode(fill_mode):
+    commands = FactorizeCommandGenerator(False).generate("Hello Piet World!")
+    message_commands = copy.copy(commands)
+
+    layouter = SquareLayouter(False, False, fill_mode=fill_mode, seed=0)
+    grid = layouter.do_layout(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
+
+    _inspect_layout(layouter, grid, message_commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
@@ -0,0 +1,258 @@
+import random
+
+import pytest
+
+from pietgenerator.codel_grid import CodelGrid
+from pietgenerator.piet_common import Codel
+from pietgenerator.piet_common import Color
+
+
+def test_codel_grid_init():
+    grid = CodelGrid(3, 2)
+
+    assert grid.width == 3
+    assert grid.height == 2
+    assert len(grid) == 2
+    assert len(grid[0]) == 3
+
+    for y in range(2):
+        for x in range(3):
+            assert grid.get(x, y) == CodelGrid.EMPTY
+            assert grid.get_color(x, y) is None
+            assert grid.is_empty(x, y)
+            assert grid[y][x] is None
+
+
+@pytest.mark.parametrize('w, h', [
+    pytest.param(0, 1, id='w=0'),
+    pytest.param(1, 0, id='h=0'),
+])
+def test_codel_grid_init_raise_value_error(w, h):
+    with pytest.raises(ValueError):
+        _ = CodelGrid(w, h)
+
+
+def test_codel_grid_set():
+    grid = CodelGrid(3, 2)
+
+    grid.set(1, 0, Color.RED.index)
+    grid.set_color(2, 1, Color.BLACK)
+
+    assert grid.get(1, 0) == Color.RED.index
+    assert grid.get_color(1, 0) is Color.RED
+    assert grid.get_color(2, 1) is Color.BLACK
+    assert not grid.is_empty(1, 0)
+    assert grid.is_empty(0, 0)
+
+    grid.set(1, 0, CodelGrid.EMPTY)
+
+    assert grid.is_empty(1, 0)
+
+
+def test_codel_grid_from_codels():
+    codels = [
+        [Codel(Color.LIGHT_RED), None,                    Codel(Color.DARK_MAGENTA)],
+        [Codel(Color.WHITE),     Codel(Color.BLACK),      None],
+    ]
+
+    grid = CodelGrid.from_codels(codels)
+
+    assert grid.width == 3
+    assert grid.height == 2
+
+    for y, row in enumerate(codels):
+        for x, codel in enumerate(row):
+            if codel is None:
+                assert grid[y][x] is None
+            else:
+                assert grid[y][x].color is codel.color
+
+    actual = grid.to_codels()
+
+    assert [[None if codel is None else codel.color for codel in row] for row in actual] == [
+        [Color.LIGHT_RED, None,        Color.DARK_MAGENTA],
+        [Color.WHITE,     Color.BLACK, None],
+    ]
+
+
+def test_codel_grid_row_adapter():
+    grid = CodelGrid(3, 2)
+
+    grid[1][2] = Codel(Color.BLUE)
+    grid[-1][0] = Codel(Color.YELLOW)
+
+    assert grid.get_color(2, 1) is Color.BLUE
+    assert grid.get_color(0, 1) is Color.YELLOW
+    assert grid[1][-1].color is Color.BLUE
+    assert [codel is None for codel in grid[1]] == [False, True, False]
+
+    grid[1][2] = None
+
+    assert grid.is_empty(2, 1)
+
+
+@pytest.mark.parametrize('y, x', [
+    pytest.param(2,  0, id='y=2'),
+    pytest.param(-3, 0, id='y=-3'),
+    pytest.param(0,  3, id='x=3'),
+    pytest.param(0, -4, id='x=-4'),
+])
+def test_codel_grid_row_adapter_raise_index_error(y, x):
+    grid = CodelGrid(3, 2)
+
+    with pytest.raises(IndexError):
+        _ = grid[y][x]
+
+
+def test_codel_grid_is_fill_all():
+    grid = CodelGrid(2, 2)
+
+    for index, (x, y) in enumerate([(0, 0), (1, 0), (0, 1), (1, 1)]):
+        assert not grid.is_fill_all()
+        grid.set(x, y, index)
+
+    assert grid.is_fill_all()
+
+
+@pytest.mark.parametrize('x, y, expect', [
+    pytest.param(1, 1, False, id='pos=(1, 1)'),
+    pytest.param(0, 1, True,  id='pos=(0, 1) right'),
+    pytest.param(2, 1, True,  id='pos=(2, 1) left'),
+    pytest.param(1, 0, True,  id='pos=(1, 0) under'),
+    pytest.param(1, 2, True,  id='pos=(1, 2) upper'),
+    pytest.param(0, 0, False, id='pos=(0, 0) diagonal'),
+    pytest.param(2, 2, False, id='pos=(2, 2) diagonal'),
+])
+def test_codel_grid_has_neighbor(x, y, expect):
+    grid = CodelGrid(3, 3)
+    grid.set_color(1, 1, Color.GREEN)
+
+    assert grid.has_neighbor(x, y, Color.GREEN.index) == expect
+    assert not grid.has_neighbor(x, y, Color.RED.index)
+
+
+def test_codel_grid_neighbor_mask():
+    grid = CodelGrid(3, 3)
+
+    assert all(grid.neighbor_mask(x, y) == 0 for y in range(3) for x in range(3))
+
+    grid.set_color(1, 1, Color.GREEN)
+    grid.set_color(1, 0, Color.WHITE)
+    grid.set_color(0, 1, Color.BLACK)
+
+    # 白 / 黒はマスクの対象外
+    assert grid.neighbor_mask(0, 0) == 0
+    assert grid.neighbor_mask(1, 2) == 1 << Color.GREEN.index
+    assert grid.neighbor_mask(2, 1) == 1 << Color.GREEN.index
+
+    grid.set_color(2, 2, Color.GREEN)
+    grid.set_color(2, 0, Color.RED)
+
+    assert grid.neighbor_mask(2, 1) == (1 << Color.GREEN.index) | (1 << Color.RED.index)
+
+    # 上書き後も、他の隣接セルに同じ色が残っている場合はbitを維持する
+    grid.set_color(1, 1, Color.BLUE)
+
+    assert grid.neighbor_mask(2, 1) == ((1 << Color.GREEN.index) | (1 << Color.RED.index) |
+                                        (1 << Color.BLUE.index))
+    assert grid.neighbor_mask(1, 2) == (1 << Color.GREEN.index) | (1 << Color.BLUE.index)
+
+    grid.set(2, 2, CodelGrid.EMPTY)
+
+    assert grid.neighbor_mask(2, 1) == (1 << Color.RED.index) | (1 << Color.BLUE.index)
+    assert grid.neighbor_mask(1, 2) == 1 << Color.BLUE.index
+
+
+def test_codel_grid_neighbor_mask_random():
+    rand = random.Random(0)
+    w = 7
+    h = 5
+    grid = CodelGrid(w, h)
+
+    for _ in range(1000):
+        grid.set(rand.randrange(w), rand.randrange(h), rand.choice([*range(20), CodelGrid.EMPTY]))
+
+    # 隣接色マスク / 隣接判定が、隣接セルを個別に判定した結果と一致するかテスト
+    for y in range(h):
+        for x in range(w):
+            expect = 0
+            for nx, ny in [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]:
+                if (0 <= nx < w) and (0 <= ny < h) and (grid.get(nx, ny) < 18):
+                    expect |= 1 << grid.get(nx, ny)
+
+            assert grid.neighbor_mask(x, y) == expect
+
+            for index in range(20):
+                assert grid.has_neighbor(x, y, index) == any(
+                    grid.get(nx, ny) == index
+                    for nx, ny in [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
+                    if (0 <= nx < w) and (0 <= ny < h))
+
+
+def test_codel_grid_fill_empty():
+    pattern = [bytes([Color.RED.index, Color.BLUE.index]),
+               bytes([Color.BLUE.index, Color.RED.index])]
+    grid = CodelGrid(4, 3)
+    grid.set_color(1, 1, Color.WHITE)
+    grid.set_color(3, 0, Color.RED)
+
+    assert grid.fill_empty(pattern) == 10
+    assert grid.is_fill_all()
+
+    assert [[grid.get_color(x, y) for x in range(4)] for y in range(3)] == [
+        # (2, 0) / (3, 1) は、模様の色(RED)が(3, 0)と競合するため、
+        # 隣接するセルの色を除いた最小のColor.indexの色(LIGHT_RED)に補正
+        [Color.RED,  Color.BLUE,  Color.LIGHT_RED, Color.RED],
+        [Color.BLUE, Color.WHITE, Color.BLUE,      Color.LIGHT_RED],
+        [Color.RED,  Color.BLUE,  Color.RED,       Color.BLUE],
+    ]
+
+    # 空セルがない場合は配置しない
+    assert grid.fill_empty(pattern) == 0
+
+
+def test_codel_grid_fill_empty_random():
+    rand = random.Random(0)
+    w = 9
+    h = 7
+    pattern = [bytes([Color.GREEN.index])]
+
+    for _ in range(20):
+        grid = CodelGrid(w, h)
+        for _ in range(30):
+            grid.set(rand.randrange(w), rand.randrange(h), rand.randrange(20))
+        expect = grid.to_index_rows()
+
+        grid.fill_empty(pattern)
+
+        # 配置済みのセルは変更せず、配置したセルでは競合が発生しないかテスト
+        for y in range(h):
+            for x in range(w):
+                if expect[y][x] != CodelGrid.EMPTY:
+                    assert grid.get(x, y) == expect[y][x]
+                else:
+                    assert grid.get(x, y) < 18
+                    assert not grid.has_neighbor(x, y, grid.get(x, y))
+
+
+def test_codel_grid_row():
+    grid = CodelGrid(3, 2)
+    grid.set_color(0, 1, Color.RED)
+
+    row = grid.row(1)
+
+    assert bytes(row) == bytes([Color.RED.index, CodelGrid.EMPTY, CodelGrid.EMPTY])
+
+    # 行ビューはgridの更新を参照する
+    grid.set_color(2, 1, Color.BLUE)
+
+    assert row[2] == Color.BLUE.index
+
+
+def test_codel_grid_to_index_rows():
+    grid = CodelGrid.from_codels([
+        [Codel(Color.LIGHT_RED), Codel(Color.RED),   Codel(Color.DARK_MAGENTA)],
+        [Codel(Color.WHITE),     Codel(Color.BLACK), Codel(Color.LIGHT_RED)],
+    ])
+
+    assert grid.to_index_rows() == [bytes([0, 6, 17]), bytes([18, 19, 0])]
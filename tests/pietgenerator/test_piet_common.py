@@ -6,6 +6,8 @@ from pietgenerator.piet_common import CodelChooser
 from pietgenerator.piet_common import Color
 from pietgenerator.piet_common import Command
 from pietgenerator.piet_common import DirectionPointer
+from pietgenerator.piet_common import COLOR_TRANSITION_TABLE
+from pietgenerator.piet_common import COMMAND_TRANSITION_TABLE
 from pietgenerator.piet_common import get_command_from_color
 from pietgenerator.piet_common import get_color_from_command
 
@@ -182,6 +184,8 @@ def test_codel_chooser_index_of_raise_valu_error(index):
     pytest.param(Command.OUT_CHAR,    17, 5, 2, id='OUT_CHAR'),
     pytest.param(Command.FREE_ZONE,  100, 0, 0, id='FREE_ZONE'),
     pytest.param(Command.EDGE,       101, 0, 0, id='EDGE'),
+    pytest.param(Command.LOOP_BEGIN, 102, 0, 0, id='LOOP_BEGIN'),
+    pytest.param(Command.LOOP_END,   103, 0, 0, id='LOOP_END'),
 ])
 def test_command_init(command, command_id, hue_step, lightness_step):
     assert command._command_id == command_id
@@ -210,6 +214,8 @@ def test_command_init(command, command_id, hue_step, lightness_step):
     pytest.param(Command.OUT_CHAR,   'OUT_CHAR',   id='OUT_CHAR'),
     pytest.param(Command.FREE_ZONE,  'FREE_ZONE',  id='FREE_ZONE'),
     pytest.param(Command.EDGE,       'EDGE',       id='EDGE'),
+    pytest.param(Command.LOOP_BEGIN, 'LOOP_BEGIN', id='LOOP_BEGIN'),
+    pytest.param(Command.LOOP_END,   'LOOP_END',   id='LOOP_END'),
 ])
 def test_command_str(command, expect):
     assert str(command) == expect
@@ -236,12 +242,25 @@ def test_command_str(command, expect):
     pytest.param(Command.OUT_CHAR,   5, 2, id='OUT_CHAR'),
     pytest.param(Command.FREE_ZONE,  0, 0, id='FREE_ZONE'),
     pytest.param(Command.EDGE,       0, 0, id='EDGE'),
+    pytest.param(Command.LOOP_BEGIN, 0, 0, id='LOOP_BEGIN'),
+    pytest.param(Command.LOOP_END,   0, 0, id='LOOP_END'),
 ])
 def test_command_properties(command, hue_step, lightness_step):
     assert command.hue_step == hue_step
     assert command.lightness_step == lightness_step
 
 
+def test_command_command_id():
+    command_ids = [command.command_id for command in Command]
+
+    assert len(set(command_ids)) == len(command_ids)
+    assert command_ids[:18] == list(range(18))
+    assert Command.FREE_ZONE.command_id == 100
+    assert Command.EDGE.command_id == 101
+    assert Command.LOOP_BEGIN.command_id == 102
+    assert Command.LOOP_END.command_id == 103
+
+
 @pytest.mark.parametrize('hue_step, lightness_step, expect', [
     pytest.param(0, 0, Command.NONE,       id='NONE'),
     pytest.param(0, 1, Command.PUSH,       id='PUSH'),
@@ -271,6 +290,7 @@ def test_command_get_command(hue_step, lightness_step, expect):
     pytest.param(6, 0, id='hue_step=6 lightness_step=0'),
     pytest.param(0, 3, id='hue_step=0 lightness_step=3'),
     pytest.param(6, 3, id='hue_step=6 lightness_step=3'),
+    pytest.param(-1, 0, id='hue_step=-1 lightness_step=0'),
 ])
 def test_command_get_command_raise_value_error(hue_step, lightness_step):
     with pytest.raises(ValueError):
@@ -391,6 +411,7 @@ def test_color_get_color(hue, lightness, expect):
     pytest.param(6, 0, id='hue=6 lightness=0'),
     pytest.param(0, 3, id='hue=0 lightness=3'),
     pytest.param(6, 3, id='hue=6 lightness=3'),
+    pytest.param(-1, 0, id='hue=-1 lightness=0'),
 ])
 def test_color_get_color_raise_value_error(hue, lightness):
     with pytest.raises(ValueError):
@@ -422,6 +443,52 @@ def test_color_name_of(name, expect):
     assert expect is actual
 
 
+@pytest.mark.parametrize('name', [
+    pytest.param('PURPLE', id='PURPLE'),
+    pytest.param('red',    id='red'),
+])
+def test_color_name_of_raise_value_error(name):
+    with pytest.raises(ValueError):
+        _ = Color.name_of(name)
+
+
+@pytest.mark.parametrize('index, expect', [
+    pytest.param( 0, Color.LIGHT_RED,     id='LIGHT_RED'),
+    pytest.param( 1, Color.LIGHT_YELLOW,  id='LIGHT_YELLOW'),
+    pytest.param( 2, Color.LIGHT_GREEN,   id='LIGHT_GREEN'),
+    pytest.param( 3, Color.LIGHT_CYAN,    id='LIGHT_CYAN'),
+    pytest.param( 4, Color.LIGHT_BLUE,    id='LIGHT_BLUE'),
+    pytest.param( 5, Color.LIGHT_MAGENTA, id='LIGHT_MAGENTA'),
+    pytest.param( 6, Color.RED,           id='RED'),
+    pytest.param( 7, Color.YELLOW,        id='YELLOW'),
+    pytest.param( 8, Color.GREEN,         id='GREEN'),
+    pytest.param( 9, Color.CYAN,          id='CYAN'),
+    pytest.param(10, Color.BLUE,          id='BLUE'),
+    pytest.param(11, Color.MAGENTA,       id='MAGENTA'),
+    pytest.param(12, Color.DARK_RED,      id='DARK_RED'),
+    pytest.param(13, Color.DARK_YELLOW,   id='DARK_YELLOW'),
+    pytest.param(14, Color.DARK_GREEN,    id='DARK_GREEN'),
+    pytest.param(15, Color.DARK_CYAN,     id='DARK_CYAN'),
+    pytest.param(16, Color.DARK_BLUE,     id='DARK_BLUE'),
+    pytest.param(17, Color.DARK_MAGENTA,  id='DARK_MAGENTA'),
+    pytest.param(18, Color.WHITE,         id='WHITE'),
+    pytest.param(19, Color.BLACK,         id='BLACK'),
+])
+def test_color_index_of(index, expect):
+    actual = Color.index_of(index)
+    assert expect is actual
+    assert expect.index == index
+
+
+@pytest.mark.parametrize('index', [
+    pytest.param(20, id='index=20'),
+    pytest.param(-1, id='index=-1'),
+])
+def test_color_index_of_raise_value_error(index):
+    with pytest.raises(ValueError):
+        _ = Color.index_of(index)
+
+
 @pytest.mark.parametrize('color', [
     pytest.param(Color.BLACK, id='NONE'),
 ])
@@ -535,3 +602,55 @@ def test_get_color_from_command(command, color, expect):
 def test_get_command_from_color(current_color, next_color, expect):
     actual = get_command_from_color(current_color, next_color)
     assert actual is expect
+
+
+@pytest.mark.parametrize('command, color, expect', [
+    pytest.param(Command.FREE_ZONE, Color.RED,   Color.RED,   id='FREE_ZONE: RED'),
+    pytest.param(Command.EDGE,      Color.BLUE,  Color.BLUE,  id='EDGE: BLUE'),
+])
+def test_get_color_from_command_out_of_table(command, color, expect):
+    actual = get_color_from_command(command, color)
+    assert actual is expect
+
+
+@pytest.mark.parametrize('current_color, next_color, expect', [
+    pytest.param(Color.WHITE, Color.RED,   Command.NONE,      id='WHITE -> RED'),
+    pytest.param(Color.WHITE, Color.WHITE, Command.NONE,      id='WHITE -> WHITE'),
+    pytest.param(Color.RED,   Color.WHITE, Command.FREE_ZONE, id='RED -> WHITE'),
+])
+def test_get_command_from_color_white(current_color, next_color, expect):
+    actual = get_command_from_color(current_color, next_color)
+    assert actual is expect
+
+
+def test_color_transition_table():
+    colors = [color for color in Color if (color.index is not None) and (color.index < 18)]
+    commands = [command for command in Command if command.command_id < 18]
+
+    assert len(COLOR_TRANSITION_TABLE) == 18
+
+    for color in colors:
+        assert len(COLOR_TRANSITION_TABLE[color.index]) == 18
+
+        for command in commands:
+            next_color = Color.index_of(COLOR_TRANSITION_TABLE[color.index][command.command_id])
+
+            assert next_color.hue == (color.hue + command.hue_step) % 6
+            assert next_color.lightness == (color.lightness + command.lightness_step) % 3
+
+
+def test_command_transition_table():
+    colors = [color for color in Color if (color.index is not None) and (color.index < 18)]
+
+    assert len(COMMAND_TRANSITION_TABLE) == 19
+
+    for color in colors:
+        assert len(COMMAND_TRANSITION_TABLE[color.index]) == 19
+        assert COMMAND_TRANSITION_TABLE[color.index][Color.WHITE.index] is Command.FREE_ZONE
+        assert COMMAND_TRANSITION_TABLE[Color.WHITE.index][color.index] is Command.NONE
+
+        for next_color in colors:
+            command = COMMAND_TRANSITION_TABLE[color.index][next_color.index]
+
+            # 色遷移テーブルと逆の関係となる
+            assert COLOR_TRANSITION_TABLE[color.index][command.command_id] == next_color.index
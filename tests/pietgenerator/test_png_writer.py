@@ -0,0 +1,132 @@
+import zlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from pietgenerator.png_writer import PngWriter
+from pietgenerator.rasterizer import ImageMode
+from pietgenerator.rasterizer import PALETTE_RGB
+from pietgenerator.rasterizer import rasterize
+
+
+def _read_chunks(png):
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+
+    chunks = []
+    pos = 8
+
+    while pos < len(png):
+        length = int.from_bytes(png[pos:pos + 4], "big")
+        chunk_type = png[pos + 4:pos + 8]
+        data = png[pos + 8:pos + 8 + length]
+        crc = int.from_bytes(png[pos + 8 + length:pos + 12 + length], "big")
+
+        assert crc == zlib.crc32(chunk_type + data)
+
+        chunks.append((chunk_type, data))
+        pos += 12 + length
+
+    return chunks
+
+
+@pytest.mark.parametrize('image_mode', [
+    pytest.param(ImageMode.RGBA,    id='RGBA'),
+    pytest.param(ImageMode.PALETTE, id='PALETTE'),
+])
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(1,  id='codel_size=1'),
+    pytest.param(3,  id='codel_size=3'),
+    pytest.param(10, id='codel_size=10'),
+])
+def test_write(image_mode, codel_size):
+    rows = [bytes([0, 6, 17, 1]), bytes([18, 19, 0, 2]), bytes([5, 11, 12, 19])]
+    w = len(rows[0])
+    h = len(rows)
+
+    fp = BytesIO()
+    PngWriter(image_mode).write(fp, rows, codel_size)
+
+    image = Image.open(BytesIO(fp.getvalue()))
+
+    assert image.mode == image_mode.pil_mode
+    assert image.size == (w * codel_size, h * codel_size)
+    assert image.tobytes() == rasterize(rows, codel_size, image_mode)
+
+    if image_mode is ImageMode.PALETTE:
+        assert bytes(image.getpalette()) == PALETTE_RGB
+
+
+def test_write_chunks():
+    rows = [bytes([0, 6, 17]), bytes([18, 19, 0])]
+    codel_size = 4
+
+    fp = BytesIO()
+    PngWriter(ImageMode.PALETTE).write(fp, rows, codel_size)
+
+    chunks = _read_chunks(fp.getvalue())
+
+    assert [chunk_type for chunk_type, _ in chunks] == [b"IHDR", b"PLTE", b"IDAT", b"IEND"]
+
+    # Codel 1行内の2行目以降のスキャンラインは、"Up"フィルタですべて0となる
+    data = zlib.decompress(chunks[2][1])
+    stride = 1 + (len(rows[0]) * codel_size)
+
+    for y in range(len(rows) * codel_size):
+        scanline = data[y * stride:(y + 1) * stride]
+
+        if (y % codel_size) == 0:
+            assert scanline[0] == 0
+        else:
+            assert scanline == b"\x02" + bytes(stride - 1)
+
+
+def test_write_split_idat_chunks():
+    rows = [bytes([(x * 7 + y) % 20 for x in range(64)]) for y in range(64)]
+
+    fp = BytesIO()
+    PngWriter(ImageMode.RGBA, compress_level=0, chunk_size=1024).write(fp, rows, 2)
+
+    chunks = _read_chunks(fp.getvalue())
+    idat_chunks = [data for chunk_type, data in chunks if chunk_type == b"IDAT"]
+
+    assert len(idat_chunks) > 1
+
+    image = Image.open(BytesIO(fp.getvalue()))
+
+    assert image.tobytes() == rasterize(rows, 2, ImageMode.RGBA)
+
+
+@pytest.mark.parametrize('compress_level', [
+    pytest.param(0, id='compress_level=0'),
+    pytest.param(9, id='compress_level=9'),
+])
+def test_write_compress_level(compress_level):
+    rows = [bytes([(x * 7 + y) % 20 for x in range(16)]) for y in range(16)]
+
+    fp = BytesIO()
+    PngWriter(ImageMode.RGBA, compress_level=compress_level).write(fp, rows, 5)
+
+    image = Image.open(BytesIO(fp.getvalue()))
+
+    assert image.tobytes() == rasterize(rows, 5, ImageMode.RGBA)
+
+
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(2,  id='codel_size=2'),
+    pytest.param(7,  id='codel_size=7'),
+    pytest.param(16, id='codel_size=16'),
+])
+def test_write_split_bands(codel_size, mocker):
+    rows = [bytes([0, 6, 17, 1]), bytes([18, 19, 0, 2])]
+
+    # "Up"フィルタのスキャンラインを3行ずつ圧縮する
+    stride = 1 + (len(rows[0]) * codel_size * 4)
+    mocker.patch.object(PngWriter, "_BAND_SIZE", stride * 3)
+
+    fp = BytesIO()
+    PngWriter(ImageMode.RGBA).write(fp, rows, codel_size)
+
+    image = Image.open(BytesIO(fp.getvalue()))
+
+    assert image.tobytes() == rasterize(rows, codel_size, ImageMode.RGBA)
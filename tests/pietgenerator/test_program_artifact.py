@@ -0,0 +1,136 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from pietgenerator.piet_common import Codel
+from pietgenerator.piet_common import Color
+from pietgenerator.program_artifact import ProgramArtifact
+from pietgenerator.rasterizer import ImageMode
+from pietgenerator.rasterizer import rasterize
+
+
+_ROWS = [bytes([0, 6, 17, 1]), bytes([18, 19, 0, 2]), bytes([5, 11, 12, 19])]
+
+
+def test_init():
+    artifact = ProgramArtifact(_ROWS, cache_size=3)
+
+    assert artifact.width == 4
+    assert artifact.height == 3
+    assert artifact.rows == _ROWS
+    assert artifact.cache_info() == (0, 3)
+
+
+@pytest.mark.parametrize('rows', [
+    pytest.param([], id='no rows'),
+    pytest.param([b""], id='empty row'),
+    pytest.param([bytes([0, 1]), bytes([0])], id='different widths'),
+])
+def test_init_raise_value_error(rows):
+    with pytest.raises(ValueError):
+        _ = ProgramArtifact(rows)
+
+
+def test_from_grid():
+    grid = [
+        [Codel(Color.LIGHT_RED), Codel(Color.RED)],
+        [Codel(Color.WHITE),     Codel(Color.BLACK)],
+    ]
+
+    artifact = ProgramArtifact.from_grid(grid)
+
+    assert artifact.rows == [bytes([0, 6]), bytes([18, 19])]
+
+
+@pytest.mark.parametrize('image_mode', [
+    pytest.param(ImageMode.RGBA,    id='RGBA'),
+    pytest.param(ImageMode.PALETTE, id='PALETTE'),
+])
+def test_to_png_from_png(image_mode):
+    artifact = ProgramArtifact(_ROWS)
+    png = artifact.to_png(image_mode)
+
+    image = Image.open(BytesIO(png))
+    assert image.size == (artifact.width, artifact.height)
+
+    actual = ProgramArtifact.from_png(png)
+
+    assert actual.rows == _ROWS
+
+
+def test_from_png_raise_value_error():
+    fp = BytesIO()
+    Image.new("RGB", (2, 2), (1, 2, 3)).save(fp, format="PNG")
+
+    with pytest.raises(ValueError):
+        _ = ProgramArtifact.from_png(fp.getvalue())
+
+
+@pytest.mark.parametrize('image_mode', [
+    pytest.param(ImageMode.RGBA,    id='RGBA'),
+    pytest.param(ImageMode.PALETTE, id='PALETTE'),
+])
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(1,  id='codel_size=1'),
+    pytest.param(10, id='codel_size=10'),
+])
+def test_render(image_mode, codel_size):
+    artifact = ProgramArtifact(_ROWS)
+    image = Image.open(BytesIO(artifact.render(codel_size, image_mode)))
+
+    assert image.size == (artifact.width * codel_size, artifact.height * codel_size)
+    assert image.tobytes() == rasterize(_ROWS, codel_size, image_mode)
+
+
+def test_render_to():
+    artifact = ProgramArtifact(_ROWS, cache_size=0)
+
+    fp = BytesIO()
+    artifact.render_to(fp, 5)
+
+    assert fp.getvalue() == artifact.render(5)
+
+
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(0,  id='codel_size=0'),
+    pytest.param(-1, id='codel_size=-1'),
+])
+def test_render_raise_value_error(codel_size):
+    artifact = ProgramArtifact(_ROWS)
+
+    with pytest.raises(ValueError):
+        _ = artifact.render(codel_size)
+
+
+def test_render_cache(mocker):
+    artifact = ProgramArtifact(_ROWS, cache_size=2)
+    render_to_spy = mocker.spy(artifact, "render_to")
+
+    image1 = artifact.render(1)
+    image2 = artifact.render(2)
+
+    # キャッシュ済み
+    assert artifact.render(1) is image1
+    assert render_to_spy.call_count == 2
+    assert artifact.cache_info() == (2, 2)
+
+    # 最も長く使用されていない codel_size=2 が削除される
+    _ = artifact.render(3)
+    assert artifact.cache_info() == (2, 2)
+    assert artifact.render(1) is image1
+    assert render_to_spy.call_count == 3
+
+    assert artifact.render(2) == image2
+    assert render_to_spy.call_count == 4
+
+
+def test_render_without_cache(mocker):
+    artifact = ProgramArtifact(_ROWS, cache_size=0)
+    render_to_spy = mocker.spy(artifact, "render_to")
+
+    _ = artifact.render(1)
+    _ = artifact.render(1)
+
+    assert render_to_spy.call_count == 2
+    assert artifact.cache_info() == (0, 0)
@@ -1,4 +1,4 @@
-
+import random
 from io import BytesIO
 
 import pytest
@@ -9,6 +9,7 @@ from pietgenerator.piet_common import Color
 from pietgenerator.piet_common import Command
 from pietgenerator.program_generator import GenerateProgramError
 from pietgenerator.program_generator import ProgramGenerator
+from pietgenerator.rasterizer import ImageMode
 from pietgenerator.command_generator.command_generator import GenerateCommandError
 from pietgenerator.command_layouter.command_layouter import LayoutCommandError
 
@@ -25,6 +26,8 @@ def test_generate(mocker):
     start_color = Color.RED
     abort_program_color = Color.MAGENTA
     codel_size = 20
+    image_mode = ImageMode.PALETTE
+    compress_level = 9
     grid = [[Command.NONE, Command.NONE], [Command.NONE, Command.NONE]]
     image = b"\x00\x01\x02"
 
@@ -37,11 +40,11 @@ def test_generate(mocker):
     gen = ProgramGenerator(command_generator_mock, command_layouter_mock)
     translate_mock = mocker.patch.object(gen, "_translate", mocker.MagicMock(return_value=image))
 
-    actual = gen.generate(message, start_color=start_color, abort_program_color=abort_program_color, codel_size=codel_size)
+    actual = gen.generate(message, start_color=start_color, abort_program_color=abort_program_color, codel_size=codel_size, image_mode=image_mode, compress_level=compress_level)
 
     command_generator_generate_mock.assert_called_once_with(message)
     command_layouter_do_layout_mock.assert_called_once_with(commands, start_color, abort_program_color)
-    translate_mock.assert_called_once_with(grid, codel_size)
+    translate_mock.assert_called_once_with(grid, codel_size, image_mode, compress_level)
     assert actual == image
 
 
@@ -64,7 +67,7 @@ def test_generate_call_default_values(mocker):
 
     command_generator_generate_mock.assert_called_once_with(message)
     command_layouter_do_layout_mock.assert_called_once_with(commands, Color.LIGHT_RED, Color.LIGHT_GREEN)
-    translate_mock.assert_called_once_with(grid, 10)
+    translate_mock.assert_called_once_with(grid, 10, ImageMode.RGBA, -1)
     assert actual == image
 
 
@@ -89,6 +92,116 @@ def test_generate_raise_exception(side_effect_commnad_generator, side_effect_com
         _ = gen.generate("")
 
 
+def test_generate_to(mocker):
+    message = "Hello Piet World!"
+    commands = [Command.NONE, Command.PUSH, Command.POP]
+    start_color = Color.RED
+    abort_program_color = Color.MAGENTA
+    codel_size = 20
+    image_mode = ImageMode.PALETTE
+    compress_level = 9
+    grid = [[Command.NONE, Command.NONE], [Command.NONE, Command.NONE]]
+    stream = BytesIO()
+
+    command_generator_mock = mocker.MagicMock()
+    command_generator_generate_mock = mocker.patch.object(command_generator_mock, "generate", mocker.MagicMock(return_value=commands))
+
+    command_layouter_mock = mocker.MagicMock()
+    command_layouter_do_layout_mock = mocker.patch.object(command_layouter_mock, "do_layout", mocker.MagicMock(return_value=grid))
+
+    gen = ProgramGenerator(command_generator_mock, command_layouter_mock)
+    translate_to_mock = mocker.patch.object(gen, "_translate_to", mocker.MagicMock())
+
+    gen.generate_to(stream, message, start_color=start_color, abort_program_color=abort_program_color, codel_size=codel_size, image_mode=image_mode, compress_level=compress_level)
+
+    command_generator_generate_mock.assert_called_once_with(message)
+    command_layouter_do_layout_mock.assert_called_once_with(commands, start_color, abort_program_color)
+    translate_to_mock.assert_called_once_with(stream, grid, codel_size, image_mode, compress_level)
+
+
+@pytest.mark.parametrize('side_effect_commnad_generator, side_effect_commnad_layouter', [
+    pytest.param(GenerateCommandError, [], id='command_generator: GenerateCommandError'),
+    pytest.param([], LayoutCommandError, id='command_layouter: LayoutCommandError'),
+])
+def test_generate_to_raise_exception(side_effect_commnad_generator, side_effect_commnad_layouter, mocker):
+    command_generator_mock = mocker.MagicMock()
+    mocker.patch.object(command_generator_mock, "generate", mocker.MagicMock(side_effect=side_effect_commnad_generator))
+
+    command_layouter_mock = mocker.MagicMock()
+    mocker.patch.object(command_layouter_mock, "do_layout", mocker.MagicMock(side_effect=side_effect_commnad_layouter))
+
+    gen = ProgramGenerator(command_generator_mock, command_layouter_mock)
+    mocker.patch.object(gen, "_translate_to", mocker.MagicMock())
+
+    with pytest.raises(GenerateProgramError):
+        gen.generate_to(BytesIO(), "")
+
+
+def test_generate_to_raise_os_error(mocker):
+    command_generator_mock = mocker.MagicMock()
+    command_layouter_mock = mocker.MagicMock()
+
+    gen = ProgramGenerator(command_generator_mock, command_layouter_mock)
+    mocker.patch.object(gen, "_translate_to", mocker.MagicMock(side_effect=OSError))
+
+    with pytest.raises(OSError):
+        gen.generate_to(BytesIO(), "")
+
+
+def test_generate_artifact(mocker):
+    message = "Hello Piet World!"
+    commands = [Command.NONE, Command.PUSH, Command.POP]
+    start_color = Color.RED
+    abort_program_color = Color.MAGENTA
+    grid = [[Codel(Color.RED), Codel(Color.BLUE)], [Codel(Color.WHITE), Codel(Color.BLACK)]]
+
+    command_generator_mock = mocker.MagicMock()
+    command_generator_generate_mock = mocker.patch.object(command_generator_mock, "generate", mocker.MagicMock(return_value=commands))
+
+    command_layouter_mock = mocker.MagicMock()
+    command_layouter_do_layout_mock = mocker.patch.object(command_layouter_mock, "do_layout", mocker.MagicMock(return_value=grid))
+
+    gen = ProgramGenerator(command_generator_mock, command_layouter_mock)
+
+    artifact = gen.generate_artifact(message, start_color=start_color, abort_program_color=abort_program_color, cache_size=3)
+
+    command_generator_generate_mock.assert_called_once_with(message)
+    command_layouter_do_layout_mock.assert_called_once_with(commands, start_color, abort_program_color)
+    assert artifact.rows == [bytes([Color.RED.index, Color.BLUE.index]), bytes([Color.WHITE.index, Color.BLACK.index])]
+    assert artifact.cache_info() == (0, 3)
+
+    # 拡大したPietプログラムファイルは_translateと同一となる
+    for codel_size in [1, 5, 10]:
+        assert artifact.render(codel_size) == gen._translate(grid, codel_size)
+
+
+def test_generate_artifact_raise_exception(mocker):
+    command_generator_mock = mocker.MagicMock()
+    mocker.patch.object(command_generator_mock, "generate", mocker.MagicMock(side_effect=GenerateCommandError))
+
+    gen = ProgramGenerator(command_generator_mock, mocker.MagicMock())
+
+    with pytest.raises(GenerateProgramError):
+        _ = gen.generate_artifact("")
+
+
+@pytest.mark.parametrize('image_mode', [
+    pytest.param(ImageMode.RGBA,    id='RGBA'),
+    pytest.param(ImageMode.PALETTE, id='PALETTE'),
+])
+def test_piet_generator__translate_to(image_mode):
+    grid = [
+        [Codel(Color.LIGHT_RED), Codel(Color.RED),   Codel(Color.DARK_RED)],
+        [Codel(Color.BLACK),     Codel(Color.WHITE), Codel(Color.BLACK)],
+    ]
+    gen = ProgramGenerator(None, None)
+
+    stream = BytesIO()
+    gen._translate_to(stream, grid, 10, image_mode)
+
+    assert stream.getvalue() == gen._translate(grid, 10, image_mode)
+
+
 @pytest.mark.parametrize('grid, codel_size', [
     pytest.param([
             [Codel(Color.LIGHT_RED),     Codel(Color.RED),     Codel(Color.DARK_RED)],
@@ -137,3 +250,75 @@ def test_piet_generator__translate(grid, codel_size):
                     assert g == grid[y][x].color.g
                     assert b == grid[y][x].color.b
                     assert a == grid[y][x].color.a
+
+
+def _translate_by_putpixel(grid, codel_size):
+    # 1pixelずつ描画する従来の実装 (出力画像の比較用)
+    h = len(grid)
+    w = len(grid[0])
+
+    image = Image.new("RGBA", (w * codel_size, h * codel_size))
+
+    for y in range(h):
+        for x in range(w):
+            color = grid[y][x].color
+
+            for i in range(codel_size):
+                for j in range(codel_size):
+                    image.putpixel(((x * codel_size) + j, (y * codel_size) + i),
+                                   (color.r, color.g, color.b, color.a))
+
+    fp = BytesIO()
+    image.save(fp, format="PNG")
+
+    return fp.getvalue()
+
+
+@pytest.mark.parametrize('w, h, codel_size', [
+    pytest.param( 1,  1,  1, id='1 x 1: codel_size=1'),
+    pytest.param( 7,  5,  3, id='7 x 5: codel_size=3'),
+    pytest.param(20, 20, 10, id='20 x 20: codel_size=10'),
+])
+def test_piet_generator__translate_same_as_putpixel(w, h, codel_size):
+    colors = [color for color in Color if color is not Color.COLOR_MAX]
+    rand = random.Random(w * h * codel_size)
+    grid = [[Codel(rand.choice(colors)) for _ in range(w)] for _ in range(h)]
+
+    gen = ProgramGenerator(None, None)
+
+    actual = Image.open(BytesIO(gen._translate(grid, codel_size)))
+    expect = Image.open(BytesIO(_translate_by_putpixel(grid, codel_size)))
+
+    assert actual.mode == expect.mode
+    assert actual.size == expect.size
+    assert actual.tobytes() == expect.tobytes()
+
+
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(1,  id='codel_size=1'),
+    pytest.param(10, id='codel_size=10'),
+])
+def test_piet_generator__translate_palette(codel_size):
+    grid = [
+        [Codel(Color.LIGHT_RED),     Codel(Color.RED),     Codel(Color.DARK_RED)],
+        [Codel(Color.LIGHT_YELLOW),  Codel(Color.YELLOW),  Codel(Color.DARK_YELLOW)],
+        [Codel(Color.LIGHT_GREEN),   Codel(Color.GREEN),   Codel(Color.DARK_GREEN)],
+        [Codel(Color.LIGHT_CYAN),    Codel(Color.CYAN),    Codel(Color.DARK_CYAN)],
+        [Codel(Color.LIGHT_BLUE),    Codel(Color.BLUE),    Codel(Color.DARK_BLUE)],
+        [Codel(Color.LIGHT_MAGENTA), Codel(Color.MAGENTA), Codel(Color.DARK_MAGENTA)],
+        [Codel(Color.BLACK),         Codel(Color.WHITE),   Codel(Color.BLACK)],
+    ]
+    w = len(grid[0])
+    h = len(grid)
+    gen = ProgramGenerator(None, None)
+    image = Image.open(BytesIO(gen._translate(grid, codel_size, ImageMode.PALETTE)))
+
+    assert image.mode == "P"
+    assert len(image.getpalette()) == 20 * 3
+    assert image.width == w * codel_size
+    assert image.height == h * codel_size
+
+    # RGBA形式と同一の画素となるかテスト
+    expect = Image.open(BytesIO(gen._translate(grid, codel_size, ImageMode.RGBA)))
+
+    assert list(image.convert("RGBA").getdata()) == list(expect.getdata())
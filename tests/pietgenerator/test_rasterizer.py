@@ -0,0 +1,113 @@
+import pytest
+
+from pietgenerator.codel_grid import CodelGrid
+
+from pietgenerator.piet_common import Codel
+from pietgenerator.piet_common import Color
+from pietgenerator.rasterizer import ImageMode
+from pietgenerator.rasterizer import PALETTE
+from pietgenerator.rasterizer import PALETTE_RGB
+from pietgenerator.rasterizer import rasterize
+from pietgenerator.rasterizer import rasterize_palette
+from pietgenerator.rasterizer import rasterize_rgba
+from pietgenerator.rasterizer import to_index_rows
+
+
+def test_palette():
+    assert len(PALETTE) == 20
+
+    for index, color in enumerate(PALETTE):
+        assert color.index == index
+
+
+def test_to_index_rows():
+    grid = [
+        [Codel(Color.LIGHT_RED), Codel(Color.RED),   Codel(Color.DARK_MAGENTA)],
+        [Codel(Color.WHITE),     Codel(Color.BLACK), Codel(Color.LIGHT_RED)],
+    ]
+
+    actual = to_index_rows(grid)
+
+    assert actual == [bytes([0, 6, 17]), bytes([18, 19, 0])]
+
+
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(1,  id='codel_size=1'),
+    pytest.param(3,  id='codel_size=3'),
+    pytest.param(10, id='codel_size=10'),
+])
+def test_rasterize_rgba(codel_size):
+    rows = [bytes([0, 6, 17]), bytes([18, 19, 0])]
+    h = len(rows)
+    w = len(rows[0])
+
+    actual = rasterize_rgba(rows, codel_size)
+
+    assert len(actual) == (w * codel_size) * (h * codel_size) * 4
+
+    for py in range(h * codel_size):
+        for px in range(w * codel_size):
+            color = PALETTE[rows[py // codel_size][px // codel_size]]
+            offset = ((py * w * codel_size) + px) * 4
+
+            assert tuple(actual[offset:offset + 4]) == (color.r, color.g, color.b, color.a)
+
+
+@pytest.mark.parametrize('codel_size', [
+    pytest.param(1,  id='codel_size=1'),
+    pytest.param(3,  id='codel_size=3'),
+])
+def test_rasterize_palette(codel_size):
+    rows = [bytes([0, 6, 17]), bytes([18, 19, 0])]
+    h = len(rows)
+    w = len(rows[0])
+
+    actual = rasterize_palette(rows, codel_size)
+
+    assert len(actual) == (w * codel_size) * (h * codel_size)
+
+    for py in range(h * codel_size):
+        for px in range(w * codel_size):
+            assert actual[(py * w * codel_size) + px] == rows[py // codel_size][px // codel_size]
+
+
+@pytest.mark.parametrize('image_mode, expect', [
+    pytest.param(ImageMode.RGBA,    rasterize_rgba,    id='RGBA'),
+    pytest.param(ImageMode.PALETTE, rasterize_palette, id='PALETTE'),
+])
+def test_rasterize(image_mode, expect):
+    rows = [bytes([0, 6, 17]), bytes([18, 19, 0])]
+
+    assert rasterize(rows, 2, image_mode) == expect(rows, 2)
+
+
+def test_palette_rgb():
+    assert len(PALETTE_RGB) == 20 * 3
+
+    for index, color in enumerate(PALETTE):
+        assert tuple(PALETTE_RGB[index * 3:(index + 1) * 3]) == (color.r, color.g, color.b)
+
+
+@pytest.mark.parametrize('name, expect', [
+    pytest.param('RGBA',    ImageMode.RGBA,    id='RGBA'),
+    pytest.param('PALETTE', ImageMode.PALETTE, id='PALETTE'),
+])
+def test_image_mode_name_of(name, expect):
+    assert ImageMode.name_of(name) is expect
+    assert str(expect) == name
+
+
+def test_image_mode_name_of_raise_value_error():
+    with pytest.raises(ValueError):
+        _ = ImageMode.name_of('P')
+
+
+def test_to_index_rows_codel_grid():
+    grid = [
+        [Codel(Color.LIGHT_RED), Codel(Color.RED),   Codel(Color.DARK_MAGENTA)],
+        [Codel(Color.WHITE),     Codel(Color.BLACK), Codel(Color.LIGHT_RED)],
+    ]
+
+    actual = to_index_rows(CodelGrid.from_codels(grid))
+
+    assert actual == to_index_rows(grid)